@@ -5,10 +5,17 @@ Visualización interactiva de la red social procesada con CUDA
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from cuda_wrapper import CUDASocialNetwork
+import numpy as np
+from metrics import summarize, format_bytes
+from paging import PagedTable, TextWindow, render_paged_table, render_text_window
+from memo import fingerprint, memoized, session_fingerprint
+import charts
+from network_layout import RESULT_GRAPHS, NetworkGraph, compute_layout, layout_stats
+from cuda_wrapper import MAX_CONCURRENT_RUNS, CUDASocialNetwork
+from query_server import DEFAULT_URL, RemoteSocialNetwork
 import time
+import asyncio
+import threading
 
 # Configuración de la página
 st.set_page_config(
@@ -44,13 +51,44 @@ st.markdown("""
 st.markdown('<p class="main-header">🚀 Red Social con CUDA</p>', unsafe_allow_html=True)
 st.markdown("---")
 
-# Inicializar el wrapper de CUDA
-@st.cache_resource
+# Un wrapper de CUDA por sesión: dataset, métricas y el análisis en curso son
+# de la instancia; el ejecutable compilado se comparte (reuse_binary)
 def get_cuda_network():
-    return CUDASocialNetwork()
+    if 'cuda_network' not in st.session_state:
+        network = CUDASocialNetwork()
+        network.reuse_binary()
+        st.session_state['cuda_network'] = network
+    return st.session_state['cuda_network']
+
+# Cada sesión corre su propio event loop (run_slots() no las acota entre sí):
+# el límite de ejecuciones simultáneas del binario es de todo el proceso
+@st.cache_resource
+def get_run_slots():
+    return threading.BoundedSemaphore(MAX_CONCURRENT_RUNS)
+
+# nvcc escribe siempre el mismo ejecutable: una compilación a la vez
+@st.cache_resource
+def get_compile_lock():
+    return threading.Lock()
 
 network = get_cuda_network()
 
+# Ventanas de tiempo del motor remoto (desplazamientos desde el último evento)
+VENTANAS = {"Toda la historia": None, "Últimas 24 h": "-24h", "Últimos 7 días": "-7d",
+            "Últimos 30 días": "-30d"}
+
+# Cliente del servicio compartido (query_server.py), uno por URL
+@st.cache_resource
+def get_remote_network(url):
+    return RemoteSocialNetwork(url)
+
+# Columnas derivadas de la tabla de reacciones (se calculan una vez por dataset)
+def engagement_columns(columnas):
+    total = columnas['likes'] + columnas['dislikes']
+    ratio = np.divide(columnas['likes'] * 100.0, total,
+                      out=np.zeros(len(total)), where=total > 0)
+    return {'total_reacciones': total, 'ratio_positivo': ratio.round(2)}
+
 # Sidebar con controles
 with st.sidebar:
     st.header("⚙️ Configuración")
@@ -68,7 +106,7 @@ with st.sidebar:
 
     # Botón de compilación
     if st.button("🔨 Compilar Código CUDA", disabled=not cuda_exists):
-        with st.spinner("Compilando..."):
+        with st.spinner("Compilando..."), get_compile_lock():
             success, msg = network.compile()
             if success:
                 st.success(msg)
@@ -77,23 +115,86 @@ with st.sidebar:
 
     st.markdown("---")
 
+    # Motor: binario CUDA de esta sesión o servicio compartido entre dashboards
+    motor = st.radio("🖥️ Motor", ["CUDA local", "Remoto (API)"], horizontal=True,
+                     help="El motor remoto es un query_server.py corriendo en otra terminal")
+    remoto = motor == "Remoto (API)"
+    if remoto:
+        api_url = st.text_input("URL del servicio", value=DEFAULT_URL)
+        ventana = st.selectbox("🕒 Ventana de tiempo", list(VENTANAS),
+                               help="Seguidores, reacciones, top y hashtags de la ventana "
+                                    "(requiere un dataset con marcas de tiempo)")
+    else:
+        dataset_dir = st.text_input("📁 Dataset", value="",
+                                    help="Directorio generado con graph_generator.py "
+                                         "(vacío = datos de ejemplo del programa)")
+        limite = st.number_input("⏳ Timeout (s)", min_value=0, value=0, step=30,
+                                 help="Corta la ejecución del binario (0 = automático "
+                                      "según el tamaño del dataset)")
+
+    # Instrumentación (desactivada no agrega costo)
+    medir = st.checkbox("⏱️ Medir rendimiento", value=False, disabled=remoto,
+                        help="Registra tiempos, bytes copiados a la GPU y memoria pico por consulta")
+    network.set_metrics(medir)
+
     # Botón de ejecución
     if st.button("▶️ Ejecutar Análisis", type="primary"):
-        if not network.compiled:
-            st.warning("⚠️ Compilando código primero...")
-            success, msg = network.compile()
-            if not success:
-                st.error(msg)
+        if remoto:
+            remote = get_remote_network(api_url)
+            with st.spinner("Consultando el motor remoto..."):
+                desde = VENTANAS[ventana]
+                # Cascadas y analítica de hashtags son de toda la historia
+                data = remote.get_parsed_data(**({'desde': desde} if desde else {'analitica': '1'}))
+            if data:
+                st.session_state['data'] = data
+                # El servicio ya envía la huella de la respuesta (ETag)
+                st.session_state['huella'] = remote.etag or fingerprint(data)
+                st.success("✓ Análisis completado!")
+                st.rerun()
+            else:
+                st.error(f"Error al consultar {api_url}: {remote.last_error}")
+        else:
+            try:
+                network.set_dataset(dataset_dir.strip() or None)
+            except ValueError as error:
+                st.error(str(error))
                 st.stop()
 
-        with st.spinner("Ejecutando código CUDA..."):
-            data = network.get_parsed_data()
+            with get_compile_lock():
+                if not network.compiled and not network.reuse_binary():
+                    st.warning("⚠️ Compilando código primero...")
+                    success, msg = network.compile()
+                    if not success:
+                        st.error(msg)
+                        st.stop()
+
+            # Ejecución asíncrona: el estado muestra cada sección que imprime el
+            # binario y detener la app mata el proceso
+            with st.status("Ejecutando código CUDA...") as estado:
+                def avance(etapa, detalle):
+                    if detalle:
+                        estado.update(label=f"Ejecutando: {detalle.capitalize()}")
+                    elif etapa == "parseo":
+                        estado.update(label="Procesando resultados...")
+
+                slots = get_run_slots()
+                if not slots.acquire(blocking=False):
+                    estado.update(label="Esperando turno: hay otros análisis en curso...")
+                    slots.acquire()
+                try:
+                    data = asyncio.run(network.get_parsed_data_async(
+                        timeout=limite or None, progress=avance))
+                finally:
+                    slots.release()
+                estado.update(label="Ejecución terminada" if data else "Error de ejecución",
+                              state="complete" if data else "error")
             if data:
                 st.session_state['data'] = data
+                st.session_state['huella'] = fingerprint(data)
                 st.success("✓ Análisis completado!")
                 st.rerun()
             else:
-                st.error("Error al ejecutar el código CUDA")
+                st.error(f"Error al ejecutar el código CUDA: {network.last_error}")
 
     st.markdown("---")
 
@@ -108,6 +209,8 @@ with st.sidebar:
             "#️⃣ Hashtags",
             "🚫 Usuarios Bloqueados",
             "💼 Recomendaciones Empresas",
+            "🧩 Comunidades",
+            "⏱️ Rendimiento",
             "📄 Output Completo"
         ]
     )
@@ -149,6 +252,12 @@ if 'data' not in st.session_state:
 
 else:
     data = st.session_state['data']
+    # Tablas y figuras se reutilizan entre reruns mientras no cambie la huella
+    huella = session_fingerprint(st.session_state, data)
+    if data.get('ventana'):
+        ventana = data['ventana']
+        st.caption(f"🕒 Ventana de tiempo: {ventana['desde'] or 'inicio'} → "
+                   f"{ventana['hasta'] or 'último evento'}")
 
     # Dashboard General
     if view_option == "📈 Dashboard General":
@@ -181,45 +290,29 @@ else:
         with col1:
             # Top 5 personas por seguidores
             st.subheader("🏆 Top 5 Personas - Seguidores")
-            personas_df = pd.DataFrame(data['seguidores']['personas'])
-            if not personas_df.empty:
-                personas_df = personas_df.sort_values('seguidores', ascending=False).head(5)
-                fig = px.bar(
-                    personas_df,
-                    x='nombre',
-                    y='seguidores',
-                    color='seguidores',
-                    color_continuous_scale='Blues'
-                )
-                fig.update_layout(showlegend=False)
+            personas_tabla = memoized(huella, 'tabla_personas', lambda: PagedTable.from_records(
+                data['seguidores']['personas']))
+            if len(personas_tabla):
+                fig = memoized(huella, 'fig_top_personas', lambda: charts.top_bar(
+                    pd.DataFrame(personas_tabla.top('seguidores', 5)), 'nombre', 'seguidores', 'Blues'))
                 st.plotly_chart(fig, use_container_width=True)
 
         with col2:
             # Top empresas por seguidores
             st.subheader("🏢 Top Empresas - Seguidores")
-            empresas_df = pd.DataFrame(data['seguidores']['empresas'])
-            if not empresas_df.empty:
-                empresas_df = empresas_df.sort_values('seguidores', ascending=False)
-                fig = px.bar(
-                    empresas_df,
-                    x='nombre',
-                    y='seguidores',
-                    color='seguidores',
-                    color_continuous_scale='Greens'
-                )
-                fig.update_layout(showlegend=False)
+            empresas_tabla = memoized(huella, 'tabla_empresas', lambda: PagedTable.from_records(
+                data['seguidores']['empresas']))
+            if len(empresas_tabla):
+                fig = memoized(huella, 'fig_top_empresas', lambda: charts.top_bar(
+                    pd.DataFrame(empresas_tabla.top('seguidores', 10)), 'nombre', 'seguidores', 'Greens'))
                 st.plotly_chart(fig, use_container_width=True)
 
         # Distribución de hashtags
         st.subheader("📊 Distribución de Hashtags")
-        hashtags_df = pd.DataFrame(data['hashtags']['conteo'])
-        if not hashtags_df.empty:
-            fig = px.pie(
-                hashtags_df,
-                values='cantidad',
-                names='hashtag',
-                title='Popularidad de Hashtags'
-            )
+        if data['hashtags']['conteo']:
+            fig = memoized(huella, 'fig_popularidad_hashtags', lambda: charts.share_pie(
+                pd.DataFrame(data['hashtags']['conteo']), 'cantidad', 'hashtag',
+                'Popularidad de Hashtags'))
             st.plotly_chart(fig, use_container_width=True)
 
     # Vista de Seguidores
@@ -229,47 +322,31 @@ else:
         tab1, tab2 = st.tabs(["Personas", "Empresas"])
 
         with tab1:
-            personas_df = pd.DataFrame(data['seguidores']['personas'])
-            if not personas_df.empty:
-                st.dataframe(
-                    personas_df.sort_values('seguidores', ascending=False),
-                    use_container_width=True,
-                    hide_index=True
-                )
-
-                # Gráfico de barras horizontal
-                fig = px.bar(
-                    personas_df.sort_values('seguidores'),
-                    x='seguidores',
-                    y='nombre',
-                    orientation='h',
-                    title='Seguidores por Persona',
-                    color='seguidores',
-                    color_continuous_scale='Viridis'
-                )
+            personas_tabla = memoized(huella, 'tabla_personas', lambda: PagedTable.from_records(
+                data['seguidores']['personas']))
+            if len(personas_tabla):
+                personas_df = render_paged_table(personas_tabla, 'tabla_personas',
+                                                 sort_by='seguidores')
+
+                # Gráfico de barras horizontal (página visible)
+                fig = memoized(huella, 'fig_personas', lambda: charts.horizontal_bar(
+                    personas_df, 'seguidores', 'nombre', 'Seguidores por Persona', 'Viridis'),
+                    personas_df.attrs['vista'])
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No hay datos de personas disponibles")
 
         with tab2:
-            empresas_df = pd.DataFrame(data['seguidores']['empresas'])
-            if not empresas_df.empty:
-                st.dataframe(
-                    empresas_df.sort_values('seguidores', ascending=False),
-                    use_container_width=True,
-                    hide_index=True
-                )
-
-                # Gráfico de barras horizontal
-                fig = px.bar(
-                    empresas_df.sort_values('seguidores'),
-                    x='seguidores',
-                    y='nombre',
-                    orientation='h',
-                    title='Seguidores por Empresa',
-                    color='seguidores',
-                    color_continuous_scale='Plasma'
-                )
+            empresas_tabla = memoized(huella, 'tabla_empresas', lambda: PagedTable.from_records(
+                data['seguidores']['empresas']))
+            if len(empresas_tabla):
+                empresas_df = render_paged_table(empresas_tabla, 'tabla_empresas',
+                                                 sort_by='seguidores')
+
+                # Gráfico de barras horizontal (página visible)
+                fig = memoized(huella, 'fig_empresas', lambda: charts.horizontal_bar(
+                    empresas_df, 'seguidores', 'nombre', 'Seguidores por Empresa', 'Plasma'),
+                    empresas_df.attrs['vista'])
                 st.plotly_chart(fig, use_container_width=True)
             else:
                 st.info("No hay datos de empresas disponibles")
@@ -278,52 +355,24 @@ else:
     elif view_option == "❤️ Reacciones":
         st.header("❤️ Reacciones por Publicación")
 
-        reacciones_df = pd.DataFrame(data['reacciones'])
-        if not reacciones_df.empty:
-            # Calcular engagement
-            reacciones_df['total_reacciones'] = reacciones_df['likes'] + reacciones_df['dislikes']
-            reacciones_df['ratio_positivo'] = (
-                reacciones_df['likes'] / reacciones_df['total_reacciones'] * 100
-            ).fillna(0).round(2)
-
-            # Mostrar tabla
-            st.dataframe(
-                reacciones_df.sort_values('total_reacciones', ascending=False),
-                use_container_width=True,
-                hide_index=True
-            )
+        reacciones_tabla = memoized(huella, 'tabla_reacciones', lambda: PagedTable.from_records(
+            data['reacciones'], derive=engagement_columns))
+        if len(reacciones_tabla):
+            render_paged_table(reacciones_tabla, 'tabla_reacciones', sort_by='total_reacciones')
+
+            # Los gráficos cubren todas las publicaciones; charts.py las agrupa
+            # o reduce por encima del umbral para acotar lo enviado al navegador
+            reacciones_df = memoized(huella, 'df_reacciones',
+                                     lambda: pd.DataFrame(reacciones_tabla.columns))
 
             # Gráfico de likes vs dislikes
-            fig = go.Figure()
-            fig.add_trace(go.Bar(
-                name='Likes',
-                x=reacciones_df['post_id'],
-                y=reacciones_df['likes'],
-                marker_color='green'
-            ))
-            fig.add_trace(go.Bar(
-                name='Dislikes',
-                x=reacciones_df['post_id'],
-                y=reacciones_df['dislikes'],
-                marker_color='red'
-            ))
-            fig.update_layout(
-                title='Likes vs Dislikes por Publicación',
-                barmode='group',
-                xaxis_title='Post ID',
-                yaxis_title='Cantidad'
-            )
+            fig = memoized(huella, 'fig_likes_dislikes',
+                           lambda: charts.likes_dislikes(reacciones_df))
             st.plotly_chart(fig, use_container_width=True)
 
             # Ratio positivo
-            fig2 = px.line(
-                reacciones_df.sort_values('post_id'),
-                x='post_id',
-                y='ratio_positivo',
-                markers=True,
-                title='Ratio de Aceptación por Publicación (%)'
-            )
-            fig2.update_layout(yaxis_range=[0, 100])
+            fig2 = memoized(huella, 'fig_ratio_positivo',
+                            lambda: charts.acceptance_line(reacciones_df))
             st.plotly_chart(fig2, use_container_width=True)
         else:
             st.info("No hay datos de reacciones disponibles")
@@ -332,37 +381,81 @@ else:
     elif view_option == "🏆 Top Publicaciones":
         st.header("🏆 Top Publicaciones")
 
-        col1, col2 = st.columns(2)
+        # Con cascadas (motor NumPy) se puede ordenar por alcance de republicaciones
+        orden = "❤️ Likes"
+        if data.get('cascadas'):
+            orden = st.radio("Ordenar por", ["❤️ Likes", "🔁 Alcance de cascada"],
+                             horizontal=True, key='top_orden')
 
-        with col1:
-            st.subheader("⭐ Top 5 - MÁS Likes")
-            mas_likes = data['top_posts']['mas_likes']
-            if mas_likes:
-                for i, post in enumerate(mas_likes, 1):
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <strong>#{i}</strong> - {post['likes']} ❤️<br>
-                        "{post['texto']}"
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.markdown("<br>", unsafe_allow_html=True)
-            else:
-                st.info("No hay datos disponibles")
+        if orden == "❤️ Likes":
+            col1, col2 = st.columns(2)
 
-        with col2:
-            st.subheader("📉 Top 5 - MENOS Likes")
-            menos_likes = data['top_posts']['menos_likes']
-            if menos_likes:
-                for i, post in enumerate(menos_likes, 1):
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <strong>#{i}</strong> - {post['likes']} ❤️<br>
-                        "{post['texto']}"
-                    </div>
-                    """, unsafe_allow_html=True)
-                    st.markdown("<br>", unsafe_allow_html=True)
+            with col1:
+                st.subheader("⭐ Top 5 - MÁS Likes")
+                mas_likes = data['top_posts']['mas_likes']
+                if mas_likes:
+                    for i, post in enumerate(mas_likes, 1):
+                        st.markdown(f"""
+                        <div class="metric-card">
+                            <strong>#{i}</strong> - {post['likes']} ❤️<br>
+                            "{post['texto']}"
+                        </div>
+                        """, unsafe_allow_html=True)
+                        st.markdown("<br>", unsafe_allow_html=True)
+                else:
+                    st.info("No hay datos disponibles")
+
+            with col2:
+                st.subheader("📉 Top 5 - MENOS Likes")
+                menos_likes = data['top_posts']['menos_likes']
+                if menos_likes:
+                    for i, post in enumerate(menos_likes, 1):
+                        st.markdown(f"""
+                        <div class="metric-card">
+                            <strong>#{i}</strong> - {post['likes']} ❤️<br>
+                            "{post['texto']}"
+                        </div>
+                        """, unsafe_allow_html=True)
+                        st.markdown("<br>", unsafe_allow_html=True)
+                else:
+                    st.info("No hay datos disponibles")
+        else:
+            cascadas = data['cascadas']
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Cascadas", f"{cascadas['cascadas']:,}")
+            with col2:
+                st.metric("Republicaciones", f"{cascadas['republicaciones']:,}")
+            with col3:
+                st.metric("Mayor Alcance", f"{cascadas['mayor_alcance']:,}")
+            with col4:
+                st.metric("Profundidad Máxima", cascadas['profundidad_max'])
+
+            top = list(cascadas['top'])
+            if top:
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    st.subheader(f"🔁 Top {len(top)} - MAYOR Alcance")
+                    for i, post in enumerate(top, 1):
+                        st.markdown(f"""
+                        <div class="metric-card">
+                            <strong>#{i}</strong> - {post['alcance']} 🔁 · {post['likes']} ❤️ ·
+                            profundidad {post['profundidad']}<br>
+                            "{post['texto']}"
+                        </div>
+                        """, unsafe_allow_html=True)
+                        st.markdown("<br>", unsafe_allow_html=True)
+
+                with col2:
+                    st.subheader("📊 Alcance y Likes de la Cascada")
+                    fig = memoized(huella, 'fig_cascadas', lambda: charts.top_bar(
+                        pd.DataFrame(top).assign(
+                            post=lambda df: 'Post ' + df['post_id'].astype(str)),
+                        'post', 'alcance', 'Purples'))
+                    st.plotly_chart(fig, use_container_width=True)
             else:
-                st.info("No hay datos disponibles")
+                st.info("No hay publicaciones")
 
     # Vista de Hashtags
     elif view_option == "#️⃣ Hashtags":
@@ -384,57 +477,82 @@ else:
         st.markdown("---")
 
         # Tabla de todos los hashtags
-        hashtags_df = pd.DataFrame(data['hashtags']['conteo'])
-        if not hashtags_df.empty:
+        hashtags_tabla = memoized(huella, 'tabla_hashtags', lambda: PagedTable.from_records(
+            data['hashtags']['conteo']))
+        if len(hashtags_tabla):
             col1, col2 = st.columns(2)
 
             with col1:
-                st.dataframe(
-                    hashtags_df.sort_values('cantidad', ascending=False),
-                    use_container_width=True,
-                    hide_index=True
-                )
+                render_paged_table(hashtags_tabla, 'tabla_hashtags', sort_by='cantidad')
 
             with col2:
-                # Gráfico de dona
-                fig = px.pie(
-                    hashtags_df,
-                    values='cantidad',
-                    names='hashtag',
-                    hole=0.4,
-                    title='Distribución de Hashtags'
-                )
+                # Gráfico de dona (top hashtags + "Otros")
+                fig = memoized(huella, 'fig_distribucion_hashtags', lambda: charts.share_pie(
+                    pd.DataFrame(hashtags_tabla.columns), 'cantidad', 'hashtag',
+                    'Distribución de Hashtags', hole=0.4))
                 st.plotly_chart(fig, use_container_width=True)
         else:
             st.info("No hay datos de hashtags disponibles")
 
+        # Analítica (motor NumPy): varios hashtags por post, interacción y tendencias
+        analitica = data.get('analitica_hashtags')
+        if analitica:
+            st.markdown("---")
+            st.subheader("📈 Analítica de Hashtags")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Posts con Hashtag", f"{analitica['posts_con_hashtag']:,}")
+            with col2:
+                st.metric("Autores", f"{analitica['autores']:,}")
+            with col3:
+                st.metric("Pares que Co-ocurren", f"{analitica['pares']:,}")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**❤️ Interacción por Hashtag**")
+                if analitica['interaccion']:
+                    fig = memoized(huella, 'fig_interaccion_hashtags', lambda: charts.top_bar(
+                        pd.DataFrame(analitica['interaccion']), 'hashtag', 'likes', 'Reds'))
+                    st.plotly_chart(fig, use_container_width=True)
+            with col2:
+                st.markdown("**🔥 Tendencias**")
+                if analitica['tendencias']:
+                    st.dataframe(pd.DataFrame(analitica['tendencias']), hide_index=True,
+                                 use_container_width=True)
+                else:
+                    st.info("Ningún hashtag supera a sus ventanas anteriores")
+
+            st.markdown("**🔗 Hashtags que Aparecen Juntos**")
+            if analitica['coocurrencias']:
+                st.dataframe(pd.DataFrame(analitica['coocurrencias']), hide_index=True,
+                             use_container_width=True)
+            else:
+                st.info("Ningún post combina varios hashtags")
+
     # Vista de Bloqueados
     elif view_option == "🚫 Usuarios Bloqueados":
         st.header("🚫 Seguidores Bloqueados")
 
         bloqueados = data['bloqueados']
         if bloqueados:
-            bloqueados_df = pd.DataFrame(bloqueados)
-
-            # Contar bloqueos por usuario
-            bloqueos_count = bloqueados_df.groupby('usuario').size().reset_index(name='total_bloqueados')
+            bloqueados_tabla = memoized(huella, 'tabla_bloqueados',
+                                        lambda: PagedTable.from_records(bloqueados))
 
             col1, col2 = st.columns(2)
 
             with col1:
                 st.subheader("📊 Total de Bloqueos por Usuario")
-                fig = px.bar(
-                    bloqueos_count.sort_values('total_bloqueados', ascending=False),
-                    x='usuario',
-                    y='total_bloqueados',
-                    color='total_bloqueados',
-                    color_continuous_scale='Reds'
-                )
+                # Se grafican los 20 usuarios con más bloqueos
+                fig = memoized(huella, 'fig_bloqueos', lambda: charts.top_bar(
+                    pd.DataFrame(bloqueados_tabla.group_count('usuario', 'total_bloqueados')
+                                 .top('total_bloqueados', 20)),
+                    'usuario', 'total_bloqueados', 'Reds'))
                 st.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 st.subheader("📋 Lista Detallada")
-                st.dataframe(bloqueados_df, use_container_width=True, hide_index=True)
+                render_paged_table(bloqueados_tabla, 'tabla_bloqueados', sort_by='usuario',
+                                   descending=False)
         else:
             st.info("No hay usuarios bloqueados")
 
@@ -444,14 +562,10 @@ else:
 
         recomendaciones = data['recomendaciones']
         if recomendaciones:
-            rec_df = pd.DataFrame(recomendaciones)
+            rec_df = memoized(huella, 'df_recomendaciones', lambda: pd.DataFrame(recomendaciones))
 
             st.dataframe(rec_df, use_container_width=True, hide_index=True)
 
-            # Gráfico de red (simplificado)
-            st.subheader("🔗 Red de Recomendaciones")
-            st.info("Red de empresas que se recomiendan entre sí")
-
             # Mostrar métricas
             col1, col2 = st.columns(2)
             with col1:
@@ -462,11 +576,113 @@ else:
         else:
             st.info("No hay recomendaciones entre empresas")
 
+        # Grafo de relaciones; el layout se calcula una vez por dataset
+        relaciones = [nombre for nombre, (clave, _, _) in RESULT_GRAPHS.items() if data.get(clave)]
+        if relaciones:
+            st.subheader("🔗 Red de Recomendaciones")
+            relacion = st.radio("Relación", relaciones, horizontal=True, key='red_relacion')
+            clave, origen, destino = RESULT_GRAPHS[relacion]
+            with st.spinner("Calculando layout..."):
+                layout = memoized(huella, 'layout_red', lambda: compute_layout(
+                    NetworkGraph.from_records(data[clave], origen, destino)), relacion)
+
+            for col, (nombre, valor) in zip(st.columns(4), layout_stats(layout)):
+                col.metric(nombre, valor)
+            if layout.aggregated:
+                st.info("Grafo grande: cada nodo agrupa una comunidad (propagación de "
+                        "etiquetas); las comunidades más chicas se juntan en \"Otros\"")
+
+            fig = memoized(huella, 'fig_red', lambda: charts.network_graph(
+                layout, f"Red de {relacion}"), relacion)
+            st.plotly_chart(fig, use_container_width=True)
+
+    # Vista de Comunidades
+    elif view_option == "🧩 Comunidades":
+        st.header("🧩 Componentes y Comunidades")
+
+        comunidades = data.get('comunidades')
+        if comunidades:
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Componentes Débiles", f"{comunidades['componentes_debiles']:,}")
+            with col2:
+                st.metric("Componentes Fuertes", f"{comunidades['componentes_fuertes']:,}")
+            with col3:
+                st.metric("Comunidades", f"{comunidades['comunidades']:,}")
+            with col4:
+                st.metric("Modularidad", f"{comunidades['modularidad']:.3f}")
+
+            tamanos_tabla = memoized(huella, 'tabla_comunidades',
+                                     lambda: PagedTable.from_records(comunidades['tamanos']))
+            miembros_tabla = memoized(huella, 'tabla_miembros',
+                                      lambda: PagedTable.from_records(comunidades['miembros']))
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                st.subheader("📊 Comunidades más Grandes")
+                # Se grafican las 20 comunidades con más miembros
+                fig = memoized(huella, 'fig_comunidades', lambda: charts.top_bar(
+                    pd.DataFrame(tamanos_tabla.top('miembros', 20)).assign(
+                        comunidad=lambda df: 'C' + df['comunidad'].astype(str)),
+                    'comunidad', 'miembros', 'Teal'))
+                st.plotly_chart(fig, use_container_width=True)
+
+            with col2:
+                st.subheader("📋 Tamaños")
+                render_paged_table(tamanos_tabla, 'tabla_comunidades', sort_by='miembros')
+
+            st.subheader("👤 Miembros")
+            render_paged_table(miembros_tabla, 'tabla_miembros', sort_by='comunidad',
+                               descending=False, filter_columns=['nombre'])
+        else:
+            st.info("Estos resultados no incluyen comunidades: generarlos con "
+                    "`python numpy_engine.py <dataset> --communities` o consultar "
+                    "`/comunidades` en el motor remoto (backend numpy)")
+
+    # Vista de Rendimiento
+    elif view_option == "⏱️ Rendimiento":
+        st.header("⏱️ Rendimiento por Consulta")
+
+        metricas = data.get('metricas')
+        if metricas:
+            resumen = summarize(metricas)
+
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("⚡ Consultas", f"{resumen['consultas_s'] * 1000:.2f} ms")
+            with col2:
+                st.metric("🎮 Kernels GPU", f"{resumen['kernel_ms']:.2f} ms")
+            with col3:
+                st.metric("🔁 Host ↔ Device",
+                          format_bytes(resumen['h2d_bytes'] + resumen['d2h_bytes']))
+            with col4:
+                st.metric("🧩 Parseo", f"{resumen['parseo_s'] * 1000:.2f} ms")
+
+            metricas_df = memoized(huella, 'df_metricas', lambda: charts.metrics_frame(metricas))
+
+            fig = memoized(huella, 'fig_tiempos', lambda: charts.query_times(metricas_df))
+            st.plotly_chart(fig, use_container_width=True)
+
+            # Transferencias de la ruta CUDA
+            if 'h2d_bytes' in metricas_df.columns:
+                fig = memoized(huella, 'fig_transferencias',
+                               lambda: charts.transfer_bytes(metricas_df))
+                st.plotly_chart(fig, use_container_width=True)
+
+            st.dataframe(metricas_df.drop(columns=['ms']), use_container_width=True,
+                         hide_index=True)
+        else:
+            st.info("Estos resultados no incluyen métricas. Activa '⏱️ Medir rendimiento' en la barra lateral y vuelve a ejecutar el análisis")
+
     # Vista de Output Completo
     elif view_option == "📄 Output Completo":
         st.header("📄 Output Completo del Programa CUDA")
 
-        st.code(data['output_raw'], language='text')
+        # Visor por ventanas: nunca se renderiza la salida entera
+        ventana = memoized(huella, 'ventana_output',
+                           lambda: TextWindow.from_text(data['output_raw']))
+        render_text_window(ventana, 'visor_output')
 
         # Botón de descarga
         st.download_button(
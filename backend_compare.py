@@ -0,0 +1,407 @@
+"""
+Benchmark diferencial CUDA vs NumPy
+Carga el mismo dataset en el motor NumPy (implementación de referencia) y en
+el binario CUDA, verifica que las consultas den lo mismo (seguidores,
+reacciones, top-K, hashtags, bloqueos, recomendaciones, visibilidad e
+influencia) y mide el speedup de cada una incluyendo las copias
+host<->device, el parseo del wrapper y su parte del costo fijo del binario
+(proceso, contexto CUDA, carga y subida de datos)
+
+Con las mediciones arma la política que usa cuda_wrapper.BackendPolicy para
+elegir el backend de cada consulta según el tamaño de su entrada. El binario
+solo se usa si hay nvcc y GPU (o con --backends numpy cuda); sin ellos se
+miden únicamente los tiempos de referencia
+
+    python backend_compare.py --sizes 1000 10000 100000
+    python backend_compare.py --datasets datos_1m --repeat 5
+"""
+
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmark import (BENCH_DIR, DATA_DIR, DEFAULT_REPEAT, DEFAULT_SIZES, _timed,
+                       ensure_dataset, git_commit)
+from cuda_wrapper import (BACKEND_POLICY_FILE, CUDASocialNetwork, cuda_available, dataset_rows,
+                          query_input_size)
+from numpy_engine import NumpySocialNetwork
+from social_dataset import COMPANY, POST_AUTHOR_TYPE, load_dataset
+
+POLICY_VERSION = 1
+# Posts y personas de ejemplo que el binario consulta (si el dataset los tiene)
+VISIBILITY_POSTS = (0, 5)
+INFLUENCE_PERSONS = (0, 1)
+INFLUENCE_DEGREE = 2
+
+# Consulta -> nombres de sus líneas METRIC en el binario
+CUDA_METRICS = {
+    "seguidores": ("seguidores",),
+    "reacciones": ("reacciones",),
+    "top_posts": ("top_posts",),
+    "hashtags": ("hashtags",),
+    "bloqueados": ("bloqueados",),
+    "recomendaciones": ("recomendaciones",),
+    "visibilidad": tuple(f"visibilidad_post_{post}" for post in VISIBILITY_POSTS),
+    "influencia": tuple(f"influencia_{person}" for person in INFLUENCE_PERSONS),
+}
+# Métricas del binario que no son consultas (van al costo fijo)
+CUDA_SETUP_METRICS = ("contexto_cuda", "carga_datos")
+
+
+# ============================================================================
+# REFERENCIA NUMPY
+# ============================================================================
+
+def _visibility(engine: NumpySocialNetwork) -> Dict[int, Optional[List[str]]]:
+    """Como la sección del binario: None si el post es de una empresa (lo ven todos)"""
+    ds = engine.dataset
+    return {post: None if ds.posts[post, POST_AUTHOR_TYPE] == COMPANY
+            else engine.query_visibility(post)
+            for post in VISIBILITY_POSTS if post < ds.num_posts}
+
+
+def _influence(engine: NumpySocialNetwork) -> Dict[str, List[List[str]]]:
+    ds = engine.dataset
+    return {ds.person_names[person]: engine.query_influence_network(person, INFLUENCE_DEGREE)
+            for person in INFLUENCE_PERSONS if person < ds.num_persons}
+
+
+REFERENCE_QUERIES: Dict[str, Callable[[NumpySocialNetwork], Any]] = {
+    "seguidores": lambda e: e.query_followers(),
+    "reacciones": lambda e: e.query_post_reactions(),
+    "top_posts": lambda e: e.query_top_posts(),
+    "hashtags": lambda e: e.query_hashtags(),
+    "bloqueados": lambda e: e.query_blocked_followers(),
+    "recomendaciones": lambda e: e.query_company_recommendations(),
+    "visibilidad": _visibility,
+    "influencia": _influence,
+}
+
+
+def run_reference(ds, repeat: int) -> Dict[str, Dict]:
+    """
+    Resultado y mediana de tiempo de cada consulta NumPy
+    Cada repetición usa un motor nuevo: los conteos y CSR cacheados se
+    recalculan, como en el binario
+    """
+    results = {}
+    for name, query in REFERENCE_QUERIES.items():
+        value = query(NumpySocialNetwork(ds))
+        times = _timed(lambda: query(NumpySocialNetwork(ds)), repeat)
+        results[name] = {"valor": value, "segundos": statistics.median(times)}
+    return results
+
+
+# ============================================================================
+# BINARIO CUDA
+# ============================================================================
+
+def run_cuda(network: CUDASocialNetwork, dataset: str, repeat: int) -> Dict:
+    """
+    Ejecuta el binario repeat veces con --metrics sobre el dataset
+    Returns: {"consultas": {nombre: {"valor", "segundos", "kernel_s",
+    "transferencia_bytes", "parseo_s"}}, "fijo_s", "programa_s"}
+    Raises: RuntimeError si el binario falla
+    """
+    network.set_dataset(dataset)
+    network.set_metrics(True)
+    runs = []
+    for _ in range(repeat):
+        data = network.get_parsed_data()
+        if data is None:
+            raise RuntimeError(network.last_error or "Error al ejecutar el código CUDA")
+        output = data["output_raw"]
+        started = time.perf_counter()
+        data["visibilidad"] = network.parse_visibility(output)
+        visibility_s = time.perf_counter() - started
+        started = time.perf_counter()
+        data["influencia"] = network.parse_influence(output)
+        influence_s = time.perf_counter() - started
+
+        entries = data["metricas"]
+        binary = {e["consulta"]: e for e in entries if e["backend"] == "cuda"}
+        wrapper = {e["consulta"]: e["segundos"] for e in entries if e["backend"] == "wrapper"}
+        wrapper.update({"parseo_visibilidad": visibility_s, "parseo_influencia": influence_s})
+        query_s = sum(e["segundos"] for name, e in binary.items() if name not in CUDA_SETUP_METRICS)
+        runs.append({"datos": data, "binario": binary, "wrapper": wrapper,
+                     "fijo_s": wrapper["ejecucion"] - query_s, "programa_s": wrapper["ejecucion"]})
+
+    def median(values):
+        return statistics.median(values) if values else 0.0
+
+    queries = {}
+    for name, metric_names in CUDA_METRICS.items():
+        metrics = [[run["binario"][m] for m in metric_names if m in run["binario"]] for run in runs]
+        queries[name] = {
+            "valor": runs[0]["datos"][name],
+            "segundos": median([sum(m["segundos"] for m in ms) for ms in metrics]),
+            "kernel_s": median([sum(m.get("kernel_ms", 0) for m in ms) / 1000 for ms in metrics]),
+            "transferencia_bytes": sum(m.get("h2d_bytes", 0) + m.get("d2h_bytes", 0)
+                                       for m in metrics[0]),
+            "parseo_s": median([run["wrapper"].get(f"parseo_{name}", 0.0) for run in runs]),
+        }
+    return {"consultas": queries,
+            "fijo_s": median([run["fijo_s"] for run in runs]),
+            "programa_s": median([run["programa_s"] for run in runs])}
+
+
+# ============================================================================
+# COMPARACIÓN
+# ============================================================================
+
+def _pairs(records: List[Dict]) -> List[tuple]:
+    return sorted(tuple(record.values()) for record in records)
+
+
+def canonical(name: str, value):
+    """
+    Forma comparable de un resultado: el binario y NumPy pueden listar en otro
+    orden los pares (bloqueos, recomendaciones), los conteos de hashtags y los
+    nombres dentro de un grado de influencia
+    """
+    if name in ("bloqueados", "recomendaciones"):
+        return _pairs(value)
+    if name == "hashtags":
+        top = value["mas_usado"]
+        counts = {h["hashtag"]: h["cantidad"] for h in value["conteo"]}
+        # Con empate en el máximo, cualquiera de los empatados es correcto
+        valid_top = top is None or counts.get(top["hashtag"]) == top["cantidad"]
+        return counts, top and top["cantidad"], valid_top
+    if name == "influencia":
+        return {person: [sorted(level) for level in levels] for person, levels in value.items()}
+    return value
+
+
+def first_difference(name: str, expected, actual) -> str:
+    """Descripción corta de la primera diferencia (para el reporte)"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(set(expected) | set(actual), key=str):
+            if expected.get(key) != actual.get(key):
+                return f"{name}[{key!r}]: numpy={_short(expected.get(key))} cuda={_short(actual.get(key))}"
+    if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+        if len(expected) != len(actual):
+            return f"{name}: {len(expected)} filas en numpy y {len(actual)} en cuda"
+        for i, (a, b) in enumerate(zip(expected, actual)):
+            if a != b:
+                return f"{name}[{i}]: numpy={_short(a)} cuda={_short(b)}"
+    return f"{name}: numpy={_short(expected)} cuda={_short(actual)}"
+
+
+def _short(value, limit: int = 120) -> str:
+    text = repr(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def speedup_row(name: str, size: int, reference: Dict, cuda: Optional[Dict],
+                fixed_share: float) -> Dict:
+    """
+    Fila del reporte de una consulta; speedup compara NumPy con el camino
+    CUDA completo (consulta con sus copias + parseo + parte del costo fijo) y
+    speedup_kernel solo con el tiempo de kernels (cota sin transferencias)
+    """
+    row = {"consulta": name, "tamano_entrada": size,
+           "numpy_s": round(reference["segundos"], 6),
+           "cuda_s": None, "kernel_s": None, "transferencia_bytes": None, "parseo_s": None,
+           "fijo_s": None, "speedup": None, "speedup_kernel": None, "iguales": None,
+           "diferencia": None}
+    if cuda is None:
+        return row
+    total = cuda["segundos"] + cuda["parseo_s"] + fixed_share
+    expected, actual = canonical(name, reference["valor"]), canonical(name, cuda["valor"])
+    row.update({
+        "cuda_s": round(cuda["segundos"], 6),
+        "kernel_s": round(cuda["kernel_s"], 6),
+        "transferencia_bytes": cuda["transferencia_bytes"],
+        "parseo_s": round(cuda["parseo_s"], 6),
+        "fijo_s": round(fixed_share, 6),
+        "speedup": round(reference["segundos"] / total, 3) if total > 0 else None,
+        "speedup_kernel": round(reference["segundos"] / cuda["kernel_s"], 3)
+        if cuda["kernel_s"] > 0 else None,
+        "iguales": expected == actual,
+        "diferencia": None if expected == actual else first_difference(name, expected, actual),
+    })
+    return row
+
+
+def compare_dataset(path: str, repeat: int, network: Optional[CUDASocialNetwork]) -> Dict:
+    """Referencia NumPy y (si hay network) binario CUDA sobre un dataset"""
+    started = time.perf_counter()
+    ds = load_dataset(path)
+    load_s = time.perf_counter() - started
+    reference = run_reference(ds, repeat)
+    rows = dataset_rows(path)
+
+    cuda, error = None, None
+    if network is not None:
+        try:
+            cuda = run_cuda(network, path, repeat)
+        except (RuntimeError, ValueError) as e:
+            error = str(e)
+
+    fixed_share = cuda["fijo_s"] / len(CUDA_METRICS) if cuda else 0.0
+    result = {
+        "dataset": path,
+        "personas": rows["personas"],
+        "filas": sum(rows.values()),
+        "numpy_carga_s": round(load_s, 6),
+        "numpy_total_s": round(load_s + sum(r["segundos"] for r in reference.values()), 6),
+        "cuda_programa_s": None,
+        "cuda_fijo_s": None,
+        "cuda_error": error,
+        "consultas": [speedup_row(name, query_input_size(rows, name), reference[name],
+                                  cuda["consultas"][name] if cuda else None, fixed_share)
+                      for name in REFERENCE_QUERIES],
+    }
+    if cuda:
+        result["cuda_programa_s"] = round(cuda["programa_s"], 6)
+        result["cuda_fijo_s"] = round(cuda["fijo_s"], 6)
+    return result
+
+
+# ============================================================================
+# POLÍTICA DE BACKEND
+# ============================================================================
+
+def derive_policy(results: List[Dict]) -> Dict[str, Dict]:
+    """
+    Umbral por consulta: el menor tamaño de entrada medido desde el cual el
+    camino CUDA completo fue más rápido en ese tamaño y en todos los mayores
+    (None si no ganó en el mayor tamaño medido)
+    """
+    points: Dict[str, List] = {}
+    for result in results:
+        for row in result["consultas"]:
+            if row["speedup"] is not None:
+                points.setdefault(row["consulta"], []).append(
+                    (row["tamano_entrada"], row["speedup"]))
+    policy = {}
+    for name, measured in points.items():
+        measured.sort()
+        threshold = None
+        for size, speedup in reversed(measured):
+            if speedup < 1:
+                break
+            threshold = size
+        policy[name] = {"umbral": threshold, "medidas": [list(point) for point in measured]}
+    return policy
+
+
+def save_policy(policy: Dict[str, Dict], path, meta: Dict) -> Path:
+    """Guarda la política en el formato que lee BackendPolicy.load()"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"version": POLICY_VERSION, **meta, "consultas": policy}, f, indent=2,
+                  ensure_ascii=False)
+    return path
+
+
+def run_comparison(datasets: List[str], use_cuda: bool, repeat: int = DEFAULT_REPEAT,
+                   bench_dir=BENCH_DIR, verbose: bool = False) -> Dict:
+    """
+    Compara los backends en cada dataset y guarda el reporte en bench_dir;
+    si se midió CUDA y todos los resultados coinciden, también la política
+    Returns: {"run_id", "fecha", "commit", "datasets": [...], "politica": ... | None}
+    """
+    network = None
+    if use_cuda:
+        network = CUDASocialNetwork()
+        if not network.reuse_binary():
+            success, message = network.compile()
+            if not success:
+                raise RuntimeError(message)
+
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    meta = {"run_id": run_id, "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit()}
+    results = []
+    for path in datasets:
+        if verbose:
+            print(f"{path}: {'numpy y cuda' if network else 'numpy'}", flush=True)
+        results.append(compare_dataset(path, repeat, network))
+
+    all_equal = all(row["iguales"] is not False for result in results
+                    for row in result["consultas"])
+    policy = None
+    if network is not None and all_equal and not any(r["cuda_error"] for r in results):
+        policy = derive_policy(results)
+        save_policy(policy, Path(bench_dir) / os.path.basename(BACKEND_POLICY_FILE), meta)
+
+    report = {**meta, "datasets": results, "politica": policy}
+    Path(bench_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(bench_dir) / f"diferencial_{run_id}.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
+
+
+def format_table(report: Dict) -> str:
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.2f}"
+
+    lines = [f"{'personas':>9} {'consulta':<16} {'entrada':>10} {'numpy ms':>10} {'cuda ms':>10} "
+             f"{'parseo ms':>10} {'speedup':>8} {'kernel':>8}  iguales"]
+    for result in report["datasets"]:
+        for row in result["consultas"]:
+            equal = {None: "-", True: "sí", False: "NO"}[row["iguales"]]
+            speedup = "-" if row["speedup"] is None else f"x{row['speedup']:.2f}"
+            kernel = "-" if row["speedup_kernel"] is None else f"x{row['speedup_kernel']:.1f}"
+            lines.append(f"{result['personas']:>9} {row['consulta']:<16} {row['tamano_entrada']:>10} "
+                         f"{ms(row['numpy_s']):>10} {ms(row['cuda_s']):>10} "
+                         f"{ms(row['parseo_s']):>10} {speedup:>8} {kernel:>8}  {equal}")
+        if result["cuda_programa_s"] is not None:
+            lines.append(f"{'':>9} programa completo: numpy {ms(result['numpy_total_s'])} ms, "
+                         f"cuda {ms(result['cuda_programa_s'])} ms "
+                         f"(fijo {ms(result['cuda_fijo_s'])} ms)")
+        if result["cuda_error"]:
+            lines.append(f"{'':>9} error de cuda: {result['cuda_error']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Compara CUDA y NumPy sobre los mismos datos "
+                                                 "y arma la política de backend por consulta")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Número de personas de cada grafo generado")
+    parser.add_argument("--datasets", nargs="+", default=None,
+                        help="Directorios de datasets existentes (en lugar de --sizes)")
+    parser.add_argument("--backends", nargs="+", choices=["numpy", "cuda"], default=None,
+                        help="Por defecto numpy y cuda si hay nvcc y GPU")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--bench-dir", default=BENCH_DIR)
+    args = parser.parse_args()
+
+    backends = args.backends or ["numpy"] + (["cuda"] if cuda_available() else [])
+    datasets = args.datasets or [str(ensure_dataset(size, args.seed, args.data_dir))
+                                 for size in args.sizes]
+    try:
+        report = run_comparison(datasets, "cuda" in backends, args.repeat, args.bench_dir,
+                                verbose=True)
+    except RuntimeError as error:
+        print(f"✗ {error}")
+        sys.exit(1)
+    print(format_table(report))
+
+    if report["politica"] is not None:
+        print(f"\nPolítica de backend en {Path(args.bench_dir) / os.path.basename(BACKEND_POLICY_FILE)}:")
+        for name, entry in report["politica"].items():
+            threshold = "numpy siempre" if entry["umbral"] is None else f"cuda desde {entry['umbral']:,} filas"
+            print(f"   {name}: {threshold}")
+    elif "cuda" not in backends:
+        print("\nSin nvcc/GPU: solo tiempos de referencia NumPy (no se genera política)")
+
+    mismatches = [row for result in report["datasets"] for row in result["consultas"]
+                  if row["iguales"] is False]
+    if mismatches:
+        print(f"\n⚠️  {len(mismatches)} consultas con resultados distintos:")
+        for row in mismatches:
+            print(f"   {row['diferencia']}")
+        sys.exit(1)
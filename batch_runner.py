@@ -0,0 +1,333 @@
+"""
+Procesamiento por lotes de snapshots
+Analiza una lista de datasets (p. ej. un snapshot por región y por día) con
+un conjunto de consultas y escribe, por snapshot, un bundle Parquet y/o un
+resultados.json más un resumen del lote (resumen_lote.json)
+
+Es reanudable: cada snapshot terminado deja lote.json con la huella de su
+dataset, las consultas, el backend y los formatos; una corrida posterior lo
+omite si la huella no cambió. Cada snapshot se escribe en un directorio
+temporal que se renombra al terminar, así que un corte no deja resultados a
+medias
+
+    python batch_runner.py snapshots/*/* --output lote --workers 4
+    python batch_runner.py --manifest snapshots.txt --output lote --queries seguidores,hashtags
+    python batch_runner.py snapshots/*/* --output lote --backend cuda --workers 2
+"""
+
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+BATCH_VERSION = 1
+MARKER_FILE = "lote.json"
+SUMMARY_FILE = "resumen_lote.json"
+JSON_FILE = "resultados.json"
+PARQUET_DIR = "resultados_parquet"
+FORMATS = {"parquet": ("parquet",), "json": ("json",), "both": ("parquet", "json")}
+
+# Consulta -> método del motor NumPy; las del binario CUDA son las de CORE_QUERIES
+QUERIES: Dict[str, Callable] = {
+    "seguidores": lambda engine: engine.query_followers(),
+    "reacciones": lambda engine: engine.query_post_reactions(),
+    "top_posts": lambda engine: engine.query_top_posts(),
+    "hashtags": lambda engine: engine.query_hashtags(),
+    "bloqueados": lambda engine: engine.query_blocked_followers(),
+    "recomendaciones": lambda engine: engine.query_company_recommendations(),
+    "cascadas": lambda engine: engine.query_cascades(),
+    "analitica_hashtags": lambda engine: engine.query_hashtag_analytics(),
+    "comunidades": lambda engine: engine.query_communities(),
+}
+CORE_QUERIES = ("seguidores", "reacciones", "top_posts", "hashtags", "bloqueados",
+                "recomendaciones")
+# Las de get_parsed_data(include_analytics=True) del motor NumPy
+DEFAULT_QUERIES = CORE_QUERIES + ("cascadas", "analitica_hashtags")
+
+
+def parse_queries(text: Optional[str], backend: str = "numpy") -> List[str]:
+    """
+    Lista de consultas separadas por coma ("todas" = todas las del backend)
+    Raises: ValueError si alguna no existe o el backend no la calcula
+    """
+    available = CORE_QUERIES if backend == "cuda" else tuple(QUERIES)
+    if not text:
+        return list(CORE_QUERIES if backend == "cuda" else DEFAULT_QUERIES)
+    if text.strip() == "todas":
+        return list(available)
+    queries = [name.strip() for name in text.split(",") if name.strip()]
+    unknown = [name for name in queries if name not in available]
+    if unknown:
+        raise ValueError(f"Consultas no disponibles con el backend {backend}: "
+                         f"{', '.join(unknown)} (válidas: {', '.join(available)})")
+    return list(dict.fromkeys(queries))
+
+
+def read_manifest(path) -> List[str]:
+    """Snapshots de un archivo: una ruta por línea (relativa al archivo), # comenta"""
+    base = Path(path).parent
+    snapshots = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                snapshots.append(str(base / line))
+    return snapshots
+
+
+def snapshot_names(paths: Sequence[str]) -> List[str]:
+    """
+    Nombre de salida de cada snapshot: su ruta relativa al padre común
+    (región/día conserva la jerarquía y evita choques entre días iguales)
+    """
+    absolute = [Path(os.path.abspath(path)) for path in paths]
+    if not absolute:
+        return []
+    root = Path(os.path.commonpath([path.parent for path in absolute]))
+    names = [path.relative_to(root).as_posix() for path in absolute]
+    if len(set(names)) != len(names):
+        raise ValueError("Hay snapshots repetidos en la lista")
+    return names
+
+
+def dataset_fingerprint(path) -> str:
+    """Huella de un dataset en disco sin leerlo (nombres, tamaños y fechas)"""
+    from memo import fingerprint
+
+    stats = [(f.name, f.stat().st_size, f.stat().st_mtime_ns)
+             for f in sorted(Path(path).iterdir()) if f.is_file()]
+    return fingerprint(json.dumps(stats).encode("utf-8"))
+
+
+def job_key(dataset: str, queries: Sequence[str], backend: str, formats: Sequence[str]) -> str:
+    """Huella de un trabajo: si no cambia, el resultado en disco sigue valiendo"""
+    from memo import fingerprint
+
+    return fingerprint({"version": BATCH_VERSION, "dataset": dataset_fingerprint(dataset),
+                        "consultas": list(queries), "backend": backend,
+                        "formatos": list(formats)})
+
+
+def cached_entry(target: Path, key: str) -> Optional[Dict]:
+    """Entrada de lote.json si el snapshot ya está calculado con la misma huella"""
+    try:
+        with open(target / MARKER_FILE, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry if entry.get("huella") == key else None
+
+
+def write_results(data: Dict, target: Path, queries: Sequence[str], formats: Sequence[str],
+                  entry: Dict) -> Dict:
+    """
+    Escribe los resultados en un directorio temporal y lo renombra a target
+    al final; lote.json (la marca de terminado) va adentro
+    Returns: la entrada con las filas de cada tabla
+    """
+    staging = target.with_name(f".{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    if "json" in formats:
+        with open(staging / JSON_FILE, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+    if "parquet" in formats:
+        from results_arrow import results_to_tables, write_bundle
+
+        # Solo las tablas de las consultas pedidas (read_bundle deja vacías las demás)
+        write_bundle(data, staging / PARQUET_DIR, results_to_tables(data, queries))
+        with open(staging / PARQUET_DIR / "resumen.json", 'r', encoding='utf-8') as f:
+            entry["tablas"] = json.load(f)["tablas"]
+    with open(staging / MARKER_FILE, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=2, ensure_ascii=False)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+    return entry
+
+
+def run_numpy_snapshot(dataset: str, target: str, queries: Sequence[str],
+                       formats: Sequence[str], key: str) -> Dict:
+    """
+    Analiza un snapshot con el motor NumPy (función de módulo para poder
+    ejecutarla en procesos worker). Todas las consultas comparten un motor
+    residente: conteos de reacciones, índices CSR y bosques de cascadas se
+    calculan una vez por snapshot
+    """
+    from numpy_engine import NumpySocialNetwork, format_output
+
+    started = time.perf_counter()
+    engine = NumpySocialNetwork.from_path(dataset, mmap=True)
+    seconds = {"carga": round(time.perf_counter() - started, 4)}
+    data = {}
+    for name in queries:
+        query_started = time.perf_counter()
+        data[name] = QUERIES[name](engine)
+        seconds[name] = round(time.perf_counter() - query_started, 4)
+    ds = engine.dataset
+    # La salida de texto solo tiene sentido con todas las secciones del binario
+    data["output_raw"] = format_output(data, ds.num_persons, ds.num_companies, ds.num_posts,
+                                       ds.post_texts) if set(CORE_QUERIES) <= set(data) else ""
+    entry = {"huella": key, "dataset": dataset, "backend": "numpy", "consultas": list(queries),
+             "segundos": round(time.perf_counter() - started, 4),
+             "segundos_por_consulta": seconds}
+    return write_results(data, Path(target), queries, formats, entry)
+
+
+def _run_numpy_job(job: Dict) -> Dict:
+    try:
+        return {"estado": "ok", **run_numpy_snapshot(job["dataset"], job["target"], job["consultas"],
+                                                       job["formatos"], job["huella"])}
+    except Exception as error:  # un snapshot dañado no frena el lote
+        return {"estado": "error", "dataset": job["dataset"], "error": f"{type(error).__name__}: {error}"}
+
+
+async def _run_cuda_jobs(jobs: List[Dict], workers: int, timeout: Optional[float],
+                         log: Callable[[str], None]) -> List[Dict]:
+    """Snapshots con el binario CUDA: un ejecutable compilado (o reutilizado) para todos"""
+    import asyncio
+
+    from cuda_wrapper import CUDASocialNetwork
+
+    compiler = CUDASocialNetwork()
+    if not compiler.reuse_binary():
+        success, msg = await compiler.compile_async()
+        if not success:
+            return [{"estado": "error", "dataset": job["dataset"], "error": msg} for job in jobs]
+    slots = asyncio.Semaphore(max(1, workers))
+
+    async def execute(job: Dict) -> Dict:
+        started = time.perf_counter()
+        network = CUDASocialNetwork(dataset=job["dataset"])
+        network.compiled = True
+        data = await network.get_parsed_data_async(timeout, slots=slots)
+        if data is None:
+            return {"estado": "error", "dataset": job["dataset"], "error": network.last_error}
+        data = {**{name: data[name] for name in job["consultas"]},
+                "output_raw": data["output_raw"]}
+        entry = {"huella": job["huella"], "dataset": job["dataset"], "backend": "cuda",
+                 "consultas": job["consultas"], "segundos": round(time.perf_counter() - started, 4)}
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, write_results, data, Path(job["target"]),
+                                           job["consultas"], job["formatos"], entry)
+        log(f"✓ {job['nombre']} ({entry['segundos']:.2f} s)")
+        return {"estado": "ok", **entry}
+
+    async def run(job: Dict) -> Dict:
+        try:
+            return await execute(job)
+        except Exception as error:  # un snapshot dañado no frena el lote
+            return {"estado": "error", "dataset": job["dataset"], "error": f"{type(error).__name__}: {error}"}
+
+    return list(await asyncio.gather(*(run(job) for job in jobs)))
+
+
+def run_batch(snapshots: Sequence[str], output, queries: Optional[Sequence[str]] = None,
+              backend: str = "numpy", workers: int = 1, formats: Sequence[str] = ("parquet",),
+              force: bool = False, timeout: Optional[float] = None,
+              log: Callable[[str], None] = print) -> Dict:
+    """
+    Analiza los snapshots que falten y escribe output/<snapshot>/ y
+    output/resumen_lote.json
+    - workers: procesos del motor NumPy, o binarios CUDA simultáneos
+    - force: recalcular aunque el resultado esté en caché
+    Returns: el resumen del lote
+    """
+    queries = list(queries or (CORE_QUERIES if backend == "cuda" else DEFAULT_QUERIES))
+    output = Path(output)
+    names = snapshot_names(snapshots)
+    entries: List[Optional[Dict]] = [None] * len(snapshots)
+    pending = []
+    for i, (dataset, name) in enumerate(zip(snapshots, names)):
+        target = output / name
+        try:
+            key = job_key(dataset, queries, backend, formats)
+        except OSError as error:
+            entries[i] = {"estado": "error", "dataset": dataset, "error": str(error)}
+            continue
+        cached = None if force else cached_entry(target, key)
+        if cached is not None:
+            entries[i] = {**cached, "estado": "en_cache"}
+            continue
+        pending.append((i, {"dataset": str(dataset), "nombre": name, "target": str(target),
+                            "consultas": queries, "formatos": list(formats), "huella": key}))
+    log(f"{len(snapshots)} snapshots: {len(pending)} por calcular, "
+        f"{len(snapshots) - len(pending)} en caché o inválidos")
+
+    started = time.perf_counter()
+    jobs = [job for _, job in pending]
+    if backend == "cuda":
+        import asyncio
+
+        results = asyncio.run(_run_cuda_jobs(jobs, workers, timeout, log))
+    elif workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = []
+            for job, result in zip(jobs, executor.map(_run_numpy_job, jobs)):
+                log(_describe(job["nombre"], result))
+                results.append(result)
+    else:
+        results = []
+        for job in jobs:
+            results.append(_run_numpy_job(job))
+            log(_describe(job["nombre"], results[-1]))
+    for (i, _), result in zip(pending, results):
+        entries[i] = result
+
+    summary = {
+        "version": BATCH_VERSION,
+        "backend": backend,
+        "consultas": queries,
+        "formatos": list(formats),
+        "segundos": round(time.perf_counter() - started, 4),
+        "totales": {state: sum(entry["estado"] == state for entry in entries)
+                    for state in ("ok", "en_cache", "error")},
+        "snapshots": [{"snapshot": name, **entry} for name, entry in zip(names, entries)],
+    }
+    output.mkdir(parents=True, exist_ok=True)
+    with open(output / SUMMARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    return summary
+
+
+def _describe(name: str, result: Dict) -> str:
+    if result["estado"] == "ok":
+        return f"✓ {name} ({result['segundos']:.2f} s)"
+    return f"✗ {name}: {result['error']}"
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Analiza muchos snapshots de datasets "
+                                                 "(reanudable, un bundle por snapshot)")
+    parser.add_argument("snapshots", nargs="*", help="Directorios de datasets")
+    parser.add_argument("--manifest", help="Archivo con un directorio de dataset por línea")
+    parser.add_argument("--output", required=True, help="Directorio de resultados del lote")
+    parser.add_argument("--queries", help="Consultas separadas por coma o 'todas' "
+                                          f"(por defecto: {','.join(DEFAULT_QUERIES)})")
+    parser.add_argument("--backend", choices=["numpy", "cuda"], default="numpy")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos (numpy) o binarios simultáneos (cuda)")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--force", action="store_true", help="Recalcular los snapshots en caché")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Segundos por snapshot (backend cuda; por defecto según el tamaño)")
+    args = parser.parse_args()
+
+    snapshots = list(args.snapshots) + (read_manifest(args.manifest) if args.manifest else [])
+    if not snapshots:
+        parser.error("Indicar snapshots o --manifest")
+    try:
+        queries = parse_queries(args.queries, args.backend)
+        summary = run_batch(snapshots, args.output, queries, args.backend, args.workers,
+                            FORMATS[args.format], args.force, args.timeout)
+    except ValueError as error:
+        parser.error(str(error))
+    print(json.dumps({"totales": summary["totales"], "segundos": summary["segundos"],
+                      "resumen": str(Path(args.output) / SUMMARY_FILE)}, ensure_ascii=False))
+    sys.exit(1 if summary["totales"]["error"] else 0)
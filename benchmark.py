@@ -0,0 +1,367 @@
+"""
+Benchmark de consultas de la red social
+Ejecuta cada consulta sobre grafos sintéticos de tamaño creciente y para cada
+backend disponible (motor NumPy y, si hay nvcc, el binario CUDA), registra
+tiempo, RSS pico y throughput en un historial JSON/CSV y marca regresiones
+contra una línea base guardada
+"""
+
+import csv
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from cuda_wrapper import cuda_available
+from graph_generator import generate_dataset
+from numpy_engine import NumpySocialNetwork
+from social_dataset import POST_AUTHOR_TYPE, PERSON, META_FILE, RELATIONS, load_dataset
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.2     # 20% más lento que la línea base = regresión
+MIN_DELTA = 0.001           # diferencias menores a 1 ms se ignoran (ruido)
+
+BENCH_DIR = "benchmarks"
+DATA_DIR = "bench_data"
+HISTORY_CSV = "history.csv"
+BASELINE_FILE = "baseline.json"
+
+CSV_FIELDS = ["run_id", "fecha", "commit", "backend", "personas", "aristas",
+              "interacciones", "consulta", "segundos", "segundos_min",
+              "rss_pico_mb", "elementos", "elementos_por_segundo"]
+
+
+def peak_rss_mb(children: bool = False) -> Optional[float]:
+    """RSS máximo del proceso (o de sus hijos) en MB; None si no está disponible"""
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    rss = resource.getrusage(who).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return round(rss / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+
+
+def git_commit() -> str:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                                capture_output=True, text=True, timeout=5)
+        return result.stdout.strip() if result.returncode == 0 else ""
+    except (OSError, subprocess.TimeoutExpired):
+        return ""
+
+
+def ensure_dataset(size: int, seed: int, data_dir=DATA_DIR) -> Path:
+    """Genera (una sola vez) el dataset sintético de un tamaño"""
+    path = Path(data_dir) / f"personas_{size}_seed_{seed}"
+    if not (path / META_FILE).exists():
+        generate_dataset(path, size, seed=seed)
+    return path
+
+
+# ============================================================================
+# CONSULTAS DEL MOTOR NUMPY
+# ============================================================================
+#
+# nombre -> (función(engine, params), elementos procesados(dataset))
+# Los elementos son las filas que la consulta recorre y dan el throughput
+
+def _edges(ds, *names) -> int:
+    return sum(len(ds.relations[name]) for name in names)
+
+
+def benchmark_params(ds) -> Dict[str, int]:
+    """Parámetros fijos por dataset: primer post de persona y persona más seguida"""
+    person_posts = np.flatnonzero(np.asarray(ds.posts[:, POST_AUTHOR_TYPE]) == PERSON)
+    follows = np.asarray(ds.relations["person_follows_person"])
+    counts = np.bincount(follows[:, 1], minlength=ds.num_persons)
+    return {
+        "post": int(person_posts[0]) if len(person_posts) else 0,
+        "persona": int(np.argmax(counts)) if len(counts) else 0,
+    }
+
+
+NUMPY_QUERIES: Dict[str, Tuple[Callable, Callable]] = {
+    "seguidores": (
+        lambda e, p: e.query_followers(),
+        lambda ds: _edges(ds, "person_follows_person", "person_follows_company",
+                          "company_follows_company")),
+    "reacciones": (
+        lambda e, p: e.query_post_reactions(),
+        lambda ds: len(ds.interactions)),
+    "top_posts": (
+        lambda e, p: e.query_top_posts(),
+        lambda ds: len(ds.interactions)),
+    "hashtags": (
+        lambda e, p: e.query_hashtags(),
+        lambda ds: ds.num_posts),
+    "visibilidad": (
+        lambda e, p: e.visible_persons(p["post"]),
+        lambda ds: _edges(ds, "person_follows_person", "person_blocks_person")),
+    "influencia": (
+        lambda e, p: e.influence_levels(p["persona"], 2),
+        lambda ds: _edges(ds, "person_follows_person")),
+    "mejores_clientes": (
+        lambda e, p: e.query_best_customers(),
+        lambda ds: len(ds.interactions) + _edges(ds, "person_is_client")),
+    "bloqueados": (
+        lambda e, p: e.query_blocked_followers(),
+        lambda ds: _edges(ds, "person_blocks_person", "person_follows_person")),
+    "recomendaciones": (
+        lambda e, p: e.query_company_recommendations(),
+        lambda ds: _edges(ds, "company_recommends_company")),
+}
+
+
+def _timed(fn: Callable, repeat: int) -> List[float]:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return times
+
+
+def _row(backend: str, summary: Dict, query: str, times: List[float],
+         items: int, rss: Optional[float]) -> Dict:
+    median = statistics.median(times)
+    return {
+        "backend": backend,
+        "personas": summary["personas"],
+        "aristas": summary["aristas"],
+        "interacciones": summary["interacciones"],
+        "consulta": query,
+        "segundos": round(median, 6),
+        "segundos_min": round(min(times), 6),
+        "rss_pico_mb": rss,
+        "elementos": items,
+        "elementos_por_segundo": round(items / median) if median > 0 else None,
+    }
+
+
+def run_numpy(dataset_path: str, queries: List[str], repeat: int) -> List[Dict]:
+    """
+    Ejecuta las consultas NumPy sobre un dataset
+    Corre en un proceso propio para que el RSS pico sea el de ese tamaño
+    """
+    started = time.perf_counter()
+    ds = load_dataset(dataset_path)
+    load_time = time.perf_counter() - started
+    summary = ds.summary()
+    engine = NumpySocialNetwork(ds)
+    params = benchmark_params(ds)
+
+    rows = [_row("numpy", summary, "carga", [load_time],
+                 summary["aristas"] + summary["interacciones"], peak_rss_mb())]
+    for name in queries:
+        fn, items = NUMPY_QUERIES[name]
+        times = _timed(lambda: fn(engine, params), repeat)
+        rows.append(_row("numpy", summary, name, times, items(ds), peak_rss_mb()))
+    return rows
+
+
+# ============================================================================
+# BACKEND CUDA
+# ============================================================================
+
+def run_cuda(repeat: int, dataset_paths: Optional[List[str]] = None) -> List[Dict]:
+    """
+    Mide el binario CUDA completo (compilación aparte) y el parseo del wrapper
+    El binario carga cada dataset y dimensiona sus tablas con él; sin
+    dataset_paths usa sus datos de ejemplo internos
+    """
+    from cuda_wrapper import CUDASocialNetwork, dataset_rows
+
+    network = CUDASocialNetwork()
+    success, message = network.compile()
+    if not success:
+        raise RuntimeError(message)
+
+    captured = {}
+
+    def execute():
+        ok, output = network.execute()
+        if not ok:
+            raise RuntimeError(output)
+        captured["output"] = output
+
+    rows = []
+    for path in dataset_paths or [None]:
+        network.set_dataset(path)
+        if path is None:
+            summary = {"personas": 6, "aristas": 16, "interacciones": 10}
+        else:
+            counts = dataset_rows(path)
+            summary = {"personas": counts["personas"],
+                       "aristas": sum(counts.get(name, 0) for name in RELATIONS),
+                       "interacciones": counts["interacciones"]}
+        times = _timed(execute, repeat)
+        rows.append(_row("cuda", summary, "programa_completo", times,
+                         summary["aristas"] + summary["interacciones"],
+                         peak_rss_mb(children=True)))
+        # Solo el parseo, sobre la salida ya capturada (sin volver a ejecutar)
+        output = captured["output"]
+        times = _timed(lambda: network._parse_output(output), repeat)
+        rows.append(_row("cuda", summary, "parseo_wrapper", times, len(output), peak_rss_mb()))
+    return rows
+
+
+# ============================================================================
+# HISTORIAL Y REGRESIONES
+# ============================================================================
+
+def row_key(row: Dict) -> str:
+    return f"{row['backend']}/{row['personas']}/{row['consulta']}"
+
+
+def append_history(rows: List[Dict], bench_dir=BENCH_DIR):
+    """Agrega las filas al CSV histórico (crea la cabecera la primera vez)"""
+    path = Path(bench_dir) / HISTORY_CSV
+    new_file = not path.exists()
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        if new_file:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def load_baseline(bench_dir=BENCH_DIR) -> Dict[str, Dict]:
+    path = Path(bench_dir) / BASELINE_FILE
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(rows: List[Dict], bench_dir=BENCH_DIR):
+    """Guarda la corrida como línea base (las claves existentes se sobrescriben)"""
+    baseline = load_baseline(bench_dir)
+    baseline.update({row_key(row): row for row in rows})
+    with open(Path(bench_dir) / BASELINE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False)
+
+
+def find_regressions(rows: List[Dict], baseline: Dict[str, Dict],
+                     threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Consultas cuya mediana supera a la línea base en más de threshold"""
+    regressions = []
+    for row in rows:
+        base = baseline.get(row_key(row))
+        if base is None:
+            continue
+        delta = row["segundos"] - base["segundos"]
+        if delta > MIN_DELTA and row["segundos"] > base["segundos"] * (1 + threshold):
+            regressions.append({
+                "clave": row_key(row),
+                "base": base["segundos"],
+                "actual": row["segundos"],
+                "factor": round(row["segundos"] / base["segundos"], 2) if base["segundos"] else None,
+            })
+    return regressions
+
+
+def run_benchmarks(sizes: List[int] = DEFAULT_SIZES, backends: Optional[List[str]] = None,
+                   queries: Optional[List[str]] = None, repeat: int = DEFAULT_REPEAT,
+                   seed: int = 42, data_dir=DATA_DIR, bench_dir=BENCH_DIR,
+                   verbose: bool = False) -> Dict:
+    """
+    Ejecuta el benchmark completo y lo guarda en bench_dir
+    Returns: {"run_id", "fecha", "commit", "filas": [...]}
+    """
+    if backends is None:
+        backends = ["numpy"] + (["cuda"] if cuda_available() else [])
+    queries = queries or list(NUMPY_QUERIES)
+    Path(bench_dir).mkdir(parents=True, exist_ok=True)
+
+    def log(message):
+        if verbose:
+            print(message, flush=True)
+
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    meta = {"run_id": run_id, "fecha": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit()}
+    rows = []
+
+    if "numpy" in backends:
+        # Un proceso nuevo por tamaño: el RSS pico no arrastra tamaños anteriores
+        context = multiprocessing.get_context("spawn")
+        for size in sizes:
+            path = ensure_dataset(size, seed, data_dir)
+            log(f"numpy: {size} personas")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                rows.extend(pool.submit(run_numpy, str(path), queries, repeat).result())
+
+    if "cuda" in backends:
+        paths = [str(ensure_dataset(size, seed, data_dir)) for size in sizes]
+        log(f"cuda: {', '.join(str(size) for size in sizes)} personas")
+        rows.extend(run_cuda(repeat, paths))
+
+    for row in rows:
+        row.update(meta)
+
+    with open(Path(bench_dir) / f"run_{run_id}.json", 'w', encoding='utf-8') as f:
+        json.dump({**meta, "filas": rows}, f, indent=2, ensure_ascii=False)
+    append_history(rows, bench_dir)
+    return {**meta, "filas": rows}
+
+
+def format_table(rows: List[Dict]) -> str:
+    lines = [f"{'backend':<8} {'personas':>9} {'consulta':<18} {'ms':>10} "
+             f"{'RSS MB':>8} {'elem/s':>14}"]
+    for row in rows:
+        rss = "-" if row["rss_pico_mb"] is None else f"{row['rss_pico_mb']:.1f}"
+        rate = "-" if row["elementos_por_segundo"] is None else f"{row['elementos_por_segundo']:,}"
+        lines.append(f"{row['backend']:<8} {row['personas']:>9} {row['consulta']:<18} "
+                     f"{row['segundos'] * 1000:>10.2f} {rss:>8} {rate:>14}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Benchmark de consultas por tamaño y backend")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Número de personas de cada grafo generado")
+    parser.add_argument("--backends", nargs="+", choices=["numpy", "cuda"], default=None,
+                        help="Por defecto numpy y cuda si hay nvcc y GPU")
+    parser.add_argument("--queries", nargs="+", choices=list(NUMPY_QUERIES), default=None)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--bench-dir", default=BENCH_DIR)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Fracción de lentitud tolerada frente a la línea base")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Guardar esta corrida como nueva línea base")
+    args = parser.parse_args()
+
+    result = run_benchmarks(args.sizes, args.backends, args.queries, args.repeat,
+                            args.seed, args.data_dir, args.bench_dir, verbose=True)
+    print(format_table(result["filas"]))
+
+    regressions = find_regressions(result["filas"], load_baseline(args.bench_dir),
+                                   args.threshold)
+    if args.save_baseline:
+        save_baseline(result["filas"], args.bench_dir)
+        print(f"\nLínea base actualizada en {Path(args.bench_dir) / BASELINE_FILE}")
+
+    if regressions:
+        print(f"\n⚠️  {len(regressions)} regresiones (> {args.threshold:.0%} sobre la base):")
+        for reg in regressions:
+            print(f"   {reg['clave']}: {reg['base'] * 1000:.2f} ms -> "
+                  f"{reg['actual'] * 1000:.2f} ms (x{reg['factor']})")
+        sys.exit(1)
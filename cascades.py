@@ -0,0 +1,196 @@
+"""
+Cascadas de republicaciones (Posts.original_post_id)
+Cada post apunta a su original (-1 si es original); el bosque se resuelve con
+saltos de puntero vectorizados: en cada ronda todos los posts saltan al padre
+de su padre y suman su profundidad, así que alcanzan la raíz en O(log d) rondas
+
+Por cascada (post original): alcance (posts en la cascada), profundidad,
+amplitud por nivel y reacciones sumadas de todas las republicaciones.
+SocialGraphStore mantiene el bosque por evento con add_post/add_reactions
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from numpy_engine import TOP_CASCADES, count_reactions, top_k_indices
+from social_dataset import POST_ORIGINAL_ID, SocialDataset
+
+# Criterios de orden de top_viral: alcance, reacciones o profundidad
+RANKINGS = ("alcance", "likes", "profundidad")
+
+# Columnas por post del bosque (crecen con add_post)
+COLUMNS = ("roots", "depth", "is_root", "size", "likes", "dislikes", "max_depth", "max_breadth")
+
+
+def cascade_roots(original: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Raíz y profundidad de cada post (la raíz tiene profundidad 0)
+    Los ids fuera de rango cuentan como originales; los posts de un ciclo o
+    que cuelgan de uno (datos corruptos) quedan como originales de sí mismos
+    """
+    original = np.asarray(original, dtype=np.int64)
+    n = len(original)
+    ids = np.arange(n, dtype=np.int64)
+    parent = np.where((original >= 0) & (original < n), original, ids)
+    is_original = parent == ids
+    depth = (~is_original).astype(np.int64)
+    for _ in range(max(1, int(np.ceil(np.log2(max(n, 2))))) + 1):
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            break
+        depth += depth[parent]
+        parent = grand
+    # Tras log2(n) + 1 rondas solo siguen sin raíz los ciclos y lo que cuelga de ellos
+    unresolved = ~is_original[parent]
+    parent[unresolved] = ids[unresolved]
+    depth[unresolved] = 0
+    return parent, depth
+
+
+class CascadeForest:
+    """Bosque de republicaciones con las métricas de cada cascada"""
+
+    def __init__(self, original: np.ndarray, likes: np.ndarray, dislikes: np.ndarray,
+                 post_texts: Optional[Sequence[str]] = None):
+        self.roots, self.depth = cascade_roots(original)
+        n = len(self.roots)
+        self.post_texts = post_texts
+        self.is_root = self.roots == np.arange(n)
+        # Métricas indexadas por post original (0 en los que no son raíz)
+        self.size = np.bincount(self.roots, minlength=n)
+        self.likes = np.bincount(self.roots, np.asarray(likes, dtype=np.float64),
+                                 n).astype(np.int64)
+        self.dislikes = np.bincount(self.roots, np.asarray(dislikes, dtype=np.float64),
+                                    n).astype(np.int64)
+        self.max_depth = np.zeros(n, dtype=np.int64)
+        np.maximum.at(self.max_depth, self.roots, self.depth)
+
+        # Amplitud: cantidad de posts por (raíz, nivel), ordenada por raíz y nivel
+        levels = int(self.depth.max(initial=0)) + 1
+        keys, counts = np.unique(self.roots * levels + self.depth, return_counts=True)
+        self._level_roots, self._level_depths = keys // levels, keys % levels
+        self._level_counts = counts
+        self.max_breadth = np.zeros(n, dtype=np.int64)
+        np.maximum.at(self.max_breadth, self._level_roots, counts)
+        # (raíz, nivel) -> posts agregados con add_post después de construir
+        self._added_levels: Dict[Tuple[int, int], int] = {}
+        self._buffers = {name: getattr(self, name) for name in COLUMNS}
+
+    @classmethod
+    def from_dataset(cls, dataset: SocialDataset, likes: Optional[np.ndarray] = None,
+                     dislikes: Optional[np.ndarray] = None) -> "CascadeForest":
+        if likes is None or dislikes is None:
+            likes, dislikes = count_reactions(dataset.interactions, dataset.num_posts)
+        return cls(dataset.posts[:, POST_ORIGINAL_ID], likes, dislikes, dataset.post_texts)
+
+    @property
+    def num_posts(self) -> int:
+        return len(self.roots)
+
+    # --- Actualización por evento -----------------------------------------
+
+    def _reserve(self, n: int):
+        """Extiende las columnas a n posts (capacidad duplicada, sin copiar cada vez)"""
+        if n > len(self._buffers["roots"]):
+            capacity = max(n, 2 * len(self._buffers["roots"]), 16)
+            for name, buffer in self._buffers.items():
+                grown = np.zeros(capacity, dtype=buffer.dtype)
+                grown[:self.num_posts] = buffer[:self.num_posts]
+                self._buffers[name] = grown
+        for name in COLUMNS:
+            setattr(self, name, self._buffers[name][:n])
+
+    def _level_count(self, root: int, depth: int) -> int:
+        """Posts de la cascada root en un nivel"""
+        lo, hi = np.searchsorted(self._level_roots, [root, root + 1])
+        i = lo + np.searchsorted(self._level_depths[lo:hi], depth)
+        base = int(self._level_counts[i]) if i < hi and self._level_depths[i] == depth else 0
+        return base + self._added_levels.get((root, depth), 0)
+
+    def add_post(self, original: int) -> int:
+        """
+        Agrega el post siguiente en O(log n) amortizado; original es el post
+        republicado (-1 si es original). Una referencia a un post que todavía
+        no existe cuenta como original
+        Returns: id del post
+        """
+        post = self.num_posts
+        self._reserve(post + 1)
+        if 0 <= original < post:
+            root, depth = int(self.roots[original]), int(self.depth[original]) + 1
+        else:
+            root, depth = post, 0
+        self.roots[post] = root
+        self.depth[post] = depth
+        self.is_root[post] = root == post
+        self.size[root] += 1
+        self.max_depth[root] = max(self.max_depth[root], depth)
+        self._added_levels[(root, depth)] = self._added_levels.get((root, depth), 0) + 1
+        self.max_breadth[root] = max(self.max_breadth[root], self._level_count(root, depth))
+        return post
+
+    def add_reactions(self, posts: np.ndarray, likes_delta: np.ndarray,
+                      dislikes_delta: np.ndarray):
+        """Suma cambios de likes/dislikes de posts a las cascadas que los contienen"""
+        roots = self.roots[np.asarray(posts, dtype=np.int64)]
+        np.add.at(self.likes, roots, likes_delta)
+        np.add.at(self.dislikes, roots, dislikes_delta)
+
+    # --- Consultas -----------------------------------------------------------
+
+    def breadth(self, root: int) -> List[int]:
+        """Posts por nivel de la cascada (nivel 0 = el original)"""
+        lo, hi = np.searchsorted(self._level_roots, [root, root + 1])
+        counts = np.zeros(int(self.max_depth[root]) + 1, dtype=np.int64)
+        counts[self._level_depths[lo:hi]] = self._level_counts[lo:hi]
+        if self._added_levels:
+            for depth in range(len(counts)):
+                counts[depth] += self._added_levels.get((root, depth), 0)
+        return counts.tolist()
+
+    def ranking(self, by: str = "alcance") -> np.ndarray:
+        """Valor por post con el que se ordenan las cascadas (-1 si no es original)"""
+        if by not in RANKINGS:
+            raise ValueError(f"Orden desconocido '{by}': usar {', '.join(RANKINGS)}")
+        values = {"alcance": self.size, "likes": self.likes, "profundidad": self.max_depth}[by]
+        return np.where(self.is_root, values, -1)
+
+    def top_viral(self, k: int = TOP_CASCADES, by: str = "alcance",
+                  exclude: Optional[np.ndarray] = None) -> np.ndarray:
+        """Ids de los k originales con mayor ranking (exclude: máscara de posts a omitir)"""
+        values = self.ranking(by)
+        if exclude is not None:
+            values = np.where(exclude, -1, values)
+        top = top_k_indices(values, k, largest=True)
+        return top[values[top] >= 0]
+
+    def record(self, post: int, levels: bool = False) -> Dict:
+        """Métricas de la cascada a la que pertenece un post"""
+        root = int(self.roots[post])
+        record = {
+            "post_id": root,
+            "texto": self.post_texts[root] if self.post_texts is not None else "",
+            "alcance": int(self.size[root]),
+            "republicaciones": int(self.size[root]) - 1,
+            "profundidad": int(self.max_depth[root]),
+            "amplitud_max": int(self.max_breadth[root]),
+            "likes": int(self.likes[root]),
+            "dislikes": int(self.dislikes[root]),
+        }
+        if levels:
+            record["niveles"] = self.breadth(root)
+        return record
+
+    def summary(self, k: int = TOP_CASCADES, by: str = "alcance",
+                exclude: Optional[np.ndarray] = None) -> Dict:
+        """Resumen para get_parsed_data(): totales y top-k de cascadas"""
+        reposted = self.is_root & (self.size > 1)
+        return {
+            "originales": int(self.is_root.sum()),
+            "republicaciones": int((~self.is_root).sum()),
+            "cascadas": int(reposted.sum()),
+            "mayor_alcance": int(self.size.max(initial=0)),
+            "profundidad_max": int(self.max_depth.max(initial=0)),
+            "top": [self.record(post) for post in self.top_viral(k, by, exclude).tolist()],
+        }
@@ -0,0 +1,275 @@
+"""
+Figuras Plotly de los dashboards
+Compartidas por app.py y app_sin_cuda.py; cada función arma una figura a
+partir de un DataFrame ya preparado para poder memoizarla (ver memo.py)
+
+Por encima de un umbral las series se reducen del lado del servidor
+(bins de publicaciones, LTTB, top-N + "Otros") y se usan trazas WebGL,
+de modo que el JSON enviado al navegador queda acotado por POINT_BUDGET
+sin importar el tamaño del dataset
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Puntos máximos por figura (suma de todas sus trazas)
+POINT_BUDGET = 2000
+# Barras agrupadas: más allá de esta cantidad de publicaciones se agrupan en bins
+MAX_BARS = 100
+# Porciones de una torta antes de agrupar el resto en "Otros"
+MAX_SLICES = 12
+OTHER_LABEL = "Otros"
+
+
+# ============================================================================
+# REDUCCIÓN DE DATOS
+# ============================================================================
+
+def bin_sums(x: np.ndarray, values: Tuple[np.ndarray, ...], bins: int
+             ) -> Tuple[list, Tuple[np.ndarray, ...]]:
+    """
+    Agrupa filas ordenadas por x en bins de igual cantidad de filas
+    Returns: (etiquetas "primero–último" de cada bin, sumas por bin de cada serie)
+    """
+    order = np.argsort(x, kind="stable")
+    x = x[order]
+    starts = np.unique(np.linspace(0, len(x), bins, endpoint=False).astype(np.int64))
+    ends = np.append(starts[1:], len(x)) - 1
+    labels = [f"{x[a]}–{x[b]}" if a != b else f"{x[a]}" for a, b in zip(starts, ends)]
+    sums = tuple(np.add.reduceat(np.asarray(v)[order], starts) for v in values)
+    return labels, sums
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: índices de threshold puntos que conservan
+    la forma visual de la serie (x debe venir ordenado)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Primer y último punto fijos; el resto se reparte en threshold-2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        # Promedio del bucket siguiente (o el último punto)
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        # Área del triángulo (anterior, candidato, promedio siguiente)
+        area = np.abs((x[previous] - avg_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def top_n_other(df: pd.DataFrame, values: str, names: str,
+                n: int = MAX_SLICES) -> pd.DataFrame:
+    """Las n filas de mayor valor más una fila "Otros" con la suma del resto"""
+    if len(df) <= n:
+        return df
+    top = df.nlargest(n, values)
+    rest = df[values].sum() - top[values].sum()
+    other = pd.DataFrame({names: [OTHER_LABEL], values: [rest]})
+    return pd.concat([top[[names, values]], other], ignore_index=True)
+
+
+def point_count(fig: go.Figure) -> int:
+    """Puntos que la figura envía al navegador (para verificar el presupuesto)"""
+    total = 0
+    for trace in fig.data:
+        for attr in ("x", "y", "values"):
+            value = getattr(trace, attr, None)
+            if value is not None:
+                total += len(value)
+                break
+    return total
+
+
+# ============================================================================
+# FIGURAS
+# ============================================================================
+
+
+def top_bar(df: pd.DataFrame, x: str, y: str, color_scale: str) -> go.Figure:
+    """Barras verticales del dashboard general"""
+    fig = px.bar(
+        df,
+        x=x,
+        y=y,
+        color=y,
+        color_continuous_scale=color_scale
+    )
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+def horizontal_bar(df: pd.DataFrame, value: str, label: str, title: str,
+                   color_scale: str) -> go.Figure:
+    """Barras horizontales ordenadas por valor"""
+    return px.bar(
+        df.sort_values(value),
+        x=value,
+        y=label,
+        orientation='h',
+        title=title,
+        color=value,
+        color_continuous_scale=color_scale
+    )
+
+
+def share_pie(df: pd.DataFrame, values: str, names: str, title: str,
+              hole: float = 0.0, max_slices: int = MAX_SLICES) -> go.Figure:
+    """Torta (o dona con hole > 0); más allá de max_slices el resto va a Otros"""
+    return px.pie(
+        top_n_other(df, values, names, max_slices),
+        values=values,
+        names=names,
+        hole=hole,
+        title=title
+    )
+
+
+def likes_dislikes(df: pd.DataFrame, max_bars: int = MAX_BARS) -> go.Figure:
+    """
+    Likes vs dislikes por publicación
+    Con más de max_bars publicaciones se suman por rangos de post_id
+    """
+    x, likes, dislikes = df['post_id'], df['likes'], df['dislikes']
+    title = 'Likes vs Dislikes por Publicación'
+    xaxis_title = 'Post ID'
+    if len(df) > max_bars:
+        x, (likes, dislikes) = bin_sums(df['post_id'].to_numpy(),
+                                        (likes.to_numpy(), dislikes.to_numpy()), max_bars)
+        title += f' (agrupadas en {len(x)} rangos)'
+        xaxis_title = 'Rango de Post ID'
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        name='Likes',
+        x=x,
+        y=likes,
+        marker_color='green'
+    ))
+    fig.add_trace(go.Bar(
+        name='Dislikes',
+        x=x,
+        y=dislikes,
+        marker_color='red'
+    ))
+    fig.update_layout(
+        title=title,
+        barmode='group',
+        xaxis_title=xaxis_title,
+        yaxis_title='Cantidad'
+    )
+    return fig
+
+
+def acceptance_line(df: pd.DataFrame, max_points: int = POINT_BUDGET) -> go.Figure:
+    """
+    Ratio de aceptación (%) por publicación
+    Con más de max_points publicaciones se reduce con LTTB y se dibuja con WebGL
+    """
+    df = df.sort_values('post_id')
+    title = 'Ratio de Aceptación por Publicación (%)'
+    if len(df) <= max_points:
+        fig = px.line(
+            df,
+            x='post_id',
+            y='ratio_positivo',
+            markers=True,
+            title=title
+        )
+    else:
+        x = df['post_id'].to_numpy()
+        y = df['ratio_positivo'].to_numpy()
+        keep = lttb(x, y, max_points)
+        fig = go.Figure(go.Scattergl(x=x[keep], y=y[keep], mode='lines',
+                                     name='ratio_positivo'))
+        fig.update_layout(title=f'{title} — {len(keep):,} de {len(df):,} puntos (LTTB)',
+                          xaxis_title='post_id', yaxis_title='ratio_positivo')
+    fig.update_layout(yaxis_range=[0, 100])
+    return fig
+
+
+def metrics_frame(metricas) -> pd.DataFrame:
+    """Tabla de métricas con la columna ms para graficar"""
+    metricas_df = pd.DataFrame(metricas)
+    metricas_df['ms'] = metricas_df['segundos'] * 1000
+    return metricas_df
+
+
+def query_times(metricas_df: pd.DataFrame) -> go.Figure:
+    return px.bar(
+        metricas_df,
+        x='consulta',
+        y='ms',
+        color='backend',
+        title='Tiempo de Pared por Consulta (ms)'
+    )
+
+
+def transfer_bytes(metricas_df: pd.DataFrame) -> go.Figure:
+    """MB copiados host<->device por consulta de la ruta CUDA"""
+    cuda_df = metricas_df[metricas_df['backend'] == 'cuda'].fillna(0)
+    fig = go.Figure(data=[
+        go.Bar(name='Host → Device', x=cuda_df['consulta'],
+               y=cuda_df['h2d_bytes'] / 1e6, marker_color='#1E88E5'),
+        go.Bar(name='Device → Host', x=cuda_df['consulta'],
+               y=cuda_df['d2h_bytes'] / 1e6, marker_color='#FFA726')
+    ])
+    fig.update_layout(barmode='stack', title='MB Copiados por Consulta',
+                      yaxis_title='MB')
+    return fig
+
+
+def network_graph(layout, title: str) -> go.Figure:
+    """
+    Grafo con posiciones precalculadas (network_layout.NetworkLayout) en WebGL
+    Las aristas van en una sola traza de segmentos separados por None
+    """
+    graph, pos = layout.graph, layout.positions
+    edges = layout.edges()
+    src, dst = graph.src[edges], graph.dst[edges]
+    edge_x = np.full(len(edges) * 3, np.nan)
+    edge_y = np.full(len(edges) * 3, np.nan)
+    edge_x[0::3], edge_x[1::3] = pos[src, 0], pos[dst, 0]
+    edge_y[0::3], edge_y[1::3] = pos[src, 1], pos[dst, 1]
+
+    degree = graph.degree()
+    sizes = 6 + 4 * np.sqrt(graph.size - 1 + degree / max(degree.max(), 1))
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=edge_x, y=edge_y,
+        mode='lines',
+        line=dict(width=0.5, color='#B0BEC5'),
+        hoverinfo='skip',
+        name='Relaciones'
+    ))
+    fig.add_trace(go.Scattergl(
+        x=pos[:, 0], y=pos[:, 1],
+        mode='markers',
+        marker=dict(size=np.minimum(sizes, 40), color=layout.groups % 24,
+                    colorscale='Turbo', line=dict(width=0.5, color='white')),
+        text=[f"{name}<br>grado: {d:g}" for name, d in zip(graph.names, degree)],
+        hoverinfo='text',
+        name='Nodos'
+    ))
+    fig.update_layout(
+        title=title,
+        showlegend=False,
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False, scaleanchor='x'),
+        height=600
+    )
+    return fig
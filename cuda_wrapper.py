@@ -1,21 +1,299 @@
 """
 CUDA Social Network Wrapper
 Compila y ejecuta el código CUDA y parsea los resultados
+
+Además de compile()/execute()/get_parsed_data() (bloqueantes) hay variantes
+asyncio (compile_async, execute_async, get_parsed_data_async) que no usan
+shell, reportan el avance por sección, aceptan timeout por llamada y matan
+el proceso si la tarea se cancela; analyze_datasets() corre varios análisis
+a la vez con un límite de concurrencia
 """
 
+import asyncio
 import subprocess
 import os
 import re
 import json
+import shutil
+import signal
+import weakref
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Sequence
+
+from metrics import MetricsRecorder
+from profiling import HookRegistry, STAGE_COMPUTE, STAGE_LOAD, STAGE_PARSE, hooks_from_env
+from social_dataset import read_metadata
+
+# El binario indexa con int: una tabla con más filas se rechaza antes de ejecutarlo
+MAX_ROWS = 2 ** 31 - 1
+# Timeout de ejecución: base más un margen por millón de filas del dataset
+EXECUTE_TIMEOUT = 30
+TIMEOUT_PER_MILLION_ROWS = 30
+COMPILE_TIMEOUT = 60
+# Ejecuciones simultáneas del binario por event loop (todas las instancias)
+MAX_CONCURRENT_RUNS = 2
+# Bloques de stdout leídos por vez en execute_async
+READ_CHUNK = 1 << 16
+# Encabezado de sección de la salida: "========== TITULO =========="
+SECTION_RE = re.compile(rb'^=+ (.+?) =+\r?$', re.MULTILINE)
+
+# Política de backend por consulta que genera backend_compare.py
+BACKEND_POLICY_FILE = os.path.join("benchmarks", "backend_policy.json")
+# Sin política medida, CUDA se usa desde este tamaño de entrada (filas)
+DEFAULT_CUDA_MIN_ROWS = 1_000_000
+# Consulta -> tablas de dataset_rows() que recorre; su suma es el tamaño de entrada
+QUERY_INPUTS = {
+    "seguidores": ("person_follows_person", "person_follows_company", "company_follows_company"),
+    "reacciones": ("interacciones",),
+    "top_posts": ("interacciones",),
+    "hashtags": ("publicaciones",),
+    "bloqueados": ("person_blocks_person", "company_blocks_person"),
+    "recomendaciones": ("company_recommends_company",),
+    "visibilidad": ("person_follows_person", "person_blocks_person"),
+    "influencia": ("person_follows_person",),
+}
+# Consultas que get_parsed_data() saca de la salida del binario
+PARSED_QUERIES = ("seguidores", "reacciones", "top_posts", "hashtags", "bloqueados",
+                  "recomendaciones")
+# Misma consulta en el motor NumPy (para get_parsed_data_auto)
+NUMPY_QUERY_METHODS = {
+    "seguidores": "query_followers",
+    "reacciones": "query_post_reactions",
+    "top_posts": "query_top_posts",
+    "hashtags": "query_hashtags",
+    "bloqueados": "query_blocked_followers",
+    "recomendaciones": "query_company_recommendations",
+}
+
+# progress(etapa, detalle): "compilacion", "ejecucion" (detalle = sección que
+# el binario empezó a imprimir), "parseo" y "listo"
+ProgressCallback = Callable[[str, str], None]
+
+# Semáforo por event loop (un asyncio.Semaphore no puede pasar de un loop a otro)
+_run_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = \
+    weakref.WeakKeyDictionary()
+
+
+def run_slots() -> asyncio.Semaphore:
+    """Semáforo compartido que acota las ejecuciones simultáneas en el loop actual"""
+    loop = asyncio.get_running_loop()
+    slots = _run_slots.get(loop)
+    if slots is None:
+        slots = _run_slots[loop] = asyncio.Semaphore(MAX_CONCURRENT_RUNS)
+    return slots
+
+
+async def _read_output(stream: asyncio.StreamReader,
+                       on_section: Optional[Callable[[str], None]]) -> bytes:
+    """Lee stdout por bloques y avisa cada encabezado de sección completo"""
+    chunks, pending = [], b""
+    while True:
+        chunk = await stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if on_section is not None:
+            text = pending + chunk
+            cut = text.rfind(b"\n") + 1
+            for match in SECTION_RE.finditer(text, 0, cut):
+                on_section(match.group(1).decode('utf-8', errors='replace'))
+            pending = text[cut:]
+    return b"".join(chunks)
+
+
+def _kill_group(process: asyncio.subprocess.Process):
+    """
+    Mata el proceso y los que haya lanzado (nvcc arranca cicc, ptxas, gcc):
+    un hijo vivo mantiene abiertos stdout/stderr y wait() no volvería
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    elif process.returncode is None:
+        process.kill()
+
+
+async def _run_process(argv: List[str], timeout: Optional[float],
+                       on_section: Optional[Callable[[str], None]] = None) -> Tuple[int, str, str]:
+    """
+    Ejecuta argv sin shell y espera su salida
+    Si vence el timeout o la tarea se cancela, el proceso y sus hijos (corre
+    en su propia sesión) se matan antes de propagar la excepción
+    (asyncio.TimeoutError o CancelledError)
+    Returns: (código de salida, stdout, stderr)
+    """
+    process = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+        start_new_session=True)
+    readers = asyncio.gather(_read_output(process.stdout, on_section), process.stderr.read())
+    try:
+        stdout, stderr = await asyncio.wait_for(readers, timeout)
+        await process.wait()
+    except BaseException:
+        _kill_group(process)
+        await process.wait()
+        raise
+    finally:
+        # La cancelación de los lectores ya se propagó: marcarla como leída
+        if readers.done() and not readers.cancelled():
+            readers.exception()
+    return (process.returncode, stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'))
+
+
+def _notify(progress: Optional[ProgressCallback], stage: str, detail: str = ""):
+    if progress is not None:
+        progress(stage, detail)
+
+
+def dataset_rows(path) -> Dict[str, int]:
+    """Filas de cada tabla de un dataset según su dataset.json"""
+    meta = read_metadata(path)
+    rows = {
+        "personas": meta["num_persons"],
+        "empresas": meta["num_companies"],
+        "publicaciones": meta["num_posts"],
+        "interacciones": meta["num_interactions"],
+    }
+    rows.update(meta.get("relations", {}))
+    return rows
+
+
+def cuda_available() -> bool:
+    """nvcc en el PATH y una GPU visible para nvidia-smi"""
+    if shutil.which("nvcc") is None:
+        return False
+    try:
+        return subprocess.run(["nvidia-smi", "-L"], capture_output=True,
+                              timeout=10).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+def query_input_size(rows: Dict[str, int], query: str) -> int:
+    """Filas que recorre una consulta según los conteos de dataset_rows()"""
+    return sum(rows.get(table, 0) for table in QUERY_INPUTS.get(query, ()))
+
+
+class BackendPolicy:
+    """
+    Elige "cuda" o "numpy" para cada consulta según el tamaño de su entrada
+    thresholds[consulta] son las filas desde las que el binario CUDA fue más
+    rápido en backend_compare.py (None = no lo fue en ningún tamaño medido);
+    las consultas sin umbral medido usan default
+    """
+
+    def __init__(self, thresholds: Optional[Dict[str, Optional[int]]] = None,
+                 default: Optional[int] = DEFAULT_CUDA_MIN_ROWS):
+        self.thresholds = dict(thresholds or {})
+        self.default = default
+
+    @classmethod
+    def load(cls, path=BACKEND_POLICY_FILE) -> "BackendPolicy":
+        """Política guardada (sin archivo, la política por defecto)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                policy = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        return cls({query: entry.get("umbral") for query, entry in policy["consultas"].items()})
+
+    def choose(self, query: str, size: int, cuda_ready: bool = True) -> str:
+        threshold = self.thresholds.get(query, self.default)
+        return "cuda" if cuda_ready and threshold is not None and size >= threshold else "numpy"
+
+    def plan(self, dataset: Optional[str], queries: Sequence[str] = PARSED_QUERIES,
+             cuda_ready: Optional[bool] = None) -> Dict[str, str]:
+        """
+        Backend de cada consulta para un dataset (None = datos de ejemplo)
+        cuda_ready: None = detectar nvcc y GPU
+        """
+        if cuda_ready is None:
+            cuda_ready = cuda_available()
+        rows = dataset_rows(dataset) if dataset is not None else {}
+        return {query: self.choose(query, query_input_size(rows, query), cuda_ready)
+                for query in queries}
+
 
 class CUDASocialNetwork:
-    def __init__(self, cuda_file="social_network.cu", executable="social_network.exe"):
+    def __init__(self, cuda_file="social_network.cu", executable="social_network.exe",
+                 metrics: bool = False, hooks: Optional[HookRegistry] = None,
+                 dataset: Optional[str] = None):
         self.cuda_file = cuda_file
         self.executable = executable
         self.compiled = False
         self.output_cache = None
+        # Motivo del último fallo de get_parsed_data()/get_parsed_data_async()
+        self.last_error: Optional[str] = None
+        # Un análisis asíncrono a la vez por instancia (las métricas son de la instancia)
+        self._busy = False
+        # Dataset que carga el binario (None = datos de ejemplo internos)
+        self.dataset: Optional[str] = None
+        self.timeout = EXECUTE_TIMEOUT
+        if dataset is not None:
+            self.set_dataset(dataset)
+        # Con metrics=True el binario se ejecuta con --metrics y get_parsed_data()
+        # agrega la clave "metricas" (tiempos, bytes copiados, parseo, memoria)
+        self.metrics = MetricsRecorder(metrics, backend="wrapper")
+        # Hooks de profiling (por defecto los de SOCIAL_NETWORK_PROFILE)
+        self.hooks = hooks if hooks is not None else hooks_from_env()
+
+    def set_metrics(self, enabled: bool):
+        """Activa o desactiva la instrumentación para las próximas ejecuciones"""
+        if enabled != self.metrics.enabled:
+            self.metrics = MetricsRecorder(enabled, backend="wrapper")
+
+    def set_dataset(self, path: Optional[str]):
+        """
+        Selecciona el dataset que carga el binario (None = datos de ejemplo)
+        El binario dimensiona sus tablas con los conteos reales; aquí se
+        rechazan de antemano los que no entran en índices int32
+        Raises: ValueError si el dataset es inválido o demasiado grande
+        """
+        self.output_cache = None
+        if path is None:
+            self.dataset, self.timeout = None, EXECUTE_TIMEOUT
+            return
+        try:
+            rows = dataset_rows(path)
+        except (OSError, KeyError) as error:
+            raise ValueError(f"Dataset inválido en {path}: {error}") from None
+        too_large = {name: count for name, count in rows.items() if count > MAX_ROWS}
+        if too_large:
+            raise ValueError(f"Dataset demasiado grande para el binario CUDA "
+                             f"(máximo {MAX_ROWS} filas por tabla): {too_large}")
+        self.dataset = str(path)
+        self.timeout = EXECUTE_TIMEOUT + TIMEOUT_PER_MILLION_ROWS * sum(rows.values()) / 1e6
+
+    def compile_command(self) -> List[str]:
+        """Argumentos de nvcc (se ejecutan sin shell)"""
+        return ["nvcc", "-o", self.executable, self.cuda_file, "-std=c++11"]
+
+    def execute_command(self, dataset: Optional[str] = None) -> List[str]:
+        """Argumentos del binario para un dataset (por defecto, el seleccionado)"""
+        executable = os.path.join(os.curdir, self.executable) if os.name != 'nt' else self.executable
+        cmd = [executable]
+        dataset = self.dataset if dataset is None else dataset
+        if dataset is not None:
+            cmd.append(dataset)
+        if self.metrics.enabled:
+            cmd.append("--metrics")
+        return cmd
+
+    def reuse_binary(self) -> bool:
+        """
+        Da por compilado el ejecutable si ya existe y es más nuevo que el
+        código CUDA (p. ej. de una corrida anterior); retorna si se reutiliza
+        """
+        try:
+            current = os.path.getmtime(self.executable) >= os.path.getmtime(self.cuda_file)
+        except OSError:
+            current = False
+        self.compiled = self.compiled or current
+        return current
 
     def compile(self) -> Tuple[bool, str]:
         """
@@ -27,15 +305,14 @@ class CUDASocialNetwork:
             if not os.path.exists(self.cuda_file):
                 return False, f"Archivo {self.cuda_file} no encontrado"
 
-            # Compilar con nvcc
-            cmd = f'nvcc -o {self.executable} {self.cuda_file} -std=c++11'
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            # La compilación cuenta como etapa de carga del backend
+            with self.metrics.measure("compilacion"), self.hooks.stage(STAGE_LOAD, "compile"):
+                result = subprocess.run(
+                    self.compile_command(),
+                    capture_output=True,
+                    text=True,
+                    timeout=COMPILE_TIMEOUT
+                )
 
             if result.returncode == 0:
                 self.compiled = True
@@ -60,16 +337,17 @@ class CUDASocialNetwork:
                     return False, msg
 
             # Ejecutar el programa
-            result = subprocess.run(
-                f'./{self.executable}' if os.name != 'nt' else self.executable,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            with self.metrics.measure("ejecucion"), self.hooks.stage(STAGE_COMPUTE, "execute"):
+                result = subprocess.run(
+                    self.execute_command(),
+                    capture_output=True,
+                    text=True,
+                    timeout=self.timeout
+                )
 
             if result.returncode == 0:
                 self.output_cache = result.stdout
+                self.metrics.record_cuda_output(result.stderr)
                 return True, result.stdout
             else:
                 return False, f"Error de ejecución:\n{result.stderr}"
@@ -79,6 +357,106 @@ class CUDASocialNetwork:
         except Exception as e:
             return False, f"Error: {str(e)}"
 
+    # --- Ejecución asíncrona ---------------------------------------------
+
+    async def compile_async(self, timeout: Optional[float] = None,
+                            progress: Optional[ProgressCallback] = None) -> Tuple[bool, str]:
+        """
+        compile() sin bloquear el event loop; cancelar la tarea mata a nvcc
+        timeout: segundos (por defecto COMPILE_TIMEOUT)
+        """
+        if not os.path.exists(self.cuda_file):
+            return False, f"Archivo {self.cuda_file} no encontrado"
+        _notify(progress, "compilacion")
+        try:
+            with self.metrics.measure("compilacion"), self.hooks.stage(STAGE_LOAD, "compile"):
+                returncode, _, stderr = await _run_process(
+                    self.compile_command(), COMPILE_TIMEOUT if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            return False, "Timeout durante la compilación"
+        except OSError as e:
+            return False, f"Error: {str(e)}"
+        if returncode != 0:
+            return False, f"Error de compilación:\n{stderr}"
+        self.compiled = True
+        return True, "Compilación exitosa"
+
+    async def execute_async(self, timeout: Optional[float] = None,
+                            progress: Optional[ProgressCallback] = None,
+                            slots: Optional[asyncio.Semaphore] = None) -> Tuple[bool, str]:
+        """
+        execute() sin bloquear el event loop
+        - timeout: segundos para esta llamada (por defecto, el del dataset)
+        - progress: se llama con ("ejecucion", sección) a medida que el binario
+          imprime cada sección
+        - slots: semáforo que acota las ejecuciones simultáneas (por defecto
+          run_slots(), compartido por todas las instancias del loop)
+        Cancelar la tarea mata el proceso y propaga CancelledError
+        """
+        self._claim()
+        try:
+            return await self._execute_async(timeout, progress, slots)
+        finally:
+            self._busy = False
+
+    async def get_parsed_data_async(self, timeout: Optional[float] = None,
+                                    progress: Optional[ProgressCallback] = None,
+                                    slots: Optional[asyncio.Semaphore] = None) -> Optional[Dict]:
+        """
+        get_parsed_data() sin bloquear el event loop (mismos argumentos que
+        execute_async); el parseo corre en un thread para no frenar otros
+        análisis del mismo loop. Si falla retorna None y deja el motivo en
+        last_error
+        """
+        self._claim()
+        try:
+            with self.hooks.query("get_parsed_data"):
+                self.metrics.reset()
+                self.last_error = None
+                success, output = await self._execute_async(timeout, progress, slots)
+                if not success:
+                    self.last_error = output
+                    return None
+                _notify(progress, "parseo")
+                data = await asyncio.get_running_loop().run_in_executor(None, self._parse_output, output)
+                _notify(progress, "listo")
+                return data
+        finally:
+            self._busy = False
+
+    def _claim(self):
+        if self._busy:
+            raise RuntimeError("Esta instancia ya tiene un análisis en curso: "
+                               "usar una instancia por análisis simultáneo")
+        self._busy = True
+
+    async def _execute_async(self, timeout: Optional[float], progress: Optional[ProgressCallback],
+                             slots: Optional[asyncio.Semaphore]) -> Tuple[bool, str]:
+        if not self.compiled:
+            success, msg = await self.compile_async(progress=progress)
+            if not success:
+                return False, msg
+
+        on_section = partial(progress, "ejecucion") if progress is not None else None
+        async with slots if slots is not None else run_slots():
+            _notify(progress, "ejecucion")
+            try:
+                with self.metrics.measure("ejecucion"), self.hooks.stage(STAGE_COMPUTE, "execute"):
+                    returncode, stdout, stderr = await _run_process(
+                        self.execute_command(), self.timeout if timeout is None else timeout,
+                        on_section)
+            except asyncio.TimeoutError:
+                return False, "Timeout durante la ejecución"
+            except OSError as e:
+                return False, f"Error: {str(e)}"
+        if returncode != 0:
+            return False, f"Error de ejecución:\n{stderr}"
+        self.output_cache = stdout
+        self.metrics.record_cuda_output(stderr)
+        return True, stdout
+
+    # --- Parseo de la salida ---------------------------------------------
+
     def parse_followers(self, output: str) -> Dict[str, List[Dict]]:
         """Parsea la sección de seguidores"""
         followers_data = {"personas": [], "empresas": []}
@@ -87,7 +465,7 @@ class CUDASocialNetwork:
         person_match = re.search(r'--- Personas ---\n(.*?)(?=\n---|$)', output, re.DOTALL)
         if person_match:
             for line in person_match.group(1).strip().split('\n'):
-                match = re.match(r'(.+?):\s*(\d+)\s*seguidores?', line)
+                match = re.match(r'(.+):\s*(\d+)\s*seguidores?$', line)
                 if match:
                     followers_data["personas"].append({
                         "nombre": match.group(1),
@@ -98,7 +476,7 @@ class CUDASocialNetwork:
         company_match = re.search(r'--- Empresas ---\n(.*?)(?=\n=|$)', output, re.DOTALL)
         if company_match:
             for line in company_match.group(1).strip().split('\n'):
-                match = re.match(r'(.+?):\s*(\d+)\s*seguidores?', line)
+                match = re.match(r'(.+):\s*(\d+)\s*seguidores?$', line)
                 if match:
                     followers_data["empresas"].append({
                         "nombre": match.group(1),
@@ -108,19 +486,18 @@ class CUDASocialNetwork:
         return followers_data
 
     def parse_post_reactions(self, output: str) -> List[Dict]:
-        """Parsea las reacciones por publicación"""
+        """Parsea las reacciones por publicación (línea del post y línea de conteos)"""
         reactions = []
 
         section = re.search(r'REACCIONES POR PUBLICACION.*?\n(.*?)(?=\n=|$)', output, re.DOTALL)
         if section:
-            for line in section.group(1).strip().split('\n'):
-                match = re.match(r'Post (\d+).*?:\s*(\d+)\s*likes?,\s*(\d+)\s*dislikes?', line)
-                if match:
-                    reactions.append({
-                        "post_id": int(match.group(1)),
-                        "likes": int(match.group(2)),
-                        "dislikes": int(match.group(3))
-                    })
+            for match in re.finditer(r'^Post (\d+):.*\n\s*Likes:\s*(\d+)\s*\|\s*Dislikes:\s*(\d+)',
+                                     section.group(1), re.MULTILINE):
+                reactions.append({
+                    "post_id": int(match.group(1)),
+                    "likes": int(match.group(2)),
+                    "dislikes": int(match.group(3))
+                })
 
         return reactions
 
@@ -132,7 +509,7 @@ class CUDASocialNetwork:
         more_section = re.search(r'--- Top 5 con MAS likes ---\n(.*?)(?=\n---|$)', output, re.DOTALL)
         if more_section:
             for line in more_section.group(1).strip().split('\n'):
-                match = re.match(r'\d+\.\s*"(.+?)"\s*-\s*(\d+)\s*likes?', line)
+                match = re.match(r'\d+\.\s*"(.*)"\s*-\s*(\d+)\s*likes?$', line)
                 if match:
                     top_data["mas_likes"].append({
                         "texto": match.group(1),
@@ -143,7 +520,7 @@ class CUDASocialNetwork:
         less_section = re.search(r'--- Top 5 con MENOS likes ---\n(.*?)(?=\n=|$)', output, re.DOTALL)
         if less_section:
             for line in less_section.group(1).strip().split('\n'):
-                match = re.match(r'\d+\.\s*"(.+?)"\s*-\s*(\d+)\s*likes?', line)
+                match = re.match(r'\d+\.\s*"(.*)"\s*-\s*(\d+)\s*likes?$', line)
                 if match:
                     top_data["menos_likes"].append({
                         "texto": match.group(1),
@@ -162,7 +539,7 @@ class CUDASocialNetwork:
         section = re.search(r'ANALISIS DE HASHTAGS.*?\n(.*?)(?=\n=|$)', output, re.DOTALL)
         if section:
             # Hashtag más usado
-            most_used = re.search(r'Hashtag mas usado:\s*(#\w+)\s*\((\d+)\s*veces?\)', section.group(1))
+            most_used = re.search(r'Hashtag mas usado:\s*(#\S+)\s*\((\d+)\s*(?:publicaciones|veces)\)', section.group(1))
             if most_used:
                 hashtag_data["mas_usado"] = {
                     "hashtag": most_used.group(1),
@@ -171,7 +548,7 @@ class CUDASocialNetwork:
 
             # Conteo de todos
             for line in section.group(1).split('\n'):
-                match = re.match(r'\s*(#\w+):\s*(\d+)\s*publicaciones?', line)
+                match = re.match(r'\s*(#\S+):\s*(\d+)\s*publicaciones?$', line)
                 if match:
                     hashtag_data["conteo"].append({
                         "hashtag": match.group(1),
@@ -181,15 +558,15 @@ class CUDASocialNetwork:
         return hashtag_data
 
     def parse_blocked_followers(self, output: str) -> List[Dict]:
-        """Parsea seguidores bloqueados"""
+        """Parsea seguidores bloqueados (personas y empresas que bloquean)"""
         blocked = []
 
         section = re.search(r'SEGUIDORES BLOQUEADOS.*?\n(.*?)(?=\n=|$)', output, re.DOTALL)
         if section:
             current_user = None
             for line in section.group(1).strip().split('\n'):
-                user_match = re.match(r'(.+?):', line)
-                blocked_match = re.match(r'\s*-\s*(.+)', line)
+                user_match = re.match(r'(.+) ha bloqueado a:$', line)
+                blocked_match = re.match(r'\s+-\s*(.+?)(?: \(persona\))?$', line)
 
                 if user_match:
                     current_user = user_match.group(1)
@@ -202,44 +579,215 @@ class CUDASocialNetwork:
         return blocked
 
     def parse_company_recommendations(self, output: str) -> List[Dict]:
-        """Parsea recomendaciones de empresas"""
+        """
+        Parsea recomendaciones de empresas, agrupadas por empresa recomendada
+        ("X recibio recomendaciones de:" del binario) o una por línea
+        ("X recomienda a: Y" de format_output del motor NumPy)
+        """
         recommendations = []
 
-        section = re.search(r'EMPRESAS QUE RECOMIENDAN.*?\n(.*?)(?=\n=|$)', output, re.DOTALL)
+        section = re.search(r'RECOMENDACIONES DE EMPRESAS.*?\n(.*?)(?=\n=|$)', output, re.DOTALL)
         if section:
+            current = None
             for line in section.group(1).strip().split('\n'):
-                match = re.match(r'(.+?)\s*recomienda a:\s*(.+)', line)
-                if match:
+                target_match = re.match(r'(.+) recibio recomendaciones de:$', line)
+                source_match = re.match(r'\s+-\s*(.+)', line)
+                pair_match = re.match(r'(.+?) recomienda a: (.+)', line)
+                if target_match:
+                    current = target_match.group(1)
+                elif source_match and current:
                     recommendations.append({
-                        "recomienda": match.group(1),
-                        "recomendada": match.group(2)
+                        "recomienda": source_match.group(1),
+                        "recomendada": current
+                    })
+                elif pair_match:
+                    recommendations.append({
+                        "recomienda": pair_match.group(1),
+                        "recomendada": pair_match.group(2)
                     })
 
         return recommendations
 
+    def parse_visibility(self, output: str) -> Dict[int, Optional[List[str]]]:
+        """
+        Parsea las secciones de visibilidad: post -> personas que lo ven
+        (None si es de una empresa: lo ven todos)
+        """
+        visibility = {}
+        for match in re.finditer(r'VISIBILIDAD DEL POST (\d+) \((PERSONA|EMPRESA)\) =+\n(.*?)(?=\n=|$)',
+                                 output, re.DOTALL):
+            post_id = int(match.group(1))
+            if match.group(2) == "EMPRESA":
+                visibility[post_id] = None
+            else:
+                visible = match.group(3).split("Personas que pueden ver esta publicacion:\n", 1)
+                visibility[post_id] = re.findall(r'^  - (.+)$', visible[-1], re.MULTILINE)
+        return visibility
+
+    def parse_influence(self, output: str) -> Dict[str, List[List[str]]]:
+        """Parsea las redes de influencia: persona -> seguidores por grado"""
+        influence = {}
+        for match in re.finditer(r'RED DE INFLUENCIA: ([^\n]+) \(grado \d+\) =+\n(.*?)(?=\n=|$)',
+                                 output, re.DOTALL):
+            levels = []
+            for level in re.split(r'--- Grado \d+ ---', match.group(2))[1:]:
+                names = re.findall(r'^  (\S.*)$', level, re.MULTILINE)
+                if names and names != ["(no hay mas seguidores en este grado)"]:
+                    levels.append(names)
+            influence[match.group(1)] = levels
+        return influence
+
     def get_parsed_data(self) -> Optional[Dict]:
         """
         Ejecuta el programa y retorna todos los datos parseados
         """
+        with self.hooks.query("get_parsed_data"):
+            return self._get_parsed_data()
+
+    def get_arrow_tables(self) -> Optional[Dict]:
+        """Resultados como tablas Arrow (ver results_arrow.py); requiere pyarrow"""
+        from results_arrow import results_to_tables
+
+        data = self.get_parsed_data()
+        return results_to_tables(data) if data else None
+
+    def _get_parsed_data(self) -> Optional[Dict]:
+        self.metrics.reset()
+        self.last_error = None
         success, output = self.execute()
 
         if not success:
+            self.last_error = output
             return None
-
-        return {
-            "seguidores": self.parse_followers(output),
-            "reacciones": self.parse_post_reactions(output),
-            "top_posts": self.parse_top_posts(output),
-            "hashtags": self.parse_hashtags(output),
-            "bloqueados": self.parse_blocked_followers(output),
-            "recomendaciones": self.parse_company_recommendations(output),
-            "output_raw": output
+        return self._parse_output(output)
+
+    def _parse_output(self, output: str) -> Dict:
+        """Todas las secciones de una salida del binario"""
+        parsers = {
+            "seguidores": self.parse_followers,
+            "reacciones": self.parse_post_reactions,
+            "top_posts": self.parse_top_posts,
+            "hashtags": self.parse_hashtags,
+            "bloqueados": self.parse_blocked_followers,
+            "recomendaciones": self.parse_company_recommendations,
         }
+        data = {}
+        with self.metrics.measure("parseo"):
+            for key, parser in parsers.items():
+                with self.metrics.measure(f"parseo_{key}"), self.hooks.stage(STAGE_PARSE, key):
+                    data[key] = parser(output)
+        data["output_raw"] = output
+
+        if self.metrics.enabled:
+            data["metricas"] = self.metrics.to_list()
+        return data
+
+
+async def analyze_datasets(datasets: Sequence[Optional[str]],
+                           max_concurrency: int = MAX_CONCURRENT_RUNS,
+                           timeout: Optional[float] = None,
+                           progress: Optional[Callable[[Optional[str], str, str], None]] = None,
+                           metrics: bool = False, cuda_file: str = "social_network.cu",
+                           executable: str = "social_network.exe") -> List[Optional[Dict]]:
+    """
+    Analiza varios datasets en paralelo (None = datos de ejemplo), con a lo
+    sumo max_concurrency binarios a la vez; compila una sola vez (o reutiliza
+    un ejecutable al día)
+    progress(dataset, etapa, detalle); los resultados quedan en el orden de
+    datasets (None si ese análisis falló)
+    Raises: ValueError si algún dataset es inválido (antes de ejecutar nada)
+    """
+    networks = [CUDASocialNetwork(cuda_file, executable, metrics=metrics, dataset=dataset)
+                for dataset in datasets]
+    if not networks:
+        return []
+    notify = (lambda dataset: partial(progress, dataset)) if progress is not None \
+        else (lambda dataset: None)
+    success, msg = (True, "") if networks[0].reuse_binary() else \
+        await networks[0].compile_async(progress=notify(datasets[0]))
+    if not success:
+        for network in networks:
+            network.last_error = msg
+        return [None] * len(networks)
+    for network in networks:
+        network.compiled = True
+
+    slots = asyncio.Semaphore(max(1, max_concurrency))
+    return list(await asyncio.gather(*(
+        network.get_parsed_data_async(timeout, notify(dataset), slots)
+        for network, dataset in zip(networks, datasets))))
+
+
+def get_parsed_data_auto(dataset: Optional[str] = None, policy: Optional[BackendPolicy] = None,
+                         network: Optional[CUDASocialNetwork] = None,
+                         cuda_ready: Optional[bool] = None) -> Dict:
+    """
+    Resultados de get_parsed_data() con el backend de cada consulta elegido
+    por la política: las consultas de CUDA salen de una sola ejecución del
+    binario y el resto del motor NumPy (también si el binario falla; el
+    motivo queda en network.last_error). data["backends"] registra la elección
+    """
+    from numpy_engine import NumpySocialNetwork, format_output
+    from social_dataset import sample_dataset
+
+    policy = policy if policy is not None else BackendPolicy.load()
+    backends = policy.plan(dataset, cuda_ready=cuda_ready)
+    data = {}
+    if "cuda" in backends.values():
+        network = network if network is not None else CUDASocialNetwork(dataset=dataset)
+        network.set_dataset(dataset)
+        network.reuse_binary()
+        parsed = network.get_parsed_data()
+        if parsed is None:
+            backends = dict.fromkeys(backends, "numpy")
+        else:
+            data = {query: parsed[query] for query, backend in backends.items() if backend == "cuda"}
+            if "metricas" in parsed:
+                data["metricas"] = parsed["metricas"]
+
+    if "numpy" in backends.values():
+        engine = NumpySocialNetwork.from_path(dataset) if dataset is not None \
+            else NumpySocialNetwork(sample_dataset())
+        for query, backend in backends.items():
+            if backend == "numpy":
+                data[query] = getattr(engine, NUMPY_QUERY_METHODS[query])()
+        ds = engine.dataset
+        data["output_raw"] = format_output(data, ds.num_persons, ds.num_companies, ds.num_posts,
+                                           ds.post_texts)
+    else:
+        data["output_raw"] = parsed["output_raw"]
+    data["backends"] = backends
+    return data
 
 
 if __name__ == "__main__":
-    # Test del wrapper
-    network = CUDASocialNetwork()
+    # Test del wrapper (con --metrics se muestran las métricas por consulta;
+    # un argumento posicional es el directorio de un dataset a cargar; con
+    # varios se analizan en paralelo con analyze_datasets; con --auto cada
+    # consulta usa el backend que elige la política de backend_compare.py)
+    import sys
+    datasets = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if "--auto" in sys.argv:
+        data = get_parsed_data_auto(datasets[0] if datasets else None,
+                                    network=CUDASocialNetwork(metrics="--metrics" in sys.argv))
+        print(json.dumps({key: value for key, value in data.items() if key != "output_raw"},
+                         indent=2, ensure_ascii=False))
+        sys.exit(0)
+    if len(datasets) > 1:
+        def show_progress(dataset, stage, detail):
+            print(f"[{dataset}] {stage}{': ' + detail if detail else ''}", file=sys.stderr)
+
+        results = asyncio.run(analyze_datasets(datasets, progress=show_progress,
+                                               metrics="--metrics" in sys.argv))
+        print(json.dumps({dataset: None if data is None else {
+            "personas": len(data["seguidores"]["personas"]),
+            "publicaciones": len(data["reacciones"]),
+            "hashtags": len(data["hashtags"]["conteo"]),
+        } for dataset, data in zip(datasets, results)}, indent=2, ensure_ascii=False))
+        sys.exit(0 if all(results) else 1)
+
+    dataset = datasets[0] if datasets else None
+    network = CUDASocialNetwork(metrics="--metrics" in sys.argv, dataset=dataset)
 
     print("Compilando código CUDA...")
     success, msg = network.compile()
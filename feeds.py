@@ -0,0 +1,415 @@
+"""
+Feeds materializados por persona ("qué ve la persona X")
+
+Cada post de una persona se reparte (fan-out) a su audiencia con la regla de
+check_visibility_kernel: el autor, sus seguidores no bloqueados y los
+seguidores de esos seguidores. Los posts de empresas los ve todo el mundo:
+se guardan una sola vez en una lista compartida que se mezcla al leer (el
+mismo resultado que copiarlos a cada feed, sin personas x posts de empresa)
+
+    python feeds.py datos_1m 12 --limit 20 --workers 4
+
+Feeds comprimidos: cada feed es la lista ordenada de ids de post visibles,
+partida en bloques de FEED_BLOCK ids; el primer id de cada bloque va en una
+tabla de saltos y el resto como diferencias en varints (text_index). Una
+página, del post más nuevo al más viejo y antes de un cursor, decodifica solo
+los bloques que toca: O(log bloques + página + FEED_BLOCK)
+
+Construcción en paralelo por rangos de lectores (procesos worker); cada
+rango junta sus autores visibles (propios, directos y a dos saltos) y los
+posts de esos autores, sin bucles por persona. Los posts nuevos se reparten
+a un tramo sin comprimir que se fusiona con los feeds cuando crece. Los
+cambios de seguimientos o bloqueos no reescriben lo ya repartido: se
+reconstruye con FeedIndex.build()
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from numpy_engine import FEED_PAGE, gather_neighbors, group_by_source, sorted_unique
+from social_dataset import COMPANY, PERSON, POST_AUTHOR_ID, POST_AUTHOR_TYPE, SocialDataset
+from text_index import _segmented_cumsum, decode_varints, encode_varints
+
+# Ids por bloque comprimido (una página decodifica a lo sumo un bloque de más)
+FEED_BLOCK = 128
+# Entradas de feed (cota antes de quitar repetidos) por tarea de construcción
+TASK_ENTRIES = 1 << 22
+# El tramo sin comprimir se fusiona al llegar a esta fracción de los feeds
+TAIL_FRACTION = 0.25
+FLUSH_ENTRIES = 1 << 16
+
+
+# ============================================================================
+# GRAFO DE VISIBILIDAD
+# ============================================================================
+
+class FeedGraph:
+    """
+    CSR de seguimientos entre personas para repartir posts
+    - follows: lector -> personas que sigue
+    - direct: lector -> autores que sigue y no lo bloquean
+    - audience: autor -> seguidores que no bloqueó
+    - followers: persona -> sus seguidores
+    - posts: autor -> sus posts (solo personas), en orden
+    """
+
+    def __init__(self, dataset: SocialDataset):
+        n = dataset.num_persons
+        self.num_persons = n
+        follows = np.asarray(dataset.relations["person_follows_person"], dtype=np.int64)
+        blocks = np.asarray(dataset.relations["person_blocks_person"], dtype=np.int64)
+        # Seguimiento (f, a) bloqueado si existe el bloqueo (a, f)
+        blocked = np.isin(follows[:, 1] * n + follows[:, 0], blocks[:, 0] * n + blocks[:, 1])
+        direct = follows[~blocked]
+
+        self.follows_indptr, self.follows = group_by_source(follows, n)
+        self.direct_indptr, self.direct = group_by_source(direct, n)
+        self.audience_indptr, self.audience = group_by_source(direct[:, ::-1], n)
+        self.followers_indptr, self.followers = group_by_source(follows[:, ::-1], n)
+
+        posts = np.asarray(dataset.posts)
+        person_posts = np.flatnonzero(posts[:, POST_AUTHOR_TYPE] == PERSON)
+        self.posts_indptr, self.posts = group_by_source(
+            np.stack([posts[person_posts, POST_AUTHOR_ID], person_posts], axis=1), n)
+
+    def visible_authors(self, lo: int, hi: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (lector - lo, autor) sin repetidos y ordenados para los lectores
+        lo..hi-1: el propio lector, los autores que sigue sin estar bloqueado y
+        los autores que siguen (sin bloqueo) las personas que él sigue
+        """
+        readers = np.arange(lo, hi, dtype=np.int64)
+        direct_counts = np.diff(self.direct_indptr)
+        follow_counts = self.follows_indptr[readers + 1] - self.follows_indptr[readers]
+        followees = gather_neighbors(self.follows_indptr, self.follows, readers)
+        via = np.repeat(readers - lo, follow_counts)
+        keys = np.concatenate([
+            (readers - lo) * self.num_persons + readers,
+            np.repeat(readers - lo, direct_counts[readers]) * self.num_persons
+            + gather_neighbors(self.direct_indptr, self.direct, readers),
+            np.repeat(via, direct_counts[followees]) * self.num_persons
+            + gather_neighbors(self.direct_indptr, self.direct, followees),
+        ])
+        keys = sorted_unique(keys)
+        return keys // self.num_persons, keys % self.num_persons
+
+    def audience_of(self, author: int) -> np.ndarray:
+        """Personas que ven los posts de un autor (como visible_persons), ordenadas"""
+        direct = self.audience[self.audience_indptr[author]:self.audience_indptr[author + 1]]
+        second = gather_neighbors(self.followers_indptr, self.followers, direct)
+        return sorted_unique(np.concatenate([[author], direct, second]).astype(np.int64))
+
+    def estimated_entries(self) -> np.ndarray:
+        """Cota de entradas de feed por lector (posts de autores visibles con repetidos)"""
+        post_counts = np.diff(self.posts_indptr).astype(np.float64)
+        direct_posts = _segment_sums(post_counts[self.direct], self.direct_indptr)
+        return post_counts + direct_posts + _segment_sums(direct_posts[self.follows],
+                                                          self.follows_indptr)
+
+    def task_ranges(self, max_entries: float) -> List[Tuple[int, int]]:
+        """Rangos de lectores con a lo sumo max_entries entradas estimadas (salvo uno solo)"""
+        cumulative = np.cumsum(self.estimated_entries())
+        total = cumulative[-1] if len(cumulative) else 0
+        cuts = np.searchsorted(cumulative, np.arange(max_entries, total, max_entries), side="right")
+        bounds = sorted_unique(np.r_[0, cuts, self.num_persons].astype(np.int64))
+        return [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])] or [(0, 0)]
+
+
+def _segment_sums(values: np.ndarray, indptr: np.ndarray) -> np.ndarray:
+    """Suma de cada tramo CSR (0 en los vacíos)"""
+    sums = np.r_[0, np.cumsum(values)]
+    return sums[indptr[1:]] - sums[indptr[:-1]]
+
+
+# ============================================================================
+# CODIFICACIÓN POR BLOQUES
+# ============================================================================
+
+def encode_blocks(counts: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Listas ordenadas (counts[i] ids de la persona i, concatenados) ->
+    (bytes varint, primer id de cada bloque, bytes de cada bloque)
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    ids = np.asarray(ids, dtype=np.int64)
+    position = np.arange(len(ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+    first = position % FEED_BLOCK == 0
+    deltas = np.diff(ids, prepend=0)[~first]
+    data, lengths = encode_varints(deltas)
+    block_of = np.cumsum(first)[~first] - 1
+    block_bytes = np.bincount(block_of, weights=lengths, minlength=int(first.sum()))
+    return data, ids[first], block_bytes.astype(np.int64)
+
+
+def _block_sizes(counts: np.ndarray) -> np.ndarray:
+    """Ids de cada bloque: FEED_BLOCK salvo el último de cada persona"""
+    num_blocks = -(-counts // FEED_BLOCK)
+    sizes = np.full(int(num_blocks.sum()), FEED_BLOCK, dtype=np.int64)
+    last = np.cumsum(num_blocks)[num_blocks > 0] - 1
+    sizes[last] = counts[num_blocks > 0] - (num_blocks[num_blocks > 0] - 1) * FEED_BLOCK
+    return sizes
+
+
+def build_range(graph: FeedGraph, lo: int, hi: int) -> Tuple[np.ndarray, ...]:
+    """Feeds codificados de los lectores lo..hi-1: (ids por lector, bytes, primeros, bytes por bloque)"""
+    readers, authors = graph.visible_authors(lo, hi)
+    post_counts = graph.posts_indptr[authors + 1] - graph.posts_indptr[authors]
+    posts = gather_neighbors(graph.posts_indptr, graph.posts, authors).astype(np.int64)
+    # Los autores tienen posts disjuntos: ordenar por (lector, post) alcanza
+    num_posts = int(posts.max(initial=0)) + 1
+    keys = np.sort(np.repeat(readers, post_counts) * num_posts + posts)
+    counts = np.bincount(keys // num_posts, minlength=hi - lo)
+    return (counts,) + encode_blocks(counts, keys % num_posts)
+
+
+_WORKER_GRAPH: Optional[FeedGraph] = None
+
+
+def _init_worker(graph: FeedGraph):
+    global _WORKER_GRAPH
+    _WORKER_GRAPH = graph
+
+
+def _build_task(bounds: Tuple[int, int]) -> Tuple[np.ndarray, ...]:
+    return build_range(_WORKER_GRAPH, *bounds)
+
+
+# ============================================================================
+# ÍNDICE DE FEEDS
+# ============================================================================
+
+class FeedIndex:
+    """
+    Feeds de todas las personas (comprimidos) más los posts de empresas
+    Los ids de post que se agregan deben ser mayores que los ya repartidos
+    """
+
+    def __init__(self, graph: FeedGraph, parts: Sequence[Tuple[np.ndarray, ...]],
+                 company_posts: np.ndarray, size: int, flush_entries: int = FLUSH_ENTRIES):
+        """parts: salidas de build_range para rangos consecutivos de lectores"""
+        self.graph = graph
+        self.flush_entries = flush_entries
+        self._set_blocks(*(np.concatenate([part[i] for part in parts]) for i in range(4)))
+        self._shared = np.asarray(company_posts, dtype=np.int64)
+        self.num_shared = len(self._shared)
+        self.size = size           # ids de post repartidos (máximo id + 1)
+        self._tail_readers: List[np.ndarray] = []
+        self._tail_posts: List[np.ndarray] = []
+        self.tail_entries = 0
+        self._tail_csr: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def _set_blocks(self, counts: np.ndarray, data: np.ndarray, block_first: np.ndarray,
+                    block_bytes: np.ndarray):
+        self.counts = np.zeros(self.graph.num_persons, dtype=np.int64)
+        self.counts[:len(counts)] = counts
+        self.data = data.astype(np.uint8, copy=False)
+        self.block_first = block_first.astype(np.int64, copy=False)
+        self.block_offsets = np.r_[0, np.cumsum(block_bytes)].astype(np.int64)
+        self.user_blocks = np.r_[0, np.cumsum(-(-self.counts // FEED_BLOCK))].astype(np.int64)
+
+    @classmethod
+    def build(cls, dataset: SocialDataset, workers: int = 1,
+              task_entries: int = TASK_ENTRIES) -> "FeedIndex":
+        """Reparte todos los posts del dataset (en paralelo con workers > 1)"""
+        graph = FeedGraph(dataset)
+        if workers > 1:
+            # Unas 4 tareas por worker para repartir la carga
+            task_entries = max(1.0, min(task_entries,
+                                        graph.estimated_entries().sum() / (4 * workers)))
+        ranges = graph.task_ranges(task_entries)
+        if workers > 1 and len(ranges) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(graph,)) as executor:
+                parts = list(executor.map(_build_task, ranges))
+        else:
+            parts = [build_range(graph, lo, hi) for lo, hi in ranges]
+        posts = np.asarray(dataset.posts)
+        return cls(graph, parts, np.flatnonzero(posts[:, POST_AUTHOR_TYPE] == COMPANY),
+                   dataset.num_posts)
+
+    # --- Actualización -----------------------------------------------------
+
+    def add_posts(self, post_ids: Sequence[int], author_types: Sequence[int],
+                  authors: Sequence[int]):
+        """
+        Reparte posts nuevos a las audiencias de sus autores (con el grafo
+        del momento de la construcción); se fusionan al crecer el tramo nuevo
+        Raises: ValueError si los ids no son crecientes o el autor no existe
+        """
+        post_ids = np.asarray(post_ids, dtype=np.int64)
+        author_types = np.asarray(author_types)
+        authors = np.asarray(authors, dtype=np.int64)
+        if len(post_ids) == 0:
+            return
+        if post_ids[0] < self.size or np.any(np.diff(post_ids) <= 0):
+            raise ValueError("Los ids de post nuevos deben ser crecientes y mayores que los repartidos")
+        persons = author_types == PERSON
+        if np.any(persons & ((authors < 0) | (authors >= self.graph.num_persons))):
+            raise ValueError("Autor fuera de rango para el grafo de los feeds")
+
+        self._append_shared(post_ids[~persons])
+        audiences = {author: self.graph.audience_of(author)
+                     for author in np.unique(authors[persons]).tolist()}
+        for post, author in zip(post_ids[persons].tolist(), authors[persons].tolist()):
+            audience = audiences[author]
+            self._tail_readers.append(audience)
+            self._tail_posts.append(np.full(len(audience), post, dtype=np.int64))
+            self.tail_entries += len(audience)
+        self._tail_csr = None
+        self.size = int(post_ids[-1]) + 1
+        if self.tail_entries >= max(self.flush_entries, TAIL_FRACTION * len(self.block_first)
+                                    * FEED_BLOCK):
+            self.flush()
+
+    def _append_shared(self, posts: np.ndarray):
+        end = self.num_shared + len(posts)
+        if end > len(self._shared):
+            grown = np.zeros(max(end, 2 * len(self._shared)), dtype=np.int64)
+            grown[:self.num_shared] = self._shared[:self.num_shared]
+            self._shared = grown
+        self._shared[self.num_shared:end] = posts
+        self.num_shared = end
+
+    def _tail(self) -> Tuple[np.ndarray, np.ndarray]:
+        """CSR del tramo sin comprimir: (indptr por persona, posts en orden)"""
+        if self._tail_csr is None:
+            readers = np.concatenate(self._tail_readers) if self._tail_readers \
+                else np.zeros(0, dtype=np.int64)
+            posts = np.concatenate(self._tail_posts) if self._tail_posts \
+                else np.zeros(0, dtype=np.int64)
+            # Orden estable: los posts de cada persona ya vienen crecientes
+            self._tail_csr = group_by_source(np.stack([readers, posts], axis=1),
+                                             self.graph.num_persons)
+        return self._tail_csr
+
+    def flush(self):
+        """Fusiona el tramo nuevo con los feeds comprimidos (re-codifica)"""
+        if not self.tail_entries:
+            return
+        tail_indptr, tail_posts = self._tail()
+        stored = _segmented_cumsum(self._decode_all(), _block_sizes(self.counts))
+        tail_counts = np.diff(tail_indptr)
+        readers = np.r_[np.repeat(np.arange(self.graph.num_persons), self.counts),
+                        np.repeat(np.arange(self.graph.num_persons), tail_counts)]
+        # Los posts del tramo son mayores que los guardados: orden estable por lector
+        order = np.argsort(readers, kind='stable')
+        counts = self.counts + tail_counts
+        self._set_blocks(counts, *encode_blocks(counts, np.r_[stored, tail_posts][order]))
+        self._tail_readers, self._tail_posts = [], []
+        self.tail_entries = 0
+        self._tail_csr = None
+
+    def _decode_all(self) -> np.ndarray:
+        """Primer id y diferencias de todos los bloques, en orden"""
+        deltas = decode_varints(self.data)
+        sizes = _block_sizes(self.counts)
+        values = np.empty(int(sizes.sum()), dtype=np.int64)
+        first = np.cumsum(sizes) - sizes
+        is_first = np.zeros(len(values), dtype=bool)
+        is_first[first] = True
+        values[is_first] = self.block_first
+        values[~is_first] = deltas
+        return values
+
+    # --- Lectura -----------------------------------------------------------
+
+    def _check_person(self, person: int):
+        if not 0 <= person < self.graph.num_persons:
+            raise ValueError(f"Persona fuera de rango: {person}")
+
+    def _block(self, person: int, block: int) -> np.ndarray:
+        """Ids de un bloque de la persona (decodifica solo ese bloque)"""
+        size = min(FEED_BLOCK, int(self.counts[person]) - (block - int(self.user_blocks[person]))
+                   * FEED_BLOCK)
+        deltas = decode_varints(self.data[self.block_offsets[block]:self.block_offsets[block + 1]])
+        first = self.block_first[block]
+        return np.r_[first, first + np.cumsum(deltas[:size - 1])]
+
+    def _stored_page(self, person: int, limit: int, before: int) -> np.ndarray:
+        """Hasta limit ids guardados menores que before, del más nuevo al más viejo"""
+        start, end = int(self.user_blocks[person]), int(self.user_blocks[person + 1])
+        block = start + int(np.searchsorted(self.block_first[start:end], before)) - 1
+        parts, found = [], 0
+        while block >= start and found < limit:
+            ids = self._block(person, block)
+            ids = ids[:np.searchsorted(ids, before)][::-1]
+            parts.append(ids)
+            found += len(ids)
+            block -= 1
+        return np.concatenate(parts)[:limit] if parts else np.zeros(0, dtype=np.int64)
+
+    def page(self, person: int, limit: int = FEED_PAGE, before: Optional[int] = None) -> np.ndarray:
+        """
+        Posts que ve la persona, del más nuevo al más viejo; before es el
+        cursor de la página siguiente (el último id de la anterior)
+        """
+        self._check_person(person)
+        before = self.size if before is None else min(int(before), self.size)
+        tail_indptr, tail_posts = self._tail()
+        tail = tail_posts[tail_indptr[person]:tail_indptr[person + 1]]
+        tail = tail[:np.searchsorted(tail, before)][::-1][:limit]
+        shared = self._shared[:self.num_shared]
+        cut = int(np.searchsorted(shared, before))
+        shared = shared[max(0, cut - limit):cut][::-1]
+        ids = np.concatenate([self._stored_page(person, limit, before), tail, shared])
+        return -np.sort(-ids)[:limit]
+
+    def feed(self, person: int) -> np.ndarray:
+        """Feed completo de una persona, en orden creciente"""
+        self._check_person(person)
+        start, end = int(self.user_blocks[person]), int(self.user_blocks[person + 1])
+        tail_indptr, tail_posts = self._tail()
+        parts = [self._block(person, block) for block in range(start, end)]
+        parts += [tail_posts[tail_indptr[person]:tail_indptr[person + 1]],
+                  self._shared[:self.num_shared]]
+        return np.sort(np.concatenate(parts))
+
+    @property
+    def num_entries(self) -> int:
+        """Entradas repartidas a feeds de personas (sin contar los posts de empresas)"""
+        return int(self.counts.sum()) + self.tail_entries
+
+    @property
+    def nbytes(self) -> int:
+        return (self.data.nbytes + self.block_first.nbytes + self.block_offsets.nbytes
+                + self.user_blocks.nbytes + self.counts.nbytes + 8 * self.num_shared
+                + 16 * self.tail_entries)
+
+    def summary(self) -> Dict:
+        entries = self.num_entries
+        return {"personas": self.graph.num_persons, "entradas": entries,
+                "posts_de_empresas": self.num_shared, "bloques": len(self.block_first),
+                "bytes": self.nbytes,
+                "bytes_por_entrada": round(self.nbytes / entries, 3) if entries else None}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from numpy_engine import NumpySocialNetwork
+    from social_dataset import load_dataset, sample_dataset
+
+    parser = argparse.ArgumentParser(description="Feed materializado de una persona")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("person", type=int, help="Índice de la persona")
+    parser.add_argument("--limit", type=int, default=FEED_PAGE, help="Posts por página")
+    parser.add_argument("--before", type=int, default=None,
+                        help="Cursor: solo posts con id menor (la página siguiente)")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para la construcción")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset, mmap=True) if args.dataset else sample_dataset()
+    engine = NumpySocialNetwork(dataset)
+    start = time.perf_counter()
+    index = engine.feed_index(args.workers)
+    built = time.perf_counter()
+    result = engine.query_feed(args.person, args.limit, args.before)
+    end = time.perf_counter()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(json.dumps(index.summary(), ensure_ascii=False))
+    print(f"Feeds: {built - start:.2f} s ({index.nbytes / 1e6:.1f} MB); "
+          f"página: {(end - built) * 1000:.2f} ms")
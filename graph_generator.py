@@ -0,0 +1,309 @@
+"""
+Generador sintético de redes sociales para pruebas de escala
+Produce personas, empresas, publicaciones con hashtags Zipf, relaciones con
+grados en ley de potencias e interacciones like/dislike, y las escribe por
+bloques en el formato de dataset del proyecto (ver social_dataset.py)
+
+Las aristas se generan con el modelo de Chung-Lu: cada origen recibe un
+grado de salida con distribución de Pareto y sus destinos se muestrean con
+probabilidad proporcional a un peso en ley de potencias (grado de entrada
+esperado), la versión vectorizable del apego preferencial de Barabási-Albert.
+Generar por rangos de origen permite eliminar duplicados bloque a bloque
+
+Marcas de tiempo: los posts se reparten en orden de id a lo largo de `days`
+días desde start_time, cada reacción llega con una demora exponencial
+después de su post y los seguimientos son uniformes en el período
+"""
+
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from social_dataset import (
+    PERSON, COMPANY, LIKE, DISLIKE, RELATIONS, POST_COLUMNS, INTER_COLUMNS, TIMED_RELATIONS,
+    TIME_FILES, TableWriter, write_metadata,
+)
+from numpy_engine import sorted_unique
+
+CHUNK_SIZE = 250_000
+# Inicio del período generado (2024-01-01T00:00:00Z), duración y demora media de reacciones
+START_TIME = 1_704_067_200
+DAYS = 30.0
+REACTION_DELAY = 6 * 3600
+
+BASE_HASHTAGS = ["#tech", "#coding", "#life", "#social", "#data"]
+PHRASES = [
+    "Hola mundo!", "Me encanta programar", "Hermoso dia!", "CUDA es increible",
+    "Nuevos productos disponibles", "Unete a nuestra red", "Analiza tus datos",
+    "Gran evento de tecnologia",
+]
+
+# Semilla independiente por tabla y bloque: misma semilla y tamaño de bloque
+# producen exactamente los mismos archivos
+TABLE_KEYS = {name: i for i, name in enumerate(
+    ["popularity", "posts", "interactions"] + list(RELATIONS))}
+
+
+def _rng(seed: int, table: str, chunk: int = 0) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence([seed, TABLE_KEYS[table], chunk]))
+
+
+class PowerLawSampler:
+    """
+    Muestrea ids con probabilidad ~ rango^-exponent, con los rangos asignados
+    a ids al azar (la popularidad no depende del id). Usa la inversa cerrada
+    de la CDF continua, O(1) por muestra; exponent=0 es muestreo uniforme
+    """
+
+    def __init__(self, n: int, exponent: float, rng: Optional[np.random.Generator] = None):
+        self.n = n
+        self.exponent = exponent
+        self.perm = rng.permutation(n) if rng is not None and exponent > 0 else None
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        u = rng.random(size)
+        if self.exponent == 0:
+            ranks = np.floor(u * self.n)
+        elif self.exponent == 1:
+            ranks = np.floor((self.n + 1) ** u) - 1
+        else:
+            e = 1.0 - self.exponent
+            ranks = np.floor((1 + u * ((self.n + 1) ** e - 1)) ** (1 / e)) - 1
+        ranks = np.clip(ranks.astype(np.int64), 0, self.n - 1)
+        return ranks if self.perm is None else self.perm[ranks]
+
+
+def pareto_degrees(size: int, mean: float, gamma: float, max_degree: int,
+                   rng: np.random.Generator) -> np.ndarray:
+    """Grados enteros con cola de Pareto P(k) ~ k^-gamma y media aproximada `mean`"""
+    if mean <= 0 or max_degree <= 0:
+        return np.zeros(size, dtype=np.int64)
+    xmin = mean * (gamma - 2) / (gamma - 1)
+    degrees = np.floor(xmin * (rng.pareto(gamma - 1, size) + 1)).astype(np.int64)
+    return np.minimum(degrees, max_degree)
+
+
+def poisson_degrees(mean: float) -> Callable:
+    return lambda size, rng: rng.poisson(mean, size)
+
+
+def _write_edges(writer: TableWriter, num_sources: int, targets: PowerLawSampler,
+                 degree_fn: Callable, seed: int, table: str, chunk_size: int,
+                 no_self_loops: bool, time_writer: Optional[TableWriter] = None,
+                 period: Tuple[int, int] = (START_TIME, START_TIME)) -> int:
+    """
+    Genera aristas por rangos de origen, sin duplicados ni (opcionalmente) lazos
+    Con time_writer escribe además una marca uniforme en period por arista
+    """
+    if targets.n == 0:
+        return 0
+    for chunk, start in enumerate(range(0, num_sources, chunk_size)):
+        rng = _rng(seed, table, chunk + 1)
+        size = min(chunk_size, num_sources - start)
+        degrees = degree_fn(size, rng)
+        srcs = np.repeat(np.arange(start, start + size, dtype=np.int64), degrees)
+        dsts = targets.sample(len(srcs), rng)
+        if no_self_loops:
+            keep = srcs != dsts
+            srcs, dsts = srcs[keep], dsts[keep]
+        keys = sorted_unique((srcs << 32) | dsts)
+        writer.write(np.stack([keys >> 32, keys & 0xFFFFFFFF], axis=1))
+        if time_writer is not None:
+            # Se sortea después de las aristas: no cambia los archivos de una semilla
+            time_writer.write(rng.integers(period[0], max(period[1], period[0] + 1), len(keys)))
+    return writer.rows
+
+
+def generate_dataset(path, num_persons: int = 100_000, num_companies: Optional[int] = None,
+                     num_posts: Optional[int] = None, avg_follows: float = 20.0,
+                     avg_reactions: float = 8.0, like_rate: float = 0.85,
+                     company_post_share: float = 0.1, repost_rate: float = 0.1,
+                     num_hashtags: int = 1000, hashtag_exponent: float = 1.1,
+                     degree_exponent: float = 2.3, seed: int = 42,
+                     chunk_size: int = CHUNK_SIZE, start_time: int = START_TIME,
+                     days: float = DAYS, verbose: bool = False) -> Dict:
+    """
+    Genera un dataset sintético reproducible (misma semilla -> mismos archivos)
+
+    - avg_follows: seguimientos persona->persona promedio (grados Pareto)
+    - avg_reactions: reacciones promedio por publicación (popularidad Pareto)
+    - like_rate: proporción media de likes; cada post tiene su propia tasa Beta
+    - num_hashtags / hashtag_exponent: vocabulario y exponente Zipf de hashtags
+    - start_time / days: período de las marcas de tiempo (segundos Unix)
+    Returns: resumen con conteos y tiempo
+    """
+    started = time.perf_counter()
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    num_companies = max(1, num_persons // 100) if num_companies is None else num_companies
+    num_posts = 2 * num_persons if num_posts is None else num_posts
+    in_exponent = 1.0 / (degree_exponent - 1)
+    end_time = start_time + int(days * 86400)
+
+    def log(message):
+        if verbose:
+            print(f"[{time.perf_counter() - started:7.1f}s] {message}")
+
+    # --- Entidades ---------------------------------------------------------
+    for filename, prefix, count in (("persons.txt", "persona", num_persons),
+                                    ("companies.txt", "empresa", num_companies)):
+        with open(path / filename, 'w', encoding='utf-8') as f:
+            for start in range(0, count, chunk_size):
+                end = min(count, start + chunk_size)
+                f.write("".join(f"{prefix}_{i}\n" for i in range(start, end)))
+
+    pop_rng = _rng(seed, "popularity")
+    person_pop = PowerLawSampler(num_persons, in_exponent, pop_rng)      # a quién se sigue
+    activity = PowerLawSampler(num_persons, in_exponent, pop_rng)        # quién publica/reacciona
+    company_pop = PowerLawSampler(num_companies, in_exponent, pop_rng)
+    uniform_persons = PowerLawSampler(num_persons, 0)
+    uniform_companies = PowerLawSampler(num_companies, 0)
+
+    # --- Relaciones --------------------------------------------------------
+    # nombre -> (cantidad de orígenes, muestreador de destinos, grados)
+    specs = {
+        "person_follows_person": (num_persons, person_pop,
+                                  lambda size, rng: pareto_degrees(size, avg_follows, degree_exponent,
+                                                                   num_persons - 1, rng)),
+        "person_blocks_person": (num_persons, uniform_persons, poisson_degrees(0.02 * avg_follows)),
+        "person_follows_company": (num_persons, company_pop, poisson_degrees(2.0)),
+        "person_is_client": (num_persons, company_pop, poisson_degrees(0.3)),
+        "person_works_at": (num_persons, company_pop, poisson_degrees(0.3)),
+        "person_blocked_by_company": (num_persons, uniform_companies, poisson_degrees(0.002)),
+        "company_follows_company": (num_companies, company_pop, poisson_degrees(5.0)),
+        "company_recommends_company": (num_companies, company_pop, poisson_degrees(2.0)),
+        "company_blocks_company": (num_companies, uniform_companies, poisson_degrees(0.05)),
+        "company_blocks_person": (num_companies, uniform_persons, poisson_degrees(2.0)),
+    }
+    relation_counts = {}
+    for name, (num_sources, targets, degree_fn) in specs.items():
+        src_type, dst_type = RELATIONS[name]
+        with TableWriter(path / f"{name}.npy", 2) as writer:
+            time_writer = (TableWriter(path / f"{name}_times.npy", None, '<i8')
+                           if name in TIMED_RELATIONS else None)
+            relation_counts[name] = _write_edges(writer, num_sources, targets, degree_fn, seed,
+                                                 name, chunk_size, no_self_loops=src_type == dst_type,
+                                                 time_writer=time_writer,
+                                                 period=(start_time, end_time))
+            if time_writer is not None:
+                time_writer.close()
+        log(f"{name}: {relation_counts[name]} aristas")
+
+    # --- Publicaciones -----------------------------------------------------
+    # Zipf exacto sobre el vocabulario (pocos hashtags: inversión por búsqueda binaria)
+    tag_cdf = np.cumsum(np.arange(1, num_hashtags + 1, dtype=np.float64) ** -hashtag_exponent)
+    tag_cdf /= tag_cdf[-1]
+    tag_names = BASE_HASHTAGS[:num_hashtags] + [f"#tag{i}" for i in range(len(BASE_HASHTAGS), num_hashtags)]
+    post_tag = np.zeros(num_posts, dtype=np.int32)
+    post_root = np.zeros(num_posts, dtype=np.int64)
+    # Posts en orden de id a lo largo del período (las reacciones las necesitan)
+    post_time = np.zeros(num_posts, dtype=np.int64)
+    seconds_per_post = (end_time - start_time) / max(num_posts, 1)
+
+    with TableWriter(path / "posts.npy", POST_COLUMNS) as writer, \
+            TableWriter(path / f"{TIME_FILES['posts']}.npy", None, '<i8') as time_writer, \
+            open(path / "post_texts.txt", 'w', encoding='utf-8') as texts, \
+            open(path / "post_hashtags.txt", 'w', encoding='utf-8') as hashtags:
+        for chunk, start in enumerate(range(0, num_posts, chunk_size)):
+            rng = _rng(seed, "posts", chunk)
+            ids = np.arange(start, min(num_posts, start + chunk_size), dtype=np.int64)
+            size = len(ids)
+
+            author_types = (rng.random(size) < company_post_share).astype(np.int64)
+            if num_companies == 0:
+                author_types[:] = PERSON
+            authors = np.where(author_types == COMPANY,
+                               company_pop.sample(size, rng) if num_companies else 0,
+                               activity.sample(size, rng))
+
+            # Republicaciones: apuntan a un post anterior, sesgado a los más antiguos
+            originals = np.where(rng.random(size) < repost_rate,
+                                 np.floor(ids * rng.random(size) ** 3).astype(np.int64), -1)
+            originals[ids == 0] = -1
+            post_tag[ids] = np.minimum(np.searchsorted(tag_cdf, rng.random(size), side='right'),
+                                       num_hashtags - 1)
+            post_root[ids] = np.where(originals < 0, ids, originals)
+            # Pointer jumping hasta la raíz de cada cascada
+            while True:
+                parents = post_root[post_root[ids]]
+                if np.array_equal(parents, post_root[ids]):
+                    break
+                post_root[ids] = parents
+            post_tag[ids] = post_tag[post_root[ids]]
+
+            writer.write(np.stack([authors, author_types, originals], axis=1))
+            roots, tags = post_root[ids].tolist(), post_tag[ids].tolist()
+            texts.write("".join(f"{PHRASES[r % len(PHRASES)]} {r} {tag_names[t]}\n"
+                                for r, t in zip(roots, tags)))
+            hashtags.write("".join(f"{tag_names[t]}\n" for t in tags))
+            post_time[ids] = start_time + np.floor((ids + rng.random(size)) * seconds_per_post)
+            time_writer.write(post_time[ids])
+    log(f"posts: {num_posts}")
+
+    # --- Interacciones -----------------------------------------------------
+    like_a = 8.0
+    like_b = like_a * (1 - like_rate) / like_rate
+    with TableWriter(path / "interactions.npy", INTER_COLUMNS) as writer, \
+            TableWriter(path / f"{TIME_FILES['interactions']}.npy", None, '<i8') as time_writer:
+        for chunk, start in enumerate(range(0, num_posts, chunk_size)):
+            rng = _rng(seed, "interactions", chunk)
+            size = min(chunk_size, num_posts - start)
+            counts = pareto_degrees(size, avg_reactions, degree_exponent, num_persons, rng)
+            post_ids = np.repeat(np.arange(start, start + size, dtype=np.int64), counts)
+            n = len(post_ids)
+            user_types = (rng.random(n) < 0.03).astype(np.int64) if num_companies else np.zeros(n, np.int64)
+            users = np.where(user_types == COMPANY,
+                             company_pop.sample(n, rng) if num_companies else 0,
+                             activity.sample(n, rng))
+            post_like_rate = rng.beta(like_a, like_b, size)
+            values = np.where(rng.random(n) < post_like_rate[post_ids - start], LIKE, DISLIKE)
+
+            # El valor se codifica en los bits bajos para conservar una fila por par usuario-post
+            keys = sorted_unique((((post_ids << 32) | users) << 1 | user_types) << 2 | values)
+            pairs = keys >> 2
+            keys = keys[np.concatenate([[True], pairs[1:] != pairs[:-1]])] if len(keys) else keys
+            writer.write(np.stack([(keys >> 2) & 1, (keys >> 3) & 0xFFFFFFFF, keys >> 35, keys & 3], axis=1))
+            delays = rng.exponential(REACTION_DELAY, len(keys)).astype(np.int64)
+            time_writer.write(np.minimum(post_time[keys >> 35] + delays, end_time))
+        num_interactions = writer.rows
+    log(f"interactions: {num_interactions}")
+
+    write_metadata(path, num_persons, num_companies, num_posts, num_interactions, relation_counts)
+    return {
+        "personas": num_persons,
+        "empresas": num_companies,
+        "publicaciones": num_posts,
+        "aristas": sum(relation_counts.values()),
+        "interacciones": num_interactions,
+        "segundos": round(time.perf_counter() - started, 2),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Generador sintético de redes sociales")
+    parser.add_argument("path", help="Directorio de salida del dataset")
+    parser.add_argument("--persons", type=int, default=100_000)
+    parser.add_argument("--companies", type=int, default=None)
+    parser.add_argument("--posts", type=int, default=None)
+    parser.add_argument("--avg-follows", type=float, default=20.0)
+    parser.add_argument("--avg-reactions", type=float, default=8.0)
+    parser.add_argument("--like-rate", type=float, default=0.85)
+    parser.add_argument("--hashtags", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--start-time", type=int, default=START_TIME,
+                        help="Inicio de las marcas de tiempo (segundos Unix)")
+    parser.add_argument("--days", type=float, default=DAYS, help="Días cubiertos por el dataset")
+    args = parser.parse_args()
+
+    summary = generate_dataset(args.path, args.persons, args.companies, args.posts,
+                               avg_follows=args.avg_follows, avg_reactions=args.avg_reactions,
+                               like_rate=args.like_rate, num_hashtags=args.hashtags,
+                               seed=args.seed, chunk_size=args.chunk_size,
+                               start_time=args.start_time, days=args.days, verbose=True)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
@@ -0,0 +1,848 @@
+"""
+Almacén incremental de la red social
+Aplica eventos (seguir, bloquear, cliente, recomendación, publicación,
+reacción) actualizando contadores, top-K e índices de bloqueo en
+O(1)-O(log n) por evento, sin recalcular las queries desde cero
+
+Publicaciones, reacciones y seguimientos guardan su marca de tiempo (por
+defecto, la hora del evento); las queries con ventana [desde, hasta) se
+responden con el motor NumPy sobre una instantánea
+"""
+
+import heapq
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from social_dataset import (
+    SocialDataset, RELATIONS, TIMED_RELATIONS, PERSON, COMPANY, NONE, LIKE, DISLIKE,
+    POST_AUTHOR_ID, POST_AUTHOR_TYPE, POST_ORIGINAL_ID,
+    INTER_USER_TYPE, INTER_USER_ID, INTER_POST_ID, INTER_VALUE,
+)
+from string_pool import InternedStrings, StringPool, as_interned, as_pool
+from numpy_engine import (SEARCH_LIMIT, TOP_CASCADES, TOP_HASHTAGS, TOP_K, TREND_WINDOW,
+                          format_hashtags, format_output)
+from time_index import Window, format_time
+
+# Relación según (tipo origen, tipo destino) para cada tipo de evento
+FOLLOW_RELATIONS = {
+    (PERSON, PERSON): "person_follows_person",
+    (PERSON, COMPANY): "person_follows_company",
+    (COMPANY, COMPANY): "company_follows_company",
+}
+BLOCK_RELATIONS = {
+    (PERSON, PERSON): "person_blocks_person",
+    (COMPANY, PERSON): "company_blocks_person",
+    (COMPANY, COMPANY): "company_blocks_company",
+}
+
+# Relaciones cuyo destino acumula seguidores
+FOLLOWER_COUNTERS = {
+    "person_follows_person": PERSON,
+    "person_follows_company": COMPANY,
+    "company_follows_company": COMPANY,
+}
+
+# Índices de bloqueo: relación -> tipo del usuario que bloquea
+BLOCK_INDEXES = {
+    "person_blocks_person": PERSON,
+    "company_blocks_person": COMPANY,
+}
+
+
+def edge_key(src: int, dst: int) -> int:
+    """Codifica una arista como un entero (src en los 32 bits altos)"""
+    return (int(src) << 32) | int(dst)
+
+
+def split_key(key: int) -> Tuple[int, int]:
+    return key >> 32, key & 0xFFFFFFFF
+
+
+def _timestamp(value: Optional[int]) -> int:
+    """Marca de un evento: la indicada o la hora actual (segundos Unix)"""
+    return int(time.time()) if value is None else int(value)
+
+
+class GrowableCounts:
+    """Array de contadores int64 con crecimiento amortizado (duplicando capacidad)"""
+
+    def __init__(self, size: int = 0):
+        self._data = np.zeros(max(size, 16), dtype=np.int64)
+        self.size = size
+
+    def ensure(self, size: int):
+        if size > len(self._data):
+            data = np.zeros(max(size, 2 * len(self._data)), dtype=np.int64)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self.size = max(self.size, size)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._data[:self.size]
+
+    def __getitem__(self, idx):
+        return self._data[:self.size][idx]
+
+    def add(self, idx: int, delta: int = 1):
+        self._data[idx] += delta
+
+    def add_many(self, idx: np.ndarray, delta):
+        np.add.at(self._data, idx, delta)
+
+
+class SocialGraphStore:
+    """
+    Red social mutable con resultados siempre al día
+
+    Los métodos add_*/remove_* aplican un evento; get_parsed_data() y las
+    queries leen las estructuras mantenidas sin recorrer el dataset
+    """
+
+    def __init__(self):
+        self.version = 0  # Se incrementa con cada evento aplicado
+
+        # Columnas de cadenas compactas (string_pool); append amortizado
+        self.person_names = StringPool()
+        self.company_names = StringPool()
+
+        self.post_texts = StringPool()
+        self.post_hashtags = InternedStrings(StringPool(), np.zeros(0, dtype=np.int32))
+        self.post_authors: List[Tuple[int, int]] = []  # (tipo, id)
+        self.post_original: List[int] = []
+        self.post_deleted: List[bool] = []
+        self.post_times: List[int] = []
+        self.live_posts = 0
+
+        self.edges: Dict[str, Set[int]] = {name: set() for name in RELATIONS}
+        self.blocks: Dict[str, Dict[int, Set[int]]] = {name: {} for name in BLOCK_INDEXES}
+
+        self.followers = {PERSON: GrowableCounts(), COMPANY: GrowableCounts()}
+        self.recommendations = GrowableCounts()
+        self.likes = GrowableCounts()
+        self.dislikes = GrowableCounts()
+
+        # (tipo, usuario, post) -> LIKE/DISLIKE y marca de la última reacción
+        self.reactions: Dict[Tuple[int, int, int], int] = {}
+        self.reaction_times: Dict[Tuple[int, int, int], int] = {}
+        # Seguimientos: relación -> clave de arista -> marca
+        self.edge_times: Dict[str, Dict[int, int]] = {name: {} for name in TIMED_RELATIONS}
+        self._post_reactors: Dict[int, Set[Tuple[int, int]]] = {}
+        # (persona, empresa) -> likes de la persona a posts de la empresa
+        self.company_likes: Dict[Tuple[int, int], int] = {}
+
+        self.hashtag_counts: Dict[str, int] = {}
+        self._hashtag_posts: Dict[str, List[int]] = {}  # heap de ids (primera aparición)
+
+        # Heaps perezosos para top-K: (-likes, id) y (likes, -id)
+        self._top_heap: List[Tuple[int, int]] = []
+        self._bottom_heap: List[Tuple[int, int]] = []
+
+        # (version, CommunityAnalysis) del último snapshot analizado
+        self._communities = None
+        # Índice de texto, cascadas y analítica de hashtags: se arman en la
+        # primera consulta y después se actualizan por evento
+        self._text_index = None
+        self._cascades = None
+        self._hashtag_analytics = None
+        # exclude_blocked -> (version, PathFinder)
+        self._path_finders: Dict[bool, Tuple[int, object]] = {}
+        # (version, NumpySocialNetwork) para las queries con ventana de tiempo
+        self._snapshot = None
+
+    # ========================================================================
+    # CARGA INICIAL
+    # ========================================================================
+
+    @classmethod
+    def from_dataset(cls, dataset: SocialDataset) -> "SocialGraphStore":
+        """Construye el almacén a partir de un dataset completo (carga vectorizada)"""
+        store = cls()
+        store.person_names = as_pool(dataset.person_names).copy()
+        store.company_names = as_pool(dataset.company_names).copy()
+        num_persons, num_companies, num_posts = dataset.num_persons, dataset.num_companies, dataset.num_posts
+        store.followers[PERSON].ensure(num_persons)
+        store.followers[COMPANY].ensure(num_companies)
+        store.recommendations.ensure(num_companies)
+
+        posts = np.asarray(dataset.posts)
+        store.post_texts = as_pool(dataset.post_texts).copy()
+        store.post_hashtags = as_interned(dataset.post_hashtags).copy()
+        store.post_authors = list(zip(posts[:, POST_AUTHOR_TYPE].tolist(), posts[:, POST_AUTHOR_ID].tolist()))
+        store.post_original = posts[:, POST_ORIGINAL_ID].tolist()
+        store.post_deleted = [False] * num_posts
+        # Sin marcas en el dataset, los eventos cargados quedan en el instante 0
+        store.post_times = (np.asarray(dataset.post_times).tolist() if dataset.post_times is not None
+                            else [0] * num_posts)
+        store.live_posts = num_posts
+        # Posts de cada hashtag agrupados por id (orden estable: cada lista ya es un heap)
+        tags = store.post_hashtags
+        counts = tags.counts()
+        by_tag = np.split(np.argsort(tags.codes, kind="stable"), np.cumsum(counts)[:-1])
+        for code in np.argsort(tags.first_rows(), kind="stable").tolist():
+            tag = tags.values[code]
+            if tag and counts[code]:
+                store.hashtag_counts[tag] = int(counts[code])
+                store._hashtag_posts[tag] = by_tag[code].tolist()
+
+        for name, edges in dataset.relations.items():
+            edges = np.asarray(edges, dtype=np.int64)
+            store.edges[name] = set(((edges[:, 0] << 32) | edges[:, 1]).tolist())
+            if name in store.edge_times:
+                times = dataset.times(name)
+                store.edge_times[name] = dict(zip(
+                    ((edges[:, 0] << 32) | edges[:, 1]).tolist(),
+                    np.asarray(times).tolist() if times is not None else [0] * len(edges)))
+            if name in FOLLOWER_COUNTERS:
+                store.followers[FOLLOWER_COUNTERS[name]].add_many(edges[:, 1], 1)
+            elif name in BLOCK_INDEXES:
+                for src, dst in edges.tolist():
+                    store.blocks[name].setdefault(src, set()).add(dst)
+            elif name == "company_recommends_company":
+                store.recommendations.add_many(edges[:, 1], 1)
+
+        inter = np.asarray(dataset.interactions)
+        store.reactions = dict(zip(map(tuple, inter[:, :INTER_VALUE].tolist()),
+                                   inter[:, INTER_VALUE].tolist()))
+        store.reaction_times = dict(zip(
+            store.reactions, np.asarray(dataset.interaction_times).tolist()
+            if dataset.interaction_times is not None else [0] * len(inter)))
+        for user_type, user, post in store.reactions:
+            store._post_reactors.setdefault(post, set()).add((user_type, user))
+        store.likes.ensure(num_posts)
+        store.dislikes.ensure(num_posts)
+        values, post_ids = inter[:, INTER_VALUE], inter[:, INTER_POST_ID]
+        store.likes.add_many(post_ids[values == LIKE], 1)
+        store.dislikes.add_many(post_ids[values == DISLIKE], 1)
+
+        # Likes de personas a publicaciones de empresas (mejores clientes)
+        liked = inter[(values == LIKE) & (inter[:, INTER_USER_TYPE] == PERSON)]
+        liked_posts = posts[liked[:, INTER_POST_ID]]
+        liked = liked[liked_posts[:, POST_AUTHOR_TYPE] == COMPANY]
+        authors = liked_posts[liked_posts[:, POST_AUTHOR_TYPE] == COMPANY, POST_AUTHOR_ID]
+        pairs, counts = np.unique(np.stack([liked[:, INTER_USER_ID], authors], axis=1),
+                                  axis=0, return_counts=True)
+        store.company_likes = dict(zip(map(tuple, pairs.tolist()), counts.tolist()))
+
+        store._rebuild_heaps()
+        return store
+
+    def to_dataset(self) -> SocialDataset:
+        """
+        Instantánea del estado actual con sus marcas de tiempo (posts eliminados
+        quedan sin texto ni reacciones)
+        """
+        ordered = {name: sorted(keys) for name, keys in self.edges.items()}
+        relations = {
+            name: np.array([split_key(k) for k in keys], dtype=np.int32).reshape(-1, 2)
+            for name, keys in ordered.items()
+        }
+        reactions = sorted(self.reactions, key=lambda key: key[::-1])
+        interactions = [key + (self.reactions[key],) for key in reactions]
+        return SocialDataset(
+            person_names=self.person_names.copy(),
+            company_names=self.company_names.copy(),
+            post_texts=self.post_texts.blank(self.post_deleted),
+            post_hashtags=self.post_hashtags.blank(self.post_deleted),
+            posts=self._post_rows(),
+            relations=relations,
+            interactions=np.array(interactions, dtype=np.int32).reshape(-1, 4),
+            post_times=np.array(self.post_times, dtype=np.int64),
+            interaction_times=np.array([self.reaction_times[key] for key in reactions],
+                                       dtype=np.int64),
+            relation_times={name: np.array([times[k] for k in ordered[name]], dtype=np.int64)
+                            for name, times in self.edge_times.items()},
+        )
+
+    def _post_rows(self) -> np.ndarray:
+        """Tabla Posts (autor, tipo, original) del estado actual"""
+        posts = [(author, author_type, original)
+                 for (author_type, author), original in zip(self.post_authors, self.post_original)]
+        return np.array(posts, dtype=np.int32).reshape(-1, 3)
+
+    # ========================================================================
+    # EVENTOS
+    # ========================================================================
+
+    def add_person(self, name: str) -> int:
+        self.person_names.append(name)
+        self.followers[PERSON].ensure(len(self.person_names))
+        self.version += 1
+        return len(self.person_names) - 1
+
+    def add_company(self, name: str) -> int:
+        self.company_names.append(name)
+        self.followers[COMPANY].ensure(len(self.company_names))
+        self.recommendations.ensure(len(self.company_names))
+        self.version += 1
+        return len(self.company_names) - 1
+
+    def _check_user(self, user_type: int, user: int):
+        count = len(self.person_names) if user_type == PERSON else len(self.company_names)
+        if not 0 <= user < count:
+            raise IndexError(f"Usuario {user} (tipo {user_type}) no existe")
+
+    def _check_post(self, post: int):
+        if not 0 <= post < len(self.post_texts) or self.post_deleted[post]:
+            raise IndexError(f"Publicación {post} no existe")
+
+    def _add_edge(self, name: str, src: int, dst: int, timestamp: Optional[int] = None) -> bool:
+        """Inserta una arista; retorna False si ya existía"""
+        src_type, dst_type = RELATIONS[name]
+        self._check_user(src_type, src)
+        self._check_user(dst_type, dst)
+        key = edge_key(src, dst)
+        if key in self.edges[name]:
+            return False
+        self.edges[name].add(key)
+        if name in self.edge_times:
+            self.edge_times[name][key] = _timestamp(timestamp)
+
+        if name in FOLLOWER_COUNTERS:
+            self.followers[FOLLOWER_COUNTERS[name]].add(dst)
+        elif name in BLOCK_INDEXES:
+            self.blocks[name].setdefault(src, set()).add(dst)
+        elif name == "company_recommends_company":
+            self.recommendations.add(dst)
+        self.version += 1
+        return True
+
+    def _remove_edge(self, name: str, src: int, dst: int) -> bool:
+        """Elimina una arista; retorna False si no existía"""
+        key = edge_key(src, dst)
+        if key not in self.edges[name]:
+            return False
+        self.edges[name].discard(key)
+        if name in self.edge_times:
+            del self.edge_times[name][key]
+
+        if name in FOLLOWER_COUNTERS:
+            self.followers[FOLLOWER_COUNTERS[name]].add(dst, -1)
+        elif name in BLOCK_INDEXES:
+            blocked = self.blocks[name][src]
+            blocked.discard(dst)
+            if not blocked:
+                del self.blocks[name][src]
+        elif name == "company_recommends_company":
+            self.recommendations.add(dst, -1)
+        self.version += 1
+        return True
+
+    @staticmethod
+    def _relation(table: Dict, src_type: int, dst_type: int) -> str:
+        try:
+            return table[(src_type, dst_type)]
+        except KeyError:
+            raise ValueError(f"Relación no soportada entre tipos {src_type} -> {dst_type}")
+
+    def add_follow(self, src_type: int, src: int, dst_type: int, dst: int,
+                   timestamp: Optional[int] = None) -> bool:
+        return self._add_edge(self._relation(FOLLOW_RELATIONS, src_type, dst_type), src, dst,
+                              timestamp)
+
+    def remove_follow(self, src_type: int, src: int, dst_type: int, dst: int) -> bool:
+        return self._remove_edge(self._relation(FOLLOW_RELATIONS, src_type, dst_type), src, dst)
+
+    def add_block(self, src_type: int, src: int, dst_type: int, dst: int) -> bool:
+        return self._add_edge(self._relation(BLOCK_RELATIONS, src_type, dst_type), src, dst)
+
+    def remove_block(self, src_type: int, src: int, dst_type: int, dst: int) -> bool:
+        return self._remove_edge(self._relation(BLOCK_RELATIONS, src_type, dst_type), src, dst)
+
+    def add_client(self, person: int, company: int) -> bool:
+        return self._add_edge("person_is_client", person, company)
+
+    def remove_client(self, person: int, company: int) -> bool:
+        return self._remove_edge("person_is_client", person, company)
+
+    def add_recommendation(self, company: int, recommended: int) -> bool:
+        return self._add_edge("company_recommends_company", company, recommended)
+
+    def remove_recommendation(self, company: int, recommended: int) -> bool:
+        return self._remove_edge("company_recommends_company", company, recommended)
+
+    def add_post(self, author_type: int, author: int, text: str,
+                 hashtag: str = "", original_post_id: int = -1,
+                 timestamp: Optional[int] = None) -> int:
+        """Publica un post y retorna su id"""
+        self._check_user(author_type, author)
+        post = len(self.post_texts)
+        self.post_texts.append(text)
+        self.post_hashtags.append(hashtag)
+        self.post_authors.append((author_type, author))
+        self.post_original.append(original_post_id)
+        self.post_deleted.append(False)
+        self.post_times.append(_timestamp(timestamp))
+        self.live_posts += 1
+
+        self.likes.ensure(post + 1)
+        self.dislikes.ensure(post + 1)
+        if hashtag:
+            self.hashtag_counts[hashtag] = self.hashtag_counts.get(hashtag, 0) + 1
+            heapq.heappush(self._hashtag_posts.setdefault(hashtag, []), post)
+        heapq.heappush(self._top_heap, (0, post))
+        heapq.heappush(self._bottom_heap, (0, -post))
+        if self._text_index is not None:
+            self._text_index.add([post], [text])
+        if self._cascades is not None:
+            self._cascades.add_post(original_post_id)
+        if self._hashtag_analytics is not None:
+            self._hashtag_analytics.add_post(text, hashtag, author_type, author)
+        self.version += 1
+        return post
+
+    def remove_post(self, post: int) -> bool:
+        """Elimina un post (queda como lápida) junto con sus reacciones"""
+        if not 0 <= post < len(self.post_texts) or self.post_deleted[post]:
+            return False
+        for user_type, user in list(self._post_reactors.get(post, ())):
+            self.set_reaction(user_type, user, post, NONE)
+        self.post_deleted[post] = True
+        self.live_posts -= 1
+
+        hashtag = self.post_hashtags[post]
+        if hashtag:
+            self.hashtag_counts[hashtag] -= 1
+            if self.hashtag_counts[hashtag] == 0:
+                del self.hashtag_counts[hashtag]
+                del self._hashtag_posts[hashtag]
+        if self._text_index is not None:
+            self._text_index.remove(post)
+        if self._hashtag_analytics is not None:
+            self._hashtag_analytics.remove_post(post)
+        self.version += 1
+        return True
+
+    def set_reaction(self, user_type: int, user: int, post: int, value: int,
+                     timestamp: Optional[int] = None) -> int:
+        """
+        Fija la reacción de un usuario a un post (NONE la elimina)
+        Returns: reacción anterior
+        """
+        self._check_user(user_type, user)
+        self._check_post(post)
+        key = (user_type, user, post)
+        previous = self.reactions.get(key, NONE)
+        if previous == value:
+            return previous
+
+        if value == NONE:
+            del self.reactions[key]
+            del self.reaction_times[key]
+            reactors = self._post_reactors[post]
+            reactors.discard((user_type, user))
+            if not reactors:
+                del self._post_reactors[post]
+        else:
+            self.reactions[key] = value
+            self.reaction_times[key] = _timestamp(timestamp)
+            self._post_reactors.setdefault(post, set()).add((user_type, user))
+
+        likes_delta = (value == LIKE) - (previous == LIKE)
+        dislikes_delta = (value == DISLIKE) - (previous == DISLIKE)
+        if dislikes_delta:
+            self.dislikes.add(post, dislikes_delta)
+        if likes_delta:
+            self._update_likes(user_type, user, post, likes_delta)
+        self._reactions_changed(np.array([post]), np.array([likes_delta]),
+                                np.array([dislikes_delta]))
+        self.version += 1
+        return previous
+
+    def add_reaction(self, user_type: int, user: int, post: int, value: int = LIKE,
+                     timestamp: Optional[int] = None) -> int:
+        return self.set_reaction(user_type, user, post, value, timestamp)
+
+    def remove_reaction(self, user_type: int, user: int, post: int) -> int:
+        return self.set_reaction(user_type, user, post, NONE)
+
+    def _update_likes(self, user_type: int, user: int, post: int, delta: int):
+        self.likes.add(post, delta)
+        likes = int(self.likes[post])
+        heapq.heappush(self._top_heap, (-likes, post))
+        heapq.heappush(self._bottom_heap, (likes, -post))
+
+        author_type, author = self.post_authors[post]
+        if user_type == PERSON and author_type == COMPANY:
+            pair = (user, author)
+            self.company_likes[pair] = self.company_likes.get(pair, 0) + delta
+            if self.company_likes[pair] == 0:
+                del self.company_likes[pair]
+
+        # Compactar los heaps cuando acumulan demasiadas entradas obsoletas
+        if len(self._top_heap) > 4 * self.live_posts + 64:
+            self._rebuild_heaps()
+
+    def _reactions_changed(self, posts: np.ndarray, likes_delta: np.ndarray,
+                           dislikes_delta: np.ndarray):
+        """Propaga cambios de reacciones a las estructuras derivadas ya armadas"""
+        if self._cascades is not None:
+            self._cascades.add_reactions(posts, likes_delta, dislikes_delta)
+        if self._hashtag_analytics is not None:
+            self._hashtag_analytics.add_reactions(posts, likes_delta, dislikes_delta)
+
+    def _rebuild_heaps(self):
+        live = [p for p, deleted in enumerate(self.post_deleted) if not deleted]
+        likes = self.likes.values
+        self._top_heap = [(-int(likes[p]), p) for p in live]
+        self._bottom_heap = [(int(likes[p]), -p) for p in live]
+        heapq.heapify(self._top_heap)
+        heapq.heapify(self._bottom_heap)
+
+    # ========================================================================
+    # LOTES VECTORIZADOS
+    # ========================================================================
+
+    def _valid_users(self, user_types: np.ndarray, users: np.ndarray) -> np.ndarray:
+        limits = np.where(user_types == PERSON, len(self.person_names), len(self.company_names))
+        return (users >= 0) & (users < limits) & ((user_types == PERSON) | (user_types == COMPANY))
+
+    def apply_edges(self, name: str, srcs, dsts, remove: bool = False,
+                    timestamps=None) -> Tuple[int, int]:
+        """
+        Inserta (o elimina) un lote de aristas de una relación
+        Equivale a aplicar _add_edge/_remove_edge en orden; los contadores
+        se actualizan con una sola operación vectorizada
+        timestamps: marca de cada evento (por defecto, la hora actual)
+        Returns: (aristas que cambiaron, eventos rechazados por ids inválidos)
+        """
+        srcs, dsts = np.asarray(srcs, dtype=np.int64), np.asarray(dsts, dtype=np.int64)
+        times = (np.full(len(srcs), _timestamp(None), dtype=np.int64) if timestamps is None
+                 else np.asarray(timestamps, dtype=np.int64))
+        src_type, dst_type = RELATIONS[name]
+        valid = (self._valid_users(np.full(len(srcs), src_type), srcs)
+                 & self._valid_users(np.full(len(dsts), dst_type), dsts))
+        rejected = int((~valid).sum())
+
+        # Primera aparición de cada arista: su marca es la del primer evento que la crea
+        keys, first = np.unique((srcs[valid] << 32) | dsts[valid], return_index=True)
+        edges = self.edges[name]
+        edge_times = self.edge_times.get(name)
+        if remove:
+            changed = np.array([k for k in keys.tolist() if k in edges], dtype=np.int64)
+            edges.difference_update(changed.tolist())
+            if edge_times is not None:
+                for key in changed.tolist():
+                    del edge_times[key]
+            delta = -1
+        else:
+            new = np.array([k not in edges for k in keys.tolist()], dtype=bool)
+            changed = keys[new]
+            edges.update(changed.tolist())
+            if edge_times is not None:
+                edge_times.update(zip(changed.tolist(), times[valid][first[new]].tolist()))
+            delta = 1
+
+        targets = changed & 0xFFFFFFFF
+        if name in FOLLOWER_COUNTERS:
+            self.followers[FOLLOWER_COUNTERS[name]].add_many(targets, delta)
+        elif name == "company_recommends_company":
+            self.recommendations.add_many(targets, delta)
+        elif name in BLOCK_INDEXES:
+            index = self.blocks[name]
+            for src, dst in map(split_key, changed.tolist()):
+                if remove:
+                    index[src].discard(dst)
+                    if not index[src]:
+                        del index[src]
+                else:
+                    index.setdefault(src, set()).add(dst)
+
+        self.version += len(changed)
+        return len(changed), rejected
+
+    def apply_reactions(self, user_types, users, posts, values,
+                        timestamps=None) -> Tuple[int, int]:
+        """
+        Aplica un lote de reacciones (para cada par usuario-post gana la última)
+        Los totales de likes/dislikes se actualizan con np.add.at
+        timestamps: marca de cada evento (por defecto, la hora actual)
+        Returns: (reacciones que cambiaron, eventos rechazados por ids inválidos)
+        """
+        user_types = np.asarray(user_types, dtype=np.int64)
+        users = np.asarray(users, dtype=np.int64)
+        posts = np.asarray(posts, dtype=np.int64)
+        values = np.asarray(values, dtype=np.int64)
+        times = (np.full(len(posts), _timestamp(None), dtype=np.int64) if timestamps is None
+                 else np.asarray(timestamps, dtype=np.int64))
+
+        valid = (self._valid_users(user_types, users) & (posts >= 0) & (posts < len(self.post_texts))
+                 & (values >= NONE) & (values <= DISLIKE))
+        valid[valid] = [not self.post_deleted[p] for p in posts[valid].tolist()]
+        rejected = int((~valid).sum())
+        user_types, users, posts, values = user_types[valid], users[valid], posts[valid], values[valid]
+        times = times[valid]
+
+        # Última reacción de cada par (orden inverso + primera aparición)
+        keys = (posts << 33) | (users << 1) | user_types
+        _, last = np.unique(keys[::-1], return_index=True)
+        last = len(keys) - 1 - last
+        user_types, users, posts, values = user_types[last], users[last], posts[last], values[last]
+        times = times[last]
+
+        previous = np.array([self.reactions.get(k, NONE) for k in
+                             zip(user_types.tolist(), users.tolist(), posts.tolist())], dtype=np.int64)
+        changed = previous != values
+        user_types, users, posts = user_types[changed], users[changed], posts[changed]
+        values, previous, times = values[changed], previous[changed], times[changed]
+
+        for key, value, moment in zip(zip(user_types.tolist(), users.tolist(), posts.tolist()),
+                                      values.tolist(), times.tolist()):
+            reactor = key[:2]
+            if value == NONE:
+                del self.reactions[key]
+                del self.reaction_times[key]
+                reactors = self._post_reactors[key[2]]
+                reactors.discard(reactor)
+                if not reactors:
+                    del self._post_reactors[key[2]]
+            else:
+                self.reactions[key] = value
+                self.reaction_times[key] = moment
+                self._post_reactors.setdefault(key[2], set()).add(reactor)
+
+        likes_delta = (values == LIKE).astype(np.int64) - (previous == LIKE)
+        dislikes_delta = (values == DISLIKE).astype(np.int64) - (previous == DISLIKE)
+        self.likes.add_many(posts, likes_delta)
+        self.dislikes.add_many(posts, dislikes_delta)
+        self._reactions_changed(posts, likes_delta, dislikes_delta)
+
+        touched = np.unique(posts[likes_delta != 0])
+        for post, likes in zip(touched.tolist(), self.likes[touched].tolist()):
+            heapq.heappush(self._top_heap, (-likes, post))
+            heapq.heappush(self._bottom_heap, (likes, -post))
+
+        for user_type, user, post, delta in zip(user_types.tolist(), users.tolist(),
+                                                posts.tolist(), likes_delta.tolist()):
+            author_type, author = self.post_authors[post]
+            if delta and user_type == PERSON and author_type == COMPANY:
+                pair = (user, author)
+                self.company_likes[pair] = self.company_likes.get(pair, 0) + delta
+                if self.company_likes[pair] == 0:
+                    del self.company_likes[pair]
+
+        if len(self._top_heap) > 4 * self.live_posts + 64:
+            self._rebuild_heaps()
+        self.version += len(values)
+        return len(values), rejected
+
+    # ========================================================================
+    # QUERIES
+    # ========================================================================
+
+    def _heap_top(self, heap: List[Tuple[int, int]], k: int, largest: bool) -> List[int]:
+        """Extrae los k primeros posts válidos de un heap perezoso y los reinserta"""
+        taken, seen = [], set()
+        while heap and len(taken) < k:
+            entry = heapq.heappop(heap)
+            post = entry[1] if largest else -entry[1]
+            likes = -entry[0] if largest else entry[0]
+            if self.post_deleted[post] or post in seen or self.likes[post] != likes:
+                continue
+            seen.add(post)
+            taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [entry[1] if largest else -entry[1] for entry in taken]
+
+    def snapshot_engine(self):
+        """
+        Motor NumPy sobre la instantánea actual (se rearma solo si cambió
+        version); responde las queries con ventana de tiempo
+        """
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            from numpy_engine import NumpySocialNetwork
+
+            self._snapshot = (self.version, NumpySocialNetwork(self.to_dataset()))
+        return self._snapshot[1]
+
+    def latest_time(self) -> Optional[int]:
+        """Marca del evento más reciente cargado"""
+        return self.snapshot_engine().latest_time()
+
+    def query_followers(self, window: Optional[Window] = None) -> Dict[str, List[Dict]]:
+        if window is not None:
+            return self.snapshot_engine().query_followers(window)
+        return {
+            "personas": [{"nombre": n, "seguidores": int(c)}
+                         for n, c in zip(self.person_names, self.followers[PERSON].values)],
+            "empresas": [{"nombre": n, "seguidores": int(c)}
+                         for n, c in zip(self.company_names, self.followers[COMPANY].values)],
+        }
+
+    def query_post_reactions(self, window: Optional[Window] = None) -> List[Dict]:
+        if window is not None:
+            return self.snapshot_engine().query_post_reactions(window)
+        likes, dislikes = self.likes.values.tolist(), self.dislikes.values.tolist()
+        return [{"post_id": p, "likes": likes[p], "dislikes": dislikes[p]}
+                for p, deleted in enumerate(self.post_deleted) if not deleted]
+
+    def query_top_posts(self, k: int = TOP_K, window: Optional[Window] = None) -> Dict[str, List[Dict]]:
+        if window is not None:
+            return self.snapshot_engine().query_top_posts(
+                k, window, exclude=np.array(self.post_deleted, dtype=bool))
+        pick = lambda posts: [{"texto": self.post_texts[p], "likes": int(self.likes[p])} for p in posts]
+        return {
+            "mas_likes": pick(self._heap_top(self._top_heap, k, largest=True)),
+            "menos_likes": pick(self._heap_top(self._bottom_heap, k, largest=False)),
+        }
+
+    def query_hashtags(self, window: Optional[Window] = None) -> Dict:
+        if window is not None:
+            return self.snapshot_engine().query_hashtags(window)
+        counts = {}
+        for tag, count in self.hashtag_counts.items():
+            heap = self._hashtag_posts[tag]
+            while self.post_deleted[heap[0]]:
+                heapq.heappop(heap)
+            counts[tag] = [count, heap[0]]
+        return format_hashtags(counts)
+
+    def hashtag_analytics(self):
+        """Analítica de hashtags de los posts vivos (HashtagAnalytics, se mantiene por evento)"""
+        if self._hashtag_analytics is None:
+            from hashtag_analytics import HashtagAnalytics
+
+            # Solo hacen falta las columnas de posts, sin aristas ni reacciones
+            posts = SocialDataset(post_texts=self.post_texts.blank(self.post_deleted),
+                                  post_hashtags=self.post_hashtags.blank(self.post_deleted),
+                                  posts=self._post_rows())
+            self._hashtag_analytics = HashtagAnalytics.from_dataset(posts, self.likes.values,
+                                                                    self.dislikes.values)
+        return self._hashtag_analytics
+
+    def query_hashtag_analytics(self, k: int = TOP_HASHTAGS, window: int = TREND_WINDOW) -> Dict:
+        return self.hashtag_analytics().summary(k, window)
+
+    def query_blocked_followers(self) -> List[Dict]:
+        result = []
+        for name, names in (("person_blocks_person", self.person_names),
+                            ("company_blocks_person", self.company_names)):
+            index = self.blocks[name]
+            for src in sorted(index):
+                result += [{"usuario": names[src], "bloqueado": self.person_names[dst]}
+                           for dst in sorted(index[src])]
+        return result
+
+    def is_blocked(self, blocker_type: int, blocker: int, person: int) -> bool:
+        """Consulta O(1) del índice de bloqueos"""
+        name = "person_blocks_person" if blocker_type == PERSON else "company_blocks_person"
+        return person in self.blocks[name].get(blocker, ())
+
+    def query_company_recommendations(self) -> List[Dict]:
+        return [{"recomienda": self.company_names[src], "recomendada": self.company_names[dst]}
+                for src, dst in map(split_key, sorted(self.edges["company_recommends_company"]))]
+
+    def query_best_customers(self, window: Optional[Window] = None) -> Dict[str, List[Dict]]:
+        if window is not None:
+            return self.snapshot_engine().query_best_customers(window)
+        result = {name: [] for name in self.company_names}
+        clients = self.edges["person_is_client"]
+        ranked = sorted(((-likes, company, person) for (person, company), likes
+                         in self.company_likes.items() if edge_key(person, company) in clients),
+                        key=lambda item: (item[1], item[0], item[2]))
+        for neg_likes, company, person in ranked:
+            result[self.company_names[company]].append(
+                {"nombre": self.person_names[person], "likes": -neg_likes})
+        return result
+
+    def text_index(self):
+        """Índice invertido de los posts vivos (TextIndex)"""
+        if self._text_index is None:
+            from text_index import TextIndex
+
+            index = TextIndex.from_texts(self.post_texts)
+            for post in np.flatnonzero(self.post_deleted).tolist():
+                index.remove(post)
+            self._text_index = index
+        return self._text_index
+
+    def _post_author(self, post: int) -> Tuple[str, str]:
+        author_type, author = self.post_authors[post]
+        if author_type == COMPANY:
+            return self.company_names[author], "empresa"
+        return self.person_names[author], "persona"
+
+    def query_search(self, query: str, k: int = SEARCH_LIMIT) -> Dict:
+        """Búsqueda de texto (BM25) con autor y reacciones de cada post"""
+        from text_index import search_results
+
+        return search_results(self.text_index(), query, k, self.post_texts, self._post_author,
+                              self.likes.values, self.dislikes.values)
+
+    def cascades(self):
+        """Bosque de republicaciones (CascadeForest, se mantiene por evento)"""
+        if self._cascades is None:
+            from cascades import CascadeForest
+
+            self._cascades = CascadeForest(np.array(self.post_original, dtype=np.int64),
+                                           self.likes.values, self.dislikes.values,
+                                           self.post_texts)
+        return self._cascades
+
+    def query_cascades(self, k: int = TOP_CASCADES, by: str = "alcance") -> Dict:
+        """Top-k de cascadas sin contar los originales eliminados"""
+        return self.cascades().summary(k, by, exclude=np.array(self.post_deleted, dtype=bool))
+
+    def query_cascade(self, post: int) -> Dict:
+        self._check_post(post)
+        return self.cascades().record(post, levels=True)
+
+    def communities(self):
+        """
+        Componentes y comunidades del snapshot actual (CommunityAnalysis)
+        Se recalculan solo si se aplicaron eventos desde la última llamada
+        """
+        if self._communities is None or self._communities[0] != self.version:
+            from communities import CommunityAnalysis
+
+            self._communities = (self.version, CommunityAnalysis(self.to_dataset()))
+        return self._communities[1]
+
+    def query_communities(self) -> Dict:
+        return self.communities().summary()
+
+    def path_finder(self, exclude_blocked: bool = False):
+        """PathFinder del snapshot actual (se rearma solo si cambió version)"""
+        cached = self._path_finders.get(exclude_blocked)
+        if cached is None or cached[0] != self.version:
+            from paths import PathFinder
+
+            cached = (self.version, PathFinder.from_dataset(self.to_dataset(), exclude_blocked))
+            self._path_finders[exclude_blocked] = cached
+        return cached[1]
+
+    def query_shortest_paths(self, pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                             exclude_blocked: bool = False, max_hops: Optional[int] = None,
+                             paths: bool = True) -> List[Dict]:
+        """Grados de separación entre pares de usuarios (tipo, índice)"""
+        from paths import shortest_path_results
+
+        return shortest_path_results(self.path_finder(exclude_blocked), self.person_names,
+                                     self.company_names, pairs, max_hops, paths)
+
+    def get_parsed_data(self, window: Optional[Window] = None,
+                        include_analytics: bool = False) -> Optional[Dict]:
+        """
+        Resultados actuales con la forma de CUDASocialNetwork.get_parsed_data()
+        window restringe seguidores, reacciones, top de posts y hashtags
+        include_analytics agrega cascadas y analítica de hashtags (sin window)
+        """
+        data = {
+            "seguidores": self.query_followers(window),
+            "reacciones": self.query_post_reactions(window),
+            "top_posts": self.query_top_posts(window=window),
+            "hashtags": self.query_hashtags(window),
+            "bloqueados": self.query_blocked_followers(),
+            "recomendaciones": self.query_company_recommendations(),
+        }
+        if include_analytics and window is None:
+            data["cascadas"] = self.query_cascades()
+            data["analitica_hashtags"] = self.query_hashtag_analytics()
+        if window is not None:
+            data["ventana"] = {"desde": format_time(window[0]), "hasta": format_time(window[1])}
+        data["output_raw"] = format_output(data, len(self.person_names), len(self.company_names),
+                                           self.live_posts, self.post_texts)
+        return data
@@ -0,0 +1,418 @@
+"""
+Analítica de hashtags
+Un post puede llevar varios hashtags: se toman del campo hashtag y de los
+"#palabra" del texto. Con la matriz de incidencia post × hashtag (COO, un par
+por post y hashtag) se calculan, con operaciones dispersas vectorizadas:
+
+- Co-ocurrencia: pares de hashtags que aparecen en el mismo post
+- Perfil de cada autor: cuántos posts publicó con cada hashtag
+- Interacción: likes y dislikes sumados sobre los posts de cada hashtag
+- Tendencias: conteos por ventanas del orden de publicación (ids de post);
+  un hashtag es tendencia si su ventana actual supera a las anteriores
+
+SocialGraphStore mantiene la analítica por evento (add_post, remove_post,
+add_reactions): la incidencia y la interacción se actualizan en el momento
+y la co-ocurrencia y los perfiles acumulan deltas que se fusionan al leerlos
+
+    python hashtag_analytics.py datos_1m --window 50000 --output hashtags.json
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from numpy_engine import TOP_HASHTAGS, TREND_WINDOW, count_reactions, sorted_unique
+from social_dataset import COMPANY, POST_AUTHOR_ID, POST_AUTHOR_TYPE, SocialDataset
+from string_pool import as_interned, join_strings
+
+HASHTAG_RE = re.compile(r"#\w+|\x00")
+SEPARATOR = "\x00"
+# Ventanas anteriores que forman la base de las tendencias
+TREND_BASELINE = 4
+# Apariciones mínimas en la ventana actual para considerar una tendencia
+TREND_MIN_COUNT = 5
+
+
+def _pair_counts(a: np.ndarray, b: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray,
+                                                                   np.ndarray]:
+    """Pares (a, b) distintos con su cantidad, ordenados por (a, b)"""
+    keys, counts = np.unique(a.astype(np.int64) * size + b, return_counts=True)
+    return keys // size, keys % size, counts
+
+
+def _merge_pairs(pairs: Tuple[np.ndarray, np.ndarray, np.ndarray], deltas: List[Tuple[int, int, int]],
+                 size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Suma deltas (a, b, cambio) a pares contados; descarta los que quedan en 0"""
+    a, b, counts = pairs
+    extra = np.array(deltas, dtype=np.int64).reshape(-1, 3)
+    keys, inverse = np.unique(np.concatenate([a * size + b, extra[:, 0] * size + extra[:, 1]]),
+                              return_inverse=True)
+    totals = np.bincount(inverse, np.concatenate([counts, extra[:, 2]]), len(keys)).astype(np.int64)
+    keep = totals > 0
+    return keys[keep] // size, keys[keep] % size, totals[keep]
+
+
+def author_node(author_type: int, author) -> np.ndarray:
+    """Nodo de un autor en los perfiles: personas en pares, empresas en impares"""
+    return 2 * np.asarray(author, dtype=np.int64) + (np.asarray(author_type) == COMPANY)
+
+
+def _top_ranked(values: np.ndarray, k: int, rank: np.ndarray) -> np.ndarray:
+    """
+    Índices de los k mayores valores; los empates se ordenan por rank
+    (no por índice), así el resultado no depende de los ids internos
+    """
+    n = len(values)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    threshold = np.partition(values, n - k)[n - k]
+    candidates = np.flatnonzero(values >= threshold)
+    order = np.lexsort((rank[candidates], -values[candidates]))
+    return candidates[order[:k]]
+
+
+def _segments(lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """Índices de todos los tramos [lo, hi) concatenados"""
+    lengths = hi - lo
+    return np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(int(lengths.sum()))
+
+
+class HashtagAnalytics:
+    """Incidencia post × hashtag de un dataset y las métricas derivadas"""
+
+    def __init__(self, tags: List[str], posts: np.ndarray, tag_ids: np.ndarray,
+                 authors: np.ndarray, likes: np.ndarray, dislikes: np.ndarray):
+        """
+        tags[i] es el texto del hashtag i; posts/tag_ids tienen un par por
+        post y hashtag (sin repetidos), ordenados por post. authors tiene
+        el nodo de autor de cada post (author_node)
+        """
+        self.tags = tags
+        self.index = {tag: i for i, tag in enumerate(tags)}
+        self.posts = np.asarray(posts, dtype=np.int64)
+        self.tag_ids = np.asarray(tag_ids, dtype=np.int64)
+        self.authors = np.asarray(authors, dtype=np.int64)
+        # Copias propias: add_reactions las actualiza
+        self.post_likes = np.array(likes, dtype=np.int64)
+        self.post_dislikes = np.array(dislikes, dtype=np.int64)
+        self.num_posts = len(self.authors)
+        self._engagement: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._cooccurrence: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        self._profiles: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        # Cambios (a, b, delta) pendientes de fusionar en las matrices cacheadas
+        self._cooccurrence_deltas: List[Tuple[int, int, int]] = []
+        self._profile_deltas: List[Tuple[int, int, int]] = []
+        self._buffers = {name: getattr(self, name) for name in
+                         ("posts", "tag_ids", "authors", "post_likes", "post_dislikes")}
+
+    @classmethod
+    def from_dataset(cls, dataset: SocialDataset, likes: Optional[np.ndarray] = None,
+                     dislikes: Optional[np.ndarray] = None) -> "HashtagAnalytics":
+        if likes is None or dislikes is None:
+            likes, dislikes = count_reactions(dataset.interactions, dataset.num_posts)
+        n = dataset.num_posts
+        # Hashtags del texto: una pasada de regex; el separador marca cada post
+        found = HASHTAG_RE.findall(join_strings(dataset.post_texts, SEPARATOR).lower()) if n else []
+        # Campo hashtag: se normalizan solo los valores distintos de la columna internada
+        tags = as_interned(dataset.post_hashtags)
+        first = tags.first_rows()
+        distinct = [tag.lower() for tag in tags.values.to_list()]
+        fields = [distinct[i] for i in np.argsort(first, kind="stable").tolist() if first[i] >= 0]
+        vocabulary = {tag: i for i, tag in enumerate(dict.fromkeys(
+            [tag for tag in found if tag != SEPARATOR] + [tag for tag in fields if tag]))}
+
+        found_ids = np.fromiter((vocabulary.get(tag, -1) for tag in found), dtype=np.int64,
+                                count=len(found))
+        is_separator = found_ids < 0
+        text_posts = np.cumsum(is_separator)[~is_separator]
+        text_tags = found_ids[~is_separator]
+        field_ids = np.fromiter((vocabulary.get(tag, -1) for tag in distinct), dtype=np.int64,
+                                count=len(distinct))[tags.codes]
+        has_field = field_ids >= 0
+        field_posts = np.flatnonzero(has_field)
+
+        num_tags = max(len(vocabulary), 1)
+        keys = sorted_unique(np.concatenate([text_posts * num_tags + text_tags,
+                                             field_posts * num_tags + field_ids[has_field]]))
+        posts = dataset.posts
+        authors = author_node(posts[:, POST_AUTHOR_TYPE], posts[:, POST_AUTHOR_ID])
+        return cls(list(vocabulary), keys // num_tags, keys % num_tags, authors, likes, dislikes)
+
+    @property
+    def num_tags(self) -> int:
+        return len(self.tags)
+
+    def name_rank(self) -> np.ndarray:
+        """Posición alfabética de cada hashtag (desempate de los top-k)"""
+        rank = np.empty(self.num_tags, dtype=np.int64)
+        rank[sorted(range(self.num_tags), key=self.tags.__getitem__)] = np.arange(self.num_tags)
+        return rank
+
+    def tag_id(self, tag: str) -> Optional[int]:
+        """Id de un hashtag (con o sin '#', sin distinguir mayúsculas)"""
+        tag = tag.strip().lower()
+        return self.index.get(tag if tag.startswith("#") else "#" + tag)
+
+    # --- Actualización por evento -----------------------------------------
+
+    def _reserve(self, names: Tuple[str, ...], n: int):
+        """Ajusta columnas a n elementos (capacidad duplicada al crecer)"""
+        for name in names:
+            buffer = self._buffers[name]
+            if n > len(buffer):
+                grown = np.zeros(max(n, 2 * len(buffer), 16), dtype=np.int64)
+                current = getattr(self, name)
+                grown[:len(current)] = current
+                self._buffers[name] = buffer = grown
+            setattr(self, name, buffer[:n])
+
+    def _add_tag(self, tag: str) -> int:
+        self.index[tag] = len(self.tags)
+        self.tags.append(tag)
+        if self._engagement is not None:
+            self._engagement = tuple(np.append(column, 0) for column in self._engagement)
+        return self.index[tag]
+
+    def add_post(self, text: str, hashtag: str, author_type: int, author: int) -> int:
+        """
+        Agrega el post siguiente (sin reacciones) con los hashtags de su texto
+        y de su campo hashtag; O(hashtags del post) más los deltas pendientes
+        Returns: id del post
+        """
+        found = [tag for tag in HASHTAG_RE.findall(text.lower()) if tag != SEPARATOR]
+        if hashtag:
+            found.append(hashtag.lower())
+        ids = sorted({self.index[tag] if tag in self.index else self._add_tag(tag)
+                      for tag in found})
+        post = self.num_posts
+        self._reserve(("authors", "post_likes", "post_dislikes"), post + 1)
+        node = int(author_node(author_type, author))
+        self.authors[post] = node
+        self.post_likes[post] = self.post_dislikes[post] = 0
+        self.num_posts += 1
+        if ids:
+            pairs = len(self.posts)
+            self._reserve(("posts", "tag_ids"), pairs + len(ids))
+            self.posts[pairs:] = post
+            self.tag_ids[pairs:] = ids
+            self._tags_changed(ids, node, 1)
+        return post
+
+    def remove_post(self, post: int):
+        """Saca un post de la incidencia (queda como post sin hashtags)"""
+        lo, hi = np.searchsorted(self.posts, [post, post + 1])
+        if lo == hi:
+            return
+        ids = self.tag_ids[lo:hi].tolist()
+        if self._engagement is not None:
+            _, likes, dislikes = self._engagement
+            likes[ids] -= self.post_likes[post]
+            dislikes[ids] -= self.post_dislikes[post]
+        self._tags_changed(ids, int(self.authors[post]), -1)
+        n = len(self.posts)
+        for name in ("posts", "tag_ids"):
+            column = self._buffers[name]
+            column[lo:n - (hi - lo)] = column[hi:n]
+        self._reserve(("posts", "tag_ids"), n - (hi - lo))
+
+    def _tags_changed(self, ids: List[int], node: int, delta: int):
+        """Actualiza conteos de un post que entra (+1) o sale (-1) de la incidencia"""
+        if self._engagement is not None:
+            self._engagement[0][ids] += delta
+        if self._cooccurrence is not None:
+            self._cooccurrence_deltas += [(a, b, delta) for i, a in enumerate(ids)
+                                          for b in ids[i + 1:]]
+        if self._profiles is not None:
+            self._profile_deltas += [(node, tag, delta) for tag in ids]
+
+    def add_reactions(self, posts: np.ndarray, likes_delta: np.ndarray,
+                      dislikes_delta: np.ndarray):
+        """Suma cambios de likes/dislikes de posts a sus hashtags"""
+        posts = np.asarray(posts, dtype=np.int64)
+        np.add.at(self.post_likes, posts, likes_delta)
+        np.add.at(self.post_dislikes, posts, dislikes_delta)
+        if self._engagement is not None:
+            lo = np.searchsorted(self.posts, posts)
+            hi = np.searchsorted(self.posts, posts, side='right')
+            rows = np.repeat(np.arange(len(posts)), hi - lo)
+            tags = self.tag_ids[_segments(lo, hi)]
+            _, likes, dislikes = self._engagement
+            np.add.at(likes, tags, np.asarray(likes_delta, dtype=np.int64)[rows])
+            np.add.at(dislikes, tags, np.asarray(dislikes_delta, dtype=np.int64)[rows])
+
+    # --- Conteos -----------------------------------------------------------
+
+    def post_counts(self) -> np.ndarray:
+        """Posts con cada hashtag"""
+        return np.bincount(self.tag_ids, minlength=self.num_tags)
+
+    def engagement(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(posts, likes, dislikes) sumados sobre los posts de cada hashtag"""
+        if self._engagement is None:
+            posts = self.post_counts()
+            likes = np.bincount(self.tag_ids, self.post_likes[self.posts], self.num_tags)
+            dislikes = np.bincount(self.tag_ids, self.post_dislikes[self.posts], self.num_tags)
+            self._engagement = (posts, likes.astype(np.int64), dislikes.astype(np.int64))
+        return self._engagement
+
+    # --- Co-ocurrencia -----------------------------------------------------
+
+    def cooccurrence(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Matriz de co-ocurrencia dispersa, triangular superior: (a, b, posts)
+        con a < b. Cada post con m hashtags aporta sus m(m-1)/2 pares
+        """
+        if self._cooccurrence is None:
+            # Los pares están ordenados por post: el grupo de cada par es su post
+            n = len(self.posts)
+            starts = np.flatnonzero(np.r_[True, self.posts[1:] != self.posts[:-1]]) if n \
+                else np.zeros(0, dtype=np.int64)
+            bounds = np.r_[starts, n]
+            ends = np.repeat(bounds[1:], np.diff(bounds))
+            # Cada par se combina con los siguientes de su mismo post
+            partners = ends - np.arange(n) - 1
+            first = np.repeat(np.arange(n), partners)
+            offset = np.arange(int(partners.sum())) - np.repeat(np.cumsum(partners) - partners,
+                                                               partners)
+            second = first + offset + 1
+            a, b = self.tag_ids[first], self.tag_ids[second]
+            self._cooccurrence = _pair_counts(np.minimum(a, b), np.maximum(a, b),
+                                              max(self.num_tags, 1))
+        elif self._cooccurrence_deltas:
+            self._cooccurrence = _merge_pairs(self._cooccurrence, self._cooccurrence_deltas,
+                                              max(self.num_tags, 1))
+        self._cooccurrence_deltas = []
+        return self._cooccurrence
+
+    def related(self, tag: str, k: int = TOP_HASHTAGS) -> List[Dict]:
+        """Hashtags que más aparecen junto a uno dado"""
+        i = self.tag_id(tag)
+        if i is None:
+            return []
+        a, b, counts = self.cooccurrence()
+        mask = (a == i) | (b == i)
+        others = np.where(a[mask] == i, b[mask], a[mask])
+        counts = counts[mask]
+        top = _top_ranked(counts, k, self.name_rank()[others])
+        return [{"hashtag": self.tags[others[j]], "posts": int(counts[j])} for j in top.tolist()]
+
+    # --- Perfiles por autor ------------------------------------------------
+
+    def profiles(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Matriz autor × hashtag dispersa: (autor, hashtag, posts) ordenada por autor"""
+        if self._profiles is None:
+            self._profiles = _pair_counts(self.authors[self.posts], self.tag_ids,
+                                          max(self.num_tags, 1))
+        elif self._profile_deltas:
+            self._profiles = _merge_pairs(self._profiles, self._profile_deltas,
+                                          max(self.num_tags, 1))
+        self._profile_deltas = []
+        return self._profiles
+
+    def author_profile(self, author_type: int, author: int, k: int = TOP_HASHTAGS) -> List[Dict]:
+        """Hashtags más usados por un autor"""
+        node = int(author_node(author_type, author))
+        authors, tags, counts = self.profiles()
+        lo, hi = np.searchsorted(authors, [node, node + 1])
+        top = lo + _top_ranked(counts[lo:hi], k, self.name_rank()[tags[lo:hi]])
+        return [{"hashtag": self.tags[tags[j]], "posts": int(counts[j])} for j in top.tolist()]
+
+    # --- Tendencias --------------------------------------------------------
+
+    def rolling_counts(self, tag: str, window: int = TREND_WINDOW,
+                       span: int = 1) -> List[int]:
+        """Serie de un hashtag: posts por ventana, sumados sobre las últimas span ventanas"""
+        i = self.tag_id(tag)
+        buckets = max((self.num_posts + window - 1) // window, 1)
+        series = np.zeros(buckets, dtype=np.int64)
+        if i is not None:
+            posts = self.posts[self.tag_ids == i]
+            series = np.bincount(posts // window, minlength=buckets)
+        cumulative = np.r_[0, np.cumsum(series)]
+        start = np.maximum(np.arange(1, buckets + 1) - span, 0)
+        return (cumulative[1:] - cumulative[start]).tolist()
+
+    def trending(self, k: int = TOP_HASHTAGS, window: int = TREND_WINDOW,
+                 baseline: int = TREND_BASELINE, end: Optional[int] = None,
+                 min_count: int = TREND_MIN_COUNT) -> List[Dict]:
+        """
+        Hashtags en alza en la ventana [end - window, end) de ids de post
+        frente al promedio de las baseline ventanas anteriores; el puntaje es
+        (actual - base) / sqrt(base + 1), un z-score de Poisson
+        """
+        end = self.num_posts if end is None else min(end, self.num_posts)
+        current_start = max(end - window, 0)
+        base_start = max(current_start - baseline * window, 0)
+        lo, mid, hi = np.searchsorted(self.posts, [base_start, current_start, end])
+        current = np.bincount(self.tag_ids[mid:hi], minlength=self.num_tags)
+        previous = np.bincount(self.tag_ids[lo:mid], minlength=self.num_tags)
+        windows = max((current_start - base_start) / window, 1e-9)
+        base = previous / windows
+        score = np.where(current >= min_count, (current - base) / np.sqrt(base + 1), -np.inf)
+        top = _top_ranked(score, k, self.name_rank())
+        top = top[np.isfinite(score[top]) & (score[top] > 0)]
+        return [{"hashtag": self.tags[i], "ventana": int(current[i]), "base": round(float(base[i]), 2),
+                 "puntaje": round(float(score[i]), 3)} for i in top.tolist()]
+
+    # --- Resumen -----------------------------------------------------------
+
+    def summary(self, k: int = TOP_HASHTAGS, window: int = TREND_WINDOW) -> Dict:
+        """
+        Resumen para get_parsed_data(): co-ocurrencias, interacción y tendencias
+        Los empates van en orden alfabético y cada par con su hashtag menor
+        primero; los hashtags sin posts (todos eliminados) no aparecen
+        """
+        rank = self.name_rank()
+        a, b, counts = self.cooccurrence()
+        a, b = np.where(rank[a] < rank[b], a, b), np.where(rank[a] < rank[b], b, a)
+        top_pairs = _top_ranked(counts, k, rank[a] * max(self.num_tags, 1) + rank[b])
+        posts, likes, dislikes = self.engagement()
+        used = np.flatnonzero(posts)
+        top_tags = used[_top_ranked(likes[used], k, rank[used])]
+        authors = self.profiles()[0]
+        return {
+            "hashtags": int(np.count_nonzero(posts)),
+            "posts_con_hashtag": int(len(sorted_unique(self.posts))),
+            "autores": int(len(sorted_unique(authors))),
+            "pares": int(len(counts)),
+            "coocurrencias": [{"hashtag_a": self.tags[a[j]], "hashtag_b": self.tags[b[j]],
+                               "posts": int(counts[j])} for j in top_pairs.tolist()],
+            "interaccion": [{"hashtag": self.tags[i], "posts": int(posts[i]),
+                             "likes": int(likes[i]), "dislikes": int(dislikes[i])}
+                            for i in top_tags.tolist()],
+            "tendencias": self.trending(k, window),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from social_dataset import load_dataset, sample_dataset
+
+    parser = argparse.ArgumentParser(description="Analítica de hashtags (co-ocurrencia, "
+                                                 "interacción y tendencias)")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("-k", type=int, default=TOP_HASHTAGS, help="Elementos por lista")
+    parser.add_argument("--window", type=int, default=TREND_WINDOW,
+                        help="Posts por ventana de tendencias")
+    parser.add_argument("--related", help="Hashtags relacionados con uno dado")
+    parser.add_argument("--series", help="Serie por ventana de un hashtag")
+    parser.add_argument("--output", help="Archivo JSON destino (por defecto, stdout)")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset, mmap=True) if args.dataset else sample_dataset()
+    analytics = HashtagAnalytics.from_dataset(dataset)
+    result = analytics.summary(args.k, args.window)
+    if args.related:
+        result["relacionados"] = analytics.related(args.related, args.k)
+    if args.series:
+        result["serie"] = analytics.rolling_counts(args.series, args.window)
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
@@ -0,0 +1,456 @@
+"""
+Ingesta de eventos en streaming con micro-lotes
+Lee eventos NDJSON (seguir, publicar, reaccionar...) desde un archivo
+(opcionalmente siguiendo su cola) o un socket local, los agrupa por tamaño
+o ventana de tiempo y aplica cada lote al SocialGraphStore
+
+Formato de evento (una línea JSON por evento):
+    {"type": "person", "name": "Alice"}
+    {"type": "company", "name": "TechCorp"}
+    {"type": "follow", "src_type": "person", "src": 0, "dst_type": "company", "dst": 1}
+    {"type": "block", "src_type": "person", "src": 1, "dst_type": "person", "dst": 2}
+    {"type": "client", "src": 0, "dst": 0}
+    {"type": "recommend", "src": 0, "dst": 2}
+    {"type": "post", "author_type": "person", "author": 0, "text": "Hola #tech", "hashtag": "#tech"}
+    {"type": "reaction", "user_type": "person", "user": 0, "post": 3, "value": "like"}
+Los eventos de relación aceptan "remove": true; reaction acepta value "none"
+y post acepta "remove": true con "post": id. Seguimientos, publicaciones y
+reacciones aceptan "time" (segundos Unix); sin él se usa la hora de ingesta
+"""
+
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from social_dataset import PERSON, COMPANY, NONE, LIKE, DISLIKE
+from graph_store import SocialGraphStore, FOLLOW_RELATIONS, BLOCK_RELATIONS
+
+USER_TYPES = {"person": PERSON, "company": COMPANY, PERSON: PERSON, COMPANY: COMPANY}
+REACTION_VALUES = {"none": NONE, "like": LIKE, "dislike": DISLIKE, NONE: NONE, LIKE: LIKE, DISLIKE: DISLIKE}
+
+_END = object()  # Marca de fin de stream en la cola
+
+
+class EventError(ValueError):
+    """Evento mal formado o con ids inexistentes"""
+
+
+def parse_event(line: str) -> Dict:
+    """Parsea una línea NDJSON en un evento"""
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise EventError(f"JSON inválido: {e}")
+    if not isinstance(event, dict) or "type" not in event:
+        raise EventError("Evento sin campo 'type'")
+    return event
+
+
+def _edge_relation(event: Dict) -> str:
+    """Nombre de la relación afectada por un evento de arista"""
+    kind = event["type"]
+    if kind == "client":
+        return "person_is_client"
+    if kind == "recommend":
+        return "company_recommends_company"
+    table = FOLLOW_RELATIONS if kind == "follow" else BLOCK_RELATIONS
+    key = (USER_TYPES[event.get("src_type", "person")], USER_TYPES[event.get("dst_type", "person")])
+    if key not in table:
+        raise EventError(f"Relación {kind} no soportada: {event}")
+    return table[key]
+
+
+EDGE_EVENTS = ("follow", "block", "client", "recommend")
+
+
+def _run_key(event: Dict) -> Optional[Tuple]:
+    """Clave de agrupación: eventos consecutivos con la misma clave se aplican juntos"""
+    kind = event["type"]
+    if kind in EDGE_EVENTS:
+        return ("edge", _edge_relation(event), bool(event.get("remove", False)))
+    if kind == "reaction":
+        return ("reaction",)
+    return None
+
+
+def apply_event(store: SocialGraphStore, event: Dict):
+    """Aplica un único evento al almacén"""
+    kind = event["type"]
+    if kind == "person":
+        store.add_person(event["name"])
+    elif kind == "company":
+        store.add_company(event["name"])
+    elif kind == "post":
+        if event.get("remove", False):
+            store.remove_post(event["post"])
+        else:
+            store.add_post(USER_TYPES[event.get("author_type", "person")], event["author"],
+                           event.get("text", ""), event.get("hashtag", ""),
+                           event.get("original", -1), event.get("time"))
+    elif kind in EDGE_EVENTS:
+        store.apply_edges(_edge_relation(event), [event["src"]], [event["dst"]],
+                          remove=event.get("remove", False), timestamps=_event_times([event]))
+    elif kind == "reaction":
+        store.apply_reactions([USER_TYPES[event.get("user_type", "person")]], [event["user"]],
+                              [event["post"]], [REACTION_VALUES[event.get("value", "like")]],
+                              timestamps=_event_times([event]))
+    else:
+        raise EventError(f"Tipo de evento desconocido: {kind}")
+
+
+def _event_times(events: List[Dict]) -> List[int]:
+    """Marca de cada evento ("time" o la hora de ingesta)"""
+    now = int(time.time())
+    return [int(e.get("time", now)) for e in events]
+
+
+def _apply_run(store: SocialGraphStore, key: Tuple, events: List[Dict]) -> int:
+    """Aplica un grupo de eventos homogéneos con una sola operación vectorizada"""
+    if key[0] == "edge":
+        _, rejected = store.apply_edges(key[1], [e["src"] for e in events],
+                                        [e["dst"] for e in events], remove=key[2],
+                                        timestamps=_event_times(events))
+    else:
+        _, rejected = store.apply_reactions(
+            [USER_TYPES[e.get("user_type", "person")] for e in events],
+            [e["user"] for e in events],
+            [e["post"] for e in events],
+            [REACTION_VALUES[e.get("value", "like")] for e in events],
+            timestamps=_event_times(events))
+    return rejected
+
+
+def apply_batch(store: SocialGraphStore, events: List[Dict]) -> int:
+    """
+    Aplica un lote respetando el orden de los eventos
+    Los tramos consecutivos de aristas de la misma relación o de reacciones
+    se aplican vectorizados; el resto, uno a uno
+    Returns: cantidad de eventos rechazados
+    """
+    rejected = 0
+    run_key, run = None, []
+    for event in events + [None]:
+        try:
+            key = _run_key(event) if event is not None else None
+        except (KeyError, EventError):
+            rejected += 1
+            continue
+        if run and key != run_key:
+            try:
+                rejected += _apply_run(store, run_key, run)
+            except (KeyError, TypeError, ValueError):
+                # Algún evento mal formado: aplicar el tramo uno a uno
+                rejected += _apply_each(store, run)
+            run = []
+        if event is None:
+            break
+        if key is not None:
+            run_key = key
+            run.append(event)
+            continue
+        rejected += _apply_each(store, [event])
+    return rejected
+
+
+def _apply_each(store: SocialGraphStore, events: List[Dict]) -> int:
+    rejected = 0
+    for event in events:
+        try:
+            apply_event(store, event)
+        except (KeyError, TypeError, ValueError, IndexError):
+            rejected += 1
+    return rejected
+
+
+class IngestStats:
+    """Métricas de la ingesta: eventos/s, latencia de lote y profundidad de cola"""
+
+    def __init__(self):
+        self.events = 0
+        self.rejected = 0
+        self.batches = 0
+        self.apply_times: List[float] = []    # tiempo de aplicar cada lote
+        self.latencies: List[float] = []      # llegada del evento más antiguo -> aplicado
+        self.max_queue = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, size: int, rejected: int, apply_time: float, latency: float, queue_depth: int):
+        self.events += size
+        self.rejected += rejected
+        self.batches += 1
+        self.apply_times.append(apply_time)
+        self.latencies.append(latency)
+        self.max_queue = max(self.max_queue, queue_depth)
+
+    def summary(self) -> Dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        latencies = np.array(self.latencies or [0.0]) * 1000
+        apply_times = np.array(self.apply_times or [0.0]) * 1000
+        return {
+            "eventos": self.events,
+            "rechazados": self.rejected,
+            "lotes": self.batches,
+            "segundos": round(elapsed, 3),
+            "eventos_por_segundo": round(self.events / elapsed, 1) if elapsed > 0 else 0.0,
+            "latencia_lote_ms": {
+                "p50": round(float(np.percentile(latencies, 50)), 3),
+                "p95": round(float(np.percentile(latencies, 95)), 3),
+                "max": round(float(latencies.max()), 3),
+            },
+            "aplicar_lote_ms_promedio": round(float(apply_times.mean()), 3),
+            "cola_maxima": self.max_queue,
+        }
+
+
+class IngestionPipeline:
+    """
+    Productores leen NDJSON y encolan eventos; un consumidor arma micro-lotes
+    (hasta batch_size eventos o batch_window segundos) y los aplica al almacén.
+    La cola acotada (queue_size) aplica backpressure: si el consumidor se
+    atrasa, los productores esperan en put() y dejan de leer su fuente
+    """
+
+    def __init__(self, store: Optional[SocialGraphStore] = None, batch_size: int = 5000,
+                 batch_window: float = 0.05, queue_size: int = 50_000,
+                 on_batch: Optional[Callable[[IngestStats], None]] = None):
+        self.store = store if store is not None else SocialGraphStore()
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.on_batch = on_batch
+        self.stats = IngestStats()
+
+    async def _produce(self, lines: AsyncIterator[str]):
+        async for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = parse_event(line)
+            except EventError:
+                self.stats.rejected += 1
+                continue
+            await self.queue.put((time.perf_counter(), event))
+
+    async def _next_batch(self) -> Tuple[List[Dict], float, bool]:
+        """Espera el primer evento y junta más hasta llenar el lote o vencer la ventana"""
+        first = await self.queue.get()
+        if first is _END:
+            return [], 0.0, True
+        arrived, event = first
+        batch = [event]
+        deadline = time.perf_counter() + self.batch_window
+        while len(batch) < self.batch_size:
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _END:
+                return batch, arrived, True
+            batch.append(item[1])
+        return batch, arrived, False
+
+    async def _consume(self):
+        done = False
+        while not done:
+            queue_depth = self.queue.qsize()
+            batch, arrived, done = await self._next_batch()
+            if not batch:
+                continue
+            start = time.perf_counter()
+            rejected = apply_batch(self.store, batch)
+            end = time.perf_counter()
+            self.stats.record(len(batch), rejected, end - start, end - arrived, queue_depth)
+            if self.on_batch is not None:
+                self.on_batch(self.stats)
+            await asyncio.sleep(0)  # ceder el loop a los productores
+        self.stats.finished = time.perf_counter()
+
+    async def run(self, *sources: AsyncIterator[str]) -> Dict:
+        """Consume las fuentes hasta agotarlas y retorna el resumen de métricas"""
+        consumer = asyncio.create_task(self._consume())
+        try:
+            await asyncio.gather(*(self._produce(source) for source in sources))
+            await self.queue.put(_END)
+            await consumer
+        finally:
+            consumer.cancel()
+        return self.stats.summary()
+
+    async def run_file(self, path, follow: bool = False, poll_interval: float = 0.1,
+                       idle_timeout: Optional[float] = None) -> Dict:
+        return await self.run(read_file(path, follow, poll_interval, idle_timeout))
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9009,
+                    duration: Optional[float] = None) -> Dict:
+        """
+        Acepta conexiones TCP locales que envían NDJSON
+        Con la cola llena se deja de leer del socket y TCP frena al emisor
+        """
+        consumer = asyncio.create_task(self._consume())
+
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                await self._produce(read_stream(reader))
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(handle, host, port)
+        try:
+            async with server:
+                if duration is None:
+                    await server.serve_forever()
+                else:
+                    await asyncio.sleep(duration)
+        finally:
+            await self.queue.put(_END)
+            await consumer
+        return self.stats.summary()
+
+
+# ============================================================================
+# FUENTES
+# ============================================================================
+
+async def read_file(path, follow: bool = False, poll_interval: float = 0.1,
+                    idle_timeout: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    Lee un archivo NDJSON línea a línea; con follow=True sigue la cola del
+    archivo (como tail -f) hasta que pasen idle_timeout segundos sin datos
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        idle = 0.0
+        pending = ""
+        while True:
+            line = f.readline()
+            if line:
+                idle = 0.0
+                pending += line
+                if pending.endswith('\n'):
+                    yield pending
+                    pending = ""
+                continue
+            if not follow or (idle_timeout is not None and idle >= idle_timeout):
+                break
+            await asyncio.sleep(poll_interval)
+            idle += poll_interval
+        if pending:
+            yield pending
+
+
+async def read_stream(reader: asyncio.StreamReader) -> AsyncIterator[str]:
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        yield line.decode('utf-8')
+
+
+def generate_events(path, num_events: int, num_persons: int = 1000, num_companies: int = 50,
+                    seed: int = 0) -> int:
+    """
+    Escribe un archivo NDJSON de prueba: altas de usuarios seguidas de una
+    mezcla de seguimientos, bloqueos, publicaciones y reacciones
+    Returns: cantidad de eventos escritos
+    """
+    rng = np.random.default_rng(seed)
+    written = 0
+    num_posts = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        def emit(event):
+            nonlocal written
+            f.write(json.dumps(event, ensure_ascii=False))
+            f.write('\n')
+            written += 1
+
+        for i in range(num_persons):
+            emit({"type": "person", "name": f"persona_{i}"})
+        for i in range(num_companies):
+            emit({"type": "company", "name": f"empresa_{i}"})
+
+        kinds = rng.choice(6, size=max(num_events - written, 0), p=[0.3, 0.03, 0.02, 0.01, 0.09, 0.55])
+        persons = rng.integers(0, num_persons, size=(len(kinds), 2))
+        companies = rng.integers(0, num_companies, size=(len(kinds), 2))
+        tags = ["#tech", "#coding", "#life", "#social", "#data"]
+        for i, kind in enumerate(kinds.tolist()):
+            p, q = persons[i].tolist()
+            c, d = companies[i].tolist()
+            if kind == 0:
+                if rng.random() < 0.7:
+                    emit({"type": "follow", "src_type": "person", "src": p, "dst_type": "person", "dst": q})
+                else:
+                    emit({"type": "follow", "src_type": "person", "src": p, "dst_type": "company", "dst": c})
+            elif kind == 1:
+                emit({"type": "block", "src_type": "person", "src": p, "dst_type": "person", "dst": q})
+            elif kind == 2:
+                emit({"type": "client", "src": p, "dst": c})
+            elif kind == 3:
+                emit({"type": "recommend", "src": c, "dst": d})
+            elif kind == 4 or num_posts == 0:
+                tag = tags[int(rng.integers(len(tags)))]
+                if rng.random() < 0.8:
+                    emit({"type": "post", "author_type": "person", "author": p,
+                          "text": f"Post {num_posts} {tag}", "hashtag": tag})
+                else:
+                    emit({"type": "post", "author_type": "company", "author": c,
+                          "text": f"Post {num_posts} {tag}", "hashtag": tag})
+                num_posts += 1
+            else:
+                value = "like" if rng.random() < 0.85 else "dislike"
+                emit({"type": "reaction", "user_type": "person", "user": p,
+                      "post": int(rng.integers(num_posts)), "value": value})
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingesta de eventos NDJSON con micro-lotes")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    gen = sub.add_parser("generate", help="Generar un archivo de eventos de prueba")
+    gen.add_argument("path")
+    gen.add_argument("--events", type=int, default=100_000)
+    gen.add_argument("--persons", type=int, default=1000)
+    gen.add_argument("--companies", type=int, default=50)
+    gen.add_argument("--seed", type=int, default=0)
+
+    for name, help_text in (("file", "Ingerir un archivo NDJSON"), ("socket", "Escuchar en un socket local")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--batch-size", type=int, default=5000)
+        cmd.add_argument("--batch-window", type=float, default=0.05)
+        cmd.add_argument("--queue-size", type=int, default=50_000)
+        cmd.add_argument("--output", help="Guardar resultados.json al terminar")
+        if name == "file":
+            cmd.add_argument("path")
+            cmd.add_argument("--follow", action="store_true", help="Seguir la cola del archivo")
+            cmd.add_argument("--idle-timeout", type=float, default=None)
+        else:
+            cmd.add_argument("--port", type=int, default=9009)
+            cmd.add_argument("--duration", type=float, default=None)
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        n = generate_events(args.path, args.events, args.persons, args.companies, args.seed)
+        print(f"{n} eventos escritos en {args.path}")
+    else:
+        pipeline = IngestionPipeline(batch_size=args.batch_size, batch_window=args.batch_window,
+                                     queue_size=args.queue_size)
+        if args.command == "file":
+            summary = asyncio.run(pipeline.run_file(args.path, args.follow, idle_timeout=args.idle_timeout))
+        else:
+            summary = asyncio.run(pipeline.serve(port=args.port, duration=args.duration))
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(pipeline.store.get_parsed_data(), f, indent=2, ensure_ascii=False)
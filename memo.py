@@ -0,0 +1,124 @@
+"""
+Memoización de tablas y figuras entre reruns de Streamlit
+Cada entrada se identifica por la huella del dataset, un nombre y los
+parámetros de la vista; el caché es un LRU compartido por el proceso
+(equivalente a st.cache_resource pero sin hashear los datos en cada rerun)
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, MutableMapping, Optional
+
+MAX_ENTRIES = 256
+
+
+class LRUCache:
+    """
+    Diccionario acotado que descarta la entrada usada hace más tiempo
+    Con max_bytes también se acota la suma de sizeof(valor); un valor más
+    grande que todo el presupuesto no se guarda
+    """
+
+    def __init__(self, maxsize: int = MAX_ENTRIES, max_bytes: Optional[int] = None,
+                 sizeof: Callable[[Any], int] = len):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._discard(key)
+            size = self.sizeof(value) if self.max_bytes is not None else 0
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or (self.max_bytes is not None
+                                                        and self.nbytes > self.max_bytes):
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Hashable):
+        if key in self._entries:
+            del self._entries[key]
+            self.nbytes -= self._sizes.pop(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+
+    def info(self) -> Dict[str, int]:
+        info = {"entradas": len(self._entries), "aciertos": self.hits, "fallos": self.misses}
+        if self.max_bytes is not None:
+            info["bytes"] = self.nbytes
+        return info
+
+
+_CACHE = LRUCache()
+_MISSING = object()
+
+
+def fingerprint(data) -> str:
+    """
+    Huella estable de un dataset de resultados
+    Acepta los bytes del archivo (más barato) o el dict de get_parsed_data()
+    """
+    if not isinstance(data, (bytes, bytearray)):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def session_fingerprint(state: MutableMapping, data: Dict) -> str:
+    """Huella de los datos de la sesión (se calcula una vez y se guarda en state)"""
+    if state.get("huella") is None:
+        state["huella"] = fingerprint(data)
+    return state["huella"]
+
+
+def memoized(huella: str, name: str, builder: Callable[[], Any], params: Hashable = (),
+             cache: Optional[LRUCache] = None):
+    """
+    Retorna builder() cacheado bajo (huella, name, params)
+    Los objetos devueltos se comparten entre reruns: no deben mutarse
+    """
+    if cache is None:
+        cache = _CACHE
+    key = (huella, name, params)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = builder()
+        cache.put(key, value)
+    return value
+
+
+def cache_info() -> Dict[str, int]:
+    return _CACHE.info()
+
+
+def clear_cache():
+    _CACHE.clear()
@@ -0,0 +1,169 @@
+"""
+Instrumentación de consultas
+Registra tiempo de pared y memoria pico por consulta o etapa, más las
+métricas que reporta el binario CUDA (tiempo de kernels, bytes host<->device)
+Desactivado, measure() devuelve un contexto vacío compartido (costo casi nulo)
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+# Prefijo de las líneas de métricas que social_network.cu escribe en stderr
+METRIC_PREFIX = "METRIC "
+
+_DISABLED = nullcontext()
+
+
+class MemoryTracer:
+    """
+    Uso compartido de tracemalloc, que es global al proceso
+
+    Cada medición activa (de cualquier recorder, hook o hilo) se registra
+    aquí: el trazado se detiene al salir la última que lo necesitaba y,
+    antes de cada reset_peak, el pico acumulado se reparte a todas las
+    mediciones activas, así ninguna pierde el pico de otra. Con hilos
+    concurrentes el pico de cada medición incluye lo que asignan los demás
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: List = []
+        self._owns_tracing = False
+
+    def start(self, owner, frames: int = 1) -> int:
+        """Registra owner (un objeto con atributo peak); retorna la memoria actual"""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self._owns_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            for active in self._active:
+                active.peak = max(active.peak, peak)
+            tracemalloc.reset_peak()
+            owner.peak = max(owner.peak, current)
+            self._active.append(owner)
+            return current
+
+    def stop(self, owner) -> int:
+        """Da de baja a owner; retorna su pico (en bytes trazados)"""
+        with self._lock:
+            owner.peak = max(owner.peak, tracemalloc.get_traced_memory()[1])
+            self._active = [active for active in self._active if active is not owner]
+            if not self._active and self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+            return owner.peak
+
+
+TRACER = MemoryTracer()
+
+
+class _Measurement:
+    """Contexto de una medición activa (anidable)"""
+
+    def __init__(self, recorder: "MetricsRecorder", name: str, fields: Dict):
+        self.recorder = recorder
+        self.name = name
+        self.fields = fields
+        self.peak = 0
+
+    def __enter__(self):
+        recorder = self.recorder
+        if recorder.trace_memory:
+            # tracemalloc solo queda activo mientras dura alguna medición
+            self.base = TRACER.start(self)
+        recorder._stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        recorder = self.recorder
+        recorder._stack.pop()
+        entry = {"consulta": self.name, "backend": recorder.backend,
+                 "segundos": round(elapsed, 6)}
+        if recorder.trace_memory:
+            entry["memoria_pico_bytes"] = TRACER.stop(self) - self.base
+        entry.update(self.fields)
+        recorder.entries.append(entry)
+        return False
+
+
+class MetricsRecorder:
+    """
+    Colector de métricas por consulta
+
+    with recorder.measure("seguidores"):
+        ...
+    recorder.to_list() -> [{"consulta", "backend", "segundos", ...}]
+    """
+
+    def __init__(self, enabled: bool = False, backend: str = "python",
+                 trace_memory: bool = True):
+        self.enabled = enabled
+        self.backend = backend
+        self.trace_memory = enabled and trace_memory
+        self.entries: List[Dict] = []
+        self._stack: List[_Measurement] = []
+
+    def measure(self, name: str, **fields):
+        """Contexto que mide una consulta; no hace nada si está desactivado"""
+        if not self.enabled:
+            return _DISABLED
+        return _Measurement(self, name, fields)
+
+    def record(self, name: str, **fields):
+        """Agrega una métrica medida fuera del proceso (p. ej. por el binario CUDA)"""
+        if self.enabled:
+            self.entries.append({"consulta": name, "backend": self.backend, **fields})
+
+    def record_cuda_output(self, stderr: str):
+        """Agrega las líneas METRIC {...} emitidas por social_network.cu"""
+        if not self.enabled:
+            return
+        for line in stderr.splitlines():
+            if line.startswith(METRIC_PREFIX):
+                try:
+                    fields = json.loads(line[len(METRIC_PREFIX):])
+                except json.JSONDecodeError:
+                    continue
+                self.entries.append({"backend": "cuda", **fields})
+
+    def reset(self):
+        self.entries = []
+
+    def to_list(self) -> List[Dict]:
+        return [dict(entry) for entry in self.entries]
+
+
+def summarize(entries: List[Dict]) -> Dict[str, float]:
+    """
+    Totales para las tarjetas del dashboard
+    consultas_s suma las consultas de los motores (cuda/numpy) y parseo_s las
+    etapas parseo_* del wrapper, así las mediciones anidadas no se cuentan dos veces
+    """
+    queries = [e for e in entries if e.get("backend") in ("cuda", "numpy")]
+    return {
+        "consultas_s": round(sum(e.get("segundos", 0) for e in queries), 6),
+        "parseo_s": round(sum(e.get("segundos", 0) for e in entries
+                              if e.get("consulta", "").startswith("parseo_")), 6),
+        "kernel_ms": round(sum(e.get("kernel_ms", 0) for e in entries), 3),
+        "h2d_bytes": sum(e.get("h2d_bytes", 0) for e in entries),
+        "d2h_bytes": sum(e.get("d2h_bytes", 0) for e in entries),
+        "memoria_pico_bytes": max((e.get("memoria_pico_bytes", 0) for e in entries), default=0),
+        "memoria_gpu_pico_bytes": max((e.get("memoria_gpu_pico_bytes", 0) for e in entries),
+                                      default=0),
+    }
+
+
+def format_bytes(value: Optional[float]) -> str:
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
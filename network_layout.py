@@ -0,0 +1,266 @@
+"""
+Layout de grafos para la vista de red de los dashboards
+ForceAtlas2 vectorizado con NumPy; la repulsión usa una aproximación
+Barnes–Hut sobre una grilla jerárquica (O(n log n) por iteración).
+Los grafos grandes se agregan primero en super-nodos por comunidad
+(propagación de etiquetas de communities.py) para que el navegador
+dibuje pocos miles de nodos
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from communities import label_propagation
+
+# Nodos máximos que se dibujan; por encima se agrupan en comunidades
+MAX_NODES = 1500
+# Aristas máximas enviadas al navegador (las de mayor peso)
+MAX_EDGES = 5000
+LAYOUT_ITERATIONS = 150
+LEAF_SIZE = 4
+OTHER_LABEL = "Otros"
+
+# Grafos que se pueden armar desde get_parsed_data(): (clave, origen, destino)
+RESULT_GRAPHS = {
+    "Recomendaciones": ("recomendaciones", "recomienda", "recomendada"),
+    "Bloqueos": ("bloqueados", "usuario", "bloqueado"),
+}
+
+
+class NetworkGraph:
+    """
+    Grafo dirigido con pesos en formato de listas de aristas
+    size guarda cuántos nodos originales representa cada nodo (1 si no está agregado)
+    """
+
+    def __init__(self, names: np.ndarray, src: np.ndarray, dst: np.ndarray,
+                 weight: Optional[np.ndarray] = None, size: Optional[np.ndarray] = None):
+        self.names = names
+        self.src = src.astype(np.int64)
+        self.dst = dst.astype(np.int64)
+        self.weight = np.ones(len(src)) if weight is None else weight.astype(np.float64)
+        self.size = np.ones(len(names), dtype=np.int64) if size is None else size
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict], source: str, target: str) -> "NetworkGraph":
+        """Grafo a partir de pares de nombres (forma de get_parsed_data)"""
+        sources = [row[source] for row in records]
+        targets = [row[target] for row in records]
+        names, ids = np.unique(np.array(sources + targets, dtype=str), return_inverse=True)
+        return cls(names, ids[:len(sources)], ids[len(sources):])
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    def degree(self) -> np.ndarray:
+        return (np.bincount(self.src, self.weight, self.num_nodes)
+                + np.bincount(self.dst, self.weight, self.num_nodes))
+
+    def coarsen(self, labels: np.ndarray, max_nodes: int = MAX_NODES) -> "NetworkGraph":
+        """
+        Un super-nodo por etiqueta; las aristas entre grupos se suman en una
+        Si quedan más de max_nodes grupos, los más chicos se juntan en "Otros"
+        """
+        groups, labels = np.unique(labels, return_inverse=True)
+        sizes = np.bincount(labels, self.size)
+        if len(groups) > max_nodes:
+            keep = np.argsort(-sizes, kind="stable")[:max_nodes - 1]
+            remap = np.full(len(groups), max_nodes - 1)
+            remap[keep] = np.arange(len(keep))
+            labels = remap[labels]
+            sizes = np.bincount(labels, self.size, max_nodes)
+        count = len(sizes)
+        src, dst = labels[self.src], labels[self.dst]
+        keep_edges = src != dst
+        key = src[keep_edges] * count + dst[keep_edges]
+        pairs, inverse = np.unique(key, return_inverse=True)
+        weight = np.bincount(inverse, self.weight[keep_edges], len(pairs))
+        # Cada grupo se nombra por su primer miembro
+        first = np.full(count, -1)
+        first[labels[::-1]] = np.arange(len(labels))[::-1]
+        names = np.array([f"{self.names[first[g]]} (+{int(sizes[g]) - 1})" if sizes[g] > 1
+                          else str(self.names[first[g]]) for g in range(count)], dtype=object)
+        if len(groups) > max_nodes:
+            names[-1] = f"{OTHER_LABEL} ({int(sizes[-1])})"
+        return NetworkGraph(names, pairs // count, pairs % count, weight,
+                            sizes.astype(np.int64))
+
+
+# ============================================================================
+# FORCEATLAS2
+# ============================================================================
+
+def _cell_ids(unit: np.ndarray, cells: int) -> Tuple[np.ndarray, np.ndarray]:
+    coords = np.minimum((unit * cells).astype(np.int64), cells - 1)
+    return coords[:, 0], coords[:, 1]
+
+
+def repulsion(pos: np.ndarray, mass: np.ndarray, kr: float,
+              leaf_size: int = LEAF_SIZE) -> np.ndarray:
+    """
+    Repulsión kr·mi·mj/d de ForceAtlas2 con aproximación Barnes–Hut
+    Cada nivel de la grilla interactúa con el centro de masa de las celdas
+    no vecinas dentro de los vecinos de su celda padre; en el último nivel
+    los pares de celdas vecinas se calculan exactos
+    """
+    n = len(pos)
+    forces = np.zeros_like(pos)
+    if n < 2:
+        return forces
+    lo = pos.min(axis=0)
+    span = max(float(np.ptp(pos, axis=0).max()), 1e-9) * (1 + 1e-9)
+    unit = (pos - lo) / span
+    depth = max(2, min(12, math.ceil(math.log(max(n / leaf_size, 1), 4)) + 1))
+
+    for level in range(2, depth + 1):
+        cells = 2 ** level
+        cx, cy = _cell_ids(unit, cells)
+        cell = cx * cells + cy
+        cell_mass = np.bincount(cell, mass, cells * cells)
+        filled = cell_mass > 0
+        com = np.zeros((cells * cells, 2))
+        com[filled, 0] = np.bincount(cell, mass * pos[:, 0], cells * cells)[filled]
+        com[filled, 1] = np.bincount(cell, mass * pos[:, 1], cells * cells)[filled]
+        com[filled] /= cell_mass[filled, None]
+        base_x, base_y = 2 * (cx // 2), 2 * (cy // 2)
+        for ox in range(-2, 4):
+            tx = base_x + ox
+            for oy in range(-2, 4):
+                ty = base_y + oy
+                valid = ((tx >= 0) & (tx < cells) & (ty >= 0) & (ty < cells)
+                         & ((np.abs(tx - cx) > 1) | (np.abs(ty - cy) > 1)))
+                target = np.where(valid, tx * cells + ty, 0)
+                valid &= filled[target]
+                if not valid.any():
+                    continue
+                delta = pos[valid] - com[target[valid]]
+                dist2 = np.maximum((delta ** 2).sum(axis=1), 1e-9)
+                factor = kr * mass[valid] * cell_mass[target[valid]] / dist2
+                forces[valid] += delta * factor[:, None]
+
+    # Nivel más fino: pares exactos entre celdas vecinas
+    cells = 2 ** depth
+    cx, cy = _cell_ids(unit, cells)
+    cell = cx * cells + cy
+    order = np.argsort(cell, kind="stable")
+    counts = np.bincount(cell, minlength=cells * cells)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    nodes = np.arange(n)
+    for ox in (-1, 0, 1):
+        tx = cx + ox
+        for oy in (-1, 0, 1):
+            ty = cy + oy
+            inside = (tx >= 0) & (tx < cells) & (ty >= 0) & (ty < cells)
+            target = np.where(inside, tx * cells + ty, 0)
+            occupancy = np.where(inside, counts[target], 0)
+            for k in range(int(occupancy.max(initial=0))):
+                has = occupancy > k
+                i = nodes[has]
+                j = order[starts[target[has]] + k]
+                other = j != i
+                i, j = i[other], j[other]
+                delta = pos[i] - pos[j]
+                dist2 = np.maximum((delta ** 2).sum(axis=1), 1e-9)
+                forces[i] += delta * (kr * mass[i] * mass[j] / dist2)[:, None]
+    return forces
+
+
+def forceatlas2(graph: NetworkGraph, iterations: int = LAYOUT_ITERATIONS, seed: int = 0,
+                scaling: float = 2.0, gravity: float = 1.0,
+                tolerance: float = 1.0) -> np.ndarray:
+    """
+    Posiciones (n, 2) con ForceAtlas2: repulsión por grado, atracción lineal
+    en las aristas, gravedad hacia el centro y velocidad adaptativa (swing/traction)
+    """
+    n = graph.num_nodes
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(-1, 1, (n, 2)) * math.sqrt(max(n, 1))
+    if n < 2:
+        return pos
+    mass = graph.degree() + graph.size
+    speed = 1.0
+    previous = np.zeros_like(pos)
+    for _ in range(iterations):
+        forces = repulsion(pos, mass, scaling)
+        delta = pos[graph.src] - pos[graph.dst]
+        pull = delta * graph.weight[:, None]
+        for axis in (0, 1):
+            forces[:, axis] -= np.bincount(graph.src, pull[:, axis], n)
+            forces[:, axis] += np.bincount(graph.dst, pull[:, axis], n)
+        norm = np.maximum(np.sqrt((pos ** 2).sum(axis=1)), 1e-9)
+        forces -= pos * (gravity * mass / norm)[:, None]
+
+        swing = mass * np.sqrt(((forces - previous) ** 2).sum(axis=1))
+        traction = mass * np.sqrt(((forces + previous) ** 2).sum(axis=1)) / 2
+        target_speed = tolerance * traction.sum() / max(swing.sum(), 1e-9)
+        speed = min(target_speed, 1.5 * speed) if target_speed > 0 else speed
+        local = 0.1 * speed / (1 + speed * np.sqrt(swing))
+        magnitude = np.maximum(np.sqrt((forces ** 2).sum(axis=1)), 1e-9)
+        local = np.minimum(local, 10.0 / magnitude)
+        pos = pos + forces * local[:, None]
+        previous = forces
+    return pos
+
+
+# ============================================================================
+# VISTA
+# ============================================================================
+
+class NetworkLayout:
+    """
+    Grafo a dibujar (original o agregado) con sus coordenadas
+    groups asigna a cada nodo dibujado el color de su comunidad
+    """
+
+    def __init__(self, graph: NetworkGraph, positions: np.ndarray, groups: np.ndarray,
+                 num_communities: int, original_nodes: int, original_edges: int,
+                 aggregated: bool):
+        self.graph = graph
+        self.positions = positions
+        self.groups = groups
+        self.num_communities = num_communities
+        self.original_nodes = original_nodes
+        self.original_edges = original_edges
+        self.aggregated = aggregated
+
+    def edges(self, max_edges: int = MAX_EDGES) -> np.ndarray:
+        """Índices de las aristas a dibujar (las de mayor peso)"""
+        if self.graph.num_edges <= max_edges:
+            return np.arange(self.graph.num_edges)
+        return np.argsort(-self.graph.weight, kind="stable")[:max_edges]
+
+
+def compute_layout(graph: NetworkGraph, max_nodes: int = MAX_NODES,
+                   iterations: int = LAYOUT_ITERATIONS, seed: int = 0) -> NetworkLayout:
+    """
+    Layout listo para dibujar; se calcula una vez por dataset (memoizar el resultado)
+    """
+    communities = label_propagation(graph.num_nodes, graph.src, graph.dst, graph.weight,
+                                    seed=seed)
+    num_communities = len(np.unique(communities))
+    aggregated = graph.num_nodes > max_nodes
+    if aggregated:
+        shown = graph.coarsen(communities, max_nodes)
+        groups = np.arange(shown.num_nodes)
+    else:
+        shown, groups = graph, communities
+    positions = forceatlas2(shown, iterations=iterations, seed=seed)
+    return NetworkLayout(shown, positions, groups, num_communities, graph.num_nodes,
+                         graph.num_edges, aggregated)
+
+
+def layout_stats(layout: NetworkLayout) -> List[Tuple[str, str]]:
+    """Resumen para las métricas del dashboard"""
+    return [
+        ("Nodos", f"{layout.original_nodes:,}"),
+        ("Aristas", f"{layout.original_edges:,}"),
+        ("Comunidades", f"{layout.num_communities:,}"),
+        ("Nodos dibujados", f"{layout.graph.num_nodes:,}"),
+    ]
@@ -0,0 +1,772 @@
+"""
+Motor NumPy de la red social
+Implementa las queries de social_network.cu sobre un SocialDataset (sin GPU)
+y retorna los resultados con la misma forma que CUDASocialNetwork.get_parsed_data()
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from metrics import MetricsRecorder
+from string_pool import as_interned, as_list
+from profiling import HookRegistry, STAGE_COMPUTE, STAGE_LOAD, STAGE_SERIALIZE, hooks_from_env
+from time_index import DEFAULT_BUCKET, MAX_TIME, MIN_TIME, TimeIndex, Window, format_time
+from social_dataset import (
+    SocialDataset, load_dataset, PERSON, COMPANY, LIKE, DISLIKE,
+    POST_AUTHOR_ID, POST_AUTHOR_TYPE,
+    INTER_USER_TYPE, INTER_USER_ID, INTER_POST_ID, INTER_VALUE,
+)
+
+TOP_K = 5
+TOP_CASCADES = 10
+SEARCH_LIMIT = 20
+FEED_PAGE = 20
+TOP_HASHTAGS = 20
+# Posts por ventana en las tendencias de hashtags
+TREND_WINDOW = 10_000
+
+
+# ============================================================================
+# OPERACIONES VECTORIZADAS (reutilizadas por el motor particionado)
+# ============================================================================
+
+def count_targets(ids: np.ndarray, size: int, offset: int = 0) -> np.ndarray:
+    """Cuenta ocurrencias de cada id en [offset, offset + size)"""
+    ids = np.asarray(ids, dtype=np.int64) - offset
+    return np.bincount(ids, minlength=size)[:size]
+
+
+def count_reactions(interactions: np.ndarray, num_posts: int,
+                    offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Likes y dislikes por publicación para los posts [offset, offset + num_posts)"""
+    post_ids = interactions[:, INTER_POST_ID]
+    values = interactions[:, INTER_VALUE]
+    likes = count_targets(post_ids[values == LIKE], num_posts, offset)
+    dislikes = count_targets(post_ids[values == DISLIKE], num_posts, offset)
+    return likes, dislikes
+
+
+def hashtag_counts(hashtags: Sequence[str], offset: int = 0) -> Dict[str, List[int]]:
+    """
+    Conteo de hashtags no vacíos (bincount sobre los ids de la columna internada)
+    Returns: hashtag -> [cantidad, índice de primera aparición]
+    """
+    if not len(hashtags):
+        return {}
+    tags = as_interned(hashtags)
+    counts, first = tags.counts(), tags.first_rows()
+    return {
+        tag: [int(count), int(idx) + offset]
+        for tag, idx, count in zip(tags.values.to_list(), first.tolist(), counts.tolist())
+        if tag and count
+    }
+
+
+def merge_hashtag_counts(partials) -> Dict[str, List[int]]:
+    """Combina conteos parciales de hashtag_counts"""
+    merged: Dict[str, List[int]] = {}
+    for partial in partials:
+        for tag, (count, first) in partial.items():
+            if tag in merged:
+                merged[tag][0] += count
+                merged[tag][1] = min(merged[tag][1], first)
+            else:
+                merged[tag] = [count, first]
+    return merged
+
+
+def format_hashtags(counts: Dict[str, List[int]]) -> Dict:
+    """Convierte conteos de hashtags al formato de get_parsed_data()"""
+    # Orden de primera aparición, como query_hashtags en CUDA
+    ordered = sorted(counts.items(), key=lambda item: item[1][1])
+    conteo = [{"hashtag": tag, "cantidad": count} for tag, (count, _) in ordered]
+
+    mas_usado = None
+    for entry in conteo:
+        if mas_usado is None or entry["cantidad"] > mas_usado["cantidad"]:
+            mas_usado = entry
+    return {"mas_usado": dict(mas_usado) if mas_usado else None, "conteo": conteo}
+
+
+def top_k_indices(values: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """
+    Índices de los k valores mayores (o menores) sin ordenar todo el array
+    Empates: índice ascendente para los mayores, descendente para los menores,
+    de modo que ambos extremos coinciden con un único orden total
+    """
+    values = np.asarray(values)
+    n = len(values)
+    k = min(k, n)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if largest:
+        threshold = np.partition(values, n - k)[n - k]
+        strict = np.flatnonzero(values > threshold)
+        ties = np.flatnonzero(values == threshold)[:k - len(strict)]
+        candidates = np.concatenate([strict, ties])
+        order = np.lexsort((candidates, -values[candidates]))
+    else:
+        threshold = np.partition(values, k - 1)[k - 1]
+        strict = np.flatnonzero(values < threshold)
+        ties = np.flatnonzero(values == threshold)
+        ties = ties[len(ties) - (k - len(strict)):]
+        candidates = np.concatenate([strict, ties])
+        order = np.lexsort((-candidates, values[candidates]))
+    return candidates[order]
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """Valores únicos ordenados (sort + máscara, más rápido que np.unique en int64)"""
+    values = np.sort(values)
+    if len(values) == 0:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def group_by_source(edges: np.ndarray, num_sources: int) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR de una lista de aristas: (indptr, destinos ordenados por origen)"""
+    edges = np.asarray(edges)
+    order = np.argsort(edges[:, 0], kind='stable')
+    indptr = np.zeros(num_sources + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges[:, 0], minlength=num_sources)[:num_sources], out=indptr[1:])
+    return indptr, edges[order, 1]
+
+
+def gather_neighbors(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    """Concatena los vecinos CSR de varios nodos sin bucles en Python"""
+    nodes = np.asarray(nodes, dtype=np.int64)
+    starts, lengths = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+    total = int(lengths.sum())
+    if total == 0:
+        return indices[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[np.arange(total) + offsets]
+
+
+def sorted_edges(edges: np.ndarray) -> np.ndarray:
+    """Aristas ordenadas por (origen, destino)"""
+    edges = np.asarray(edges).reshape(-1, 2)
+    return edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+
+
+def edge_pairs(edges: np.ndarray, source_names: List[str], target_names: List[str],
+               source_key: str, target_key: str) -> List[Dict]:
+    """Lista de pares con nombres, ordenada por (origen, destino)"""
+    edges = sorted_edges(edges)
+    if len(edges) == 0:
+        return []
+    source_names, target_names = as_list(source_names), as_list(target_names)
+    return [
+        {source_key: source_names[src], target_key: target_names[dst]}
+        for src, dst in edges.tolist()
+    ]
+
+
+def reaction_lines(post_ids: Iterable[int], likes: Iterable[int], dislikes: Iterable[int],
+                   texts: Iterable[str]) -> List[str]:
+    """Líneas de la sección de reacciones (texts alineado con post_ids)"""
+    lines = []
+    for post, l, d, text in zip(post_ids, likes, dislikes, texts):
+        lines += ["", f"Post {post}: \"{text}\"", f"  Likes: {l} | Dislikes: {d}"]
+    return lines
+
+
+def format_output(data: Dict, num_persons: int, num_companies: int, num_posts: int,
+                  post_texts: Optional[List[str]] = None,
+                  reaction_blocks: Optional[Iterable[str]] = None) -> str:
+    """
+    Genera un reporte de texto con el formato de salida de social_network.cu
+    reaction_blocks: la sección de reacciones ya armada por partes (líneas de
+    reaction_lines unidas con saltos de línea, p. ej. una por shard); si no
+    se pasa se arma con data["reacciones"] y post_texts
+    """
+    lines = [
+        "========================================",
+        "  RED SOCIAL CON CUDA",
+        "========================================",
+        "",
+        "Datos cargados:",
+        f"  - {num_persons} personas",
+        f"  - {num_companies} empresas",
+        f"  - {num_posts} publicaciones",
+        "",
+        "========== CANTIDAD DE SEGUIDORES ==========",
+        "",
+        "--- Personas ---",
+    ]
+    lines += [f"{p['nombre']}: {p['seguidores']} seguidores" for p in data["seguidores"]["personas"]]
+    lines += ["", "--- Empresas ---"]
+    lines += [f"{e['nombre']}: {e['seguidores']} seguidores" for e in data["seguidores"]["empresas"]]
+
+    lines += ["", "========== REACCIONES POR PUBLICACION =========="]
+    if reaction_blocks is not None:
+        lines += [block for block in reaction_blocks if block]
+    else:
+        reactions = data["reacciones"]
+        lines += reaction_lines(
+            (r["post_id"] for r in reactions), (r["likes"] for r in reactions),
+            (r["dislikes"] for r in reactions),
+            (post_texts[r["post_id"]] if post_texts is not None else "" for r in reactions))
+
+    lines += ["", "========== TOP 5 PUBLICACIONES ==========", "", "--- Top 5 con MAS likes ---"]
+    lines += [f"{i}. \"{p['texto']}\" - {p['likes']} likes"
+              for i, p in enumerate(data["top_posts"]["mas_likes"], 1)]
+    lines += ["", "--- Top 5 con MENOS likes ---"]
+    lines += [f"{i}. \"{p['texto']}\" - {p['likes']} likes"
+              for i, p in enumerate(data["top_posts"]["menos_likes"], 1)]
+
+    lines += ["", "========== SEGUIDORES BLOQUEADOS ==========", ""]
+    current = None
+    for b in data["bloqueados"]:
+        if b["usuario"] != current:
+            current = b["usuario"]
+            lines.append(f"{current} ha bloqueado a:")
+        lines.append(f"  - {b['bloqueado']}")
+
+    lines += ["", "========== RECOMENDACIONES DE EMPRESAS ==========", ""]
+    lines += [f"{r['recomienda']} recomienda a: {r['recomendada']}" for r in data["recomendaciones"]]
+
+    lines += ["", "========== ANALISIS DE HASHTAGS =========="]
+    if data["hashtags"]["mas_usado"]:
+        top = data["hashtags"]["mas_usado"]
+        lines += ["", f"Hashtag mas usado: {top['hashtag']} ({top['cantidad']} publicaciones)"]
+    lines += ["", "Todos los hashtags:"]
+    lines += [f"  {h['hashtag']}: {h['cantidad']} publicaciones" for h in data["hashtags"]["conteo"]]
+
+    lines += ["", "========================================",
+              "  FIN DE CONSULTAS",
+              "========================================", ""]
+    return "\n".join(lines)
+
+
+# ============================================================================
+# MOTOR EN MEMORIA
+# ============================================================================
+
+class NumpySocialNetwork:
+    """Ejecuta las queries de social_network.cu con NumPy sobre un SocialDataset"""
+
+    def __init__(self, dataset: SocialDataset, metrics: Optional[MetricsRecorder] = None,
+                 hooks: Optional[HookRegistry] = None):
+        self.dataset = dataset
+        self.metrics = metrics or MetricsRecorder(backend="numpy")
+        # Hooks de profiling (por defecto los de SOCIAL_NETWORK_PROFILE)
+        self.hooks = hooks if hooks is not None else hooks_from_env()
+        self._reactions: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._communities = None
+        self._cascades = None
+        self._text_index = None
+        self._feed_index = None
+        self._hashtag_analytics = None
+        self._path_finders: Dict[bool, object] = {}
+        # Tabla -> (TimeIndex, filas en orden temporal); ver time_index()
+        self._time_indexes: Dict[str, Tuple[TimeIndex, np.ndarray]] = {}
+        self.time_bucket = DEFAULT_BUCKET
+
+    @classmethod
+    def from_path(cls, path, mmap: bool = True, metrics: Optional[MetricsRecorder] = None,
+                  hooks: Optional[HookRegistry] = None) -> "NumpySocialNetwork":
+        """Carga un dataset de disco (etapa "carga" de los hooks) y crea el motor"""
+        hooks = hooks if hooks is not None else hooks_from_env()
+        with hooks.stage(STAGE_LOAD, "load_dataset"):
+            dataset = load_dataset(path, mmap=mmap)
+        return cls(dataset, metrics, hooks)
+
+    # --- Ventanas de tiempo ----------------------------------------------
+
+    def time_index(self, table: str) -> Tuple[TimeIndex, np.ndarray]:
+        """
+        Índice temporal de "posts", "interactions" o una relación con sus filas
+        en orden temporal (para "posts", los ids); se arma una vez por tabla
+        """
+        if table not in self._time_indexes:
+            ds = self.dataset
+            times = ds.times(table)
+            if times is None:
+                raise ValueError(f"'{table}' no tiene marcas de tiempo en este dataset")
+            index = TimeIndex(times, self.time_bucket)
+            if table == "posts":
+                rows = index.rows((MIN_TIME, MAX_TIME))
+            elif table == "interactions":
+                rows = index.sort(ds.interactions)
+            else:
+                rows = index.sort(ds.relations[table])
+            self._time_indexes[table] = (index, rows)
+        return self._time_indexes[table]
+
+    def in_window(self, table: str, window: Window) -> np.ndarray:
+        """Filas de la tabla (ids para "posts") con marca en [desde, hasta)"""
+        index, rows = self.time_index(table)
+        lo, hi = index.span(window)
+        return rows[lo:hi]
+
+    def latest_time(self) -> Optional[int]:
+        """Marca más reciente (referencia de las ventanas relativas como -24h)"""
+        latest = [self.time_index(table)[0].latest for table in self.dataset.timed_tables()]
+        latest = [t for t in latest if t is not None]
+        return max(latest) if latest else None
+
+    def _edges(self, name: str, window: Optional[Window]) -> np.ndarray:
+        return self.dataset.relations[name] if window is None else self.in_window(name, window)
+
+    def _interactions(self, window: Optional[Window]) -> np.ndarray:
+        if window is None:
+            return self.dataset.interactions
+        return self.in_window("interactions", window)
+
+    # --- Seguidores -------------------------------------------------------
+
+    def person_follower_counts(self, window: Optional[Window] = None) -> np.ndarray:
+        ds = self.dataset
+        return count_targets(self._edges("person_follows_person", window)[:, 1], ds.num_persons)
+
+    def company_follower_counts(self, window: Optional[Window] = None) -> np.ndarray:
+        ds = self.dataset
+        return (count_targets(self._edges("person_follows_company", window)[:, 1], ds.num_companies)
+                + count_targets(self._edges("company_follows_company", window)[:, 1],
+                                ds.num_companies))
+
+    def query_followers(self, window: Optional[Window] = None) -> Dict[str, List[Dict]]:
+        """Seguidores por usuario; con window, los seguimientos de la ventana (nuevos)"""
+        ds = self.dataset
+        return {
+            "personas": [{"nombre": name, "seguidores": int(count)}
+                         for name, count in zip(ds.person_names, self.person_follower_counts(window))],
+            "empresas": [{"nombre": name, "seguidores": int(count)}
+                         for name, count in zip(ds.company_names,
+                                                self.company_follower_counts(window))],
+        }
+
+    # --- Reacciones -------------------------------------------------------
+
+    def reaction_counts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Likes y dislikes por post; se cuentan una vez (arrays de solo lectura)"""
+        if self._reactions is None:
+            likes, dislikes = count_reactions(self.dataset.interactions, self.dataset.num_posts)
+            likes.setflags(write=False)
+            dislikes.setflags(write=False)
+            self._reactions = (likes, dislikes)
+        return self._reactions
+
+    def query_post_reactions(self, window: Optional[Window] = None) -> List[Dict]:
+        """
+        Likes y dislikes por post; con window solo cuentan las reacciones de la
+        ventana y se listan solo los posts que recibieron alguna
+        """
+        if window is None:
+            likes, dislikes = self.reaction_counts()
+            return [{"post_id": i, "likes": l, "dislikes": d}
+                    for i, (l, d) in enumerate(zip(likes.tolist(), dislikes.tolist()))]
+        inter = self._interactions(window)
+        posts, inverse = np.unique(inter[:, INTER_POST_ID], return_inverse=True)
+        values = inter[:, INTER_VALUE]
+        likes = np.bincount(inverse, values == LIKE, len(posts)).astype(np.int64)
+        dislikes = np.bincount(inverse, values == DISLIKE, len(posts)).astype(np.int64)
+        return [{"post_id": p, "likes": l, "dislikes": d}
+                for p, l, d in zip(posts.tolist(), likes.tolist(), dislikes.tolist())]
+
+    def query_top_posts(self, k: int = TOP_K, window: Optional[Window] = None,
+                        exclude: Optional[np.ndarray] = None) -> Dict[str, List[Dict]]:
+        """
+        Posts con más y menos likes; con window, entre los publicados en la
+        ventana y contando los likes recibidos dentro de ella
+        exclude: máscara de posts a omitir (p. ej. eliminados)
+        """
+        texts = self.dataset.post_texts
+        if window is None:
+            likes, _ = self.reaction_counts()
+            posts = np.arange(len(likes))
+        else:
+            posts = np.sort(self.in_window("posts", window))
+            inter = self._interactions(window)
+            liked = np.sort(inter[inter[:, INTER_VALUE] == LIKE, INTER_POST_ID])
+            likes = (np.searchsorted(liked, posts, side='right')
+                     - np.searchsorted(liked, posts, side='left'))
+        if exclude is not None:
+            keep = ~np.asarray(exclude, dtype=bool)[posts]
+            posts, likes = posts[keep], likes[keep]
+        return {
+            "mas_likes": [{"texto": texts[posts[i]], "likes": int(likes[i])}
+                          for i in top_k_indices(likes, k, largest=True)],
+            "menos_likes": [{"texto": texts[posts[i]], "likes": int(likes[i])}
+                            for i in top_k_indices(likes, k, largest=False)],
+        }
+
+    # --- Cascadas de republicaciones --------------------------------------
+
+    def cascades(self):
+        """Bosque de republicaciones (CascadeForest, se calcula una vez)"""
+        if self._cascades is None:
+            from cascades import CascadeForest
+
+            likes, dislikes = self.reaction_counts()
+            self._cascades = CascadeForest.from_dataset(self.dataset, likes, dislikes)
+        return self._cascades
+
+    def query_cascades(self, k: int = TOP_CASCADES, by: str = "alcance") -> Dict:
+        """Totales y top-k de cascadas por alcance, likes sumados o profundidad"""
+        return self.cascades().summary(k, by)
+
+    def query_cascade(self, post_idx: int) -> Dict:
+        """Cascada de un post (original o republicación) con su amplitud por nivel"""
+        return self.cascades().record(post_idx, levels=True)
+
+    # --- Hashtags ---------------------------------------------------------
+
+    def query_hashtags(self, window: Optional[Window] = None) -> Dict:
+        """Conteo de hashtags; con window, de los posts publicados en la ventana"""
+        if window is None:
+            return format_hashtags(hashtag_counts(self.dataset.post_hashtags))
+        posts = np.sort(self.in_window("posts", window))
+        counts = hashtag_counts(as_interned(self.dataset.post_hashtags).take(posts))
+        return format_hashtags({tag: [count, int(posts[first])]
+                                for tag, (count, first) in counts.items()})
+
+    def query_posts_by_hashtag(self, hashtag: str) -> List[int]:
+        return self.dataset.post_hashtags.find(hashtag).tolist()
+
+    def query_users_by_hashtag(self, hashtag: str) -> Dict[str, List[str]]:
+        ds = self.dataset
+        posts = ds.posts[self.query_posts_by_hashtag(hashtag)]
+        authors = {}
+        for user_type, names in ((PERSON, ds.person_names), (COMPANY, ds.company_names)):
+            ids = np.unique(posts[posts[:, POST_AUTHOR_TYPE] == user_type, POST_AUTHOR_ID])
+            authors[user_type] = [names[i] for i in ids]
+        return {"personas": authors[PERSON], "empresas": authors[COMPANY]}
+
+    def hashtag_analytics(self):
+        """Incidencia post × hashtag con varios hashtags por post (se arma una vez)"""
+        if self._hashtag_analytics is None:
+            from hashtag_analytics import HashtagAnalytics
+
+            likes, dislikes = self.reaction_counts()
+            self._hashtag_analytics = HashtagAnalytics.from_dataset(self.dataset, likes, dislikes)
+        return self._hashtag_analytics
+
+    def query_hashtag_analytics(self, k: int = TOP_HASHTAGS, window: int = TREND_WINDOW) -> Dict:
+        """Co-ocurrencias, interacción por hashtag y tendencias por ventana de posts"""
+        return self.hashtag_analytics().summary(k, window)
+
+    # --- Búsqueda de texto ------------------------------------------------
+
+    def text_index(self):
+        """Índice invertido de los textos de los posts (TextIndex, se arma una vez)"""
+        if self._text_index is None:
+            from text_index import TextIndex
+
+            self._text_index = TextIndex.from_texts(self.dataset.post_texts)
+        return self._text_index
+
+    def post_author(self, post_idx: int) -> Tuple[str, str]:
+        """(nombre, "persona" | "empresa") del autor de un post"""
+        ds = self.dataset
+        author = int(ds.posts[post_idx, POST_AUTHOR_ID])
+        if ds.posts[post_idx, POST_AUTHOR_TYPE] == COMPANY:
+            return ds.company_names[author], "empresa"
+        return ds.person_names[author], "persona"
+
+    def query_search(self, query: str, k: int = SEARCH_LIMIT) -> Dict:
+        """
+        Posts que cumplen la consulta (palabras, OR, "frases") ordenados por
+        BM25, con autor y reacciones
+        """
+        from text_index import search_results
+
+        likes, dislikes = self.reaction_counts()
+        return search_results(self.text_index(), query, k, self.dataset.post_texts,
+                              self.post_author, likes, dislikes)
+
+    # --- Feeds ------------------------------------------------------------
+
+    def feed_index(self, workers: int = 1):
+        """Feeds materializados de todas las personas (FeedIndex, se arma una vez)"""
+        if self._feed_index is None:
+            from feeds import FeedIndex
+
+            self._feed_index = FeedIndex.build(self.dataset, workers)
+        return self._feed_index
+
+    def query_feed(self, person_idx: int, limit: int = FEED_PAGE,
+                   before: Optional[int] = None) -> Dict:
+        """
+        Página del feed de una persona, del post más nuevo al más viejo;
+        "siguiente" es el cursor (before) de la página que sigue
+        """
+        posts = self.feed_index().page(person_idx, limit, before).tolist()
+        ds = self.dataset
+        likes, dislikes = self.reaction_counts()
+        records = []
+        for post in posts:
+            name, kind = self.post_author(post)
+            records.append({"post_id": post, "texto": ds.post_texts[post], "autor": name,
+                            "tipo_autor": kind, "likes": int(likes[post]),
+                            "dislikes": int(dislikes[post])})
+        return {"persona": ds.person_names[person_idx], "posts": records,
+                "siguiente": posts[-1] if len(posts) == limit else None}
+
+    # --- Bloqueos y recomendaciones --------------------------------------
+
+    def query_blocked_followers(self) -> List[Dict]:
+        ds = self.dataset
+        return (edge_pairs(ds.relations["person_blocks_person"], ds.person_names,
+                           ds.person_names, "usuario", "bloqueado")
+                + edge_pairs(ds.relations["company_blocks_person"], ds.company_names,
+                             ds.person_names, "usuario", "bloqueado"))
+
+    def query_company_recommendations(self) -> List[Dict]:
+        ds = self.dataset
+        return edge_pairs(ds.relations["company_recommends_company"], ds.company_names,
+                          ds.company_names, "recomienda", "recomendada")
+
+    def query_top_companies_by_recommendations(self) -> List[Dict]:
+        ds = self.dataset
+        counts = count_targets(ds.relations["company_recommends_company"][:, 1], ds.num_companies)
+        order = np.argsort(-counts, kind='stable')
+        return [{"nombre": ds.company_names[i], "recomendaciones": int(counts[i])} for i in order]
+
+    # --- Empresas y clientes ---------------------------------------------
+
+    def query_top_companies_by_likes(self) -> List[Dict]:
+        ds = self.dataset
+        likes, dislikes = self.reaction_counts()
+        company_posts = ds.posts[:, POST_AUTHOR_TYPE] == COMPANY
+        authors = ds.posts[company_posts, POST_AUTHOR_ID]
+        company_likes = np.bincount(authors, weights=likes[company_posts], minlength=ds.num_companies)
+        company_dislikes = np.bincount(authors, weights=dislikes[company_posts], minlength=ds.num_companies)
+        return [{"nombre": name, "likes": int(l), "dislikes": int(d)}
+                for name, l, d in zip(ds.company_names, company_likes, company_dislikes)]
+
+    def query_best_customers(self, window: Optional[Window] = None) -> Dict[str, List[Dict]]:
+        """
+        Clientes de cada empresa ordenados por likes a las publicaciones de esa
+        empresa (con window, solo los likes dados dentro de la ventana)
+        """
+        ds = self.dataset
+        inter = self._interactions(window)
+        inter = inter[(inter[:, INTER_USER_TYPE] == PERSON) & (inter[:, INTER_VALUE] == LIKE)]
+        posts = ds.posts[inter[:, INTER_POST_ID]]
+        is_company_post = posts[:, POST_AUTHOR_TYPE] == COMPANY
+
+        # Pares (persona, empresa) codificados como persona * num_empresas + empresa
+        nc = max(ds.num_companies, 1)
+        like_keys = (inter[is_company_post, INTER_USER_ID].astype(np.int64) * nc
+                     + posts[is_company_post, POST_AUTHOR_ID])
+        clients = ds.relations["person_is_client"]
+        client_keys = clients[:, 0].astype(np.int64) * nc + clients[:, 1]
+        like_keys = like_keys[np.isin(like_keys, client_keys)]
+        keys, counts = np.unique(like_keys, return_counts=True)
+
+        persons, companies = keys // nc, keys % nc
+        order = np.lexsort((persons, -counts, companies))
+        company_names = ds.company_names.to_list()
+        client_names = ds.person_names.take(persons[order]).to_list()
+        result = {name: [] for name in company_names}
+        for name, company, count in zip(client_names, companies[order].tolist(),
+                                        counts[order].tolist()):
+            result[company_names[company]].append({"nombre": name, "likes": count})
+        return result
+
+    # --- Visibilidad e influencia ----------------------------------------
+
+    def visible_persons(self, post_idx: int) -> np.ndarray:
+        """Personas que pueden ver un post (misma regla que check_visibility_kernel)"""
+        ds = self.dataset
+        if ds.posts[post_idx, POST_AUTHOR_TYPE] == COMPANY:
+            return np.arange(ds.num_persons)
+
+        author = ds.posts[post_idx, POST_AUTHOR_ID]
+        follows = ds.relations["person_follows_person"]
+        blocks = ds.relations["person_blocks_person"]
+
+        followers = follows[follows[:, 1] == author, 0]
+        blocked = blocks[blocks[:, 0] == author, 1]
+        direct = followers[~np.isin(followers, blocked)]
+        second = follows[np.isin(follows[:, 1], direct), 0]
+        return np.union1d(np.union1d(direct, second), [author]).astype(np.int64)
+
+    def query_visibility(self, post_idx: int) -> List[str]:
+        return self.dataset.person_names.take(self.visible_persons(post_idx)).to_list()
+
+    def influence_levels(self, person_idx: int, degree: int) -> List[np.ndarray]:
+        """BFS por niveles sobre los seguidores (como query_influence_network)"""
+        ds = self.dataset
+        follows = ds.relations["person_follows_person"]
+        # Agrupar por seguido: indptr[p]..indptr[p+1] son los seguidores de p
+        indptr, followers = group_by_source(follows[:, ::-1], ds.num_persons)
+
+        visited = np.zeros(ds.num_persons, dtype=bool)
+        visited[person_idx] = True
+        frontier = np.array([person_idx], dtype=np.int64)
+        levels = []
+        for _ in range(degree):
+            candidates = gather_neighbors(indptr, followers, frontier)
+            frontier = sorted_unique(candidates[~visited[candidates]])
+            if len(frontier) == 0:
+                break
+            visited[frontier] = True
+            levels.append(frontier)
+        return levels
+
+    def query_influence_network(self, person_idx: int, degree: int) -> List[List[str]]:
+        names = self.dataset.person_names
+        return [names.take(level).to_list() for level in self.influence_levels(person_idx, degree)]
+
+    # --- Caminos mínimos -------------------------------------------------
+
+    def path_finder(self, exclude_blocked: bool = False):
+        """PathFinder sobre personas y empresas (se arma una vez por variante)"""
+        if exclude_blocked not in self._path_finders:
+            from paths import PathFinder
+
+            self._path_finders[exclude_blocked] = PathFinder.from_dataset(
+                self.dataset, exclude_blocked)
+        return self._path_finders[exclude_blocked]
+
+    def query_shortest_path(self, source: Tuple[int, int], target: Tuple[int, int],
+                            exclude_blocked: bool = False,
+                            max_hops: Optional[int] = None) -> Dict:
+        """Camino mínimo entre dos usuarios (tipo, índice) por aristas de seguimiento"""
+        return self.query_shortest_paths([(source, target)], exclude_blocked, max_hops)[0]
+
+    def query_shortest_paths(self, pairs: List[Tuple[Tuple[int, int], Tuple[int, int]]],
+                             exclude_blocked: bool = False, max_hops: Optional[int] = None,
+                             paths: bool = True) -> List[Dict]:
+        """
+        Grados de separación de muchos pares a la vez
+        Cada resultado: origen, destino, saltos (None sin camino) y camino
+        """
+        from paths import shortest_path_results
+
+        ds = self.dataset
+        return shortest_path_results(self.path_finder(exclude_blocked), ds.person_names,
+                                     ds.company_names, pairs, max_hops, paths)
+
+    # --- Comunidades -----------------------------------------------------
+
+    def communities(self):
+        """Componentes y comunidades del dataset (CommunityAnalysis, se calcula una vez)"""
+        if self._communities is None:
+            from communities import CommunityAnalysis
+
+            self._communities = CommunityAnalysis(self.dataset)
+        return self._communities
+
+    def query_communities(self) -> Dict:
+        return self.communities().summary()
+
+    # --- Resultado completo ----------------------------------------------
+
+    def get_parsed_data(self, include_communities: bool = False,
+                        window: Optional[Window] = None,
+                        include_analytics: bool = False) -> Optional[Dict]:
+        """
+        Retorna todos los resultados con la forma de CUDASocialNetwork.get_parsed_data()
+        include_communities agrega la clave "comunidades" (componentes y Louvain)
+        include_analytics agrega "cascadas" y "analitica_hashtags", que cubren
+        toda la historia: con window no se incluyen
+        window [desde, hasta) restringe seguidores, reacciones, top de posts y
+        hashtags a los eventos de la ventana y agrega la clave "ventana"
+        """
+        ds = self.dataset
+        queries = {
+            "seguidores": lambda: self.query_followers(window),
+            "reacciones": lambda: self.query_post_reactions(window),
+            "top_posts": lambda: self.query_top_posts(window=window),
+            "hashtags": lambda: self.query_hashtags(window),
+            "bloqueados": self.query_blocked_followers,
+            "recomendaciones": self.query_company_recommendations,
+        }
+        if include_analytics and window is None:
+            queries["cascadas"] = self.query_cascades
+            queries["analitica_hashtags"] = self.query_hashtag_analytics
+        if include_communities:
+            queries["comunidades"] = self.query_communities
+        self.metrics.reset()
+        data = {}
+        with self.hooks.query("get_parsed_data"):
+            for key, query in queries.items():
+                with self.metrics.measure(key), self.hooks.stage(STAGE_COMPUTE, key):
+                    data[key] = query()
+            with self.metrics.measure("formato_salida"), self.hooks.stage(STAGE_SERIALIZE):
+                data["output_raw"] = format_output(data, ds.num_persons, ds.num_companies,
+                                                   ds.num_posts, ds.post_texts)
+        if window is not None:
+            data["ventana"] = {"desde": format_time(window[0]), "hasta": format_time(window[1])}
+        if self.metrics.enabled:
+            data["metricas"] = self.metrics.to_list()
+        return data
+
+    def get_arrow_tables(self) -> Dict:
+        """
+        Resultados como tablas Arrow armadas desde las columnas del motor
+        (sin pasar por listas de dicts); requiere pyarrow
+        """
+        from results_arrow import columns_table, records_table
+
+        ds = self.dataset
+        with self.hooks.query("get_arrow_tables"):
+            with self.hooks.stage(STAGE_COMPUTE, "seguidores"):
+                tables = {
+                    "personas": columns_table("personas", {
+                        "nombre": ds.person_names, "seguidores": self.person_follower_counts()}),
+                    "empresas": columns_table("empresas", {
+                        "nombre": ds.company_names, "seguidores": self.company_follower_counts()}),
+                }
+            with self.hooks.stage(STAGE_COMPUTE, "reacciones"):
+                likes, dislikes = self.reaction_counts()
+                tables["reacciones"] = columns_table("reacciones", {
+                    "post_id": np.arange(ds.num_posts, dtype=np.int64),
+                    "likes": likes, "dislikes": dislikes})
+            with self.hooks.stage(STAGE_COMPUTE, "top_posts"):
+                for name, largest in (("top_mas_likes", True), ("top_menos_likes", False)):
+                    top = top_k_indices(likes, TOP_K, largest=largest)
+                    tables[name] = columns_table(name, {
+                        "texto": ds.post_texts.take(top), "likes": likes[top]})
+            with self.hooks.stage(STAGE_COMPUTE, "hashtags"):
+                tables["hashtags"] = records_table("hashtags", self.query_hashtags()["conteo"])
+            with self.hooks.stage(STAGE_COMPUTE, "bloqueados"):
+                person_names = np.asarray(ds.person_names.to_list(), dtype=object)
+                company_names = np.asarray(ds.company_names.to_list(), dtype=object)
+                blocked = [(sorted_edges(ds.relations["person_blocks_person"]), person_names),
+                           (sorted_edges(ds.relations["company_blocks_person"]), company_names)]
+                tables["bloqueados"] = columns_table("bloqueados", {
+                    "usuario": np.concatenate([names[e[:, 0]] for e, names in blocked]),
+                    "bloqueado": np.concatenate([person_names[e[:, 1]] for e, _ in blocked])})
+            with self.hooks.stage(STAGE_COMPUTE, "recomendaciones"):
+                edges = sorted_edges(ds.relations["company_recommends_company"])
+                tables["recomendaciones"] = columns_table("recomendaciones", {
+                    "recomienda": company_names[edges[:, 0]],
+                    "recomendada": company_names[edges[:, 1]]})
+        return tables
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from social_dataset import load_dataset, sample_dataset
+
+    from metrics import MetricsRecorder
+
+    from time_index import parse_window
+
+    # --from/--to: ventana de tiempo (segundos Unix, ISO 8601 o relativa como -24h)
+    argv, bounds = sys.argv[1:], {}
+    for flag in ("--from", "--to"):
+        if flag in argv:
+            i = argv.index(flag)
+            bounds[flag] = argv[i + 1]
+            del argv[i:i + 2]
+    args = [arg for arg in argv if arg not in ("--metrics", "--communities", "--analytics")]
+    dataset = load_dataset(args[0], mmap=True) if args else sample_dataset()
+    network = NumpySocialNetwork(dataset, MetricsRecorder("--metrics" in sys.argv, backend="numpy"))
+    window = None
+    if bounds:
+        window = parse_window(bounds.get("--from"), bounds.get("--to"), network.latest_time() or 0)
+    data = network.get_parsed_data(include_communities="--communities" in sys.argv, window=window,
+                                   include_analytics="--analytics" in sys.argv)
+    print(json.dumps(data, indent=2, ensure_ascii=False))
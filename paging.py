@@ -0,0 +1,272 @@
+"""
+Vistas paginadas para los dashboards
+Las tablas de resultados se guardan una vez como columnas NumPy y cada
+rerun de Streamlit solo filtra, ordena y materializa la página visible;
+la salida cruda se lee por ventanas de líneas en lugar de renderizarse entera
+"""
+
+import math
+import mmap
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PAGE_SIZES = (25, 50, 100, 250)
+WINDOW_LINES = 200
+MAX_CACHED_SELECTIONS = 8
+
+
+class PagedTable:
+    """
+    Tabla columnar con filtro, orden y paginación del lado del servidor
+    Los órdenes y filtros ya calculados se cachean por (columna, sentido/texto)
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("Todas las columnas deben tener el mismo largo")
+        self.columns = columns
+        self._orders: Dict[Tuple[str, bool], np.ndarray] = {}
+        self._lower: Dict[str, List[str]] = {}
+        self._masks: Dict[Tuple[str, str], np.ndarray] = {}
+        self._groups: Dict[Tuple[str, str], "PagedTable"] = {}
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict], columns: Optional[List[str]] = None,
+                     derive: Optional[Callable[[Dict[str, np.ndarray]], Dict]] = None
+                     ) -> "PagedTable":
+        """Convierte una lista de dicts (forma de get_parsed_data) a columnas"""
+        if hasattr(records, "to_columns"):
+            # ArrowRecords (results_arrow.py): columnas sin pasar por dicts
+            data = records.to_columns(columns)
+            columns = list(data)
+        else:
+            if columns is None:
+                columns = list(records[0]) if records else []
+            data = {name: np.array([row[name] for row in records]) for name in columns}
+        if derive is not None and len(records):
+            data.update(derive(data))
+        return cls(data)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @property
+    def column_names(self) -> List[str]:
+        return list(self.columns)
+
+    def is_text(self, column: str) -> bool:
+        return self.columns[column].dtype.kind in "UO"
+
+    def order(self, column: str, descending: bool = False) -> np.ndarray:
+        """Permutación que ordena la tabla por una columna (estable)"""
+        key = (column, descending)
+        if key not in self._orders:
+            values = self.columns[column]
+            if descending and not self.is_text(column):
+                order = np.argsort(-values.astype(np.float64), kind="stable")
+            else:
+                order = np.argsort(values, kind="stable")
+                if descending:
+                    order = order[::-1]
+            self._orders[key] = order
+        return self._orders[key]
+
+    def mask(self, column: str, text: str) -> np.ndarray:
+        """Filas cuya columna contiene text (sin distinguir mayúsculas)"""
+        text = text.lower()
+        key = (column, text)
+        if key not in self._masks:
+            if column not in self._lower:
+                self._lower[column] = [str(v).lower() for v in self.columns[column]]
+            lowered = self._lower[column]
+            if len(self._masks) >= MAX_CACHED_SELECTIONS:
+                self._masks.pop(next(iter(self._masks)))
+            self._masks[key] = np.fromiter((text in v for v in lowered), dtype=bool,
+                                           count=len(lowered))
+        return self._masks[key]
+
+    def select(self, filter_text: str = "", filter_column: Optional[str] = None,
+               sort_by: Optional[str] = None, descending: bool = False) -> np.ndarray:
+        """Índices de las filas que pasan el filtro, en el orden pedido"""
+        rows = self.order(sort_by, descending) if sort_by else np.arange(len(self))
+        if filter_text and filter_column:
+            rows = rows[self.mask(filter_column, filter_text)[rows]]
+        return rows
+
+    def page(self, page: int = 0, page_size: int = PAGE_SIZES[1],
+             **selection) -> Tuple[Dict[str, list], int]:
+        """
+        Materializa solo una página
+        Returns: (columnas de la página como listas, total de filas filtradas)
+        """
+        rows = self.select(**selection)
+        start = max(page, 0) * page_size
+        window = rows[start:start + page_size]
+        return {name: values[window].tolist() for name, values in self.columns.items()}, len(rows)
+
+    def top(self, column: str, k: int, descending: bool = True) -> Dict[str, list]:
+        """Las k primeras filas según una columna (para tarjetas y gráficos)"""
+        return self.page(0, k, sort_by=column, descending=descending)[0]
+
+    def group_count(self, column: str, count_name: str = "total") -> "PagedTable":
+        """Tabla (valor, cantidad de filas) agrupada por una columna (cacheada)"""
+        key = (column, count_name)
+        if key not in self._groups:
+            values, counts = np.unique(self.columns[column], return_counts=True)
+            self._groups[key] = PagedTable({column: values, count_name: counts})
+        return self._groups[key]
+
+
+def num_pages(total: int, page_size: int) -> int:
+    return max(1, math.ceil(total / page_size))
+
+
+class TextWindow:
+    """
+    Lector por ventanas de un texto grande (salida cruda del programa)
+    Indexa los saltos de línea una vez; cada lectura decodifica solo la ventana
+    """
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+        raw = np.frombuffer(buffer, dtype=np.uint8)
+        newlines = np.flatnonzero(raw == ord('\n'))
+        # starts[i]..starts[i+1] es la línea i (incluye el salto)
+        ends = newlines + 1
+        if len(raw) and (len(newlines) == 0 or newlines[-1] != len(raw) - 1):
+            ends = np.append(ends, len(raw))
+        self.starts = np.concatenate(([0], ends)).astype(np.int64)
+
+    @classmethod
+    def from_text(cls, text: str) -> "TextWindow":
+        return cls(text.encode('utf-8'))
+
+    @classmethod
+    def from_file(cls, path) -> "TextWindow":
+        """Mapea el archivo en memoria (no lo carga entero)"""
+        path = Path(path)
+        if path.stat().st_size == 0:
+            return cls(b"")
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    @property
+    def num_lines(self) -> int:
+        return len(self.starts) - 1
+
+    def lines(self, start: int, count: int = WINDOW_LINES) -> str:
+        start = min(max(start, 0), self.num_lines)
+        stop = min(start + count, self.num_lines)
+        chunk = self.buffer[int(self.starts[start]):int(self.starts[stop])]
+        return bytes(chunk).decode('utf-8', errors='replace')
+
+    def tail(self, count: int = WINDOW_LINES) -> str:
+        return self.lines(self.num_lines - count, count)
+
+    def find(self, text: str, limit: int = 100) -> List[int]:
+        """Números de línea (desde 0) que contienen text, hasta limit resultados"""
+        needle = text.encode('utf-8')
+        found = []
+        pos = self.buffer.find(needle)
+        while pos != -1 and len(found) < limit:
+            line = int(np.searchsorted(self.starts, pos, side='right')) - 1
+            found.append(line)
+            pos = self.buffer.find(needle, int(self.starts[line + 1]))
+        return found
+
+
+# ============================================================================
+# COMPONENTES STREAMLIT
+# ============================================================================
+
+def render_paged_table(table: PagedTable, key: str, sort_by: Optional[str] = None,
+                       descending: bool = True, filter_columns: Optional[List[str]] = None):
+    """
+    Controles de filtro/orden/página y la tabla de la página visible
+    Returns: DataFrame con las filas de la página (para graficar);
+    attrs['vista'] identifica la selección
+    """
+    import pandas as pd
+    import streamlit as st
+
+    columns = table.column_names
+    filter_columns = filter_columns or [c for c in columns if table.is_text(c)]
+
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+    with col1:
+        filter_text = st.text_input("🔍 Filtrar", key=f"{key}_filtro")
+    with col2:
+        filter_column = st.selectbox("Columna", filter_columns, key=f"{key}_col_filtro") \
+            if filter_columns else None
+    with col3:
+        sort_column = st.selectbox("Ordenar por", columns,
+                                   index=columns.index(sort_by) if sort_by in columns else 0,
+                                   key=f"{key}_orden")
+    with col4:
+        desc = st.checkbox("↓", value=descending, key=f"{key}_desc",
+                           help="Orden descendente")
+
+    page_size = st.session_state.get(f"{key}_tamano", PAGE_SIZES[1])
+    selection = dict(filter_text=filter_text, filter_column=filter_column,
+                     sort_by=sort_column, descending=desc)
+    total = len(table.select(**selection))
+    pages = num_pages(total, page_size)
+
+    # Un filtro nuevo puede dejar la página guardada fuera de rango
+    if st.session_state.get(f"{key}_pagina", 1) > pages:
+        st.session_state[f"{key}_pagina"] = pages
+
+    col1, col2, col3 = st.columns([1, 1, 3])
+    with col1:
+        page = st.number_input("Página", min_value=1, max_value=pages, step=1,
+                               key=f"{key}_pagina")
+    with col2:
+        st.selectbox("Filas", PAGE_SIZES, index=PAGE_SIZES.index(page_size),
+                     key=f"{key}_tamano")
+
+    rows, total = table.page(int(page) - 1, page_size, **selection)
+    page_df = pd.DataFrame(rows)
+    # Identifica la página visible (clave para memoizar sus gráficos)
+    page_df.attrs['vista'] = (key, filter_text, filter_column, sort_column, desc,
+                              int(page), page_size)
+    start = (int(page) - 1) * page_size
+    with col3:
+        st.caption(f"Filas {min(start + 1, total)}–{start + len(page_df)} de {total:,} "
+                   f"(página {int(page)} de {pages})")
+    st.dataframe(page_df, use_container_width=True, hide_index=True)
+    return page_df
+
+
+def render_text_window(window: TextWindow, key: str):
+    """Visor de la salida cruda por ventanas (final, desde una línea o búsqueda)"""
+    import streamlit as st
+
+    col1, col2, col3 = st.columns([2, 2, 3])
+    with col1:
+        mode = st.radio("Mostrar", ["Final", "Desde línea"], horizontal=True, key=f"{key}_modo")
+    with col2:
+        count = st.select_slider("Líneas", options=[50, 100, 200, 500, 1000],
+                                 value=WINDOW_LINES, key=f"{key}_lineas")
+    with col3:
+        search = st.text_input("🔍 Buscar texto", key=f"{key}_buscar")
+
+    start = max(window.num_lines - count, 0)
+    if search:
+        matches = window.find(search)
+        if matches:
+            st.caption(f"{len(matches)} coincidencias (máx. 100); primera en la línea "
+                       f"{matches[0] + 1}")
+            start = matches[0]
+        else:
+            st.caption("Sin coincidencias")
+    elif mode == "Desde línea":
+        start = int(st.number_input("Línea inicial", min_value=1,
+                                    max_value=max(window.num_lines, 1),
+                                    key=f"{key}_inicio")) - 1
+
+    st.caption(f"Líneas {start + 1}–{min(start + count, window.num_lines)} "
+               f"de {window.num_lines:,}")
+    st.code(window.lines(start, count), language='text')
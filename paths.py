@@ -0,0 +1,297 @@
+"""
+Caminos mínimos y grados de separación en el grafo de seguidores
+(personas y empresas en un solo espacio de ids, como communities.FollowGraph)
+
+- Consulta punto a punto: BFS bidireccional por niveles; se expande el lado
+  con menos aristas por recorrer y se corta en el primer nivel en que se cruzan
+- Lote: los pares que comparten origen se resuelven con un solo BFS hacia
+  adelante que termina al alcanzar todos sus destinos
+- Opcionalmente se descartan las aristas entre usuarios con un bloqueo en
+  cualquiera de los dos sentidos
+
+Los arrays de distancias se reservan una vez y después de cada consulta solo
+se limpian los nodos visitados: el costo es proporcional a lo explorado y no
+al tamaño del grafo (una instancia no se comparte entre hilos)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from communities import FollowGraph
+from numpy_engine import group_by_source, sorted_unique
+from social_dataset import COMPANY, PERSON, SocialDataset
+
+# Relaciones de bloqueo: (nombre, tipo del que bloquea, tipo del bloqueado)
+BLOCK_RELATIONS = (
+    ("person_blocks_person", PERSON, PERSON),
+    ("company_blocks_company", COMPANY, COMPANY),
+    ("company_blocks_person", COMPANY, PERSON),
+)
+# Orígenes con al menos estos destinos en un lote usan un solo BFS hacia adelante
+SHARED_SOURCE_MIN = 4
+USER_TYPES = {"persona": PERSON, "empresa": COMPANY}
+
+
+def parse_user(value: str) -> Tuple[int, int]:
+    """'persona:3' / 'empresa:5' -> (tipo, índice)"""
+    kind, _, index = value.partition(":")
+    if kind not in USER_TYPES or not index.isdigit():
+        raise ValueError(f"Usuario inválido '{value}': usar persona:<n> o empresa:<n>")
+    return USER_TYPES[kind], int(index)
+
+
+def format_path(finder: "PathFinder", person_names: Sequence[str], company_names: Sequence[str],
+                source: int, target: int, hops: int,
+                route: Optional[List[int]] = None) -> Dict:
+    """Resultado de un par con nombres (saltos None si no hay camino)"""
+    def describe(node: int) -> Dict[str, str]:
+        user_type, index = finder.user(node)
+        if user_type == COMPANY:
+            return {"nombre": company_names[index], "tipo": "empresa"}
+        return {"nombre": person_names[index], "tipo": "persona"}
+
+    return {"origen": describe(source)["nombre"], "destino": describe(target)["nombre"],
+            "saltos": hops if hops >= 0 else None,
+            "camino": [describe(node) for node in route] if route else []}
+
+
+def shortest_path_results(finder: "PathFinder", person_names: Sequence[str],
+                          company_names: Sequence[str],
+                          pairs: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]],
+                          max_hops: Optional[int] = None, paths: bool = True) -> List[Dict]:
+    """Pares ((tipo, índice), (tipo, índice)) resueltos en lote y con nombres"""
+    sources = [finder.node(*source) for source, _ in pairs]
+    targets = [finder.node(*target) for _, target in pairs]
+    hops, routes = finder.batch(sources, targets, max_hops, paths)
+    return [format_path(finder, person_names, company_names, source, target, h,
+                        routes[i] if paths else None)
+            for i, (source, target, h) in enumerate(zip(sources, targets, hops.tolist()))]
+
+
+def _blocked_keys(dataset: SocialDataset, num_persons: int, num_nodes: int) -> np.ndarray:
+    """Claves u * n + v de los pares con bloqueo, en ambos sentidos y ordenadas"""
+    parts = []
+    for name, src_type, dst_type in BLOCK_RELATIONS:
+        edges = dataset.relations[name].astype(np.int64).reshape(-1, 2)
+        src = edges[:, 0] + (num_persons if src_type == COMPANY else 0)
+        dst = edges[:, 1] + (num_persons if dst_type == COMPANY else 0)
+        parts += [src * num_nodes + dst, dst * num_nodes + src]
+    # person_blocked_by_company guarda (persona, empresa)
+    edges = dataset.relations["person_blocked_by_company"].astype(np.int64).reshape(-1, 2)
+    src, dst = edges[:, 0], edges[:, 1] + num_persons
+    parts += [src * num_nodes + dst, dst * num_nodes + src]
+    return sorted_unique(np.concatenate(parts))
+
+
+class PathFinder:
+    """Caminos mínimos (en saltos) sobre un FollowGraph dirigido"""
+
+    def __init__(self, graph: FollowGraph, blocked_keys: Optional[np.ndarray] = None):
+        self.graph = graph
+        n = graph.num_nodes
+        src = np.asarray(graph.src, dtype=np.int64)
+        dst = np.asarray(graph.dst, dtype=np.int64)
+        keep = src != dst
+        if blocked_keys is not None and len(blocked_keys):
+            keys = src * n + dst
+            position = np.minimum(np.searchsorted(blocked_keys, keys), len(blocked_keys) - 1)
+            keep &= blocked_keys[position] != keys
+        edges = np.stack([src[keep], dst[keep]], axis=1)
+        self.num_edges = len(edges)
+        # CSR hacia adelante (seguidos) y hacia atrás (seguidores)
+        self.out_ptr, self.out_idx = group_by_source(edges, n)
+        self.in_ptr, self.in_idx = group_by_source(edges[:, ::-1], n)
+
+        self._dist = (np.full(n, -1, dtype=np.int32), np.full(n, -1, dtype=np.int32))
+        self._parent = (np.full(n, -1, dtype=np.int64), np.full(n, -1, dtype=np.int64))
+
+    @classmethod
+    def from_dataset(cls, dataset: SocialDataset, exclude_blocked: bool = False) -> "PathFinder":
+        graph = FollowGraph.from_dataset(dataset)
+        blocked = (_blocked_keys(dataset, graph.num_persons, graph.num_nodes)
+                   if exclude_blocked else None)
+        return cls(graph, blocked)
+
+    # --- Ids ---------------------------------------------------------------
+
+    def node(self, user_type: int, index: int) -> int:
+        """Id global de una persona o empresa"""
+        g = self.graph
+        limit = g.num_companies if user_type == COMPANY else g.num_persons
+        if not 0 <= index < limit:
+            raise IndexError(f"Usuario fuera de rango: {index}")
+        return index + g.num_persons if user_type == COMPANY else index
+
+    def user(self, node: int) -> Tuple[int, int]:
+        """(tipo, índice) de un id global"""
+        persons = self.graph.num_persons
+        return (COMPANY, node - persons) if node >= persons else (PERSON, node)
+
+    # --- Expansión por niveles ---------------------------------------------
+
+    def _expand(self, side: int, frontier: np.ndarray, level: int) -> np.ndarray:
+        """Visita los vecinos nuevos de la frontera; devuelve la siguiente frontera"""
+        ptr, idx = (self.out_ptr, self.out_idx) if side == 0 else (self.in_ptr, self.in_idx)
+        dist, parent = self._dist[side], self._parent[side]
+        starts, lengths = ptr[frontier], ptr[frontier + 1] - ptr[frontier]
+        total = int(lengths.sum())
+        if total == 0:
+            return frontier[:0]
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        neighbors = idx[np.arange(total) + offsets]
+        parents = np.repeat(frontier, lengths)
+        new = dist[neighbors] < 0
+        neighbors, parents = neighbors[new], parents[new]
+        # Último padre de cada nodo repetido: cualquiera da un camino mínimo
+        parent[neighbors] = parents
+        neighbors = sorted_unique(neighbors)
+        dist[neighbors] = level
+        return neighbors
+
+    def _work(self, side: int, frontier: np.ndarray) -> int:
+        ptr = self.out_ptr if side == 0 else self.in_ptr
+        return int((ptr[frontier + 1] - ptr[frontier]).sum())
+
+    def _reset(self, visited: List[Tuple[int, np.ndarray]]):
+        for side, nodes in visited:
+            self._dist[side][nodes] = -1
+            self._parent[side][nodes] = -1
+
+    def _walk(self, side: int, node: int) -> List[int]:
+        """Nodos desde node hasta la raíz del lado indicado (sin incluir node)"""
+        parent = self._parent[side]
+        path = []
+        while parent[node] >= 0:
+            node = int(parent[node])
+            path.append(node)
+        return path
+
+    # --- Consultas ---------------------------------------------------------
+
+    def shortest_path(self, source: int, target: int,
+                      max_hops: Optional[int] = None) -> Optional[List[int]]:
+        """
+        Camino mínimo de source a target siguiendo "sigue a" (ids globales)
+        None si no hay camino (o si es más largo que max_hops)
+        """
+        if source == target:
+            return [source]
+        limit = max_hops if max_hops is not None else self.graph.num_nodes
+        frontiers = [np.array([source], dtype=np.int64), np.array([target], dtype=np.int64)]
+        depth = [0, 0]
+        visited = [(0, frontiers[0]), (1, frontiers[1])]
+        self._dist[0][source] = 0
+        self._dist[1][target] = 0
+        try:
+            while len(frontiers[0]) and len(frontiers[1]) and depth[0] + depth[1] < limit:
+                side = 0 if self._work(0, frontiers[0]) <= self._work(1, frontiers[1]) else 1
+                depth[side] += 1
+                frontiers[side] = self._expand(side, frontiers[side], depth[side])
+                visited.append((side, frontiers[side]))
+                meet = frontiers[side][self._dist[1 - side][frontiers[side]] >= 0]
+                if len(meet):
+                    # Entre los cruces, el más cercano al otro extremo
+                    middle = int(meet[np.argmin(self._dist[1 - side][meet])])
+                    return self._walk(0, middle)[::-1] + [middle] + self._walk(1, middle)
+            return None
+        finally:
+            self._reset(visited)
+
+    def distances_from(self, source: int, targets: np.ndarray,
+                       max_hops: Optional[int] = None, paths: bool = True
+                       ) -> Tuple[np.ndarray, Optional[List[Optional[List[int]]]]]:
+        """
+        BFS hacia adelante desde source que termina al alcanzar todos los targets
+        Returns: (saltos por target, -1 si no se alcanza; caminos si paths)
+        """
+        targets = np.asarray(targets, dtype=np.int64)
+        limit = max_hops if max_hops is not None else self.graph.num_nodes
+        dist = self._dist[0]
+        frontier = np.array([source], dtype=np.int64)
+        dist[source] = 0
+        visited = [(0, frontier)]
+        pending = int((dist[targets] < 0).sum())
+        level = 0
+        try:
+            while pending and len(frontier) and level < limit:
+                level += 1
+                frontier = self._expand(0, frontier, level)
+                visited.append((0, frontier))
+                pending = int((dist[targets] < 0).sum())
+            hops = dist[targets].astype(np.int64)
+            routes = None
+            if paths:
+                routes = [self._walk(0, t)[::-1] + [t] if h >= 0 else None
+                          for t, h in zip(targets.tolist(), hops.tolist())]
+            return hops, routes
+        finally:
+            self._reset(visited)
+
+    def batch(self, sources: Sequence[int], targets: Sequence[int],
+              max_hops: Optional[int] = None, paths: bool = True
+              ) -> Tuple[np.ndarray, Optional[List[Optional[List[int]]]]]:
+        """
+        Muchos pares a la vez: los orígenes repetidos comparten un BFS y el
+        resto usa el bidireccional
+        Returns: (saltos por par, -1 si no hay camino; caminos si paths)
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        hops = np.full(len(sources), -1, dtype=np.int64)
+        routes: Optional[List[Optional[List[int]]]] = [None] * len(sources) if paths else None
+        if len(sources) == 0:
+            return hops, routes
+        order = np.argsort(sources, kind="stable")
+        bounds = np.flatnonzero(np.diff(sources[order])) + 1
+        for group in np.split(order, bounds):
+            source = int(sources[group[0]])
+            if len(group) >= SHARED_SOURCE_MIN:
+                group_hops, group_routes = self.distances_from(source, targets[group],
+                                                               max_hops, paths)
+                hops[group] = group_hops
+                if paths:
+                    for i, route in zip(group.tolist(), group_routes):
+                        routes[i] = route
+                continue
+            for i in group.tolist():
+                route = self.shortest_path(source, int(targets[i]), max_hops)
+                if route is not None:
+                    hops[i] = len(route) - 1
+                    if paths:
+                        routes[i] = route
+        return hops, routes
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from numpy_engine import NumpySocialNetwork
+    from social_dataset import load_dataset, sample_dataset
+
+    parser = argparse.ArgumentParser(description="Grados de separación entre usuarios")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("--pair", nargs=2, action="append", default=[],
+                        metavar=("ORIGEN", "DESTINO"), help="Par persona:<n> empresa:<n>")
+    parser.add_argument("--pairs-file",
+                        help="Archivo con un par por línea: 'persona:1 empresa:3'")
+    parser.add_argument("--exclude-blocked", action="store_true",
+                        help="No pasar por aristas entre usuarios con bloqueo")
+    parser.add_argument("--max-hops", type=int)
+    parser.add_argument("--hops-only", action="store_true", help="Sin reconstruir caminos")
+    args = parser.parse_args()
+
+    pairs = [tuple(pair) for pair in args.pair]
+    if args.pairs_file:
+        with open(args.pairs_file, "r", encoding="utf-8") as f:
+            pairs += [tuple(line.split()) for line in f if line.strip()]
+    if not pairs:
+        parser.error("Indicar al menos un par con --pair o --pairs-file")
+
+    dataset = load_dataset(args.dataset, mmap=True) if args.dataset else sample_dataset()
+    engine = NumpySocialNetwork(dataset)
+    results = engine.query_shortest_paths(
+        [(parse_user(source), parse_user(target)) for source, target in pairs],
+        args.exclude_blocked, args.max_hops, paths=not args.hops_only)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
@@ -0,0 +1,429 @@
+"""
+Hooks de profiling para el wrapper CUDA y los motores
+Permite registrar callbacks antes/después de cada consulta y de cada etapa
+(carga, cálculo, serialización, parseo) e incluye adaptadores para cProfile,
+tracemalloc y un profiler por muestreo de pilas (exporta pstats y speedscope)
+
+Sin editar código:
+    python profiling.py numpy datos/ --profiler sampling --output perfil.speedscope.json
+    SOCIAL_NETWORK_PROFILE=cprofile:perfil.prof streamlit run app.py
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, List, Optional, Tuple
+
+from metrics import TRACER
+
+# Etapas de una consulta
+STAGE_LOAD = "carga"
+STAGE_COMPUTE = "calculo"
+STAGE_SERIALIZE = "serializacion"
+STAGE_PARSE = "parseo"
+STAGES = (STAGE_LOAD, STAGE_COMPUTE, STAGE_SERIALIZE, STAGE_PARSE)
+
+EVENTS = ("before_query", "after_query", "before_stage", "after_stage")
+
+# <profiler>:<archivo>, p. ej. "sampling:perfil.speedscope.json"
+PROFILE_ENV = "SOCIAL_NETWORK_PROFILE"
+
+_DISABLED = nullcontext()
+
+
+class ProfilerHook:
+    """
+    Interfaz de un hook: todos los métodos son opcionales (no-op por defecto)
+    query es el nombre de la consulta en curso (p. ej. "get_parsed_data")
+    """
+
+    def before_query(self, query: str):
+        pass
+
+    def after_query(self, query: str, seconds: float):
+        pass
+
+    def before_stage(self, stage: str, query: Optional[str]):
+        pass
+
+    def after_stage(self, stage: str, query: Optional[str], seconds: float):
+        pass
+
+    def dump(self, path):
+        """Guarda el resultado acumulado del profiler"""
+        pass
+
+
+class _CallbackHook(ProfilerHook):
+    """Adapta una función suelta a un evento"""
+
+    def __init__(self, event: str, callback: Callable):
+        self.event = event
+        self.callback = callback
+        setattr(self, event, callback)
+
+
+class HookRegistry:
+    """
+    Hooks registrados en un wrapper o motor
+
+    Sin hooks, query() y stage() devuelven un contexto vacío compartido,
+    así que instrumentar una ruta no agrega costo cuando nadie escucha
+    """
+
+    def __init__(self, hooks: Optional[List[ProfilerHook]] = None):
+        self.hooks: List[ProfilerHook] = list(hooks or [])
+        self._queries: List[str] = []
+
+    def __bool__(self):
+        return bool(self.hooks)
+
+    def register(self, hook: ProfilerHook) -> ProfilerHook:
+        self.hooks.append(hook)
+        return hook
+
+    def unregister(self, hook: ProfilerHook):
+        self.hooks = [h for h in self.hooks
+                      if h is not hook and getattr(h, "callback", None) is not hook]
+
+    def add_callback(self, event: str, callback: Callable) -> ProfilerHook:
+        """Registra una función para un evento de EVENTS"""
+        if event not in EVENTS:
+            raise ValueError(f"Evento desconocido: {event} (válidos: {', '.join(EVENTS)})")
+        return self.register(_CallbackHook(event, callback))
+
+    def query(self, name: str):
+        """Contexto de una consulta completa (dispara before/after_query)"""
+        if not self.hooks:
+            return _DISABLED
+        return self._query(name)
+
+    def stage(self, stage: str, query: Optional[str] = None):
+        """Contexto de una etapa (dispara before/after_stage)"""
+        if not self.hooks:
+            return _DISABLED
+        return self._stage(stage, query)
+
+    @contextmanager
+    def _query(self, name: str):
+        hooks = list(self.hooks)
+        for hook in hooks:
+            hook.before_query(name)
+        self._queries.append(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._queries.pop()
+            for hook in reversed(hooks):
+                hook.after_query(name, elapsed)
+
+    @contextmanager
+    def _stage(self, stage: str, query: Optional[str]):
+        if query is None and self._queries:
+            query = self._queries[-1]
+        hooks = list(self.hooks)
+        for hook in hooks:
+            hook.before_stage(stage, query)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            for hook in reversed(hooks):
+                hook.after_stage(stage, query, elapsed)
+
+
+# ============================================================================
+# ADAPTADORES
+# ============================================================================
+
+class StageTimer(ProfilerHook):
+    """Acumula segundos por (consulta, etapa); útil como callback de log"""
+
+    def __init__(self):
+        self.totals: Dict[Tuple[Optional[str], str], float] = {}
+
+    def after_stage(self, stage: str, query: Optional[str], seconds: float):
+        key = (query, stage)
+        self.totals[key] = self.totals.get(key, 0.0) + seconds
+
+    def dump(self, path):
+        rows = [{"consulta": q, "etapa": s, "segundos": round(t, 6)}
+                for (q, s), t in self.totals.items()]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+class CProfileHook(ProfilerHook):
+    """cProfile activo durante cada consulta; dump() escribe un archivo pstats"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self._depth = 0
+
+    def before_query(self, query: str):
+        if self._depth == 0:
+            self.profile.enable()
+        self._depth += 1
+
+    def after_query(self, query: str, seconds: float):
+        self._depth -= 1
+        if self._depth == 0:
+            self.profile.disable()
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profile)
+
+    def dump(self, path):
+        self.profile.dump_stats(str(path))
+
+
+class TracemallocHook(ProfilerHook):
+    """
+    tracemalloc durante cada consulta; guarda la foto al terminar
+    dump() escribe el pico y las líneas con más memoria viva en esa foto
+    """
+
+    def __init__(self, top: int = 25, frames: int = 1):
+        self.top = top
+        self.frames = frames
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak = 0
+        self._depth = 0
+
+    def before_query(self, query: str):
+        if self._depth == 0:
+            TRACER.start(self, self.frames)
+        self._depth += 1
+
+    def after_query(self, query: str, seconds: float):
+        self._depth -= 1
+        if self._depth:
+            return
+        self.snapshot = tracemalloc.take_snapshot()
+        TRACER.stop(self)
+
+    def top_lines(self) -> List[tracemalloc.Statistic]:
+        if self.snapshot is None:
+            return []
+        snapshot = self.snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ])
+        return snapshot.statistics("lineno")[:self.top]
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"Pico de memoria trazada: {self.peak / 1024:.1f} KB\n\n")
+            for stat in self.top_lines():
+                f.write(f"{stat}\n")
+
+
+class SamplingProfiler(ProfilerHook):
+    """
+    Profiler por muestreo: un hilo lee la pila del hilo que ejecuta la
+    consulta cada `interval` segundos (sin instrumentar cada llamada)
+    dump() escribe un perfil speedscope (.speedscope.json) o, con extensión
+    .txt/.folded, pilas colapsadas para flamegraph.pl
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.frames: List[Tuple[str, str, int]] = []
+        self._frame_ids: Dict[Tuple[str, str, int], int] = {}
+        self.samples: List[List[int]] = []
+        self.elapsed = 0.0
+        self._depth = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _frame_id(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        frame_id = self._frame_ids.get(key)
+        if frame_id is None:
+            frame_id = self._frame_ids[key] = len(self.frames)
+            self.frames.append(key)
+        return frame_id
+
+    def _sample(self, target: int):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_id(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.samples.append(stack[::-1])   # de la raíz a la hoja
+
+    def before_query(self, query: str):
+        self._depth += 1
+        if self._depth > 1:
+            return
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample, args=(threading.get_ident(),),
+                                        daemon=True)
+        self._thread.start()
+
+    def after_query(self, query: str, seconds: float):
+        self._depth -= 1
+        if self._depth:
+            return
+        self._stop.set()
+        self._thread.join()
+        self.elapsed += time.perf_counter() - self._started
+
+    def folded(self) -> Dict[str, int]:
+        """Pilas colapsadas "a;b;c" -> número de muestras"""
+        counts: Dict[str, int] = {}
+        for stack in self.samples:
+            key = ";".join(self.frames[i][0] for i in stack)
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def to_speedscope(self, name: str = "red_social") -> Dict:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": [{"name": n, "file": f, "line": line}
+                                  for n, f, line in self.frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(self.elapsed, 6),
+                "samples": self.samples,
+                "weights": [self.interval] * len(self.samples),
+            }],
+            "name": name,
+            "exporter": "red_social_cuda profiling.py",
+        }
+
+    def dump(self, path):
+        path = str(path)
+        with open(path, 'w', encoding='utf-8') as f:
+            if path.endswith((".txt", ".folded")):
+                for stack, count in sorted(self.folded().items()):
+                    f.write(f"{stack} {count}\n")
+            else:
+                json.dump(self.to_speedscope(), f)
+
+
+PROFILERS = {
+    "cprofile": CProfileHook,
+    "tracemalloc": TracemallocHook,
+    "sampling": SamplingProfiler,
+    "etapas": StageTimer,
+}
+
+DEFAULT_OUTPUTS = {
+    "cprofile": "perfil.prof",
+    "tracemalloc": "perfil_memoria.txt",
+    "sampling": "perfil.speedscope.json",
+    "etapas": "perfil_etapas.json",
+}
+
+
+def create_profiler(name: str) -> ProfilerHook:
+    if name not in PROFILERS:
+        raise ValueError(f"Profiler desconocido: {name} (válidos: {', '.join(PROFILERS)})")
+    return PROFILERS[name]()
+
+
+@contextmanager
+def profile(target, profiler: str = "cprofile", output: Optional[str] = None):
+    """
+    Registra un profiler en un wrapper/motor (cualquier objeto con .hooks)
+    mientras dura el bloque y lo vuelca a `output` al salir
+
+    with profile(network, "sampling", "perfil.speedscope.json") as hook:
+        network.get_parsed_data()
+    """
+    hook = create_profiler(profiler)
+    target.hooks.register(hook)
+    try:
+        yield hook
+    finally:
+        target.hooks.unregister(hook)
+        hook.dump(output or DEFAULT_OUTPUTS[profiler])
+
+
+def hooks_from_env() -> HookRegistry:
+    """
+    Registro de hooks según SOCIAL_NETWORK_PROFILE="<profiler>[:<archivo>]"
+    El perfil se vuelca después de cada consulta para no depender del cierre
+    """
+    registry = HookRegistry()
+    spec = os.environ.get(PROFILE_ENV)
+    if not spec:
+        return registry
+
+    name, _, output = spec.partition(":")
+    hook = create_profiler(name)
+    output = output or DEFAULT_OUTPUTS[name]
+
+    def dump_outermost(query, seconds):
+        if not registry._queries:
+            hook.dump(output)
+
+    # after_query corre en orden inverso: el hook se cierra antes del volcado
+    registry.add_callback("after_query", dump_outermost)
+    registry.register(hook)
+    return registry
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from cuda_wrapper import CUDASocialNetwork
+    from numpy_engine import NumpySocialNetwork
+    from social_dataset import sample_dataset
+
+    parser = argparse.ArgumentParser(description="Perfila get_parsed_data() sin editar código")
+    parser.add_argument("backend", choices=["numpy", "cuda"])
+    parser.add_argument("dataset", nargs="?", help="Directorio de dataset (backend numpy)")
+    parser.add_argument("--profiler", choices=list(PROFILERS), default="cprofile")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--interval", type=float, default=0.005,
+                        help="Intervalo de muestreo en segundos (profiler sampling)")
+    parser.add_argument("--top", type=int, default=20, help="Filas del resumen en consola")
+    args = parser.parse_args()
+
+    hook = create_profiler(args.profiler)
+    if isinstance(hook, SamplingProfiler):
+        hook.interval = args.interval
+    hooks = HookRegistry([hook])
+    output = args.output or DEFAULT_OUTPUTS[args.profiler]
+
+    # La consulta externa cubre también la carga del dataset
+    with hooks.query("perfil"):
+        if args.backend == "cuda":
+            network = CUDASocialNetwork(hooks=hooks)
+        elif args.dataset:
+            network = NumpySocialNetwork.from_path(args.dataset, hooks=hooks)
+        else:
+            network = NumpySocialNetwork(sample_dataset(), hooks=hooks)
+        data = network.get_parsed_data()
+    hook.dump(output)
+
+    if data is None:
+        print("La ejecución falló")
+        sys.exit(1)
+    if isinstance(hook, CProfileHook):
+        hook.stats().sort_stats("cumulative").print_stats(args.top)
+    elif isinstance(hook, TracemallocHook):
+        for stat in hook.top_lines()[:args.top]:
+            print(stat)
+    elif isinstance(hook, SamplingProfiler):
+        hottest = sorted(hook.folded().items(), key=lambda item: -item[1])[:args.top]
+        for stack, count in hottest:
+            print(f"{count:6d}  {stack.split(';')[-1]}  ({stack})")
+    print(f"\nPerfil guardado en {output}")
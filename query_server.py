@@ -0,0 +1,581 @@
+"""
+API HTTP local de consultas
+Un solo proceso mantiene el grafo residente (motor NumPy) o la última
+ejecución del binario CUDA y atiende a varios dashboards a la vez:
+las respuestas se cachean por (consulta, parámetros, formato) y las
+consultas idénticas concurrentes se resuelven con una sola ejecución
+
+    python query_server.py datos_1m --port 8765
+    curl 'http://127.0.0.1:8765/top_posts?k=10'
+    curl 'http://127.0.0.1:8765/reacciones?formato=arrow' > reacciones.arrows
+
+Sin dependencias externas (asyncio + urllib); las respuestas Arrow
+requieren pyarrow
+"""
+
+import asyncio
+import json
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from memo import LRUCache, fingerprint
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}"
+MAX_CACHED_RESPONSES = 128
+# Tope de la suma de los cuerpos cacheados (caminos, comunidades o /resultados
+# de un dataset grande pesan decenas de MB cada uno)
+MAX_CACHED_BYTES = 64 << 20
+REQUEST_TIMEOUT = 30
+MAX_HEADER_LINES = 100
+
+JSON_TYPE = "application/json; charset=utf-8"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+Handler = Callable[[Dict[str, str]], Any]
+
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 406: "Not Acceptable", 500: "Internal Server Error",
+            501: "Not Implemented"}
+
+
+class QueryError(Exception):
+    """Error de una consulta con su código HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================================================
+# CONSULTAS POR BACKEND
+# ============================================================================
+
+def _int_param(params: Dict[str, str], name: str, default: Optional[int] = None,
+               minimum: int = 0, maximum: Optional[int] = None) -> int:
+    value = params.get(name)
+    if value is None:
+        if default is None:
+            raise QueryError(400, f"Falta el parámetro '{name}'")
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(400, f"'{name}' debe ser un entero") from None
+    if number < minimum or (maximum is not None and number >= maximum):
+        raise QueryError(400, f"'{name}' fuera de rango")
+    return number
+
+
+def _text_param(params: Dict[str, str], name: str) -> str:
+    value = params.get(name, "").strip()
+    if not value:
+        raise QueryError(400, f"Falta el parámetro '{name}'")
+    return value
+
+
+def _window_param(engine, params: Dict[str, str]):
+    """
+    Ventana [desde, hasta) o None: segundos Unix, ISO 8601 o desplazamientos
+    como -24h relativos al evento más reciente del dataset
+    """
+    from time_index import parse_window
+
+    if params.get("desde") is None and params.get("hasta") is None:
+        return None
+    latest = engine.latest_time()
+    if latest is None:
+        raise QueryError(400, "El dataset no tiene marcas de tiempo")
+    try:
+        return parse_window(params.get("desde"), params.get("hasta"), latest)
+    except ValueError as e:
+        raise QueryError(400, str(e)) from None
+
+
+def _cascades(engine, params: Dict[str, str]) -> Dict:
+    from cascades import RANKINGS
+    from numpy_engine import TOP_CASCADES
+
+    by = params.get("orden", "alcance")
+    if by not in RANKINGS:
+        raise QueryError(400, "'orden' debe ser " + "|".join(RANKINGS))
+    return engine.query_cascades(_int_param(params, "k", TOP_CASCADES, 1), by)
+
+
+def _feed(engine, params: Dict[str, str]) -> Dict:
+    """Página del feed de una persona; el cursor 'antes' es el "siguiente" anterior"""
+    from numpy_engine import FEED_PAGE
+
+    before = _int_param(params, "antes") if "antes" in params else None
+    return engine.query_feed(_int_param(params, "persona", maximum=engine.dataset.num_persons),
+                             _int_param(params, "k", FEED_PAGE, 1), before)
+
+
+def _hashtag_analytics(engine, params: Dict[str, str], name: str) -> Any:
+    """Analítica de hashtags: resumen, relacionados, perfil de un autor o serie por ventana"""
+    from numpy_engine import TOP_HASHTAGS, TREND_WINDOW
+    from social_dataset import COMPANY
+
+    k = _int_param(params, "k", TOP_HASHTAGS, 1)
+    window = _int_param(params, "ventana", TREND_WINDOW, 1)
+    if name == "resumen":
+        return engine.query_hashtag_analytics(k, window)
+    analytics = engine.hashtag_analytics()
+    if name == "relacionados":
+        return analytics.related(_text_param(params, "tag"), k)
+    if name == "serie":
+        return analytics.rolling_counts(_text_param(params, "tag"), window,
+                                        _int_param(params, "tramo", 1, 1))
+    user_type, user = _user_param(params.get("autor"), "autor")
+    limit = engine.dataset.num_companies if user_type == COMPANY else engine.dataset.num_persons
+    if user >= limit:
+        raise QueryError(400, "'autor' fuera de rango")
+    return analytics.author_profile(user_type, user, k)
+
+
+def _user_param(value: Optional[str], name: str) -> Tuple[int, int]:
+    from paths import parse_user
+
+    if value is None:
+        raise QueryError(400, f"Falta el parámetro '{name}'")
+    try:
+        return parse_user(value)
+    except ValueError as e:
+        raise QueryError(400, str(e)) from None
+
+
+def _shortest_paths(engine, params: Dict[str, str], pairs: List[Tuple[str, str]]) -> List[Dict]:
+    """Caminos mínimos; pares de textos 'persona:<n>' / 'empresa:<n>'"""
+    users = [(_user_param(source, "origen"), _user_param(target, "destino"))
+             for source, target in pairs]
+    max_hops = _int_param(params, "max_saltos", 0) or None
+    try:
+        return engine.query_shortest_paths(users, params.get("sin_bloqueos") == "1", max_hops,
+                                           paths=params.get("solo_saltos") != "1")
+    except IndexError as e:
+        raise QueryError(400, str(e)) from None
+
+
+def _pairs_param(params: Dict[str, str]) -> List[Tuple[str, str]]:
+    """pares=persona:1>empresa:2,persona:3>persona:4"""
+    value = params.get("pares")
+    if not value:
+        raise QueryError(400, "Falta el parámetro 'pares' (origen>destino separados por comas)")
+    pairs = [tuple(pair.split(">", 1)) for pair in value.split(",")]
+    if any(len(pair) != 2 for pair in pairs):
+        raise QueryError(400, "Cada par de 'pares' debe tener la forma origen>destino")
+    return pairs
+
+
+def numpy_handlers(engine) -> Dict[str, Handler]:
+    """Consultas sobre un NumpySocialNetwork residente"""
+    from numpy_engine import SEARCH_LIMIT, TOP_K
+
+    ds = engine.dataset
+    return {
+        "seguidores": lambda p: engine.query_followers(_window_param(engine, p)),
+        "reacciones": lambda p: engine.query_post_reactions(_window_param(engine, p)),
+        "top_posts": lambda p: engine.query_top_posts(_int_param(p, "k", TOP_K, 1),
+                                                      _window_param(engine, p)),
+        "hashtags": lambda p: engine.query_hashtags(_window_param(engine, p)),
+        "mejores_clientes": lambda p: engine.query_best_customers(_window_param(engine, p)),
+        "visibilidad": lambda p: engine.query_visibility(
+            _int_param(p, "post", maximum=ds.num_posts)),
+        "influencia": lambda p: engine.query_influence_network(
+            _int_param(p, "persona", maximum=ds.num_persons), _int_param(p, "grado", 2, 1)),
+        "bloqueados": lambda p: engine.query_blocked_followers(),
+        "recomendaciones": lambda p: engine.query_company_recommendations(),
+        "comunidades": lambda p: engine.query_communities(),
+        "buscar": lambda p: engine.query_search(_text_param(p, "q"),
+                                                _int_param(p, "k", SEARCH_LIMIT, 1)),
+        "cascadas": lambda p: _cascades(engine, p),
+        "feed": lambda p: _feed(engine, p),
+        "cascada": lambda p: engine.query_cascade(_int_param(p, "post", maximum=ds.num_posts)),
+        "hashtags_analitica": lambda p: _hashtag_analytics(engine, p, "resumen"),
+        "hashtags_relacionados": lambda p: _hashtag_analytics(engine, p, "relacionados"),
+        "hashtags_autor": lambda p: _hashtag_analytics(engine, p, "autor"),
+        "hashtags_serie": lambda p: _hashtag_analytics(engine, p, "serie"),
+        "camino": lambda p: _shortest_paths(engine, p, [(p.get("origen"), p.get("destino"))])[0],
+        "caminos": lambda p: _shortest_paths(engine, p, _pairs_param(p)),
+        "resultados": lambda p: engine.get_parsed_data(
+            include_communities=p.get("comunidades") == "1", window=_window_param(engine, p),
+            include_analytics=p.get("analitica") == "1"),
+    }
+
+
+def cuda_handlers(network) -> Dict[str, Handler]:
+    """
+    Consultas sobre CUDASocialNetwork: el binario calcula todo en una
+    ejecución, así que cada endpoint toma su parte del resultado cacheado
+    """
+    state: Dict[str, Any] = {}
+
+    def results() -> Dict:
+        if "data" not in state:
+            if not network.compiled:
+                compiled, message = network.compile()
+                if not compiled:
+                    raise QueryError(500, message)
+            data = network.get_parsed_data()
+            if not data:
+                raise QueryError(500, "Error al ejecutar el código CUDA")
+            state["data"] = data
+        return state["data"]
+
+    def check_window(params):
+        if "desde" in params or "hasta" in params:
+            raise QueryError(501, "El binario CUDA no guarda marcas de tiempo; usar el "
+                                  "backend numpy para consultas con ventana")
+
+    def top_posts(params):
+        check_window(params)
+        k = _int_param(params, "k", 5, 1)
+        return {key: posts[:k] for key, posts in results()["top_posts"].items()}
+
+    def not_available(params):
+        raise QueryError(501, "El backend CUDA no implementa esta consulta (visibilidad, "
+                              "influencia, comunidades, caminos, cascadas, búsqueda, feeds, "
+                              "mejores clientes y analítica de hashtags); usar el backend numpy")
+
+    def section(key):
+        def handler(params):
+            check_window(params)
+            return results()[key] if key else results()
+        return handler
+
+    handlers = {key: section(key) for key in ("seguidores", "reacciones", "hashtags",
+                                              "bloqueados", "recomendaciones")}
+    handlers.update({"top_posts": top_posts, "visibilidad": not_available,
+                     "influencia": not_available, "comunidades": not_available,
+                     "camino": not_available, "caminos": not_available,
+                     "cascadas": not_available, "cascada": not_available,
+                     "buscar": not_available, "hashtags_analitica": not_available,
+                     "hashtags_relacionados": not_available, "hashtags_autor": not_available,
+                     "hashtags_serie": not_available, "mejores_clientes": not_available,
+                     "feed": not_available, "resultados": section(None)})
+    return handlers
+
+
+# ============================================================================
+# CODIFICACIÓN
+# ============================================================================
+
+def result_records(result, table: Optional[str] = None) -> List[Dict]:
+    """
+    Filas de un resultado para Arrow: las listas de dicts pasan tal cual,
+    los dicts se eligen por clave (tabla=personas, tabla=mas_likes, ...)
+    """
+    if isinstance(result, dict):
+        tables = {key: value for key, value in result.items() if isinstance(value, list)}
+        for value in result.values():
+            if isinstance(value, dict):
+                tables.update({key: v for key, v in value.items() if isinstance(v, list)})
+        if table not in tables:
+            raise QueryError(400, "Indicar tabla=" + "|".join(sorted(tables)))
+        result = tables[table]
+    if result and isinstance(result[0], list):
+        # Influencia: un nivel por lista
+        return [{"nivel": level, "nombre": name}
+                for level, names in enumerate(result, 1) for name in names]
+    if result and not isinstance(result[0], dict):
+        return [{"nombre": value} for value in result]
+    return result
+
+
+def encode_arrow(result, table: Optional[str] = None) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise QueryError(406, "Las respuestas Arrow requieren pyarrow") from None
+    arrow_table = pa.Table.from_pylist(result_records(result, table))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode(result, fmt: str, params: Dict[str, str]) -> Tuple[bytes, str]:
+    if fmt == "arrow":
+        return encode_arrow(result, params.get("tabla")), ARROW_TYPE
+    if fmt != "json":
+        raise QueryError(406, f"Formato desconocido: {fmt}")
+    return json.dumps(result, ensure_ascii=False).encode("utf-8"), JSON_TYPE
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+class _Abandoned(Exception):
+    """La ejecución compartida se canceló antes de terminar"""
+
+
+class QueryServer:
+    """
+    Servidor HTTP/1.1 mínimo sobre asyncio
+    Las consultas corren en un pool de hilos (un hilo por defecto: el motor
+    no se comparte entre hilos) y no bloquean el event loop
+    """
+
+    def __init__(self, handlers: Dict[str, Handler], backend: str = "numpy",
+                 cache_size: int = MAX_CACHED_RESPONSES, workers: int = 1,
+                 cache_bytes: int = MAX_CACHED_BYTES):
+        self.handlers = handlers
+        self.backend = backend
+        # Respuestas (cuerpo, content-type, etag) acotadas por cantidad y por bytes
+        self.cache = LRUCache(cache_size, cache_bytes, sizeof=lambda response: len(response[0]))
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.inflight: Dict[Tuple, asyncio.Future] = {}
+        self.stats = {"solicitudes": 0, "ejecuciones": 0, "coalescidas": 0}
+        self.started = time.time()
+
+    def info(self) -> Dict:
+        return {"backend": self.backend, "consultas": sorted(self.handlers),
+                "estadisticas": dict(self.stats), "cache": self.cache.info(),
+                "activo_s": round(time.time() - self.started, 1)}
+
+    def _compute(self, name: str, params: Dict[str, str], fmt: str) -> Tuple[bytes, str, str]:
+        self.stats["ejecuciones"] += 1
+        body, content_type = encode(self.handlers[name](params), fmt, params)
+        return body, content_type, fingerprint(body)
+
+    async def resolve(self, name: str, params: Dict[str, str],
+                      fmt: str) -> Tuple[bytes, str, str, str]:
+        """
+        Respuesta de una consulta: (cuerpo, content-type, etag, origen)
+        origen es "cache", "coalescida" o "ejecutada"
+        """
+        if name not in self.handlers:
+            raise QueryError(404, f"Consulta desconocida: {name}")
+        key = (name, tuple(sorted(params.items())), fmt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return (*cached, "cache")
+        if key in self.inflight:
+            self.stats["coalescidas"] += 1
+            try:
+                return (*await asyncio.shield(self.inflight[key]), "coalescida")
+            except _Abandoned:
+                # Se canceló la solicitud que la ejecutaba: se resuelve de nuevo
+                return await self.resolve(name, params, fmt)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.inflight[key] = future
+        response, error = None, None
+        try:
+            response = await loop.run_in_executor(self.executor, self._compute,
+                                                  name, params, fmt)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            # Quien espera la misma consulta siempre recibe algo, también si
+            # esta tarea se cancela (CancelledError no es Exception)
+            del self.inflight[key]
+            if response is not None:
+                self.cache.put(key, response)
+                future.set_result(response)
+            else:
+                future.set_exception(error if error is not None else _Abandoned())
+                future.exception()  # marcada como leída aunque nadie más espere
+        return (*response, "ejecutada")
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, body: bytes,
+                       content_type: str = JSON_TYPE, headers: Optional[Dict] = None,
+                       keep_alive: bool = True):
+        lines = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+                 f"Content-Type: {content_type}",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atiende una conexión (con keep-alive) hasta que el cliente la cierra"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, b'{"error": "Solicitud invalida"}',
+                                        keep_alive=False)
+                    break
+                keep_alive = (headers.get("connection", "").lower() != "close"
+                              and version == "HTTP/1.1")
+                await self._dispatch(writer, method, target, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer: asyncio.StreamWriter, method: str, target: str,
+                        headers: Dict[str, str], keep_alive: bool):
+        self.stats["solicitudes"] += 1
+        url = urlsplit(target)
+        name = url.path.strip("/")
+        params = dict(parse_qsl(url.query))
+        fmt = params.pop("formato", "arrow" if ARROW_TYPE in headers.get("accept", "")
+                         else "json")
+        try:
+            if method != "GET":
+                raise QueryError(405, "Solo se admite GET")
+            if name in ("", "salud"):
+                body = json.dumps(self.info(), ensure_ascii=False).encode("utf-8")
+                await self._respond(writer, 200, body, keep_alive=keep_alive)
+                return
+            body, content_type, etag, origin = await self.resolve(name, params, fmt)
+        except QueryError as error:
+            body = json.dumps({"error": str(error)}, ensure_ascii=False).encode("utf-8")
+            await self._respond(writer, error.status, body, keep_alive=keep_alive)
+            return
+        except Exception as error:
+            body = json.dumps({"error": f"{type(error).__name__}: {error}"},
+                              ensure_ascii=False).encode("utf-8")
+            await self._respond(writer, 500, body, keep_alive=keep_alive)
+            return
+
+        extra = {"ETag": f'"{etag}"', "X-Cache": origin}
+        if headers.get("if-none-match") == f'"{etag}"':
+            await self._respond(writer, 304, b"", content_type, extra, keep_alive)
+        else:
+            await self._respond(writer, 200, body, content_type, extra, keep_alive)
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await server.serve_forever()
+
+
+# ============================================================================
+# CLIENTE
+# ============================================================================
+
+class RemoteSocialNetwork:
+    """
+    Cliente del servicio con la misma interfaz que CUDASocialNetwork
+    para los dashboards; reutiliza el último cuerpo si el ETag no cambió
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, timeout: float = REQUEST_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.last_error: Optional[str] = None
+        self.etag: Optional[str] = None
+        self._responses: Dict[str, Tuple[str, bytes]] = {}
+
+    def _get(self, path: str, accept: str = JSON_TYPE) -> bytes:
+        request = urllib.request.Request(self.url + path, headers={"Accept": accept})
+        previous = self._responses.get(path)
+        if previous:
+            request.add_header("If-None-Match", previous[0])
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as error:
+            if error.code == 304 and previous:
+                self.etag = previous[0].strip('"')
+                return previous[1]
+            try:
+                message = json.loads(error.read()).get("error", str(error))
+            except ValueError:
+                message = str(error)
+            raise QueryError(error.code, message) from None
+        if etag:
+            self._responses[path] = (etag, body)
+            self.etag = etag.strip('"')
+        return body
+
+    def query(self, endpoint: str, **params):
+        """Resultado JSON de un endpoint (p. ej. query("top_posts", k=10))"""
+        query = f"?{urlencode(params)}" if params else ""
+        return json.loads(self._get(f"/{endpoint}{query}"))
+
+    def query_arrow(self, endpoint: str, **params):
+        """Resultado como pyarrow.Table"""
+        import pyarrow as pa
+
+        params["formato"] = "arrow"
+        body = self._get(f"/{endpoint}?{urlencode(params)}", ARROW_TYPE)
+        return pa.ipc.open_stream(body).read_all()
+
+    def health(self) -> Optional[Dict]:
+        try:
+            return json.loads(self._get("/salud"))
+        except (QueryError, OSError, ValueError) as error:
+            self.last_error = str(error)
+            return None
+
+    def get_parsed_data(self, **params) -> Optional[Dict]:
+        """
+        Todos los resultados, con la forma de CUDASocialNetwork.get_parsed_data()
+        params se envían tal cual (p. ej. desde="-24h" para una ventana de tiempo)
+        """
+        try:
+            self.last_error = None
+            return self.query("resultados", **params)
+        except (QueryError, OSError, ValueError) as error:
+            self.last_error = str(error)
+            return None
+
+
+def create_server(backend: str, dataset: Optional[str] = None, metrics: bool = False,
+                  workers: int = 1, cache_bytes: int = MAX_CACHED_BYTES) -> QueryServer:
+    """Crea el motor residente y el servidor para un backend (numpy o cuda)"""
+    if backend == "cuda":
+        from cuda_wrapper import CUDASocialNetwork
+
+        return QueryServer(cuda_handlers(CUDASocialNetwork(metrics=metrics, dataset=dataset)), "cuda",
+                           workers=1, cache_bytes=cache_bytes)
+
+    from metrics import MetricsRecorder
+    from numpy_engine import NumpySocialNetwork
+    from social_dataset import sample_dataset
+
+    recorder = MetricsRecorder(metrics, backend="numpy")
+    engine = NumpySocialNetwork.from_path(dataset, metrics=recorder) if dataset \
+        else NumpySocialNetwork(sample_dataset(), recorder)
+    return QueryServer(numpy_handlers(engine), "numpy", workers=workers, cache_bytes=cache_bytes)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="API HTTP local de consultas de la red social")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("--backend", choices=["numpy", "cuda"], default="numpy")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--metrics", action="store_true",
+                        help="Incluir métricas por consulta en /resultados")
+    parser.add_argument("--cache-mb", type=float, default=MAX_CACHED_BYTES / (1 << 20),
+                        help="Tope de memoria de las respuestas cacheadas (MB)")
+    args = parser.parse_args()
+
+    server = create_server(args.backend, args.dataset, args.metrics,
+                           cache_bytes=int(args.cache_mb * (1 << 20)))
+    print(f"Sirviendo {args.backend} en http://{args.host}:{args.port} "
+          f"({', '.join(sorted(server.handlers))})")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,326 @@
+"""
+Resultados en Apache Arrow / Parquet
+Convierte la salida de get_parsed_data() (o las columnas del motor NumPy)
+en tablas Arrow y las guarda como un bundle Parquet: un directorio (o .zip)
+con un archivo por tabla, resumen.json y la salida cruda en output_raw.txt
+
+Al leer un bundle cada lista de resultados es un ArrowRecords: se comporta
+como la lista de dicts original pero las apps leen sus columnas sin copiarlas
+"""
+
+import io
+import json
+import zipfile
+from collections.abc import Collection, Sequence
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+BUNDLE_VERSION = 1
+SUMMARY_FILE = "resumen.json"
+OUTPUT_FILE = "output_raw.txt"
+BATCH_ROWS = 65536
+
+# Tabla -> (ruta dentro de get_parsed_data(), columnas con su tipo Arrow)
+TABLES = {
+    "personas": (("seguidores", "personas"), (("nombre", "string"), ("seguidores", "int64"))),
+    "empresas": (("seguidores", "empresas"), (("nombre", "string"), ("seguidores", "int64"))),
+    "reacciones": (("reacciones",),
+                   (("post_id", "int64"), ("likes", "int64"), ("dislikes", "int64"))),
+    "top_mas_likes": (("top_posts", "mas_likes"), (("texto", "string"), ("likes", "int64"))),
+    "top_menos_likes": (("top_posts", "menos_likes"), (("texto", "string"), ("likes", "int64"))),
+    "hashtags": (("hashtags", "conteo"), (("hashtag", "string"), ("cantidad", "int64"))),
+    "bloqueados": (("bloqueados",), (("usuario", "string"), ("bloqueado", "string"))),
+    "recomendaciones": (("recomendaciones",),
+                        (("recomienda", "string"), ("recomendada", "string"))),
+}
+
+# Tablas que solo existen si el resultado las trae (comunidades, cascadas y analítica
+# de hashtags del motor NumPy)
+OPTIONAL_TABLES = {
+    "comunidades": (("comunidades", "tamanos"),
+                    (("comunidad", "int64"), ("miembros", "int64"),
+                     ("personas", "int64"), ("empresas", "int64"))),
+    "miembros_comunidad": (("comunidades", "miembros"),
+                           (("nombre", "string"), ("tipo", "string"),
+                            ("comunidad", "int64"), ("componente", "int64"))),
+    "cascadas": (("cascadas", "top"),
+                 (("post_id", "int64"), ("texto", "string"), ("alcance", "int64"),
+                  ("republicaciones", "int64"), ("profundidad", "int64"),
+                  ("amplitud_max", "int64"), ("likes", "int64"), ("dislikes", "int64"))),
+    "hashtags_coocurrencia": (("analitica_hashtags", "coocurrencias"),
+                              (("hashtag_a", "string"), ("hashtag_b", "string"),
+                               ("posts", "int64"))),
+    "hashtags_interaccion": (("analitica_hashtags", "interaccion"),
+                             (("hashtag", "string"), ("posts", "int64"), ("likes", "int64"),
+                              ("dislikes", "int64"))),
+    "hashtags_tendencias": (("analitica_hashtags", "tendencias"),
+                            (("hashtag", "string"), ("ventana", "int64"), ("base", "float64"),
+                             ("puntaje", "float64"))),
+}
+ALL_TABLES = {**TABLES, **OPTIONAL_TABLES}
+# Valores escalares de las secciones opcionales (van a resumen.json)
+OPTIONAL_SUMMARY = {
+    "comunidades": ("componentes_debiles", "componentes_fuertes", "mayor_componente",
+                    "comunidades", "modularidad"),
+    "cascadas": ("originales", "republicaciones", "cascadas", "mayor_alcance",
+                 "profundidad_max"),
+    "analitica_hashtags": ("hashtags", "posts_con_hashtag", "autores", "pares"),
+    "ventana": ("desde", "hasta"),
+}
+
+
+def require_pyarrow():
+    """Importa pyarrow con un mensaje claro si falta (dependencia de streamlit)"""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("Las tablas Arrow/Parquet requieren pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def schema(name: str):
+    pa = require_pyarrow()
+    return pa.schema([(column, getattr(pa, kind)()) for column, kind in ALL_TABLES[name][1]])
+
+
+class ArrowRecords(Sequence):
+    """Vista de filas (dicts) sobre una tabla Arrow, sin materializar la lista"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            rows = self.table.slice(start, max(stop - start, 0)).to_pylist()
+            return rows[::step]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.table.slice(index, 1).to_pylist()[0]
+
+    def __iter__(self):
+        for batch in self.table.to_batches(max_chunksize=BATCH_ROWS):
+            yield from batch.to_pylist()
+
+    def to_columns(self, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """Columnas como arrays NumPy (sin copia para las numéricas de un solo bloque)"""
+        columns = columns or self.table.column_names
+        return {name: self.table.column(name).to_numpy() for name in columns}
+
+
+# ============================================================================
+# CONVERSIÓN
+# ============================================================================
+
+def _get(data: Dict, path: Tuple[str, ...]):
+    for key in path:
+        data = data.get(key) if isinstance(data, dict) else None
+    return data
+
+
+def records_table(name: str, records):
+    """Tabla Arrow de una lista de resultados (acepta ArrowRecords sin copiar)"""
+    pa = require_pyarrow()
+    if isinstance(records, ArrowRecords):
+        return records.table
+    return pa.Table.from_pylist(list(records or []), schema=schema(name))
+
+
+def _column_array(pa, values, arrow_type):
+    """Array Arrow de una columna; un StringPool aporta sus propios buffers"""
+    if hasattr(values, "to_arrow"):
+        array = values.to_arrow()
+        if pa.types.is_dictionary(array.type):
+            array = array.dictionary_decode()
+        return array.cast(arrow_type)
+    return pa.array(values, type=arrow_type)
+
+
+def columns_table(name: str, columns: Dict[str, Union[np.ndarray, List]]):
+    """
+    Tabla Arrow a partir de columnas (los arrays int64 y los pools de cadenas
+    no se copian)
+    """
+    pa = require_pyarrow()
+    target = schema(name)
+    arrays = [_column_array(pa, columns[field.name], field.type) for field in target]
+    return pa.Table.from_arrays(arrays, schema=target)
+
+
+def results_to_tables(data: Dict, sections: Optional[Collection[str]] = None) -> Dict[str, object]:
+    """
+    Todas las tablas de un resultado de get_parsed_data()
+    sections: solo las de esas claves del resultado (p. ej. las consultas de un lote)
+    """
+    tables = {name: records_table(name, _get(data, path)) for name, (path, _) in TABLES.items()
+              if sections is None or path[0] in sections}
+    tables.update({name: records_table(name, _get(data, path))
+                   for name, (path, _) in OPTIONAL_TABLES.items()
+                   if (sections is None or path[0] in sections)
+                   and _get(data, path) is not None})
+    return tables
+
+
+def tables_to_results(tables: Dict[str, object], summary: Optional[Dict] = None,
+                      output_raw: str = "") -> Dict:
+    """Resultado con la forma de get_parsed_data() sobre tablas Arrow"""
+    summary = summary or {}
+    data: Dict = {}
+    for name, (path, _) in TABLES.items():
+        target = data
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        target[path[-1]] = ArrowRecords(tables[name]) if name in tables else []
+    data["hashtags"]["mas_usado"] = summary.get("hashtag_mas_usado")
+    data["output_raw"] = output_raw
+    if summary.get("metricas") is not None:
+        data["metricas"] = summary["metricas"]
+    for section in OPTIONAL_SUMMARY:
+        if summary.get(section) is None:
+            continue
+        data[section] = dict(summary[section])
+        for name, (path, _) in OPTIONAL_TABLES.items():
+            if path[0] == section:
+                data[section][path[-1]] = ArrowRecords(tables[name]) if name in tables else []
+    return data
+
+
+# ============================================================================
+# BUNDLE PARQUET
+# ============================================================================
+
+def _summary(data: Dict, tables: Dict[str, object]) -> Dict:
+    summary = {"version": BUNDLE_VERSION,
+               "tablas": {name: table.num_rows for name, table in tables.items()},
+               "hashtag_mas_usado": _get(data, ("hashtags", "mas_usado"))}
+    if data.get("metricas") is not None:
+        summary["metricas"] = data["metricas"]
+    for section, keys in OPTIONAL_SUMMARY.items():
+        if data.get(section) is not None:
+            summary[section] = {key: data[section].get(key) for key in keys}
+    return summary
+
+
+def _write_files(data: Dict, tables: Optional[Dict[str, object]], write):
+    """Llama write(nombre_archivo, bytes) por cada archivo del bundle"""
+    pq = require_pyarrow().parquet
+    if tables is None:
+        tables = results_to_tables(data)
+    else:
+        tables = dict(tables)
+        for name, (path, _) in OPTIONAL_TABLES.items():
+            if name not in tables and _get(data, path) is not None:
+                tables[name] = records_table(name, _get(data, path))
+    for name, table in tables.items():
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression="zstd")
+        write(f"{name}.parquet", buffer.getvalue())
+    summary = json.dumps(_summary(data, tables), indent=2, ensure_ascii=False)
+    write(SUMMARY_FILE, summary.encode("utf-8"))
+    write(OUTPUT_FILE, (data.get("output_raw") or "").encode("utf-8"))
+
+
+def write_bundle(data: Dict, path, tables: Optional[Dict[str, object]] = None) -> Path:
+    """
+    Guarda el resultado como bundle Parquet; si path termina en .zip se
+    escribe un único archivo (sin recomprimir: Parquet ya va comprimido)
+    tables permite pasar tablas ya armadas (p. ej. de get_arrow_tables())
+    """
+    path = Path(path)
+    if path.suffix == ".zip":
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as bundle:
+            _write_files(data, tables, bundle.writestr)
+    else:
+        path.mkdir(parents=True, exist_ok=True)
+        _write_files(data, tables, lambda name, content: (path / name).write_bytes(content))
+    return path
+
+
+def read_bundle(source: Union[str, Path, bytes]) -> Dict:
+    """
+    Lee un bundle (directorio, .zip o los bytes de un .zip subido)
+    Los Parquet de un directorio se mapean en memoria en lugar de copiarse
+    """
+    pq = require_pyarrow().parquet
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif Path(source).is_dir():
+        directory = Path(source)
+        summary = json.loads((directory / SUMMARY_FILE).read_text(encoding="utf-8"))
+        tables = {name: pq.read_table(directory / f"{name}.parquet", memory_map=True)
+                  for name in ALL_TABLES if (directory / f"{name}.parquet").exists()}
+        output = directory / OUTPUT_FILE
+        output_raw = output.read_text(encoding="utf-8") if output.exists() else ""
+        return tables_to_results(tables, summary, output_raw)
+
+    with zipfile.ZipFile(source) as bundle:
+        files = set(bundle.namelist())
+        if SUMMARY_FILE not in files:
+            raise ValueError(f"El bundle no contiene {SUMMARY_FILE}")
+        summary = json.loads(bundle.read(SUMMARY_FILE))
+        tables = {name: pq.read_table(io.BytesIO(bundle.read(f"{name}.parquet")))
+                  for name in ALL_TABLES if f"{name}.parquet" in files}
+        output_raw = bundle.read(OUTPUT_FILE).decode("utf-8") if OUTPUT_FILE in files else ""
+    return tables_to_results(tables, summary, output_raw)
+
+
+def bundle_fingerprint(path) -> str:
+    """Huella de un bundle en disco sin leerlo (nombres, tamaños y fechas)"""
+    from memo import fingerprint
+
+    path = Path(path)
+    files = sorted(path.iterdir()) if path.is_dir() else [path]
+    stats = [(f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files]
+    return fingerprint(json.dumps(stats).encode("utf-8"))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta los resultados como bundle Parquet")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("--from-json", help="Convertir un resultados.json existente")
+    parser.add_argument("--backend", choices=["numpy", "cuda"], default="numpy")
+    parser.add_argument("--output", default="resultados_parquet",
+                        help="Directorio destino (o archivo .zip)")
+    parser.add_argument("--communities", action="store_true",
+                        help="Incluir componentes y comunidades (solo backend numpy)")
+    parser.add_argument("--analytics", action="store_true",
+                        help="Incluir cascadas y analítica de hashtags (solo backend numpy)")
+    args = parser.parse_args()
+
+    tables = None
+    if args.from_json:
+        with open(args.from_json, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    elif args.backend == "cuda":
+        from cuda_wrapper import CUDASocialNetwork
+
+        network = CUDASocialNetwork()
+        success, message = network.compile()
+        if not success:
+            raise SystemExit(message)
+        data = network.get_parsed_data()
+        if not data:
+            raise SystemExit("Error al ejecutar el código CUDA")
+    else:
+        from numpy_engine import NumpySocialNetwork
+        from social_dataset import load_dataset, sample_dataset
+
+        dataset = load_dataset(args.dataset, mmap=True) if args.dataset else sample_dataset()
+        engine = NumpySocialNetwork(dataset)
+        data = engine.get_parsed_data(include_communities=args.communities,
+                                      include_analytics=args.analytics)
+        tables = engine.get_arrow_tables()
+
+    path = write_bundle(data, args.output, tables)
+    print(f"Bundle escrito en {path}")
@@ -0,0 +1,375 @@
+"""
+Procesamiento particionado (out-of-core) de la red social
+Divide las listas de aristas y el log de interacciones en shards por rango
+de usuarios o de publicaciones, y ejecuta cada query como map sobre shards
+más merge, con memoria acotada al tamaño de un shard por worker
+"""
+
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from social_dataset import (
+    INTER_COLUMNS, INTER_POST_ID, read_metadata, load_array,
+)
+from string_pool import InternedStrings, StringPool
+from numpy_engine import (
+    TOP_K, count_targets, count_reactions, hashtag_counts, merge_hashtag_counts,
+    format_hashtags, top_k_indices, edge_pairs, format_output, reaction_lines,
+)
+
+SHARDS_VERSION = 1
+SHARDS_FILE = "shards.json"
+CHUNK_ROWS = 1 << 20
+
+# Relación -> (familia de shards, columna clave)
+# Los seguimientos se parten por destino (conteo local de seguidores) y
+# los bloqueos/recomendaciones por origen (listados por usuario)
+SHARDED_RELATIONS = {
+    "person_follows_person": ("person", 1),
+    "person_blocks_person": ("person", 0),
+    "person_follows_company": ("company", 1),
+    "company_follows_company": ("company", 1),
+    "company_blocks_person": ("company", 0),
+    "company_recommends_company": ("company", 0),
+}
+
+
+def shard_dir(root, family: str, index: int) -> Path:
+    return Path(root) / f"{family}_{index:05d}"
+
+
+def read_table(path, columns: int) -> np.ndarray:
+    """Lee una tabla int32 cruda de un shard (vacía si no existe)"""
+    path = Path(path)
+    if not path.exists():
+        return np.zeros((0, columns), dtype=np.int32)
+    return np.fromfile(path, dtype=np.int32).reshape(-1, columns)
+
+
+def _partition_table(table: np.ndarray, key_column: int, range_size: int,
+                     root: Path, family: str, filename: str, chunk_rows: int):
+    """Reparte las filas de una tabla (posiblemente mapeada) en archivos por shard"""
+    for start in range(0, len(table), chunk_rows):
+        chunk = np.ascontiguousarray(table[start:start + chunk_rows], dtype=np.int32)
+        shard_ids = chunk[:, key_column] // range_size
+        order = np.argsort(shard_ids, kind='stable')
+        chunk, shard_ids = chunk[order], shard_ids[order]
+        bounds = np.flatnonzero(np.diff(shard_ids)) + 1
+        for rows in np.split(chunk, bounds):
+            if len(rows) == 0:
+                continue
+            with open(shard_dir(root, family, int(rows[0, key_column]) // range_size) / filename, 'ab') as f:
+                rows.tofile(f)
+
+
+def _partition_lines(source: Path, range_size: int, root: Path, family: str, filename: str):
+    """Reparte un archivo de una cadena por línea en shards consecutivos"""
+    out = None
+    with open(source, 'r', encoding='utf-8') as f:
+        for i, line in enumerate(f):
+            if i % range_size == 0:
+                if out is not None:
+                    out.close()
+                out = open(shard_dir(root, family, i // range_size) / filename, 'w', encoding='utf-8')
+            out.write(line)
+    if out is not None:
+        out.close()
+
+
+def build_shards(dataset_path, shards_path, users_per_shard: int = 100_000,
+                 posts_per_shard: int = 200_000, chunk_rows: int = CHUNK_ROWS) -> Dict:
+    """
+    Particiona un dataset guardado con save_dataset sin cargarlo completo en memoria
+    Returns: metadatos de los shards (también escritos en shards.json)
+    """
+    dataset_path, root = Path(dataset_path), Path(shards_path)
+    meta = read_metadata(dataset_path)
+
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+
+    counts = {
+        "person": meta["num_persons"],
+        "company": meta["num_companies"],
+        "post": meta["num_posts"],
+    }
+    sizes = {"person": users_per_shard, "company": users_per_shard, "post": posts_per_shard}
+    num_shards = {family: max(1, -(-counts[family] // sizes[family])) for family in counts}
+    for family, n in num_shards.items():
+        for i in range(n):
+            shard_dir(root, family, i).mkdir()
+
+    for name, (family, key_column) in SHARDED_RELATIONS.items():
+        if (dataset_path / f"{name}.npy").exists():
+            _partition_table(load_array(dataset_path, name), key_column, sizes[family],
+                             root, family, f"{name}.bin", chunk_rows)
+
+    # Publicaciones: filas consecutivas por rango de id
+    posts = load_array(dataset_path, "posts")
+    for i in range(num_shards["post"]):
+        rows = np.ascontiguousarray(posts[i * posts_per_shard:(i + 1) * posts_per_shard])
+        rows.astype(np.int32).tofile(shard_dir(root, "post", i) / "posts.bin")
+    _partition_table(load_array(dataset_path, "interactions"), INTER_POST_ID, posts_per_shard,
+                     root, "post", "interactions.bin", chunk_rows)
+    _partition_lines(dataset_path / "post_texts.txt", posts_per_shard, root, "post", "post_texts.txt")
+    _partition_lines(dataset_path / "post_hashtags.txt", posts_per_shard, root, "post", "post_hashtags.txt")
+
+    shutil.copy(dataset_path / "persons.txt", root / "persons.txt")
+    shutil.copy(dataset_path / "companies.txt", root / "companies.txt")
+
+    shards_meta = {
+        "version": SHARDS_VERSION,
+        "num_persons": counts["person"],
+        "num_companies": counts["company"],
+        "num_posts": counts["post"],
+        "users_per_shard": users_per_shard,
+        "posts_per_shard": posts_per_shard,
+        "num_shards": num_shards,
+    }
+    with open(root / SHARDS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(shards_meta, f, indent=2)
+    return shards_meta
+
+
+# ============================================================================
+# MAP: resultados parciales por shard (funciones de módulo para poder
+# ejecutarlas en procesos worker)
+# ============================================================================
+
+def _shard_range(meta: Dict, family: str, index: int):
+    size = meta["posts_per_shard"] if family == "post" else meta["users_per_shard"]
+    total = {"person": meta["num_persons"], "company": meta["num_companies"],
+             "post": meta["num_posts"]}[family]
+    start = index * size
+    return start, max(0, min(size, total - start))
+
+
+def map_person_shard(root: str, meta: Dict, index: int) -> Dict:
+    path = shard_dir(root, "person", index)
+    start, size = _shard_range(meta, "person", index)
+    follows = read_table(path / "person_follows_person.bin", 2)
+    return {
+        "seguidores": count_targets(follows[:, 1], size, start),
+        "bloqueos": read_table(path / "person_blocks_person.bin", 2),
+    }
+
+
+def map_company_shard(root: str, meta: Dict, index: int) -> Dict:
+    path = shard_dir(root, "company", index)
+    start, size = _shard_range(meta, "company", index)
+    return {
+        "seguidores": (count_targets(read_table(path / "person_follows_company.bin", 2)[:, 1], size, start)
+                       + count_targets(read_table(path / "company_follows_company.bin", 2)[:, 1], size, start)),
+        "bloqueos": read_table(path / "company_blocks_person.bin", 2),
+        "recomendaciones": read_table(path / "company_recommends_company.bin", 2),
+    }
+
+
+def map_post_shard(root: str, meta: Dict, index: int, k: int = TOP_K,
+                   output: bool = False) -> Dict:
+    """
+    Conteos, hashtags y candidatos top-K de un shard de posts
+    output: también arma su parte de la sección de reacciones de output_raw,
+    así los textos se leen de a un shard y no todos juntos en el merge
+    """
+    path = shard_dir(root, "post", index)
+    start, size = _shard_range(meta, "post", index)
+    likes, dislikes = count_reactions(read_table(path / "interactions.bin", INTER_COLUMNS), size, start)
+    texts = StringPool.read(path / "post_texts.txt") if size else StringPool()
+
+    # Candidatos top-K locales; el merge global aplica el mismo orden total
+    candidates = np.union1d(top_k_indices(likes, k, largest=True),
+                            top_k_indices(likes, k, largest=False))
+    part = {
+        "likes": likes,
+        "dislikes": dislikes,
+        "hashtags": hashtag_counts(InternedStrings.read(path / "post_hashtags.txt"), start) if size else {},
+        "top": [(int(start + i), int(likes[i]), texts[i]) for i in candidates],
+    }
+    if output:
+        part["salida"] = "\n".join(reaction_lines(range(start, start + size), likes.tolist(),
+                                                  dislikes.tolist(), texts))
+    return part
+
+
+MAPPERS = {"person": map_person_shard, "company": map_company_shard, "post": map_post_shard}
+
+
+# ============================================================================
+# MOTOR PARTICIONADO
+# ============================================================================
+
+class ShardedSocialNetwork:
+    """
+    Ejecuta las queries sobre un directorio de shards creado con build_shards
+    workers > 1 procesa shards en paralelo con procesos independientes
+    """
+
+    def __init__(self, shards_path, workers: int = 1):
+        self.root = Path(shards_path)
+        self.workers = workers
+        with open(self.root / SHARDS_FILE, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != SHARDS_VERSION:
+            raise ValueError(f"Versión de shards no soportada: {self.meta.get('version')}")
+        self._person_names: Optional[StringPool] = None
+        self._company_names: Optional[StringPool] = None
+        self._post_texts: Optional[StringPool] = None
+
+    @property
+    def person_names(self) -> StringPool:
+        if self._person_names is None:
+            self._person_names = StringPool.read(self.root / "persons.txt")
+        return self._person_names
+
+    @property
+    def company_names(self) -> StringPool:
+        if self._company_names is None:
+            self._company_names = StringPool.read(self.root / "companies.txt")
+        return self._company_names
+
+    @property
+    def post_texts(self) -> StringPool:
+        """
+        Textos de todos los posts (concatenando los archivos de los shards)
+        Ocupa todo el corpus en memoria: las queries no lo usan
+        """
+        if self._post_texts is None:
+            parts = [np.fromfile(shard_dir(self.root, "post", i) / "post_texts.txt", dtype=np.uint8)
+                     for i in range(self.meta["num_shards"]["post"])
+                     if _shard_range(self.meta, "post", i)[1]]
+            self._post_texts = StringPool.from_buffer(np.concatenate(parts)) if parts \
+                else StringPool()
+        return self._post_texts
+
+    def map_shards(self, family: str, **options) -> List[Dict]:
+        """Aplica el mapper de la familia a todos sus shards, en orden"""
+        mapper = partial(MAPPERS[family], **options) if options else MAPPERS[family]
+        n = self.meta["num_shards"][family]
+        args = ([str(self.root)] * n, [self.meta] * n, range(n))
+        if self.workers > 1 and n > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                return list(executor.map(mapper, *args))
+        return [mapper(*a) for a in zip(*args)]
+
+    # --- Merge ------------------------------------------------------------
+
+    def _merge_followers(self, person_parts: List[Dict], company_parts: List[Dict]) -> Dict:
+        person_counts = np.concatenate([p["seguidores"] for p in person_parts])
+        company_counts = np.concatenate([p["seguidores"] for p in company_parts])
+        return {
+            "personas": [{"nombre": name, "seguidores": int(count)}
+                         for name, count in zip(self.person_names, person_counts)],
+            "empresas": [{"nombre": name, "seguidores": int(count)}
+                         for name, count in zip(self.company_names, company_counts)],
+        }
+
+    @staticmethod
+    def _merge_reactions(post_parts: List[Dict]) -> List[Dict]:
+        likes = np.concatenate([p["likes"] for p in post_parts]).tolist()
+        dislikes = np.concatenate([p["dislikes"] for p in post_parts]).tolist()
+        return [{"post_id": i, "likes": l, "dislikes": d}
+                for i, (l, d) in enumerate(zip(likes, dislikes))]
+
+    @staticmethod
+    def _merge_top_posts(post_parts: List[Dict], k: int = TOP_K) -> Dict:
+        candidates = [c for p in post_parts for c in p["top"]]
+        if not candidates:
+            return {"mas_likes": [], "menos_likes": []}
+        likes = np.array([c[1] for c in candidates])
+        # Reordenar por id para que los desempates coincidan con el motor en memoria
+        by_id = np.argsort([c[0] for c in candidates])
+        candidates = [candidates[i] for i in by_id]
+        likes = likes[by_id]
+        pick = lambda idx: [{"texto": candidates[i][2], "likes": candidates[i][1]} for i in idx]
+        return {
+            "mas_likes": pick(top_k_indices(likes, k, largest=True)),
+            "menos_likes": pick(top_k_indices(likes, k, largest=False)),
+        }
+
+    def _merge_blocked(self, person_parts: List[Dict], company_parts: List[Dict]) -> List[Dict]:
+        return (edge_pairs(np.concatenate([p["bloqueos"] for p in person_parts]),
+                           self.person_names, self.person_names, "usuario", "bloqueado")
+                + edge_pairs(np.concatenate([p["bloqueos"] for p in company_parts]),
+                             self.company_names, self.person_names, "usuario", "bloqueado"))
+
+    def _merge_recommendations(self, company_parts: List[Dict]) -> List[Dict]:
+        return edge_pairs(np.concatenate([p["recomendaciones"] for p in company_parts]),
+                          self.company_names, self.company_names, "recomienda", "recomendada")
+
+    # --- Queries ----------------------------------------------------------
+
+    def query_followers(self) -> Dict:
+        return self._merge_followers(self.map_shards("person"), self.map_shards("company"))
+
+    def query_post_reactions(self) -> List[Dict]:
+        return self._merge_reactions(self.map_shards("post"))
+
+    def query_top_posts(self) -> Dict:
+        return self._merge_top_posts(self.map_shards("post"))
+
+    def query_hashtags(self) -> Dict:
+        return format_hashtags(merge_hashtag_counts(p["hashtags"] for p in self.map_shards("post")))
+
+    def get_parsed_data(self, include_output: bool = True) -> Optional[Dict]:
+        """
+        Resultados con la forma de CUDASocialNetwork.get_parsed_data() (una pasada por shard)
+        include_output=False omite output_raw, el único resultado que crece con
+        el total de los textos (queda "")
+        """
+        person_parts = self.map_shards("person")
+        company_parts = self.map_shards("company")
+        post_parts = self.map_shards("post", output=include_output)
+
+        data = {
+            "seguidores": self._merge_followers(person_parts, company_parts),
+            "reacciones": self._merge_reactions(post_parts),
+            "top_posts": self._merge_top_posts(post_parts),
+            "hashtags": format_hashtags(merge_hashtag_counts(p["hashtags"] for p in post_parts)),
+            "bloqueados": self._merge_blocked(person_parts, company_parts),
+            "recomendaciones": self._merge_recommendations(company_parts),
+        }
+        data["output_raw"] = ""
+        if include_output:
+            data["output_raw"] = format_output(
+                data, self.meta["num_persons"], self.meta["num_companies"],
+                self.meta["num_posts"], reaction_blocks=(p.pop("salida") for p in post_parts))
+        return data
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Procesamiento particionado de la red social")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="Particionar un dataset en shards")
+    build.add_argument("dataset")
+    build.add_argument("shards")
+    build.add_argument("--users-per-shard", type=int, default=100_000)
+    build.add_argument("--posts-per-shard", type=int, default=200_000)
+
+    query = sub.add_parser("query", help="Ejecutar las queries y guardar resultados.json")
+    query.add_argument("shards")
+    query.add_argument("--workers", type=int, default=1)
+    query.add_argument("--output", default="resultados.json")
+    query.add_argument("--no-output-raw", action="store_true",
+                       help="No generar output_raw (el reporte de texto con todos los posts)")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        info = build_shards(args.dataset, args.shards, args.users_per_shard, args.posts_per_shard)
+        print(f"Shards creados: {info['num_shards']}")
+    else:
+        network = ShardedSocialNetwork(args.shards, workers=args.workers)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(network.get_parsed_data(include_output=not args.no_output_raw), f,
+                      indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
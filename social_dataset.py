@@ -0,0 +1,393 @@
+"""
+Modelo de datos de la red social en formato columnar
+Refleja las estructuras de social_network.cu (Persons, Companies, Posts,
+Relations, PostInteractions) usando listas de aristas en lugar de matrices
+densas MAX_USERS x MAX_USERS, y define el formato de dataset en disco
+Los nombres, textos y hashtags se guardan en pools de cadenas (string_pool.py)
+y las entidades se referencian por id entero en todas las tablas
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from string_pool import InternedStrings, StringPool, as_interned, as_pool
+
+# Tipos de usuario (enum UserType)
+PERSON = 0
+COMPANY = 1
+
+# Tipos de interacción (enum Interaction)
+NONE = 0
+LIKE = 1
+DISLIKE = 2
+
+# Columnas de la tabla de publicaciones (una fila por post, id = índice)
+POST_AUTHOR_ID = 0
+POST_AUTHOR_TYPE = 1
+POST_ORIGINAL_ID = 2
+POST_COLUMNS = 3
+
+# Columnas de la tabla de interacciones (una fila por par usuario-post)
+INTER_USER_TYPE = 0
+INTER_USER_ID = 1
+INTER_POST_ID = 2
+INTER_VALUE = 3
+INTER_COLUMNS = 4
+
+# Relaciones de struct Relations: nombre -> (tipo origen, tipo destino)
+RELATIONS = {
+    "person_follows_person": (PERSON, PERSON),
+    "person_blocks_person": (PERSON, PERSON),
+    "person_follows_company": (PERSON, COMPANY),
+    "person_is_client": (PERSON, COMPANY),
+    "person_works_at": (PERSON, COMPANY),
+    "person_blocked_by_company": (PERSON, COMPANY),
+    "company_follows_company": (COMPANY, COMPANY),
+    "company_recommends_company": (COMPANY, COMPANY),
+    "company_blocks_company": (COMPANY, COMPANY),
+    "company_blocks_person": (COMPANY, PERSON),
+}
+
+DATASET_VERSION = 1
+META_FILE = "dataset.json"
+
+# Tablas con marca de tiempo opcional además de las relaciones: nombre -> archivo
+TIME_FILES = {"posts": "post_times", "interactions": "interaction_times"}
+# Relaciones cuyos eventos (seguimientos) generan los datasets con marca de tiempo
+TIMED_RELATIONS = ("person_follows_person", "person_follows_company", "company_follows_company")
+
+
+def empty_edges() -> np.ndarray:
+    """Lista de aristas vacía (n, 2) con columnas (origen, destino)"""
+    return np.zeros((0, 2), dtype=np.int32)
+
+
+class SocialDataset:
+    """
+    Red social completa en memoria (o mapeada desde disco)
+
+    - person_names / company_names / post_texts: StringPool (id = índice)
+    - post_hashtags: InternedStrings (cada hashtag distinto se guarda una vez)
+    - posts: tabla int32 (n, 3) con columnas POST_*
+    - relations: nombre -> aristas int32 (m, 2) (origen, destino)
+    - interactions: tabla int32 (k, 4) con columnas INTER_*
+    - post_times / interaction_times / relation_times[nombre]: marcas de
+      tiempo int64 (segundos Unix) alineadas con cada tabla, o None
+    """
+
+    def __init__(self,
+                 person_names: Iterable[str] = (),
+                 company_names: Iterable[str] = (),
+                 post_texts: Iterable[str] = (),
+                 post_hashtags: Iterable[str] = (),
+                 posts: Optional[np.ndarray] = None,
+                 relations: Optional[Dict[str, np.ndarray]] = None,
+                 interactions: Optional[np.ndarray] = None,
+                 post_times: Optional[np.ndarray] = None,
+                 interaction_times: Optional[np.ndarray] = None,
+                 relation_times: Optional[Dict[str, np.ndarray]] = None):
+        self.person_names: StringPool = as_pool(person_names)
+        self.company_names: StringPool = as_pool(company_names)
+        self.post_texts: StringPool = as_pool(post_texts)
+        self.post_hashtags: InternedStrings = as_interned(post_hashtags)
+
+        if posts is None:
+            posts = np.zeros((0, POST_COLUMNS), dtype=np.int32)
+        self.posts = np.asarray(posts, dtype=np.int32).reshape(-1, POST_COLUMNS)
+
+        self.relations: Dict[str, np.ndarray] = {}
+        for name in RELATIONS:
+            edges = (relations or {}).get(name)
+            if edges is None:
+                edges = empty_edges()
+            self.relations[name] = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+
+        if interactions is None:
+            interactions = np.zeros((0, INTER_COLUMNS), dtype=np.int32)
+        self.interactions = np.asarray(interactions, dtype=np.int32).reshape(-1, INTER_COLUMNS)
+
+        self.post_times = None if post_times is None else np.asarray(post_times, dtype=np.int64)
+        self.interaction_times = (None if interaction_times is None
+                                  else np.asarray(interaction_times, dtype=np.int64))
+        self.relation_times: Dict[str, np.ndarray] = {
+            name: np.asarray(times, dtype=np.int64)
+            for name, times in (relation_times or {}).items() if times is not None}
+
+    @property
+    def num_persons(self) -> int:
+        return len(self.person_names)
+
+    @property
+    def num_companies(self) -> int:
+        return len(self.company_names)
+
+    @property
+    def num_posts(self) -> int:
+        return len(self.posts)
+
+    def times(self, table: str) -> Optional[np.ndarray]:
+        """Marcas de tiempo de "posts", "interactions" o una relación (None si no tiene)"""
+        if table == "posts":
+            return self.post_times
+        if table == "interactions":
+            return self.interaction_times
+        return self.relation_times.get(table)
+
+    def timed_tables(self) -> Dict[str, np.ndarray]:
+        """Tablas que tienen marca de tiempo -> marcas"""
+        tables = {name: self.times(name) for name in list(TIME_FILES) + list(RELATIONS)}
+        return {name: times for name, times in tables.items() if times is not None}
+
+    def summary(self) -> Dict[str, int]:
+        """Conteos básicos del dataset"""
+        return {
+            "personas": self.num_persons,
+            "empresas": self.num_companies,
+            "publicaciones": self.num_posts,
+            "aristas": int(sum(len(e) for e in self.relations.values())),
+            "interacciones": len(self.interactions),
+        }
+
+
+# 2024-01-01T00:00:00Z
+SAMPLE_START = 1_704_067_200
+
+
+def sample_dataset() -> SocialDataset:
+    """Datos de ejemplo equivalentes a initialize_sample_data() en social_network.cu"""
+    persons = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank"]
+    companies = ["TechCorp", "SocialHub", "DataInc"]
+
+    # (texto, hashtag, autor, tipo de autor, post original)
+    post_rows = [
+        ("Hola mundo! #tech", "#tech", 0, PERSON, -1),
+        ("Me encanta programar #coding", "#coding", 1, PERSON, -1),
+        ("Hermoso dia! #life", "#life", 2, PERSON, -1),
+        ("CUDA es increible #tech", "#tech", 0, PERSON, -1),
+        ("Hola mundo! #tech", "#tech", 1, PERSON, 0),          # Bob republica post de Alice
+        ("Nuevos productos disponibles #tech", "#tech", 0, COMPANY, -1),
+        ("Unete a nuestra red #social", "#social", 1, COMPANY, -1),
+        ("Analiza tus datos #data", "#data", 2, COMPANY, -1),
+        ("Analiza tus datos #data", "#data", 0, COMPANY, 7),    # TechCorp recomienda post de DataInc
+        ("Gran evento de tecnologia #tech", "#tech", 0, COMPANY, -1),
+    ]
+
+    relations = {
+        "person_follows_person": [(0, 1), (1, 0), (2, 1), (3, 0), (4, 2), (5, 3)],
+        "person_blocks_person": [(1, 2)],
+        "person_follows_company": [(0, 0), (1, 0), (2, 1)],
+        "person_is_client": [(0, 0), (3, 0)],
+        "person_works_at": [(4, 1)],
+        "company_follows_company": [(0, 1)],
+        "company_recommends_company": [(0, 2), (1, 2)],
+    }
+
+    interactions = [
+        (PERSON, 0, 1, LIKE),
+        (PERSON, 1, 0, LIKE),
+        (PERSON, 2, 1, LIKE),
+        (PERSON, 0, 5, LIKE),
+        (PERSON, 1, 5, LIKE),
+        (PERSON, 3, 5, LIKE),
+        (PERSON, 0, 3, LIKE),
+        (PERSON, 4, 2, DISLIKE),
+        (PERSON, 2, 6, DISLIKE),
+        (COMPANY, 0, 6, LIKE),
+    ]
+
+    # Marcas de tiempo: un post por hora desde SAMPLE_START, cada reacción una
+    # hora después de su post y los seguimientos durante el día anterior
+    hour = 3600
+    return SocialDataset(
+        person_names=persons,
+        company_names=companies,
+        post_texts=[row[0] for row in post_rows],
+        post_hashtags=[row[1] for row in post_rows],
+        posts=[row[2:] for row in post_rows],
+        relations={name: np.array(edges, dtype=np.int32) for name, edges in relations.items()},
+        interactions=interactions,
+        post_times=SAMPLE_START + hour * np.arange(len(post_rows)),
+        interaction_times=[SAMPLE_START + hour * (post + 1) for _, _, post, _ in interactions],
+        relation_times={name: SAMPLE_START - hour * np.arange(len(relations[name]), 0, -1)
+                        for name in TIMED_RELATIONS},
+    )
+
+
+# ============================================================================
+# FORMATO EN DISCO
+# ============================================================================
+#
+# <dir>/dataset.json            metadatos y conteos
+# Los .txt son el buffer UTF-8 de cada pool con '\n' como terminador: se leen
+# con una pasada vectorizada (StringPool.read) y se escriben sin recorrerlos
+#
+# <dir>/persons.txt             un nombre por línea
+# <dir>/companies.txt
+# <dir>/post_texts.txt          un texto por línea (id = número de línea)
+# <dir>/post_hashtags.txt
+# <dir>/posts.npy               int32 (n, 3)
+# <dir>/<relacion>.npy          int32 (m, 2)
+# <dir>/interactions.npy        int32 (k, 4)
+# <dir>/post_times.npy          int64 (n,) segundos Unix (opcional)
+# <dir>/interaction_times.npy   int64 (k,) (opcional)
+# <dir>/<relacion>_times.npy    int64 (m,) (opcional)
+
+def write_lines(path, values: Iterable[str]):
+    """Escribe una cadena por línea (los saltos de línea internos se reemplazan)"""
+    if isinstance(values, (StringPool, InternedStrings)):
+        values.write(path)
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        for value in values:
+            f.write(value.replace('\n', ' '))
+            f.write('\n')
+
+
+def read_lines(path) -> List[str]:
+    """Lee un archivo escrito con write_lines"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().split('\n')[:-1]
+
+
+class TableWriter:
+    """
+    Escribe una tabla int32 (n, columnas) en formato .npy por bloques,
+    sin conocer n de antemano (la cabecera se completa al cerrar)
+    Con columns=None escribe una columna 1-D (p. ej. marcas de tiempo '<i8')
+    """
+
+    HEADER_SIZE = 128
+
+    def __init__(self, path, columns: Optional[int], dtype: str = '<i4'):
+        self.path = Path(path)
+        self.columns = columns
+        self.dtype = dtype
+        self.rows = 0
+        self._file = open(self.path, 'wb')
+        self._file.write(b'\0' * self.HEADER_SIZE)
+
+    def write(self, rows: np.ndarray):
+        rows = np.ascontiguousarray(rows, dtype=self.dtype)
+        rows = rows.reshape(-1) if self.columns is None else rows.reshape(-1, self.columns)
+        rows.tofile(self._file)
+        self.rows += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+        shape = (self.rows,) if self.columns is None else (self.rows, self.columns)
+        header = repr({'descr': self.dtype, 'fortran_order': False, 'shape': shape})
+        prefix = b'\x93NUMPY\x01\x00'
+        body = header.encode('latin1')
+        padding = self.HEADER_SIZE - len(prefix) - 2 - len(body) - 1
+        self._file.seek(0)
+        self._file.write(prefix + np.uint16(len(body) + padding + 1).tobytes()
+                         + body + b' ' * padding + b'\n')
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_metadata(path, num_persons: int, num_companies: int, num_posts: int,
+                   num_interactions: int, relations: Dict[str, int]):
+    """Escribe dataset.json"""
+    meta = {
+        "version": DATASET_VERSION,
+        "num_persons": num_persons,
+        "num_companies": num_companies,
+        "num_posts": num_posts,
+        "num_interactions": num_interactions,
+        "relations": relations,
+    }
+    with open(Path(path) / META_FILE, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+
+def save_dataset(dataset: SocialDataset, path) -> Path:
+    """Guarda el dataset en un directorio con el formato del proyecto"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+
+    write_lines(path / "persons.txt", dataset.person_names)
+    write_lines(path / "companies.txt", dataset.company_names)
+    write_lines(path / "post_texts.txt", dataset.post_texts)
+    write_lines(path / "post_hashtags.txt", dataset.post_hashtags)
+
+    np.save(path / "posts.npy", dataset.posts)
+    np.save(path / "interactions.npy", dataset.interactions)
+    for name, edges in dataset.relations.items():
+        np.save(path / f"{name}.npy", edges)
+    for name, times in dataset.timed_tables().items():
+        np.save(path / f"{TIME_FILES.get(name, name + '_times')}.npy", times)
+
+    write_metadata(path, dataset.num_persons, dataset.num_companies, dataset.num_posts,
+                   len(dataset.interactions),
+                   {name: len(edges) for name, edges in dataset.relations.items()})
+    return path
+
+
+def read_metadata(path) -> Dict:
+    """Lee dataset.json de un directorio de dataset"""
+    with open(Path(path) / META_FILE, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get("version") != DATASET_VERSION:
+        raise ValueError(f"Versión de dataset no soportada: {meta.get('version')}")
+    return meta
+
+
+def load_array(path, name: str, mmap: bool = True) -> np.ndarray:
+    """Carga una tabla .npy del dataset (mapeada en memoria por defecto)"""
+    return np.load(Path(path) / f"{name}.npy", mmap_mode='r' if mmap else None)
+
+
+def load_dataset(path, mmap: bool = False) -> SocialDataset:
+    """
+    Carga un dataset guardado con save_dataset
+    Con mmap=True las tablas numéricas quedan mapeadas en disco (solo lectura)
+    """
+    path = Path(path)
+    read_metadata(path)
+
+    relations = {}
+    for name in RELATIONS:
+        if os.path.exists(path / f"{name}.npy"):
+            relations[name] = load_array(path, name, mmap)
+
+    dataset = SocialDataset(
+        person_names=StringPool.read(path / "persons.txt"),
+        company_names=StringPool.read(path / "companies.txt"),
+        post_texts=StringPool.read(path / "post_texts.txt"),
+        post_hashtags=InternedStrings.read(path / "post_hashtags.txt"),
+    )
+    # Asignación directa para conservar el mapeo en memoria
+    dataset.posts = load_array(path, "posts", mmap)
+    dataset.interactions = load_array(path, "interactions", mmap)
+    dataset.relations.update(relations)
+    for name in list(TIME_FILES) + list(RELATIONS):
+        filename = TIME_FILES.get(name, f"{name}_times")
+        if os.path.exists(path / f"{filename}.npy"):
+            times = load_array(path, filename, mmap)
+            if name == "posts":
+                dataset.post_times = times
+            elif name == "interactions":
+                dataset.interaction_times = times
+            else:
+                dataset.relation_times[name] = times
+    return dataset
+
+
+if __name__ == "__main__":
+    import sys
+
+    target = sys.argv[1] if len(sys.argv) > 1 else "datos_ejemplo"
+    data = sample_dataset()
+    save_dataset(data, target)
+    print(f"Dataset de ejemplo guardado en {target}: {data.summary()}")
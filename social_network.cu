@@ -1,17 +1,34 @@
 #include <cuda_runtime.h>
 #include <stdio.h>
 #include <string.h>
+#include <limits.h>
 #include <algorithm>
+#include <chrono>
+#include <new>
+#include <string>
+#include <unordered_map>
+#include <utility>
+#include <vector>
+#include <stdlib.h>
 
-#define MAX_USERS 1000
-#define MAX_POSTS 2000
-#define MAX_TEXT_LEN 256
-#define MAX_HASHTAG_LEN 32
 #define THREADS_PER_BLOCK 256
 
+// Los ids y conteos se indexan con int: un dataset con más filas se rechaza
+// al cargarlo en lugar de desbordar los índices
+#define MAX_ROWS INT_MAX
+
+// Códigos de salida
+#define EXIT_INVALID_DATASET 1
+#define EXIT_NO_CAPACITY 2
+
 // ============================================================================
 // ESTRUCTURAS DE DATOS
 // ============================================================================
+// Todas las tablas se dimensionan con los conteos reales del dataset cargado
+// (no hay límites de compilación). Las relaciones se guardan como listas de
+// aristas y se indexan en CSR. Nombres, textos y hashtags son pools de cadenas
+// (un buffer contiguo más offsets, como string_pool.py); los hashtags se
+// internan y a la GPU solo viaja el id int32 de cada post
 
 // Tipos de usuario
 enum UserType { PERSON = 0, COMPANY = 1 };
@@ -19,233 +36,381 @@ enum UserType { PERSON = 0, COMPANY = 1 };
 // Tipo de interacción con publicación
 enum Interaction { NONE = 0, LIKE = 1, DISLIKE = 2 };
 
-// Estructura para personas (SoA - Structure of Arrays)
+// Pool de cadenas: todas en un buffer, cada una terminada en '\0', y el
+// offset de su inicio; at(i) es un C string listo para printf
+struct StringPool {
+    std::vector<char> data;
+    std::vector<size_t> offsets;
+
+    int size() const { return (int)offsets.size(); }
+    const char* at(int i) const { return &data[offsets[i]]; }
+    void push_back(const char* value) {
+        offsets.push_back(data.size());
+        data.insert(data.end(), value, value + strlen(value) + 1);
+    }
+};
+
+// Columna con valores repetidos: codes[i] es el id de la fila i en values
+// (cada valor distinto se guarda una vez, en orden de primera aparición)
+struct InternedStrings {
+    StringPool values;
+    std::vector<int> codes;
+    std::unordered_map<std::string, int> lookup;
+
+    int size() const { return (int)codes.size(); }
+    const char* at(int i) const { return values.at(codes[i]); }
+    // Id de un valor (-1 si no aparece)
+    int code(const char* value) const {
+        std::unordered_map<std::string, int>::const_iterator found = lookup.find(value);
+        return found == lookup.end() ? -1 : found->second;
+    }
+    void push_back(const char* value) {
+        std::pair<std::unordered_map<std::string, int>::iterator, bool> inserted =
+            lookup.insert(std::make_pair(std::string(value), values.size()));
+        if (inserted.second) values.push_back(value);
+        codes.push_back(inserted.first->second);
+    }
+};
+
+// Estructura para personas (SoA - Structure of Arrays); el id es el índice
 struct Persons {
     int count;
-    int ids[MAX_USERS];
-    char names[MAX_USERS][64];
+    StringPool names;
 };
 
 // Estructura para empresas
 struct Companies {
     int count;
-    int ids[MAX_USERS];
-    char names[MAX_USERS][64];
+    StringPool names;
 };
 
 // Estructura para publicaciones
 struct Posts {
     int count;
-    int ids[MAX_POSTS];
-    char texts[MAX_POSTS][MAX_TEXT_LEN];
-    char hashtags[MAX_POSTS][MAX_HASHTAG_LEN];
-    int author_ids[MAX_POSTS];
-    UserType author_types[MAX_POSTS];
-    int original_post_id[MAX_POSTS];  // -1 si es original, sino ID del post original
+    StringPool texts;
+    InternedStrings hashtags;
+    std::vector<int> author_ids;
+    std::vector<int> author_types;      // UserType
+    std::vector<int> original_post_id;  // -1 si es original, sino ID del post original
+};
+
+// Lista de aristas (origen, destino) de una relación
+struct EdgeList {
+    std::vector<int> src;
+    std::vector<int> dst;
 };
 
-// Relaciones entre usuarios (matrices de adyacencia)
-// 0 = no relación, 1 = relación
+// Relaciones entre usuarios (una lista de aristas por relación)
 struct Relations {
     // Persona -> Persona
-    int person_follows_person[MAX_USERS][MAX_USERS];
-    int person_blocks_person[MAX_USERS][MAX_USERS];
+    EdgeList person_follows_person;
+    EdgeList person_blocks_person;
 
     // Persona -> Empresa
-    int person_follows_company[MAX_USERS][MAX_USERS];
-    int person_is_client[MAX_USERS][MAX_USERS];
-    int person_works_at[MAX_USERS][MAX_USERS];
-    int person_blocked_by_company[MAX_USERS][MAX_USERS];
+    EdgeList person_follows_company;
+    EdgeList person_is_client;
+    EdgeList person_works_at;
+    EdgeList person_blocked_by_company;
 
     // Empresa -> Empresa
-    int company_follows_company[MAX_USERS][MAX_USERS];
-    int company_recommends_company[MAX_USERS][MAX_USERS];
-    int company_blocks_company[MAX_USERS][MAX_USERS];
+    EdgeList company_follows_company;
+    EdgeList company_recommends_company;
+    EdgeList company_blocks_company;
 
     // Empresa -> Persona
-    int company_blocks_person[MAX_USERS][MAX_USERS];
+    EdgeList company_blocks_person;
 };
 
-// Interacciones con publicaciones
+// Interacciones con publicaciones (una fila por par usuario-post)
 struct PostInteractions {
-    Interaction person_interactions[MAX_USERS][MAX_POSTS];
-    Interaction company_interactions[MAX_USERS][MAX_POSTS];
+    int count;
+    std::vector<int> user_types;
+    std::vector<int> user_ids;
+    std::vector<int> post_ids;
+    std::vector<int> values;  // Interaction
 };
 
-// ============================================================================
-// KERNELS CUDA - OPERACIONES BÁSICAS
-// ============================================================================
-
-// Kernel para contar seguidores de una persona
-__global__ void count_person_followers_kernel(int person_idx, int* relations, int num_persons, int* result) {
-    int tid = blockIdx.x * blockDim.x + threadIdx.x;
+// Formato CSR: los vecinos de la fila r son indices[offsets[r]..offsets[r+1]),
+// ordenados de menor a mayor
+struct CSR {
+    std::vector<int> offsets;
+    std::vector<int> indices;
 
-    __shared__ int local_count[THREADS_PER_BLOCK];
-    local_count[threadIdx.x] = 0;
+    int degree(int row) const { return offsets[row + 1] - offsets[row]; }
 
-    if (tid < num_persons) {
-        if (relations[tid * MAX_USERS + person_idx] == 1) {
-            local_count[threadIdx.x] = 1;
-        }
+    bool contains(int row, int col) const {
+        return std::binary_search(indices.begin() + offsets[row],
+                                  indices.begin() + offsets[row + 1], col);
     }
+};
 
-    __syncthreads();
+// Índices CSR que usan las consultas (se construyen una vez tras la carga)
+struct GraphIndex {
+    CSR follows;          // persona -> personas que sigue
+    CSR followers;        // persona -> personas que la siguen
+    CSR blocks;           // persona -> personas que bloquea
+    CSR company_blocks;   // empresa -> personas que bloquea
+    CSR recommended_by;   // empresa -> empresas que la recomiendan
+    CSR clients;          // persona -> empresas de las que es cliente
+};
 
-    // Reducción paralela
-    for (int stride = blockDim.x / 2; stride > 0; stride >>= 1) {
-        if (threadIdx.x < stride) {
-            local_count[threadIdx.x] += local_count[threadIdx.x + stride];
-        }
-        __syncthreads();
-    }
+void add_edge(EdgeList& edges, int src, int dst) {
+    edges.src.push_back(src);
+    edges.dst.push_back(dst);
+}
+
+void add_interaction(PostInteractions* interactions, UserType user_type, int user_id,
+                     int post_id, Interaction value) {
+    interactions->user_types.push_back(user_type);
+    interactions->user_ids.push_back(user_id);
+    interactions->post_ids.push_back(post_id);
+    interactions->values.push_back(value);
+    interactions->count = (int)interactions->values.size();
+}
 
-    if (threadIdx.x == 0) {
-        atomicAdd(result, local_count[0]);
+// CSR de filas -> columnas (orden por conteo, columnas ordenadas en cada fila)
+CSR build_csr(const std::vector<int>& rows, const std::vector<int>& cols, int num_rows) {
+    CSR csr;
+    csr.offsets.assign(num_rows + 1, 0);
+    for (size_t e = 0; e < rows.size(); e++) csr.offsets[rows[e] + 1]++;
+    for (int r = 0; r < num_rows; r++) csr.offsets[r + 1] += csr.offsets[r];
+
+    csr.indices.resize(rows.size());
+    std::vector<int> next(csr.offsets.begin(), csr.offsets.end() - 1);
+    for (size_t e = 0; e < rows.size(); e++) csr.indices[next[rows[e]]++] = cols[e];
+    for (int r = 0; r < num_rows; r++) {
+        std::sort(csr.indices.begin() + csr.offsets[r], csr.indices.begin() + csr.offsets[r + 1]);
     }
+    return csr;
 }
 
-// Kernel para contar seguidores de una empresa
-__global__ void count_company_followers_kernel(int company_idx,
-                                               int* person_follows_company,
-                                               int* company_follows_company,
-                                               int num_persons,
-                                               int num_companies,
-                                               int* result) {
-    int tid = blockIdx.x * blockDim.x + threadIdx.x;
+void build_index(GraphIndex* index, Persons* persons, Companies* companies,
+                 Relations* relations) {
+    const EdgeList& follows = relations->person_follows_person;
+    index->follows = build_csr(follows.src, follows.dst, persons->count);
+    index->followers = build_csr(follows.dst, follows.src, persons->count);
+    index->blocks = build_csr(relations->person_blocks_person.src,
+                              relations->person_blocks_person.dst, persons->count);
+    index->company_blocks = build_csr(relations->company_blocks_person.src,
+                                      relations->company_blocks_person.dst, companies->count);
+    index->recommended_by = build_csr(relations->company_recommends_company.dst,
+                                      relations->company_recommends_company.src, companies->count);
+    index->clients = build_csr(relations->person_is_client.src,
+                               relations->person_is_client.dst, persons->count);
+}
 
-    __shared__ int local_count[THREADS_PER_BLOCK];
-    local_count[threadIdx.x] = 0;
+// ============================================================================
+// INSTRUMENTACIÓN
+// ============================================================================
+// Se activa con --metrics o SOCIAL_NETWORK_METRICS=1. Cada consulta escribe
+// en stderr una línea "METRIC {json}" con tiempo de pared, tiempo de kernels
+// (cudaEvent), bytes copiados host<->device y memoria de GPU pico.
+// Desactivada, cada punto de medición es solo una comparación con un bool.
+
+#define MAX_TRACKED_ALLOCS 64
+
+struct QueryMetrics {
+    bool enabled;
+    const char* name;
+    std::chrono::steady_clock::time_point start;
+    float kernel_ms;
+    int kernels;
+    size_t h2d_bytes;
+    size_t d2h_bytes;
+    size_t device_bytes;
+    size_t device_peak_bytes;
+    cudaEvent_t kernel_start;
+    cudaEvent_t kernel_stop;
+    void* alloc_ptrs[MAX_TRACKED_ALLOCS];
+    size_t alloc_sizes[MAX_TRACKED_ALLOCS];
+};
 
-    // Contar personas que siguen a la empresa
-    if (tid < num_persons) {
-        if (person_follows_company[tid * MAX_USERS + company_idx] == 1) {
-            local_count[threadIdx.x] = 1;
-        }
+static QueryMetrics g_metrics = {};
+
+void metrics_begin(const char* name) {
+    if (!g_metrics.enabled) return;
+    g_metrics.name = name;
+    g_metrics.kernel_ms = 0.0f;
+    g_metrics.kernels = 0;
+    g_metrics.h2d_bytes = 0;
+    g_metrics.d2h_bytes = 0;
+    g_metrics.device_peak_bytes = g_metrics.device_bytes;
+    g_metrics.start = std::chrono::steady_clock::now();
+}
+
+void metrics_end(size_t host_bytes = 0) {
+    if (!g_metrics.enabled) return;
+    double seconds = std::chrono::duration<double>(
+        std::chrono::steady_clock::now() - g_metrics.start).count();
+    fprintf(stderr,
+            "METRIC {\"consulta\": \"%s\", \"segundos\": %.6f, \"kernel_ms\": %.4f, "
+            "\"kernels\": %d, \"h2d_bytes\": %zu, \"d2h_bytes\": %zu, "
+            "\"memoria_gpu_pico_bytes\": %zu, \"memoria_host_bytes\": %zu}\n",
+            g_metrics.name, seconds, g_metrics.kernel_ms, g_metrics.kernels,
+            g_metrics.h2d_bytes, g_metrics.d2h_bytes, g_metrics.device_peak_bytes,
+            host_bytes);
+}
+
+void metrics_init(int argc, char** argv) {
+    const char* env = getenv("SOCIAL_NETWORK_METRICS");
+    g_metrics.enabled = env != NULL && strcmp(env, "1") == 0;
+    for (int i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--metrics") == 0) g_metrics.enabled = true;
     }
-    // Contar empresas que siguen a la empresa
-    else if (tid < num_persons + num_companies) {
-        int company_tid = tid - num_persons;
-        if (company_follows_company[company_tid * MAX_USERS + company_idx] == 1) {
-            local_count[threadIdx.x] = 1;
+    if (!g_metrics.enabled) return;
+
+    cudaEventCreate(&g_metrics.kernel_start);
+    cudaEventCreate(&g_metrics.kernel_stop);
+
+    // Crear el contexto CUDA aquí para no cargarlo a la primera consulta
+    metrics_begin("contexto_cuda");
+    cudaFree(0);
+    metrics_end();
+}
+
+void track_alloc(void* ptr, size_t bytes) {
+    if (!g_metrics.enabled) return;
+    for (int i = 0; i < MAX_TRACKED_ALLOCS; i++) {
+        if (g_metrics.alloc_ptrs[i] == NULL) {
+            g_metrics.alloc_ptrs[i] = ptr;
+            g_metrics.alloc_sizes[i] = bytes;
+            break;
         }
     }
+    g_metrics.device_bytes += bytes;
+    if (g_metrics.device_bytes > g_metrics.device_peak_bytes) {
+        g_metrics.device_peak_bytes = g_metrics.device_bytes;
+    }
+}
+
+// Una reserva fallida termina el programa con un error claro (la capacidad
+// ya se verificó al cargar, así que solo ocurre si otra aplicación usa la GPU)
+void check_alloc(cudaError_t err, size_t bytes) {
+    if (err == cudaSuccess) return;
+    fprintf(stderr, "Error: no se pudieron reservar %zu bytes en la GPU (%s)\n",
+            bytes, cudaGetErrorString(err));
+    exit(EXIT_NO_CAPACITY);
+}
 
-    __syncthreads();
+template <typename T>
+cudaError_t metered_malloc(T** ptr, size_t bytes) {
+    // cudaMalloc no admite 0 bytes de forma portable: las tablas vacías reservan 1 elemento
+    bytes = std::max(bytes, sizeof(T));
+    cudaError_t err = cudaMalloc(ptr, bytes);
+    check_alloc(err, bytes);
+    track_alloc(*ptr, bytes);
+    return err;
+}
 
-    for (int stride = blockDim.x / 2; stride > 0; stride >>= 1) {
-        if (threadIdx.x < stride) {
-            local_count[threadIdx.x] += local_count[threadIdx.x + stride];
+cudaError_t metered_free(void* ptr) {
+    if (g_metrics.enabled) {
+        for (int i = 0; i < MAX_TRACKED_ALLOCS; i++) {
+            if (g_metrics.alloc_ptrs[i] == ptr) {
+                g_metrics.device_bytes -= g_metrics.alloc_sizes[i];
+                g_metrics.alloc_ptrs[i] = NULL;
+                break;
+            }
         }
-        __syncthreads();
     }
+    return cudaFree(ptr);
+}
 
-    if (threadIdx.x == 0) {
-        atomicAdd(result, local_count[0]);
+cudaError_t metered_memcpy(void* dst, const void* src, size_t bytes, cudaMemcpyKind kind) {
+    if (bytes == 0) return cudaSuccess;
+    if (g_metrics.enabled) {
+        if (kind == cudaMemcpyHostToDevice) g_metrics.h2d_bytes += bytes;
+        else if (kind == cudaMemcpyDeviceToHost) g_metrics.d2h_bytes += bytes;
     }
+    return cudaMemcpy(dst, src, bytes, kind);
 }
 
-// Kernel para contar likes de una publicación
-__global__ void count_post_likes_kernel(int post_idx,
-                                        Interaction* person_interactions,
-                                        Interaction* company_interactions,
-                                        int num_persons,
-                                        int num_companies,
-                                        int* likes,
-                                        int* dislikes) {
-    int tid = blockIdx.x * blockDim.x + threadIdx.x;
+inline void kernel_timer_start() {
+    if (g_metrics.enabled) cudaEventRecord(g_metrics.kernel_start);
+}
 
-    __shared__ int local_likes[THREADS_PER_BLOCK];
-    __shared__ int local_dislikes[THREADS_PER_BLOCK];
-    local_likes[threadIdx.x] = 0;
-    local_dislikes[threadIdx.x] = 0;
+inline void kernel_timer_stop() {
+    if (!g_metrics.enabled) return;
+    float ms = 0.0f;
+    cudaEventRecord(g_metrics.kernel_stop);
+    cudaEventSynchronize(g_metrics.kernel_stop);
+    cudaEventElapsedTime(&ms, g_metrics.kernel_start, g_metrics.kernel_stop);
+    g_metrics.kernel_ms += ms;
+    g_metrics.kernels++;
+}
 
-    if (tid < num_persons) {
-        Interaction inter = person_interactions[tid * MAX_POSTS + post_idx];
-        if (inter == LIKE) local_likes[threadIdx.x] = 1;
-        else if (inter == DISLIKE) local_dislikes[threadIdx.x] = 1;
-    }
-    else if (tid < num_persons + num_companies) {
-        int company_tid = tid - num_persons;
-        Interaction inter = company_interactions[company_tid * MAX_POSTS + post_idx];
-        if (inter == LIKE) local_likes[threadIdx.x] = 1;
-        else if (inter == DISLIKE) local_dislikes[threadIdx.x] = 1;
-    }
+inline int num_blocks_for(int n) {
+    return std::max((n + THREADS_PER_BLOCK - 1) / THREADS_PER_BLOCK, 1);
+}
 
-    __syncthreads();
+// ============================================================================
+// KERNELS CUDA - OPERACIONES BÁSICAS
+// ============================================================================
 
-    for (int stride = blockDim.x / 2; stride > 0; stride >>= 1) {
-        if (threadIdx.x < stride) {
-            local_likes[threadIdx.x] += local_likes[threadIdx.x + stride];
-            local_dislikes[threadIdx.x] += local_dislikes[threadIdx.x + stride];
-        }
-        __syncthreads();
+// Kernel para contar seguidores: un hilo por arista suma 1 a su destino
+// (counts tiene exactamente una posición por usuario)
+__global__ void count_followers_kernel(const int* targets, int num_edges, int* counts) {
+    int tid = blockIdx.x * blockDim.x + threadIdx.x;
+
+    if (tid < num_edges) {
+        atomicAdd(&counts[targets[tid]], 1);
     }
+}
+
+// Kernel para contar likes y dislikes de todas las publicaciones
+// (un hilo por interacción)
+__global__ void count_post_likes_kernel(const int* post_ids,
+                                        const int* values,
+                                        int num_interactions,
+                                        int* likes,
+                                        int* dislikes) {
+    int tid = blockIdx.x * blockDim.x + threadIdx.x;
 
-    if (threadIdx.x == 0) {
-        atomicAdd(likes, local_likes[0]);
-        atomicAdd(dislikes, local_dislikes[0]);
+    if (tid < num_interactions) {
+        if (values[tid] == LIKE) atomicAdd(&likes[post_ids[tid]], 1);
+        else if (values[tid] == DISLIKE) atomicAdd(&dislikes[post_ids[tid]], 1);
     }
 }
 
 // Kernel para encontrar publicaciones con un hashtag
-__global__ void find_posts_by_hashtag_kernel(char (*hashtags)[MAX_HASHTAG_LEN],
+// hashtag_ids: id internado del hashtag de cada post (las cadenas quedan en el
+// host); result_indices tiene `capacity` posiciones y nunca se escribe fuera de ellas
+__global__ void find_posts_by_hashtag_kernel(const int* hashtag_ids,
                                              int num_posts,
-                                             const char* target_hashtag,
+                                             int target_id,
                                              int* result_indices,
+                                             int capacity,
                                              int* result_count) {
     int tid = blockIdx.x * blockDim.x + threadIdx.x;
 
-    if (tid < num_posts) {
-        bool match = true;
-        for (int i = 0; i < MAX_HASHTAG_LEN; i++) {
-            if (hashtags[tid][i] != target_hashtag[i]) {
-                match = false;
-                break;
-            }
-            if (hashtags[tid][i] == '\0') break;
-        }
-
-        if (match && hashtags[tid][0] != '\0') {
-            int idx = atomicAdd(result_count, 1);
-            if (idx < MAX_POSTS) {
-                result_indices[idx] = tid;
-            }
+    if (tid < num_posts && hashtag_ids[tid] == target_id) {
+        int idx = atomicAdd(result_count, 1);
+        if (idx < capacity) {
+            result_indices[idx] = tid;
         }
     }
 }
 
-// Kernel para verificar si una persona puede ver una publicación
-__global__ void check_visibility_kernel(int post_idx,
-                                       int author_id,
-                                       int* person_follows_person,
-                                       int* person_blocks_person,
-                                       int num_persons,
-                                       int* can_view) {
+// Kernel para verificar qué personas pueden ver una publicación
+// direct[i] = 1 si i sigue al autor y no está bloqueado por él; los demás
+// la ven si siguen a alguno de ellos (grado 2, vecinos CSR de cada hilo)
+__global__ void check_visibility_kernel(int author_id,
+                                        const int* follow_offsets,
+                                        const int* follow_indices,
+                                        const int* direct,
+                                        int num_persons,
+                                        int* can_view) {
     int tid = blockIdx.x * blockDim.x + threadIdx.x;
 
     if (tid < num_persons) {
         // El autor siempre puede ver su propia publicación
-        if (tid == author_id) {
-            can_view[tid] = 1;
-            return;
-        }
-
-        bool is_follower = (person_follows_person[tid * MAX_USERS + author_id] == 1);
-        bool is_blocked = (person_blocks_person[author_id * MAX_USERS + tid] == 1);
-
-        // Puede ver si es seguidor y no está bloqueado
-        if (is_follower && !is_blocked) {
+        if (tid == author_id || direct[tid] == 1) {
             can_view[tid] = 1;
             return;
         }
 
         // Buscar si es seguidor de un seguidor (grado 2)
-        for (int i = 0; i < num_persons; i++) {
-            bool i_follows_author = (person_follows_person[i * MAX_USERS + author_id] == 1);
-            bool tid_follows_i = (person_follows_person[tid * MAX_USERS + i] == 1);
-            bool i_blocked_by_author = (person_blocks_person[author_id * MAX_USERS + i] == 1);
-
-            if (i_follows_author && !i_blocked_by_author && tid_follows_i) {
+        for (int e = follow_offsets[tid]; e < follow_offsets[tid + 1]; e++) {
+            if (direct[follow_indices[e]] == 1) {
                 can_view[tid] = 1;
                 return;
             }
@@ -263,240 +428,387 @@ __global__ void check_visibility_kernel(int post_idx,
 void initialize_sample_data(Persons* persons, Companies* companies, Posts* posts,
                            Relations* relations, PostInteractions* interactions) {
     // Personas
-    persons->count = 6;
-    int person_ids[] = {0, 1, 2, 3, 4, 5};
     const char* person_names[] = {"Alice", "Bob", "Charlie", "Diana", "Eve", "Frank"};
-    for (int i = 0; i < persons->count; i++) {
-        persons->ids[i] = person_ids[i];
-        strcpy(persons->names[i], person_names[i]);
-    }
+    persons->count = 6;
+    for (int i = 0; i < persons->count; i++) persons->names.push_back(person_names[i]);
 
     // Empresas
-    companies->count = 3;
-    int company_ids[] = {0, 1, 2};
     const char* company_names[] = {"TechCorp", "SocialHub", "DataInc"};
-    for (int i = 0; i < companies->count; i++) {
-        companies->ids[i] = company_ids[i];
-        strcpy(companies->names[i], company_names[i]);
-    }
-
-    // Inicializar todas las relaciones a 0
-    memset(relations, 0, sizeof(Relations));
+    companies->count = 3;
+    for (int i = 0; i < companies->count; i++) companies->names.push_back(company_names[i]);
 
     // Relaciones persona-persona (seguimiento)
-    relations->person_follows_person[0][1] = 1; // Alice sigue a Bob
-    relations->person_follows_person[1][0] = 1; // Bob sigue a Alice (amigos)
-    relations->person_follows_person[2][1] = 1; // Charlie sigue a Bob
-    relations->person_follows_person[3][0] = 1; // Diana sigue a Alice
-    relations->person_follows_person[4][2] = 1; // Eve sigue a Charlie
-    relations->person_follows_person[5][3] = 1; // Frank sigue a Diana
+    add_edge(relations->person_follows_person, 0, 1); // Alice sigue a Bob
+    add_edge(relations->person_follows_person, 1, 0); // Bob sigue a Alice (amigos)
+    add_edge(relations->person_follows_person, 2, 1); // Charlie sigue a Bob
+    add_edge(relations->person_follows_person, 3, 0); // Diana sigue a Alice
+    add_edge(relations->person_follows_person, 4, 2); // Eve sigue a Charlie
+    add_edge(relations->person_follows_person, 5, 3); // Frank sigue a Diana
 
     // Bloqueos
-    relations->person_blocks_person[1][2] = 1; // Bob bloquea a Charlie
+    add_edge(relations->person_blocks_person, 1, 2); // Bob bloquea a Charlie
 
     // Relaciones persona-empresa
-    relations->person_follows_company[0][0] = 1; // Alice sigue a TechCorp
-    relations->person_follows_company[1][0] = 1; // Bob sigue a TechCorp
-    relations->person_follows_company[2][1] = 1; // Charlie sigue a SocialHub
-    relations->person_is_client[0][0] = 1;       // Alice es cliente de TechCorp
-    relations->person_is_client[3][0] = 1;       // Diana es cliente de TechCorp
-    relations->person_works_at[4][1] = 1;        // Eve trabaja en SocialHub
+    add_edge(relations->person_follows_company, 0, 0); // Alice sigue a TechCorp
+    add_edge(relations->person_follows_company, 1, 0); // Bob sigue a TechCorp
+    add_edge(relations->person_follows_company, 2, 1); // Charlie sigue a SocialHub
+    add_edge(relations->person_is_client, 0, 0);       // Alice es cliente de TechCorp
+    add_edge(relations->person_is_client, 3, 0);       // Diana es cliente de TechCorp
+    add_edge(relations->person_works_at, 4, 1);        // Eve trabaja en SocialHub
 
     // Relaciones empresa-empresa
-    relations->company_follows_company[0][1] = 1;    // TechCorp sigue a SocialHub
-    relations->company_recommends_company[0][2] = 1; // TechCorp recomienda a DataInc
-    relations->company_recommends_company[1][2] = 1; // SocialHub recomienda a DataInc
-
-    // Publicaciones
+    add_edge(relations->company_follows_company, 0, 1);    // TechCorp sigue a SocialHub
+    add_edge(relations->company_recommends_company, 0, 2); // TechCorp recomienda a DataInc
+    add_edge(relations->company_recommends_company, 1, 2); // SocialHub recomienda a DataInc
+
+    // Publicaciones: texto, hashtag, autor, tipo de autor, post original
+    struct SamplePost { const char* text; const char* hashtag; int author; UserType type; int original; };
+    const SamplePost sample_posts[] = {
+        // Publicaciones de personas
+        {"Hola mundo! #tech", "#tech", 0, PERSON, -1},
+        {"Me encanta programar #coding", "#coding", 1, PERSON, -1},
+        {"Hermoso dia! #life", "#life", 2, PERSON, -1},
+        {"CUDA es increible #tech", "#tech", 0, PERSON, -1},
+        // Republicación: Bob republica post de Alice
+        {"Hola mundo! #tech", "#tech", 1, PERSON, 0},
+        // Publicaciones de empresas
+        {"Nuevos productos disponibles #tech", "#tech", 0, COMPANY, -1},
+        {"Unete a nuestra red #social", "#social", 1, COMPANY, -1},
+        {"Analiza tus datos #data", "#data", 2, COMPANY, -1},
+        // Empresa recomienda publicación de otra empresa
+        {"Analiza tus datos #data", "#data", 0, COMPANY, 7},
+        {"Gran evento de tecnologia #tech", "#tech", 0, COMPANY, -1},
+    };
     posts->count = 10;
-
-    // Publicaciones de personas
-    posts->ids[0] = 0;
-    strcpy(posts->texts[0], "Hola mundo! #tech");
-    strcpy(posts->hashtags[0], "#tech");
-    posts->author_ids[0] = 0;
-    posts->author_types[0] = PERSON;
-    posts->original_post_id[0] = -1;
-
-    posts->ids[1] = 1;
-    strcpy(posts->texts[1], "Me encanta programar #coding");
-    strcpy(posts->hashtags[1], "#coding");
-    posts->author_ids[1] = 1;
-    posts->author_types[1] = PERSON;
-    posts->original_post_id[1] = -1;
-
-    posts->ids[2] = 2;
-    strcpy(posts->texts[2], "Hermoso dia! #life");
-    strcpy(posts->hashtags[2], "#life");
-    posts->author_ids[2] = 2;
-    posts->author_types[2] = PERSON;
-    posts->original_post_id[2] = -1;
-
-    posts->ids[3] = 3;
-    strcpy(posts->texts[3], "CUDA es increible #tech");
-    strcpy(posts->hashtags[3], "#tech");
-    posts->author_ids[3] = 0;
-    posts->author_types[3] = PERSON;
-    posts->original_post_id[3] = -1;
-
-    // Republicación: Bob republica post de Alice
-    posts->ids[4] = 4;
-    strcpy(posts->texts[4], "Hola mundo! #tech");
-    strcpy(posts->hashtags[4], "#tech");
-    posts->author_ids[4] = 1;
-    posts->author_types[4] = PERSON;
-    posts->original_post_id[4] = 0;
-
-    // Publicaciones de empresas
-    posts->ids[5] = 5;
-    strcpy(posts->texts[5], "Nuevos productos disponibles #tech");
-    strcpy(posts->hashtags[5], "#tech");
-    posts->author_ids[5] = 0;
-    posts->author_types[5] = COMPANY;
-    posts->original_post_id[5] = -1;
-
-    posts->ids[6] = 6;
-    strcpy(posts->texts[6], "Unete a nuestra red #social");
-    strcpy(posts->hashtags[6], "#social");
-    posts->author_ids[6] = 1;
-    posts->author_types[6] = COMPANY;
-    posts->original_post_id[6] = -1;
-
-    posts->ids[7] = 7;
-    strcpy(posts->texts[7], "Analiza tus datos #data");
-    strcpy(posts->hashtags[7], "#data");
-    posts->author_ids[7] = 2;
-    posts->author_types[7] = COMPANY;
-    posts->original_post_id[7] = -1;
-
-    // Empresa recomienda publicación de otra empresa
-    posts->ids[8] = 8;
-    strcpy(posts->texts[8], "Analiza tus datos #data");
-    strcpy(posts->hashtags[8], "#data");
-    posts->author_ids[8] = 0;
-    posts->author_types[8] = COMPANY;
-    posts->original_post_id[8] = 7;
-
-    posts->ids[9] = 9;
-    strcpy(posts->texts[9], "Gran evento de tecnologia #tech");
-    strcpy(posts->hashtags[9], "#tech");
-    posts->author_ids[9] = 0;
-    posts->author_types[9] = COMPANY;
-    posts->original_post_id[9] = -1;
-
-    // Interacciones con publicaciones
-    memset(interactions, 0, sizeof(PostInteractions));
+    for (int i = 0; i < posts->count; i++) {
+        posts->texts.push_back(sample_posts[i].text);
+        posts->hashtags.push_back(sample_posts[i].hashtag);
+        posts->author_ids.push_back(sample_posts[i].author);
+        posts->author_types.push_back(sample_posts[i].type);
+        posts->original_post_id.push_back(sample_posts[i].original);
+    }
 
     // Likes
-    interactions->person_interactions[0][1] = LIKE;  // Alice le gusta post 1 de Bob
-    interactions->person_interactions[1][0] = LIKE;  // Bob le gusta post 0 de Alice
-    interactions->person_interactions[2][1] = LIKE;  // Charlie le gusta post 1 de Bob
-    interactions->person_interactions[0][5] = LIKE;  // Alice le gusta post 5 de TechCorp
-    interactions->person_interactions[1][5] = LIKE;  // Bob le gusta post 5 de TechCorp
-    interactions->person_interactions[3][5] = LIKE;  // Diana le gusta post 5 de TechCorp
-    interactions->person_interactions[0][3] = LIKE;  // Alice le gusta su propio post 3
+    add_interaction(interactions, PERSON, 0, 1, LIKE);  // Alice le gusta post 1 de Bob
+    add_interaction(interactions, PERSON, 1, 0, LIKE);  // Bob le gusta post 0 de Alice
+    add_interaction(interactions, PERSON, 2, 1, LIKE);  // Charlie le gusta post 1 de Bob
+    add_interaction(interactions, PERSON, 0, 5, LIKE);  // Alice le gusta post 5 de TechCorp
+    add_interaction(interactions, PERSON, 1, 5, LIKE);  // Bob le gusta post 5 de TechCorp
+    add_interaction(interactions, PERSON, 3, 5, LIKE);  // Diana le gusta post 5 de TechCorp
+    add_interaction(interactions, PERSON, 0, 3, LIKE);  // Alice le gusta su propio post 3
 
     // Dislikes
-    interactions->person_interactions[4][2] = DISLIKE;  // Eve no le gusta post 2
-    interactions->person_interactions[2][6] = DISLIKE;  // Charlie no le gusta post 6
+    add_interaction(interactions, PERSON, 4, 2, DISLIKE);  // Eve no le gusta post 2
+    add_interaction(interactions, PERSON, 2, 6, DISLIKE);  // Charlie no le gusta post 6
 
     // Likes de empresas
-    interactions->company_interactions[0][6] = LIKE;  // TechCorp le gusta post 6 de SocialHub
+    add_interaction(interactions, COMPANY, 0, 6, LIKE);  // TechCorp le gusta post 6 de SocialHub
 }
 
-// Contar seguidores de una persona
-int count_person_followers(int person_idx, Relations* relations, int num_persons) {
-    int *d_relations, *d_result;
-    int h_result = 0;
+// ============================================================================
+// CARGA DE DATASETS (formato de social_dataset.py)
+// ============================================================================
+// <dir>/persons.txt, companies.txt, post_texts.txt, post_hashtags.txt
+// <dir>/posts.npy (n, 3), interactions.npy (k, 4), <relacion>.npy (m, 2), int32
+
+// Lee un archivo de una cadena por línea directamente como pool: el buffer es
+// el archivo con cada '\n' reemplazado por '\0'
+bool read_pool(const std::string& path, StringPool& pool) {
+    FILE* f = fopen(path.c_str(), "rb");
+    if (f == NULL) {
+        fprintf(stderr, "Error: no se pudo abrir %s\n", path.c_str());
+        return false;
+    }
+    char buffer[1 << 16];
+    size_t n;
+    while ((n = fread(buffer, 1, sizeof(buffer), f)) > 0) {
+        pool.data.insert(pool.data.end(), buffer, buffer + n);
+    }
+    fclose(f);
+    if (!pool.data.empty() && pool.data.back() != '\n') pool.data.push_back('\n');
+
+    size_t start = 0;
+    for (size_t i = 0; i < pool.data.size(); i++) {
+        if (pool.data[i] == '\n') {
+            pool.data[i] = '\0';
+            pool.offsets.push_back(start);
+            start = i + 1;
+        }
+    }
+    if (pool.offsets.size() > (size_t)MAX_ROWS) {
+        fprintf(stderr, "Error: %s tiene más de %d filas\n", path.c_str(), MAX_ROWS);
+        return false;
+    }
+    return true;
+}
 
-    cudaMalloc(&d_relations, MAX_USERS * MAX_USERS * sizeof(int));
-    cudaMalloc(&d_result, sizeof(int));
+// Lee una columna de valores repetidos (hashtags) y la interna
+bool read_interned(const std::string& path, InternedStrings& column) {
+    StringPool rows;
+    if (!read_pool(path, rows)) return false;
+    column.codes.reserve(rows.size());
+    for (int i = 0; i < rows.size(); i++) column.push_back(rows.at(i));
+    return true;
+}
 
-    cudaMemcpy(d_relations, relations->person_follows_person,
-               MAX_USERS * MAX_USERS * sizeof(int), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_result, &h_result, sizeof(int), cudaMemcpyHostToDevice);
+// Lee una tabla .npy int32 de `columns` columnas; un archivo opcional que no
+// existe queda como tabla vacía
+bool read_npy(const std::string& path, int columns, bool optional,
+              std::vector<int>& data, int* rows) {
+    *rows = 0;
+    FILE* f = fopen(path.c_str(), "rb");
+    if (f == NULL) {
+        if (optional) return true;
+        fprintf(stderr, "Error: no se pudo abrir %s\n", path.c_str());
+        return false;
+    }
 
-    int num_blocks = (num_persons + THREADS_PER_BLOCK - 1) / THREADS_PER_BLOCK;
-    count_person_followers_kernel<<<num_blocks, THREADS_PER_BLOCK>>>(
-        person_idx, d_relations, num_persons, d_result);
+    unsigned char prefix[10];
+    bool ok = fread(prefix, 1, 10, f) == 10 && memcmp(prefix, "\x93NUMPY", 6) == 0;
+    size_t header_len = 0;
+    if (ok && prefix[6] == 1) {
+        header_len = prefix[8] | (prefix[9] << 8);
+    } else if (ok) {
+        unsigned char extra[2];
+        ok = fread(extra, 1, 2, f) == 2;
+        header_len = prefix[8] | (prefix[9] << 8) | (extra[0] << 16) | ((size_t)extra[1] << 24);
+    }
+    std::string header(header_len, '\0');
+    ok = ok && fread(&header[0], 1, header_len, f) == header_len;
+    if (!ok || header.find("'<i4'") == std::string::npos ||
+        header.find("'fortran_order': False") == std::string::npos) {
+        fprintf(stderr, "Error: %s no es una tabla .npy int32 en orden C\n", path.c_str());
+        fclose(f);
+        return false;
+    }
 
-    cudaMemcpy(&h_result, d_result, sizeof(int), cudaMemcpyDeviceToHost);
+    // 'shape': (n, columnas) o (n,) para una columna
+    size_t shape_pos = header.find("'shape': (");
+    long long shape[2] = {0, 1};
+    if (shape_pos != std::string::npos) {
+        const char* p = header.c_str() + shape_pos + 10;
+        char* end;
+        shape[0] = strtoll(p, &end, 10);
+        if (*end == ',' && end[1] == ' ' && end[2] != ')') shape[1] = strtoll(end + 2, &end, 10);
+    }
+    if (shape[1] != columns) {
+        fprintf(stderr, "Error: %s tiene %lld columnas (se esperaban %d)\n",
+                path.c_str(), shape[1], columns);
+        fclose(f);
+        return false;
+    }
+    if (shape[0] < 0 || shape[0] > MAX_ROWS) {
+        fprintf(stderr, "Error: %s tiene %lld filas (máximo %d)\n", path.c_str(), shape[0], MAX_ROWS);
+        fclose(f);
+        return false;
+    }
 
-    cudaFree(d_relations);
-    cudaFree(d_result);
+    *rows = (int)shape[0];
+    data.resize((size_t)shape[0] * columns);
+    ok = fread(data.data(), sizeof(int), data.size(), f) == data.size();
+    fclose(f);
+    if (!ok) fprintf(stderr, "Error: %s está truncado\n", path.c_str());
+    return ok;
+}
 
-    return h_result;
+// Separa la columna `column` de una tabla de `columns` columnas
+std::vector<int> table_column(const std::vector<int>& table, int rows, int columns, int column) {
+    std::vector<int> values(rows);
+    for (int i = 0; i < rows; i++) values[i] = table[(size_t)i * columns + column];
+    return values;
 }
 
-// Contar seguidores de una empresa
-int count_company_followers(int company_idx, Relations* relations,
-                            int num_persons, int num_companies) {
-    int *d_person_follows, *d_company_follows, *d_result;
-    int h_result = 0;
+// Verifica que todos los ids estén en [0, size)
+bool check_range(const std::vector<int>& ids, int size, const char* what) {
+    for (size_t i = 0; i < ids.size(); i++) {
+        if (ids[i] < 0 || ids[i] >= size) {
+            fprintf(stderr, "Error: %s: id %d fuera de rango en la fila %zu (hay %d)\n",
+                    what, ids[i], i, size);
+            return false;
+        }
+    }
+    return true;
+}
+
+bool load_relation(const std::string& dir, const char* name, EdgeList& edges,
+                   int num_sources, int num_targets) {
+    std::vector<int> table;
+    int rows;
+    if (!read_npy(dir + "/" + name + ".npy", 2, true, table, &rows)) return false;
+    edges.src = table_column(table, rows, 2, 0);
+    edges.dst = table_column(table, rows, 2, 1);
+    return check_range(edges.src, num_sources, name) && check_range(edges.dst, num_targets, name);
+}
+
+// Carga un dataset guardado con social_dataset.save_dataset; los ids fuera
+// de rango o las tablas demasiado grandes se reportan y el dataset se rechaza
+bool load_dataset(const std::string& dir, Persons* persons, Companies* companies,
+                  Posts* posts, Relations* relations, PostInteractions* interactions) {
+    if (!read_pool(dir + "/persons.txt", persons->names) ||
+        !read_pool(dir + "/companies.txt", companies->names) ||
+        !read_pool(dir + "/post_texts.txt", posts->texts) ||
+        !read_interned(dir + "/post_hashtags.txt", posts->hashtags)) {
+        return false;
+    }
+    persons->count = (int)persons->names.size();
+    companies->count = (int)companies->names.size();
+
+    std::vector<int> table;
+    int rows;
+    if (!read_npy(dir + "/posts.npy", 3, false, table, &rows)) return false;
+    posts->count = rows;
+    posts->author_ids = table_column(table, rows, 3, 0);
+    posts->author_types = table_column(table, rows, 3, 1);
+    posts->original_post_id = table_column(table, rows, 3, 2);
+    if (posts->texts.size() != rows || posts->hashtags.size() != rows) {
+        fprintf(stderr, "Error: posts.npy tiene %d filas y los textos/hashtags %d/%d\n",
+                rows, posts->texts.size(), posts->hashtags.size());
+        return false;
+    }
+    for (int i = 0; i < rows; i++) {
+        int limit = posts->author_types[i] == COMPANY ? companies->count : persons->count;
+        if (posts->author_ids[i] < 0 || posts->author_ids[i] >= limit ||
+            posts->original_post_id[i] < -1 || posts->original_post_id[i] >= rows) {
+            fprintf(stderr, "Error: posts.npy: fila %d fuera de rango\n", i);
+            return false;
+        }
+    }
 
-    cudaMalloc(&d_person_follows, MAX_USERS * MAX_USERS * sizeof(int));
-    cudaMalloc(&d_company_follows, MAX_USERS * MAX_USERS * sizeof(int));
-    cudaMalloc(&d_result, sizeof(int));
+    if (!read_npy(dir + "/interactions.npy", 4, false, table, &rows)) return false;
+    interactions->count = rows;
+    interactions->user_types = table_column(table, rows, 4, 0);
+    interactions->user_ids = table_column(table, rows, 4, 1);
+    interactions->post_ids = table_column(table, rows, 4, 2);
+    interactions->values = table_column(table, rows, 4, 3);
+    for (int i = 0; i < rows; i++) {
+        int limit = interactions->user_types[i] == COMPANY ? companies->count : persons->count;
+        if (interactions->user_ids[i] < 0 || interactions->user_ids[i] >= limit) {
+            fprintf(stderr, "Error: interactions.npy: usuario fuera de rango en la fila %d\n", i);
+            return false;
+        }
+    }
+    if (!check_range(interactions->post_ids, posts->count, "interactions.npy")) return false;
+    std::vector<int>().swap(table);
+
+    int np_ = persons->count, nc = companies->count;
+    return load_relation(dir, "person_follows_person", relations->person_follows_person, np_, np_) &&
+           load_relation(dir, "person_blocks_person", relations->person_blocks_person, np_, np_) &&
+           load_relation(dir, "person_follows_company", relations->person_follows_company, np_, nc) &&
+           load_relation(dir, "person_is_client", relations->person_is_client, np_, nc) &&
+           load_relation(dir, "person_works_at", relations->person_works_at, np_, nc) &&
+           load_relation(dir, "person_blocked_by_company", relations->person_blocked_by_company, np_, nc) &&
+           load_relation(dir, "company_follows_company", relations->company_follows_company, nc, nc) &&
+           load_relation(dir, "company_recommends_company", relations->company_recommends_company, nc, nc) &&
+           load_relation(dir, "company_blocks_company", relations->company_blocks_company, nc, nc) &&
+           load_relation(dir, "company_blocks_person", relations->company_blocks_person, nc, np_);
+}
 
-    cudaMemcpy(d_person_follows, relations->person_follows_company,
-               MAX_USERS * MAX_USERS * sizeof(int), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_company_follows, relations->company_follows_company,
-               MAX_USERS * MAX_USERS * sizeof(int), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_result, &h_result, sizeof(int), cudaMemcpyHostToDevice);
+// Memoria de GPU que necesita la consulta más grande con este dataset
+size_t device_bytes_required(Persons* persons, Companies* companies, Posts* posts,
+                             Relations* relations, PostInteractions* interactions) {
+    size_t follows = relations->person_follows_person.dst.size();
+    size_t company_follows = std::max(relations->person_follows_company.dst.size(),
+                                      relations->company_follows_company.dst.size());
+    size_t followers = std::max((persons->count + follows) * sizeof(int),
+                                (companies->count + company_follows) * sizeof(int));
+    size_t reactions = (2 * (size_t)posts->count + 2 * (size_t)interactions->count) * sizeof(int);
+    size_t hashtags = 2 * (size_t)posts->count * sizeof(int);
+    size_t visibility = (3 * (size_t)persons->count + 1 + follows) * sizeof(int);
+    return std::max(std::max(followers, reactions), std::max(hashtags, visibility));
+}
 
-    int total_users = num_persons + num_companies;
-    int num_blocks = (total_users + THREADS_PER_BLOCK - 1) / THREADS_PER_BLOCK;
+// Rechaza el dataset si la consulta más grande no entra en la memoria libre de la GPU
+bool check_device_capacity(size_t required) {
+    size_t free_bytes = 0, total_bytes = 0;
+    cudaError_t err = cudaMemGetInfo(&free_bytes, &total_bytes);
+    if (err != cudaSuccess) {
+        fprintf(stderr, "Error: no hay una GPU CUDA disponible (%s)\n", cudaGetErrorString(err));
+        return false;
+    }
+    if (required > free_bytes) {
+        fprintf(stderr, "Error: el dataset necesita %zu bytes de memoria de GPU y hay %zu libres "
+                "(de %zu)\n", required, free_bytes, total_bytes);
+        return false;
+    }
+    return true;
+}
 
-    count_company_followers_kernel<<<num_blocks, THREADS_PER_BLOCK>>>(
-        company_idx, d_person_follows, d_company_follows,
-        num_persons, num_companies, d_result);
+// Cuenta seguidores por usuario sumando los destinos de una o más listas de aristas
+std::vector<int> count_followers(const EdgeList* const* lists, int num_lists, int num_users) {
+    int* d_counts;
+    std::vector<int> h_counts(num_users, 0);
 
-    cudaMemcpy(&h_result, d_result, sizeof(int), cudaMemcpyDeviceToHost);
+    metered_malloc(&d_counts, num_users * sizeof(int));
+    cudaMemset(d_counts, 0, std::max(num_users, 1) * sizeof(int));
 
-    cudaFree(d_person_follows);
-    cudaFree(d_company_follows);
-    cudaFree(d_result);
+    for (int l = 0; l < num_lists; l++) {
+        int num_edges = (int)lists[l]->dst.size();
+        if (num_edges == 0) continue;
 
-    return h_result;
-}
+        int* d_targets;
+        metered_malloc(&d_targets, num_edges * sizeof(int));
+        metered_memcpy(d_targets, lists[l]->dst.data(), num_edges * sizeof(int),
+                       cudaMemcpyHostToDevice);
 
-// Contar likes y dislikes de una publicación
-void count_post_reactions(int post_idx, PostInteractions* interactions,
-                         int num_persons, int num_companies,
-                         int* likes, int* dislikes) {
-    Interaction *d_person_inter, *d_company_inter;
-    int *d_likes, *d_dislikes;
-    int h_likes = 0, h_dislikes = 0;
+        kernel_timer_start();
+        count_followers_kernel<<<num_blocks_for(num_edges), THREADS_PER_BLOCK>>>(
+            d_targets, num_edges, d_counts);
+        kernel_timer_stop();
 
-    cudaMalloc(&d_person_inter, MAX_USERS * MAX_POSTS * sizeof(Interaction));
-    cudaMalloc(&d_company_inter, MAX_USERS * MAX_POSTS * sizeof(Interaction));
-    cudaMalloc(&d_likes, sizeof(int));
-    cudaMalloc(&d_dislikes, sizeof(int));
+        metered_free(d_targets);
+    }
 
-    cudaMemcpy(d_person_inter, interactions->person_interactions,
-               MAX_USERS * MAX_POSTS * sizeof(Interaction), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_company_inter, interactions->company_interactions,
-               MAX_USERS * MAX_POSTS * sizeof(Interaction), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_likes, &h_likes, sizeof(int), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_dislikes, &h_dislikes, sizeof(int), cudaMemcpyHostToDevice);
+    metered_memcpy(h_counts.data(), d_counts, num_users * sizeof(int), cudaMemcpyDeviceToHost);
+    metered_free(d_counts);
 
-    int total_users = num_persons + num_companies;
-    int num_blocks = (total_users + THREADS_PER_BLOCK - 1) / THREADS_PER_BLOCK;
+    return h_counts;
+}
 
-    count_post_likes_kernel<<<num_blocks, THREADS_PER_BLOCK>>>(
-        post_idx, d_person_inter, d_company_inter,
-        num_persons, num_companies, d_likes, d_dislikes);
+// Contar likes y dislikes de todas las publicaciones
+void count_post_reactions(Posts* posts, PostInteractions* interactions,
+                          std::vector<int>& likes, std::vector<int>& dislikes) {
+    int *d_post_ids, *d_values, *d_likes, *d_dislikes;
+    int n = interactions->count;
+    size_t post_bytes = posts->count * sizeof(int);
+
+    likes.assign(posts->count, 0);
+    dislikes.assign(posts->count, 0);
+
+    metered_malloc(&d_post_ids, n * sizeof(int));
+    metered_malloc(&d_values, n * sizeof(int));
+    metered_malloc(&d_likes, post_bytes);
+    metered_malloc(&d_dislikes, post_bytes);
+
+    metered_memcpy(d_post_ids, interactions->post_ids.data(), n * sizeof(int),
+                   cudaMemcpyHostToDevice);
+    metered_memcpy(d_values, interactions->values.data(), n * sizeof(int),
+                   cudaMemcpyHostToDevice);
+    cudaMemset(d_likes, 0, post_bytes);
+    cudaMemset(d_dislikes, 0, post_bytes);
+
+    if (n > 0) {
+        kernel_timer_start();
+        count_post_likes_kernel<<<num_blocks_for(n), THREADS_PER_BLOCK>>>(
+            d_post_ids, d_values, n, d_likes, d_dislikes);
+        kernel_timer_stop();
+    }
 
-    cudaMemcpy(&h_likes, d_likes, sizeof(int), cudaMemcpyDeviceToHost);
-    cudaMemcpy(&h_dislikes, d_dislikes, sizeof(int), cudaMemcpyDeviceToHost);
+    metered_memcpy(likes.data(), d_likes, post_bytes, cudaMemcpyDeviceToHost);
+    metered_memcpy(dislikes.data(), d_dislikes, post_bytes, cudaMemcpyDeviceToHost);
 
-    *likes = h_likes;
-    *dislikes = h_dislikes;
+    metered_free(d_post_ids);
+    metered_free(d_values);
+    metered_free(d_likes);
+    metered_free(d_dislikes);
+}
 
-    cudaFree(d_person_inter);
-    cudaFree(d_company_inter);
-    cudaFree(d_likes);
-    cudaFree(d_dislikes);
+// Índices de los valores ordenados de mayor a menor (empates por índice ascendente)
+std::vector<int> order_descending(const std::vector<int>& values) {
+    std::vector<int> indices(values.size());
+    for (size_t i = 0; i < indices.size(); i++) indices[i] = (int)i;
+    std::stable_sort(indices.begin(), indices.end(),
+                     [&values](int a, int b) { return values[a] > values[b]; });
+    return indices;
 }
 
 // ============================================================================
@@ -506,121 +818,95 @@ void count_post_reactions(int post_idx, PostInteractions* interactions,
 void query_followers(Persons* persons, Companies* companies, Relations* relations) {
     printf("\n========== CANTIDAD DE SEGUIDORES ==========\n");
 
+    const EdgeList* person_lists[] = {&relations->person_follows_person};
+    std::vector<int> person_followers = count_followers(person_lists, 1, persons->count);
+
     printf("\n--- Personas ---\n");
     for (int i = 0; i < persons->count; i++) {
-        int followers = count_person_followers(i, relations, persons->count);
-        printf("%s: %d seguidores\n", persons->names[i], followers);
+        printf("%s: %d seguidores\n", persons->names.at(i), person_followers[i]);
     }
 
+    const EdgeList* company_lists[] = {&relations->person_follows_company,
+                                       &relations->company_follows_company};
+    std::vector<int> company_followers = count_followers(company_lists, 2, companies->count);
+
     printf("\n--- Empresas ---\n");
     for (int i = 0; i < companies->count; i++) {
-        int followers = count_company_followers(i, relations,
-                                                persons->count, companies->count);
-        printf("%s: %d seguidores\n", companies->names[i], followers);
+        printf("%s: %d seguidores\n", companies->names.at(i), company_followers[i]);
     }
 }
 
-void query_post_reactions(Posts* posts, PostInteractions* interactions,
-                         int num_persons, int num_companies) {
+void query_post_reactions(Posts* posts, PostInteractions* interactions) {
     printf("\n========== REACCIONES POR PUBLICACION ==========\n");
 
-    for (int i = 0; i < posts->count; i++) {
-        int likes, dislikes;
-        count_post_reactions(i, interactions, num_persons, num_companies,
-                           &likes, &dislikes);
+    std::vector<int> likes, dislikes;
+    count_post_reactions(posts, interactions, likes, dislikes);
 
-        printf("\nPost %d: \"%s\"\n", posts->ids[i], posts->texts[i]);
-        printf("  Likes: %d | Dislikes: %d\n", likes, dislikes);
+    for (int i = 0; i < posts->count; i++) {
+        printf("\nPost %d: \"%s\"\n", i, posts->texts.at(i));
+        printf("  Likes: %d | Dislikes: %d\n", likes[i], dislikes[i]);
     }
 }
 
-void query_top_posts(Posts* posts, PostInteractions* interactions,
-                    int num_persons, int num_companies) {
+void query_top_posts(Posts* posts, PostInteractions* interactions) {
     printf("\n========== TOP 5 PUBLICACIONES ==========\n");
 
     // Calcular likes para todos los posts
-    int likes[MAX_POSTS];
-    for (int i = 0; i < posts->count; i++) {
-        int dislikes;
-        count_post_reactions(i, interactions, num_persons, num_companies,
-                           &likes[i], &dislikes);
-    }
-
-    // Crear array de índices y ordenar
-    int indices[MAX_POSTS];
-    for (int i = 0; i < posts->count; i++) indices[i] = i;
+    std::vector<int> likes, dislikes;
+    count_post_reactions(posts, interactions, likes, dislikes);
 
     // Ordenar por likes (descendente)
-    for (int i = 0; i < posts->count - 1; i++) {
-        for (int j = i + 1; j < posts->count; j++) {
-            if (likes[indices[i]] < likes[indices[j]]) {
-                int temp = indices[i];
-                indices[i] = indices[j];
-                indices[j] = temp;
-            }
-        }
-    }
+    std::vector<int> indices = order_descending(likes);
 
     printf("\n--- Top 5 con MAS likes ---\n");
     for (int i = 0; i < 5 && i < posts->count; i++) {
         int idx = indices[i];
-        printf("%d. \"%s\" - %d likes\n", i+1, posts->texts[idx], likes[idx]);
+        printf("%d. \"%s\" - %d likes\n", i+1, posts->texts.at(idx), likes[idx]);
     }
 
     printf("\n--- Top 5 con MENOS likes ---\n");
     for (int i = 0; i < 5 && i < posts->count; i++) {
         int idx = indices[posts->count - 1 - i];
-        printf("%d. \"%s\" - %d likes\n", i+1, posts->texts[idx], likes[idx]);
+        printf("%d. \"%s\" - %d likes\n", i+1, posts->texts.at(idx), likes[idx]);
     }
 }
 
-void query_blocked_followers(Persons* persons, Companies* companies, Relations* relations) {
+void query_blocked_followers(Persons* persons, Companies* companies, GraphIndex* index) {
     printf("\n========== SEGUIDORES BLOQUEADOS ==========\n");
 
     printf("\n--- Personas que han bloqueado seguidores ---\n");
+    const CSR& blocks = index->blocks;
     for (int i = 0; i < persons->count; i++) {
-        bool has_blocks = false;
-        for (int j = 0; j < persons->count; j++) {
-            if (relations->person_blocks_person[i][j] == 1) {
-                if (!has_blocks) {
-                    printf("%s ha bloqueado a:\n", persons->names[i]);
-                    has_blocks = true;
-                }
-                printf("  - %s\n", persons->names[j]);
-            }
+        if (blocks.degree(i) == 0) continue;
+        printf("%s ha bloqueado a:\n", persons->names.at(i));
+        for (int e = blocks.offsets[i]; e < blocks.offsets[i + 1]; e++) {
+            printf("  - %s\n", persons->names.at(blocks.indices[e]));
         }
     }
 
     printf("\n--- Empresas que han bloqueado seguidores ---\n");
+    const CSR& company_blocks = index->company_blocks;
     for (int i = 0; i < companies->count; i++) {
-        bool has_blocks = false;
-        for (int j = 0; j < persons->count; j++) {
-            if (relations->company_blocks_person[i][j] == 1) {
-                if (!has_blocks) {
-                    printf("%s ha bloqueado a:\n", companies->names[i]);
-                    has_blocks = true;
-                }
-                printf("  - %s (persona)\n", persons->names[j]);
-            }
+        if (company_blocks.degree(i) == 0) continue;
+        printf("%s ha bloqueado a:\n", companies->names.at(i));
+        for (int e = company_blocks.offsets[i]; e < company_blocks.offsets[i + 1]; e++) {
+            printf("  - %s (persona)\n", persons->names.at(company_blocks.indices[e]));
         }
     }
 }
 
-void query_company_recommendations(Companies* companies, Relations* relations) {
+void query_company_recommendations(Companies* companies, GraphIndex* index) {
     printf("\n========== RECOMENDACIONES DE EMPRESAS ==========\n");
 
+    const CSR& recommended_by = index->recommended_by;
     for (int i = 0; i < companies->count; i++) {
-        int rec_count = 0;
-        printf("\n%s recibio recomendaciones de:\n", companies->names[i]);
+        printf("\n%s recibio recomendaciones de:\n", companies->names.at(i));
 
-        for (int j = 0; j < companies->count; j++) {
-            if (relations->company_recommends_company[j][i] == 1) {
-                printf("  - %s\n", companies->names[j]);
-                rec_count++;
-            }
+        for (int e = recommended_by.offsets[i]; e < recommended_by.offsets[i + 1]; e++) {
+            printf("  - %s\n", companies->names.at(recommended_by.indices[e]));
         }
 
-        if (rec_count == 0) {
+        if (recommended_by.degree(i) == 0) {
             printf("  (ninguna)\n");
         }
     }
@@ -629,81 +915,78 @@ void query_company_recommendations(Companies* companies, Relations* relations) {
 void query_hashtags(Posts* posts) {
     printf("\n========== ANALISIS DE HASHTAGS ==========\n");
 
-    // Contar hashtags
-    char unique_hashtags[MAX_POSTS][MAX_HASHTAG_LEN];
-    int hashtag_counts[MAX_POSTS];
-    int num_unique = 0;
-
-    for (int i = 0; i < posts->count; i++) {
-        if (posts->hashtags[i][0] == '\0') continue;
-
-        bool found = false;
-        for (int j = 0; j < num_unique; j++) {
-            if (strcmp(unique_hashtags[j], posts->hashtags[i]) == 0) {
-                hashtag_counts[j]++;
-                found = true;
-                break;
-            }
-        }
-
-        if (!found) {
-            strcpy(unique_hashtags[num_unique], posts->hashtags[i]);
-            hashtag_counts[num_unique] = 1;
-            num_unique++;
-        }
+    // Contar por id internado: los valores distintos ya están en orden de
+    // primera aparición; el hashtag vacío no cuenta
+    const InternedStrings& hashtags = posts->hashtags;
+    std::vector<int> counts(hashtags.values.size(), 0);
+    for (int i = 0; i < posts->count; i++) counts[hashtags.codes[i]]++;
+
+    std::vector<int> unique_hashtags;
+    std::vector<int> hashtag_counts;
+    for (int code = 0; code < hashtags.values.size(); code++) {
+        if (hashtags.values.at(code)[0] == '\0' || counts[code] == 0) continue;
+        unique_hashtags.push_back(code);
+        hashtag_counts.push_back(counts[code]);
     }
+    int num_unique = (int)unique_hashtags.size();
 
     // Encontrar más popular
-    int max_idx = 0;
-    for (int i = 1; i < num_unique; i++) {
-        if (hashtag_counts[i] > hashtag_counts[max_idx]) {
-            max_idx = i;
+    if (num_unique > 0) {
+        int max_idx = 0;
+        for (int i = 1; i < num_unique; i++) {
+            if (hashtag_counts[i] > hashtag_counts[max_idx]) {
+                max_idx = i;
+            }
         }
-    }
 
-    printf("\nHashtag mas usado: %s (%d publicaciones)\n",
-           unique_hashtags[max_idx], hashtag_counts[max_idx]);
+        printf("\nHashtag mas usado: %s (%d publicaciones)\n",
+               hashtags.values.at(unique_hashtags[max_idx]), hashtag_counts[max_idx]);
+    }
 
     printf("\nTodos los hashtags:\n");
     for (int i = 0; i < num_unique; i++) {
-        printf("  %s: %d publicaciones\n", unique_hashtags[i], hashtag_counts[i]);
+        printf("  %s: %d publicaciones\n", hashtags.values.at(unique_hashtags[i]), hashtag_counts[i]);
     }
 }
 
-void query_best_customers(Persons* persons, Companies* companies,
-                         Relations* relations, PostInteractions* interactions,
-                         Posts* posts) {
+void query_best_customers(Persons* persons, Companies* companies, GraphIndex* index,
+                         PostInteractions* interactions, Posts* posts) {
     printf("\n========== MEJORES CLIENTES DE EMPRESAS ==========\n");
 
+    // Likes de cada cliente a las publicaciones de su empresa: (empresa, persona) -> likes
+    std::unordered_map<long long, int> customer_likes;
+    for (int i = 0; i < interactions->count; i++) {
+        if (interactions->user_types[i] != PERSON || interactions->values[i] != LIKE) continue;
+        int post = interactions->post_ids[i];
+        if (posts->author_types[post] != COMPANY) continue;
+
+        int p = interactions->user_ids[i];
+        int c = posts->author_ids[post];
+        if (index->clients.contains(p, c)) {
+            customer_likes[(long long)c * persons->count + p]++;
+        }
+    }
+
+    // Ordenar por empresa, likes (descendente) y persona
+    std::vector<std::pair<long long, int> > ranking(customer_likes.begin(), customer_likes.end());
+    std::sort(ranking.begin(), ranking.end(),
+              [persons](const std::pair<long long, int>& a, const std::pair<long long, int>& b) {
+                  long long ca = a.first / persons->count, cb = b.first / persons->count;
+                  if (ca != cb) return ca < cb;
+                  if (a.second != b.second) return a.second > b.second;
+                  return a.first < b.first;
+              });
+
+    size_t r = 0;
     for (int c = 0; c < companies->count; c++) {
         printf("\n%s - Clientes que mas gustan de sus publicaciones:\n",
-               companies->names[c]);
-
-        int customer_likes[MAX_USERS] = {0};
+               companies->names.at(c));
 
-        // Contar likes de clientes a publicaciones de esta empresa
-        for (int p = 0; p < persons->count; p++) {
-            if (relations->person_is_client[p][c] == 0) continue;
-
-            for (int post_i = 0; post_i < posts->count; post_i++) {
-                if (posts->author_types[post_i] == COMPANY &&
-                    posts->author_ids[post_i] == c) {
-                    if (interactions->person_interactions[p][post_i] == LIKE) {
-                        customer_likes[p]++;
-                    }
-                }
-            }
-        }
-
-        // Mostrar clientes ordenados por likes
         bool found_any = false;
-        for (int likes = 10; likes >= 0; likes--) {
-            for (int p = 0; p < persons->count; p++) {
-                if (customer_likes[p] == likes && likes > 0) {
-                    printf("  - %s: %d likes\n", persons->names[p], likes);
-                    found_any = true;
-                }
-            }
+        for (; r < ranking.size() && ranking[r].first / persons->count == c; r++) {
+            int p = (int)(ranking[r].first % persons->count);
+            printf("  - %s: %d likes\n", persons->names.at(p), ranking[r].second);
+            found_any = true;
         }
 
         if (!found_any) {
@@ -713,148 +996,139 @@ void query_best_customers(Persons* persons, Companies* companies,
 }
 
 void query_top_companies_by_likes(Companies* companies, Posts* posts,
-                                 PostInteractions* interactions,
-                                 int num_persons, int num_companies) {
+                                 PostInteractions* interactions) {
     printf("\n========== EMPRESAS CON MAS/MENOS LIKES ==========\n");
 
-    int company_likes[MAX_USERS] = {0};
-    int company_dislikes[MAX_USERS] = {0};
+    std::vector<int> likes, dislikes;
+    count_post_reactions(posts, interactions, likes, dislikes);
 
+    std::vector<long long> company_likes(companies->count, 0);
+    std::vector<long long> company_dislikes(companies->count, 0);
     for (int i = 0; i < posts->count; i++) {
         if (posts->author_types[i] == COMPANY) {
-            int likes, dislikes;
-            count_post_reactions(i, interactions, num_persons, num_companies,
-                               &likes, &dislikes);
-            company_likes[posts->author_ids[i]] += likes;
-            company_dislikes[posts->author_ids[i]] += dislikes;
+            company_likes[posts->author_ids[i]] += likes[i];
+            company_dislikes[posts->author_ids[i]] += dislikes[i];
         }
     }
 
     printf("\n--- Empresas con MAS likes ---\n");
-    for (int i = 0; i < num_companies; i++) {
-        printf("%s: %d likes totales\n", companies->names[i], company_likes[i]);
+    for (int i = 0; i < companies->count; i++) {
+        printf("%s: %lld likes totales\n", companies->names.at(i), company_likes[i]);
     }
 
     printf("\n--- Empresas con MAS dislikes ---\n");
-    for (int i = 0; i < num_companies; i++) {
-        printf("%s: %d dislikes totales\n", companies->names[i], company_dislikes[i]);
+    for (int i = 0; i < companies->count; i++) {
+        printf("%s: %lld dislikes totales\n", companies->names.at(i), company_dislikes[i]);
     }
 }
 
-void query_top_companies_by_recommendations(Companies* companies, Relations* relations) {
+void query_top_companies_by_recommendations(Companies* companies, GraphIndex* index) {
     printf("\n========== EMPRESAS CON MAS RECOMENDACIONES ==========\n");
 
-    int rec_counts[MAX_USERS];
+    std::vector<int> rec_counts(companies->count);
     for (int i = 0; i < companies->count; i++) {
-        rec_counts[i] = 0;
-        for (int j = 0; j < companies->count; j++) {
-            if (relations->company_recommends_company[j][i] == 1) {
-                rec_counts[i]++;
-            }
-        }
+        rec_counts[i] = index->recommended_by.degree(i);
     }
 
-    // Crear índices y ordenar
-    int indices[MAX_USERS];
-    for (int i = 0; i < companies->count; i++) indices[i] = i;
-
-    for (int i = 0; i < companies->count - 1; i++) {
-        for (int j = i + 1; j < companies->count; j++) {
-            if (rec_counts[indices[i]] < rec_counts[indices[j]]) {
-                int temp = indices[i];
-                indices[i] = indices[j];
-                indices[j] = temp;
-            }
-        }
-    }
+    std::vector<int> indices = order_descending(rec_counts);
 
     for (int i = 0; i < companies->count; i++) {
         int idx = indices[i];
-        printf("%d. %s: %d recomendaciones\n", i+1, companies->names[idx], rec_counts[idx]);
+        printf("%d. %s: %d recomendaciones\n", i+1, companies->names.at(idx), rec_counts[idx]);
     }
 }
 
 void query_visibility_of_post(int post_idx, Posts* posts, Persons* persons,
-                              Relations* relations) {
+                              GraphIndex* index) {
     if (posts->author_types[post_idx] == COMPANY) {
         printf("\n========== VISIBILIDAD DEL POST %d (EMPRESA) ==========\n", post_idx);
-        printf("Post: \"%s\"\n", posts->texts[post_idx]);
+        printf("Post: \"%s\"\n", posts->texts.at(post_idx));
         printf("Autor: Empresa %s\n\n", "");
         printf("Todos los usuarios pueden ver esta publicacion (es de una empresa)\n");
         return;
     }
 
+    int author_id = posts->author_ids[post_idx];
     printf("\n========== VISIBILIDAD DEL POST %d (PERSONA) ==========\n", post_idx);
-    printf("Post: \"%s\"\n", posts->texts[post_idx]);
-    printf("Autor: %s\n\n", persons->names[posts->author_ids[post_idx]]);
+    printf("Post: \"%s\"\n", posts->texts.at(post_idx));
+    printf("Autor: %s\n\n", persons->names.at(author_id));
+
+    // Seguidores directos no bloqueados por el autor (CSR de seguidores)
+    int n = persons->count;
+    std::vector<int> h_direct(n, 0);
+    for (int e = index->followers.offsets[author_id]; e < index->followers.offsets[author_id + 1]; e++) {
+        int follower = index->followers.indices[e];
+        if (!index->blocks.contains(author_id, follower)) h_direct[follower] = 1;
+    }
 
-    int author_id = posts->author_ids[post_idx];
-    int *d_relations, *d_blocks, *d_can_view;
-    int h_can_view[MAX_USERS] = {0};
+    const CSR& follows = index->follows;
+    int *d_offsets, *d_indices, *d_direct, *d_can_view;
+    std::vector<int> h_can_view(n, 0);
 
-    cudaMalloc(&d_relations, MAX_USERS * MAX_USERS * sizeof(int));
-    cudaMalloc(&d_blocks, MAX_USERS * MAX_USERS * sizeof(int));
-    cudaMalloc(&d_can_view, MAX_USERS * sizeof(int));
+    metered_malloc(&d_offsets, (n + 1) * sizeof(int));
+    metered_malloc(&d_indices, follows.indices.size() * sizeof(int));
+    metered_malloc(&d_direct, n * sizeof(int));
+    metered_malloc(&d_can_view, n * sizeof(int));
 
-    cudaMemcpy(d_relations, relations->person_follows_person,
-               MAX_USERS * MAX_USERS * sizeof(int), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_blocks, relations->person_blocks_person,
-               MAX_USERS * MAX_USERS * sizeof(int), cudaMemcpyHostToDevice);
-    cudaMemcpy(d_can_view, h_can_view, MAX_USERS * sizeof(int), cudaMemcpyHostToDevice);
+    metered_memcpy(d_offsets, follows.offsets.data(), (n + 1) * sizeof(int), cudaMemcpyHostToDevice);
+    metered_memcpy(d_indices, follows.indices.data(), follows.indices.size() * sizeof(int),
+                   cudaMemcpyHostToDevice);
+    metered_memcpy(d_direct, h_direct.data(), n * sizeof(int), cudaMemcpyHostToDevice);
 
-    int num_blocks = (persons->count + THREADS_PER_BLOCK - 1) / THREADS_PER_BLOCK;
-    check_visibility_kernel<<<num_blocks, THREADS_PER_BLOCK>>>(
-        post_idx, author_id, d_relations, d_blocks, persons->count, d_can_view);
+    kernel_timer_start();
+    check_visibility_kernel<<<num_blocks_for(n), THREADS_PER_BLOCK>>>(
+        author_id, d_offsets, d_indices, d_direct, n, d_can_view);
+    kernel_timer_stop();
 
-    cudaMemcpy(h_can_view, d_can_view, MAX_USERS * sizeof(int), cudaMemcpyDeviceToHost);
+    metered_memcpy(h_can_view.data(), d_can_view, n * sizeof(int), cudaMemcpyDeviceToHost);
 
     printf("Personas que pueden ver esta publicacion:\n");
-    for (int i = 0; i < persons->count; i++) {
+    for (int i = 0; i < n; i++) {
         if (h_can_view[i] == 1) {
-            printf("  - %s\n", persons->names[i]);
+            printf("  - %s\n", persons->names.at(i));
         }
     }
 
-    cudaFree(d_relations);
-    cudaFree(d_blocks);
-    cudaFree(d_can_view);
+    metered_free(d_offsets);
+    metered_free(d_indices);
+    metered_free(d_direct);
+    metered_free(d_can_view);
 }
 
 void query_influence_network(int person_idx, int degree, Persons* persons,
-                            Relations* relations) {
+                            GraphIndex* index) {
     printf("\n========== RED DE INFLUENCIA: %s (grado %d) ==========\n",
-           persons->names[person_idx], degree);
+           persons->names.at(person_idx), degree);
 
-    bool visited[MAX_USERS] = {false};
-    int current_level[MAX_USERS], next_level[MAX_USERS];
-    int current_size = 1, next_size = 0;
+    const CSR& followers = index->followers;
+    std::vector<char> visited(persons->count, 0);
+    std::vector<int> current_level(1, person_idx), next_level;
 
-    current_level[0] = person_idx;
-    visited[person_idx] = true;
+    visited[person_idx] = 1;
 
     for (int d = 0; d < degree; d++) {
         printf("\n--- Grado %d ---\n", d + 1);
-        next_size = 0;
+        next_level.clear();
 
-        for (int i = 0; i < current_size; i++) {
+        for (size_t i = 0; i < current_level.size(); i++) {
             int current_person = current_level[i];
 
-            for (int j = 0; j < persons->count; j++) {
-                if (relations->person_follows_person[j][current_person] == 1 && !visited[j]) {
-                    printf("  %s\n", persons->names[j]);
-                    visited[j] = true;
-                    next_level[next_size++] = j;
+            for (int e = followers.offsets[current_person]; e < followers.offsets[current_person + 1]; e++) {
+                int j = followers.indices[e];
+                if (!visited[j]) {
+                    printf("  %s\n", persons->names.at(j));
+                    visited[j] = 1;
+                    next_level.push_back(j);
                 }
             }
         }
 
-        if (next_size == 0) {
+        if (next_level.empty()) {
             printf("  (no hay mas seguidores en este grado)\n");
             break;
         }
 
-        memcpy(current_level, next_level, next_size * sizeof(int));
-        current_size = next_size;
+        current_level.swap(next_level);
     }
 }
 
@@ -862,15 +1136,16 @@ void query_users_by_hashtag(const char* hashtag, Posts* posts, Persons* persons,
                             Companies* companies) {
     printf("\n========== USUARIOS QUE PUBLICARON %s ==========\n", hashtag);
 
-    bool found_persons[MAX_USERS] = {false};
-    bool found_companies[MAX_USERS] = {false};
+    std::vector<char> found_persons(persons->count, 0);
+    std::vector<char> found_companies(companies->count, 0);
+    int target = posts->hashtags.code(hashtag);
 
     for (int i = 0; i < posts->count; i++) {
-        if (strcmp(posts->hashtags[i], hashtag) == 0) {
+        if (posts->hashtags.codes[i] == target) {
             if (posts->author_types[i] == PERSON) {
-                found_persons[posts->author_ids[i]] = true;
+                found_persons[posts->author_ids[i]] = 1;
             } else {
-                found_companies[posts->author_ids[i]] = true;
+                found_companies[posts->author_ids[i]] = 1;
             }
         }
     }
@@ -879,7 +1154,7 @@ void query_users_by_hashtag(const char* hashtag, Posts* posts, Persons* persons,
     bool any_person = false;
     for (int i = 0; i < persons->count; i++) {
         if (found_persons[i]) {
-            printf("  - %s\n", persons->names[i]);
+            printf("  - %s\n", persons->names.at(i));
             any_person = true;
         }
     }
@@ -889,7 +1164,7 @@ void query_users_by_hashtag(const char* hashtag, Posts* posts, Persons* persons,
     bool any_company = false;
     for (int i = 0; i < companies->count; i++) {
         if (found_companies[i]) {
-            printf("  - %s\n", companies->names[i]);
+            printf("  - %s\n", companies->names.at(i));
             any_company = true;
         }
     }
@@ -899,15 +1174,45 @@ void query_users_by_hashtag(const char* hashtag, Posts* posts, Persons* persons,
 void query_posts_by_hashtag(const char* hashtag, Posts* posts) {
     printf("\n========== PUBLICACIONES CON %s ==========\n", hashtag);
 
-    bool found_any = false;
-    for (int i = 0; i < posts->count; i++) {
-        if (strcmp(posts->hashtags[i], hashtag) == 0) {
-            printf("  Post %d: \"%s\"\n", posts->ids[i], posts->texts[i]);
-            found_any = true;
-        }
+    // El hashtag se resuelve a su id en el host; a la GPU solo viajan los ids
+    // (un hashtag vacío o que no aparece no tiene publicaciones)
+    int target = hashtag[0] != '\0' ? posts->hashtags.code(hashtag) : -1;
+    std::vector<int> matches;
+
+    if (target >= 0) {
+        int *d_hashtag_ids, *d_indices, *d_count;
+        int h_count = 0;
+
+        metered_malloc(&d_hashtag_ids, posts->count * sizeof(int));
+        metered_malloc(&d_indices, posts->count * sizeof(int));
+        metered_malloc(&d_count, sizeof(int));
+
+        metered_memcpy(d_hashtag_ids, posts->hashtags.codes.data(), posts->count * sizeof(int),
+                       cudaMemcpyHostToDevice);
+        metered_memcpy(d_count, &h_count, sizeof(int), cudaMemcpyHostToDevice);
+
+        kernel_timer_start();
+        find_posts_by_hashtag_kernel<<<num_blocks_for(posts->count), THREADS_PER_BLOCK>>>(
+            d_hashtag_ids, posts->count, target, d_indices, posts->count, d_count);
+        kernel_timer_stop();
+
+        metered_memcpy(&h_count, d_count, sizeof(int), cudaMemcpyDeviceToHost);
+        matches.resize(std::min(h_count, posts->count));
+        metered_memcpy(matches.data(), d_indices, matches.size() * sizeof(int),
+                       cudaMemcpyDeviceToHost);
+        // El orden de los atómicos no es determinista: mostrar por id de post
+        std::sort(matches.begin(), matches.end());
+
+        metered_free(d_hashtag_ids);
+        metered_free(d_indices);
+        metered_free(d_count);
+    }
+
+    for (size_t i = 0; i < matches.size(); i++) {
+        printf("  Post %d: \"%s\"\n", matches[i], posts->texts.at(matches[i]));
     }
 
-    if (!found_any) {
+    if (matches.empty()) {
         printf("  (no se encontraron publicaciones)\n");
     }
 }
@@ -915,8 +1220,17 @@ void query_posts_by_hashtag(const char* hashtag, Posts* posts) {
 // ============================================================================
 // MAIN
 // ============================================================================
+// Uso: social_network [directorio_dataset] [--metrics]
+// Sin directorio se usan los datos de ejemplo
+
+int main(int argc, char** argv) {
+    metrics_init(argc, argv);
+
+    const char* dataset_dir = NULL;
+    for (int i = 1; i < argc; i++) {
+        if (strncmp(argv[i], "--", 2) != 0) dataset_dir = argv[i];
+    }
 
-int main() {
     printf("========================================\n");
     printf("  RED SOCIAL CON CUDA\n");
     printf("========================================\n");
@@ -927,9 +1241,29 @@ int main() {
     Posts* posts = new Posts();
     Relations* relations = new Relations();
     PostInteractions* interactions = new PostInteractions();
-
-    // Cargar datos de ejemplo
-    initialize_sample_data(persons, companies, posts, relations, interactions);
+    GraphIndex* index = new GraphIndex();
+
+    // Cargar datos (dataset en disco o datos de ejemplo)
+    metrics_begin("carga_datos");
+    bool loaded = true;
+    try {
+        if (dataset_dir != NULL) {
+            loaded = load_dataset(dataset_dir, persons, companies, posts, relations, interactions);
+        } else {
+            initialize_sample_data(persons, companies, posts, relations, interactions);
+        }
+        if (loaded) build_index(index, persons, companies, relations);
+    } catch (const std::bad_alloc&) {
+        fprintf(stderr, "Error: el dataset no entra en la memoria del host\n");
+        return EXIT_NO_CAPACITY;
+    }
+    if (!loaded) return EXIT_INVALID_DATASET;
+    if (!check_device_capacity(device_bytes_required(persons, companies, posts,
+                                                     relations, interactions))) {
+        return EXIT_NO_CAPACITY;
+    }
+    metrics_end(((size_t)posts->count * 3 + (size_t)interactions->count * 4 +
+                 relations->person_follows_person.src.size() * 2) * sizeof(int));
 
     printf("\nDatos cargados:\n");
     printf("  - %d personas\n", persons->count);
@@ -937,24 +1271,61 @@ int main() {
     printf("  - %d publicaciones\n", posts->count);
 
     // Ejecutar queries
+    metrics_begin("seguidores");
     query_followers(persons, companies, relations);
-    query_post_reactions(posts, interactions, persons->count, companies->count);
-    query_top_posts(posts, interactions, persons->count, companies->count);
-    query_blocked_followers(persons, companies, relations);
-    query_company_recommendations(companies, relations);
-    query_top_companies_by_recommendations(companies, relations);
+    metrics_end();
+    metrics_begin("reacciones");
+    query_post_reactions(posts, interactions);
+    metrics_end();
+    metrics_begin("top_posts");
+    query_top_posts(posts, interactions);
+    metrics_end();
+    metrics_begin("bloqueados");
+    query_blocked_followers(persons, companies, index);
+    metrics_end();
+    metrics_begin("recomendaciones");
+    query_company_recommendations(companies, index);
+    metrics_end();
+    metrics_begin("top_empresas_recomendaciones");
+    query_top_companies_by_recommendations(companies, index);
+    metrics_end();
+    metrics_begin("hashtags");
     query_hashtags(posts);
+    metrics_end();
+    metrics_begin("posts_por_hashtag");
     query_posts_by_hashtag("#tech", posts);
+    metrics_end();
+    metrics_begin("usuarios_por_hashtag");
     query_users_by_hashtag("#tech", posts, persons, companies);
-    query_best_customers(persons, companies, relations, interactions, posts);
-    query_top_companies_by_likes(companies, posts, interactions,
-                                persons->count, companies->count);
-
-    // Ejemplos de visibilidad y red de influencia
-    query_visibility_of_post(0, posts, persons, relations);  // Post de Alice
-    query_visibility_of_post(5, posts, persons, relations);  // Post de empresa
-    query_influence_network(0, 2, persons, relations);       // Red de Alice (grado 2)
-    query_influence_network(1, 2, persons, relations);       // Red de Bob (grado 2)
+    metrics_end();
+    metrics_begin("mejores_clientes");
+    query_best_customers(persons, companies, index, interactions, posts);
+    metrics_end();
+    metrics_begin("top_empresas_likes");
+    query_top_companies_by_likes(companies, posts, interactions);
+    metrics_end();
+
+    // Ejemplos de visibilidad y red de influencia (si el dataset tiene esos ids)
+    if (posts->count > 0) {
+        metrics_begin("visibilidad_post_0");
+        query_visibility_of_post(0, posts, persons, index);  // Post de Alice
+        metrics_end();
+    }
+    if (posts->count > 5) {
+        metrics_begin("visibilidad_post_5");
+        query_visibility_of_post(5, posts, persons, index);  // Post de empresa
+        metrics_end();
+    }
+    if (persons->count > 0) {
+        metrics_begin("influencia_0");
+        query_influence_network(0, 2, persons, index);       // Red de Alice (grado 2)
+        metrics_end();
+    }
+    if (persons->count > 1) {
+        metrics_begin("influencia_1");
+        query_influence_network(1, 2, persons, index);       // Red de Bob (grado 2)
+        metrics_end();
+    }
 
     printf("\n========================================\n");
     printf("  FIN DE CONSULTAS\n");
@@ -966,6 +1337,7 @@ int main() {
     delete posts;
     delete relations;
     delete interactions;
+    delete index;
 
     return 0;
 }
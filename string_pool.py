@@ -0,0 +1,436 @@
+"""
+Pool de cadenas compacto
+Una columna de cadenas (nombres, textos, hashtags) se guarda como un solo
+buffer UTF-8 contiguo más un array de offsets int64, al estilo Arrow: la
+cadena i son los bytes data[offsets[i]:offsets[i + 1]]. Frente a una lista
+de str no hay un objeto por cadena, la columna se lee y escribe sin
+recorrerla en Python y cada str se materializa solo al mostrarlo.
+
+- StringPool: la columna completa (textos y nombres)
+- InternedStrings: columna con muchos valores repetidos (hashtags) como
+  ids int32 sobre un StringPool de valores distintos
+
+    python string_pool.py datos_1m
+"""
+
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Separador de línea de los archivos .txt del dataset
+NEWLINE = 0x0A
+# Separador interno para materializar toda la columna con un solo split
+_SPLIT = 0x00
+
+
+def _grow(array: np.ndarray, needed: int) -> np.ndarray:
+    """Array con capacidad para `needed` elementos (crece al doble)"""
+    if needed <= len(array):
+        return array
+    grown = np.empty(max(needed, 2 * len(array), 16), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _gather(data: np.ndarray, starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Concatena los tramos data[starts[i]:starts[i] + lengths[i]]"""
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.uint8)
+    ends = np.cumsum(lengths)
+    positions = np.arange(total, dtype=np.int64) + np.repeat(starts - (ends - lengths), lengths)
+    return data[positions]
+
+
+class StringPool:
+    """
+    Columna de cadenas en un buffer UTF-8 con offsets
+
+    Se usa como una secuencia de str: len(), pool[i], iteración y append
+    (amortizado). Las operaciones de columna (take, blank, find, join,
+    write) trabajan sobre los bytes sin crear objetos str
+    """
+
+    def __init__(self, data: Optional[np.ndarray] = None, offsets: Optional[np.ndarray] = None):
+        data = np.zeros(0, dtype=np.uint8) if data is None else np.asarray(data, dtype=np.uint8)
+        offsets = np.zeros(1, dtype=np.int64) if offsets is None else np.asarray(offsets, dtype=np.int64)
+        self._data = data
+        self._offsets = offsets
+        self._count = len(offsets) - 1
+        self._nbytes = int(offsets[-1])
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "StringPool":
+        """Pool a partir de cadenas (una copia si values ya es un pool)"""
+        if isinstance(values, (StringPool, InternedStrings)):
+            return values.to_pool()
+        encoded = [str(value).encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)),
+                  out=offsets[1:])
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets)
+
+    @classmethod
+    def from_buffer(cls, buffer: Union[bytes, np.ndarray], separator: int = NEWLINE) -> "StringPool":
+        """
+        Pool a partir de cadenas terminadas por `separator` (formato de los
+        .txt del dataset); un tramo final sin terminador también cuenta
+        """
+        buffer = np.frombuffer(buffer, dtype=np.uint8) if isinstance(buffer, bytes) \
+            else np.asarray(buffer, dtype=np.uint8)
+        is_separator = buffer == separator
+        ends = np.flatnonzero(is_separator)
+        if len(buffer) and not is_separator[-1]:
+            ends = np.append(ends, len(buffer))
+        offsets = np.zeros(len(ends) + 1, dtype=np.int64)
+        # Los separadores anteriores a cada fin no son parte de las cadenas
+        offsets[1:] = ends - np.arange(len(ends))
+        return cls(buffer[~is_separator], offsets)
+
+    @classmethod
+    def read(cls, path) -> "StringPool":
+        """Lee un archivo de una cadena por línea (social_dataset.write_lines)"""
+        return cls.from_buffer(np.fromfile(path, dtype=np.uint8))
+
+    # --- Secuencia --------------------------------------------------------
+
+    @property
+    def data(self) -> np.ndarray:
+        """Bytes UTF-8 de todas las cadenas, sin separadores"""
+        return self._data[:self._nbytes]
+
+    @property
+    def offsets(self) -> np.ndarray:
+        """Offsets int64 (n + 1) de cada cadena en data"""
+        return self._offsets[:self._count + 1]
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria de la columna (bytes de texto más offsets)"""
+        return self._nbytes + 8 * (self._count + 1)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        index = int(index)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("índice fuera del pool")
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._data[start:end].tobytes().decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_list())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (StringPool, InternedStrings, list, tuple)):
+            return len(self) == len(other) and self.to_list() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"StringPool({self._count} cadenas, {self._nbytes} bytes)"
+
+    def lengths(self) -> np.ndarray:
+        """Longitud en bytes de cada cadena"""
+        return np.diff(self.offsets)
+
+    def to_list(self) -> List[str]:
+        """Todas las cadenas como str (una decodificación y un split)"""
+        if self._count == 0:
+            return []
+        data = self.data
+        if (data == _SPLIT).any():
+            return [self[i] for i in range(self._count)]
+        return self.join(chr(_SPLIT)).split(chr(_SPLIT))
+
+    def join(self, separator: str) -> str:
+        """Equivalente a separator.join(pool) sin materializar cada cadena"""
+        if self._count == 0:
+            return ""
+        sep = separator.encode('utf-8')
+        if len(sep) != 1:
+            return separator.join(self.to_list())
+        joined = np.insert(self.data, self.offsets[1:-1], sep[0])
+        return joined.tobytes().decode('utf-8')
+
+    # --- Escritura --------------------------------------------------------
+
+    def append(self, value: str) -> int:
+        """Agrega una cadena y retorna su índice"""
+        encoded = np.frombuffer(value.encode('utf-8'), dtype=np.uint8)
+        end = self._nbytes + len(encoded)
+        self._data = _grow(self._data, end)
+        self._data[self._nbytes:end] = encoded
+        self._offsets = _grow(self._offsets, self._count + 2)
+        self._count += 1
+        self._offsets[self._count] = end
+        self._nbytes = end
+        return self._count - 1
+
+    def extend(self, values: Iterable[str]):
+        for value in values:
+            self.append(value)
+
+    def write(self, path):
+        """Una cadena por línea (los saltos de línea internos pasan a espacio)"""
+        data = self.data
+        if (data == NEWLINE).any():
+            data = np.where(data == NEWLINE, np.uint8(0x20), data)
+        np.insert(data, self.offsets[1:], NEWLINE).tofile(path)
+
+    # --- Operaciones de columna -------------------------------------------
+
+    def copy(self) -> "StringPool":
+        return StringPool(self.data.copy(), self.offsets.copy())
+
+    def to_pool(self) -> "StringPool":
+        return self.copy()
+
+    def take(self, indices: Sequence[int]) -> "StringPool":
+        """Pool con las cadenas de los índices dados (en ese orden)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        lengths = self.lengths()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return StringPool(_gather(self.data, self.offsets[:-1][indices], lengths), offsets)
+
+    def blank(self, mask: np.ndarray) -> "StringPool":
+        """Copia con las cadenas de la máscara vacías (p. ej. posts eliminados)"""
+        mask = np.asarray(mask, dtype=bool)
+        lengths = self.lengths()
+        keep = np.repeat(~mask, lengths)
+        lengths = np.where(mask, 0, lengths)
+        offsets = np.zeros(self._count + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return StringPool(self.data[keep], offsets)
+
+    def find(self, value: str) -> np.ndarray:
+        """Índices de las cadenas iguales a value (comparación de bytes vectorizada)"""
+        target = np.frombuffer(value.encode('utf-8'), dtype=np.uint8)
+        candidates = np.flatnonzero(self.lengths() == len(target))
+        if len(target) == 0 or len(candidates) == 0:
+            return candidates
+        window = self.offsets[candidates][:, None] + np.arange(len(target))
+        return candidates[(self.data[window] == target).all(axis=1)]
+
+    def intern(self) -> "InternedStrings":
+        """Columna internada: ids int32 sobre los valores distintos"""
+        return InternedStrings.from_strings(self)
+
+    def to_arrow(self):
+        """Array Arrow large_string sobre los mismos buffers (sin copiar los bytes)"""
+        import pyarrow as pa
+
+        return pa.Array.from_buffers(pa.large_string(), self._count,
+                                     [None, pa.py_buffer(self.offsets), pa.py_buffer(self.data)])
+
+
+class InternedStrings:
+    """
+    Columna con valores repetidos: codes[i] es el id del valor de la fila i
+    en `values` (cada valor distinto se guarda una sola vez, en orden de
+    primera aparición)
+    """
+
+    def __init__(self, values: StringPool, codes: np.ndarray):
+        self.values = values
+        self._codes = np.asarray(codes, dtype=np.int32)
+        self._count = len(self._codes)
+        self._lookup: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_strings(cls, values: Iterable[str]) -> "InternedStrings":
+        if isinstance(values, InternedStrings):
+            return values.copy()
+        strings = values.to_list() if isinstance(values, StringPool) else list(values)
+        lookup: Dict[str, int] = {}
+        codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in strings),
+                            dtype=np.int32, count=len(strings))
+        interned = cls(StringPool.from_strings(list(lookup)), codes)
+        interned._lookup = lookup
+        return interned
+
+    @classmethod
+    def read(cls, path) -> "InternedStrings":
+        return cls.from_strings(StringPool.read(path))
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self._codes[:self._count]
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + 4 * self._count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        index = int(index)
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("índice fuera de la columna")
+        return self.values[self._codes[index]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.to_list())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (StringPool, InternedStrings, list, tuple)):
+            return len(self) == len(other) and self.to_list() == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"InternedStrings({self._count} filas, {len(self.values)} valores)"
+
+    def to_list(self) -> List[str]:
+        values = self.values.to_list()
+        return [values[code] for code in self.codes.tolist()]
+
+    def to_pool(self) -> StringPool:
+        return self.values.take(self.codes)
+
+    def code(self, value: str) -> int:
+        """Id de un valor (-1 si no aparece)"""
+        return self._lookup_table().get(value, -1)
+
+    def _lookup_table(self) -> Dict[str, int]:
+        if self._lookup is None:
+            self._lookup = {value: i for i, value in enumerate(self.values)}
+        return self._lookup
+
+    def counts(self) -> np.ndarray:
+        """Filas de cada valor distinto"""
+        return np.bincount(self.codes, minlength=len(self.values))
+
+    def first_rows(self) -> np.ndarray:
+        """Primera fila de cada valor distinto (-1 si no quedó ninguna)"""
+        first = np.full(len(self.values), self._count, dtype=np.int64)
+        np.minimum.at(first, self.codes, np.arange(self._count))
+        first[first == self._count] = -1
+        return first
+
+    def append(self, value: str) -> int:
+        lookup = self._lookup_table()
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = self.values.append(value)
+        self._codes = _grow(self._codes, self._count + 1)
+        self._codes[self._count] = code
+        self._count += 1
+        return self._count - 1
+
+    def extend(self, values: Iterable[str]):
+        for value in values:
+            self.append(value)
+
+    def write(self, path):
+        self.to_pool().write(path)
+
+    def copy(self) -> "InternedStrings":
+        return InternedStrings(self.values.copy(), self.codes.copy())
+
+    def take(self, indices: Sequence[int]) -> "InternedStrings":
+        """Filas dadas (comparten los valores distintos)"""
+        return InternedStrings(self.values, self.codes[np.asarray(indices, dtype=np.int64)])
+
+    def blank(self, mask: np.ndarray) -> "InternedStrings":
+        """Copia con las filas de la máscara vacías"""
+        copy = self.copy()
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            empty = copy.code("")
+            if empty < 0:
+                empty = copy.values.append("")
+                copy._lookup_table()[""] = empty
+            copy._codes[:copy._count][mask] = empty
+        return copy
+
+    def find(self, value: str) -> np.ndarray:
+        code = self.code(value)
+        return np.zeros(0, dtype=np.int64) if code < 0 else np.flatnonzero(self.codes == code)
+
+    def intern(self) -> "InternedStrings":
+        return self
+
+    def to_arrow(self):
+        """Array Arrow de diccionario (ids + valores distintos)"""
+        import pyarrow as pa
+
+        return pa.DictionaryArray.from_arrays(pa.array(self.codes), self.values.to_arrow())
+
+
+Strings = Union[StringPool, InternedStrings]
+
+
+def as_pool(values: Iterable[str]) -> StringPool:
+    """values como StringPool (sin copiar si ya lo es)"""
+    return values if isinstance(values, StringPool) else StringPool.from_strings(values)
+
+
+def as_interned(values: Iterable[str]) -> InternedStrings:
+    """values como columna internada (sin copiar si ya lo es)"""
+    return values if isinstance(values, InternedStrings) else InternedStrings.from_strings(values)
+
+
+def as_list(values: Iterable[str]) -> List[str]:
+    """
+    values como lista de str; un pool se materializa de una vez (para bucles
+    que indexan muchas veces la misma columna)
+    """
+    if isinstance(values, (StringPool, InternedStrings)):
+        return values.to_list()
+    return values if isinstance(values, list) else list(values)
+
+
+def join_strings(values: Iterable[str], separator: str) -> str:
+    """separator.join(values), vectorizado si values es un pool"""
+    if isinstance(values, InternedStrings):
+        values = values.to_pool()
+    if isinstance(values, StringPool):
+        return values.join(separator)
+    return separator.join(values)
+
+
+def string_memory(values: Sequence[str]) -> int:
+    """Memoria aproximada de una columna como lista de str (para comparar con un pool)"""
+    import sys
+
+    return sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Memoria de las columnas de texto de un dataset: "
+                                                 "lista de str frente a pool")
+    parser.add_argument("dataset", help="Directorio del dataset")
+    args = parser.parse_args()
+
+    report: Dict[str, Dict] = {}
+    for name, interned in (("persons", False), ("companies", False),
+                           ("post_texts", False), ("post_hashtags", True)):
+        path = Path(args.dataset) / f"{name}.txt"
+        started = time.perf_counter()
+        column: Strings = InternedStrings.read(path) if interned else StringPool.read(path)
+        seconds = time.perf_counter() - started
+        report[name] = {"filas": len(column), "pool_bytes": column.nbytes,
+                        "lista_bytes": string_memory(column.to_list()),
+                        "lectura_segundos": round(seconds, 4)}
+        if interned:
+            report[name]["valores_distintos"] = len(column.values)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,35 @@
+"""
+Fixtures compartidas: el dataset de ejemplo (initialize_sample_data) y uno
+sintético chico del generador, en memoria y guardados en disco
+Los módulos del proyecto están en la raíz del repositorio
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from graph_generator import generate_dataset  # noqa: E402
+from social_dataset import load_dataset, sample_dataset, save_dataset  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def dataset_paths(tmp_path_factory):
+    """Nombre -> directorio del dataset guardado"""
+    root = tmp_path_factory.mktemp("datasets")
+    save_dataset(sample_dataset(), root / "sample")
+    generate_dataset(root / "generado", num_persons=300, avg_follows=5, avg_reactions=3,
+                     num_hashtags=20, seed=1)
+    return {"sample": root / "sample", "generado": root / "generado"}
+
+
+@pytest.fixture(params=["sample", "generado"])
+def dataset_path(request, dataset_paths):
+    return dataset_paths[request.param]
+
+
+@pytest.fixture
+def dataset(dataset_path):
+    return load_dataset(dataset_path)
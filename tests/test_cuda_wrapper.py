@@ -0,0 +1,88 @@
+"""Ejecución asíncrona de procesos: timeout y cancelación matan también a los hijos"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+from cuda_wrapper import _run_process
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="grupos de procesos POSIX")
+
+# Como nvcc: lanza un hijo que hereda stdout/stderr y sigue corriendo
+SPAWNER = """
+import subprocess, sys, time
+child = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+open(sys.argv[1], "w").write(str(child.pid))
+time.sleep(30)
+"""
+
+
+def spawner(tmp_path):
+    pid_file = tmp_path / "hijo.pid"
+    return [sys.executable, "-c", SPAWNER, str(pid_file)], pid_file
+
+
+def wait_pid(pid_file):
+    deadline = time.monotonic() + 5
+    while not (pid_file.exists() and pid_file.read_text()):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return int(pid_file.read_text())
+
+
+def assert_dead(pid):
+    """El hijo terminó (ya no existe o quedó zombi esperando a init)"""
+    deadline = time.monotonic() + 2
+    while True:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                if f.read().split(") ")[-1].startswith("Z"):
+                    return
+        except FileNotFoundError:
+            return
+        if not os.path.exists("/proc"):
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return
+        assert time.monotonic() < deadline, f"el proceso {pid} sigue vivo"
+        time.sleep(0.02)
+
+
+def test_timeout_kills_children(tmp_path):
+    argv, pid_file = spawner(tmp_path)
+
+    async def run():
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await _run_process(argv, timeout=1.0)
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 2.5
+    assert_dead(wait_pid(pid_file))
+
+
+def test_cancel_kills_children(tmp_path):
+    argv, pid_file = spawner(tmp_path)
+
+    async def run():
+        task = asyncio.create_task(_run_process(argv, timeout=None))
+        while not (pid_file.exists() and pid_file.read_text()):
+            await asyncio.sleep(0.01)
+        started = time.monotonic()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return time.monotonic() - started
+
+    assert asyncio.run(run()) < 1.5
+    assert_dead(wait_pid(pid_file))
+
+
+def test_output_and_exit_code():
+    argv = [sys.executable, "-c", "import sys; print('hola'); sys.stderr.write('x'); sys.exit(3)"]
+    returncode, stdout, stderr = asyncio.run(_run_process(argv, timeout=10))
+    assert (returncode, stdout.strip(), stderr) == (3, "hola", "x")
@@ -0,0 +1,99 @@
+"""FeedIndex contra la lista de posts visibles armada post por post"""
+
+import numpy as np
+import pytest
+
+from feeds import FeedIndex
+from numpy_engine import NumpySocialNetwork
+from social_dataset import (COMPANY, DISLIKE, LIKE, POST_AUTHOR_ID, POST_AUTHOR_TYPE,
+                            SocialDataset)
+
+
+def brute_feeds(dataset):
+    """Persona -> posts que ve, con la regla de check_visibility_kernel"""
+    persons = dataset.num_persons
+    followers = [set() for _ in range(persons)]
+    for follower, followee in dataset.relations["person_follows_person"].tolist():
+        followers[followee].add(follower)
+    blocked = set(map(tuple, dataset.relations["person_blocks_person"].tolist()))
+    feeds = [[] for _ in range(persons)]
+    for post, (author, author_type, _) in enumerate(dataset.posts.tolist()):
+        if author_type == COMPANY:
+            readers = range(persons)
+        else:
+            direct = {f for f in followers[author] if (author, f) not in blocked}
+            readers = {author} | direct | {g for f in direct for g in followers[f]}
+        for reader in readers:
+            feeds[reader].append(post)
+    return feeds
+
+
+def read_pages(index, person, limit):
+    """Feed completo leído de a páginas con el cursor, del más nuevo al más viejo"""
+    posts, before = [], None
+    while True:
+        page = index.page(person, limit, before).tolist()
+        posts += page
+        if len(page) < limit:
+            return posts
+        before = page[-1]
+
+
+def assert_same_feeds(index, expected):
+    for person, posts in enumerate(expected):
+        assert index.feed(person).tolist() == posts, person
+        assert read_pages(index, person, 7) == posts[::-1], person
+    assert index.num_entries == sum(len(posts) for posts in expected) \
+        - len(expected) * index.num_shared
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_build_matches_brute_force(dataset, workers):
+    # Tareas chicas para que haya varios rangos de lectores
+    index = FeedIndex.build(dataset, workers=workers, task_entries=500)
+    assert_same_feeds(index, brute_feeds(dataset))
+    with pytest.raises(ValueError):
+        index.page(dataset.num_persons)
+
+
+def test_added_posts_match_brute_force(dataset):
+    half = dataset.num_posts // 2
+    first = SocialDataset(dataset.person_names, dataset.company_names,
+                          list(dataset.post_texts)[:half], list(dataset.post_hashtags)[:half],
+                          dataset.posts[:half], dataset.relations)
+    index = FeedIndex.build(first)
+    index.flush_entries = 50
+    posts = dataset.posts
+    rng = np.random.default_rng(0)
+    start = half
+    while start < len(posts):
+        stop = min(len(posts), start + int(rng.integers(1, 20)))
+        index.add_posts(range(start, stop), posts[start:stop, POST_AUTHOR_TYPE],
+                        posts[start:stop, POST_AUTHOR_ID])
+        start = stop
+    assert_same_feeds(index, brute_feeds(dataset))
+    index.flush()
+    assert index.tail_entries == 0
+    assert_same_feeds(index, brute_feeds(dataset))
+    with pytest.raises(ValueError):
+        index.add_posts([0], [COMPANY], [0])
+
+
+def test_query_feed_counts(dataset):
+    network = NumpySocialNetwork(dataset)
+    expected = brute_feeds(dataset)
+    likes = np.zeros(dataset.num_posts, dtype=np.int64)
+    dislikes = np.zeros(dataset.num_posts, dtype=np.int64)
+    for _, _, post, value in dataset.interactions.tolist():
+        likes[post] += value == LIKE
+        dislikes[post] += value == DISLIKE
+    for person in range(dataset.num_persons):
+        data = network.query_feed(person, limit=5)
+        posts = expected[person][::-1][:5]
+        assert [r["post_id"] for r in data["posts"]] == posts
+        assert [(r["likes"], r["dislikes"]) for r in data["posts"]] == \
+            [(likes[p], dislikes[p]) for p in posts]
+        assert data["siguiente"] == (posts[-1] if len(posts) == 5 else None)
+    # Los conteos se comparten entre consultas: no se pueden modificar
+    with pytest.raises(ValueError):
+        network.reaction_counts()[0][0] = 1
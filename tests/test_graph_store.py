@@ -0,0 +1,112 @@
+"""
+SocialGraphStore mantiene por evento los mismos resultados que NumpySocialNetwork
+calcula desde cero sobre el mismo estado
+"""
+
+import numpy as np
+
+from cascades import CascadeForest
+from graph_store import SocialGraphStore
+from numpy_engine import NumpySocialNetwork
+from social_dataset import COMPANY, DISLIKE, LIKE, NONE, PERSON, POST_ORIGINAL_ID
+
+
+def assert_same_results(data, expected):
+    for key, value in data.items():
+        assert value == expected[key], key
+
+
+def test_from_dataset_matches_numpy(dataset):
+    store = SocialGraphStore.from_dataset(dataset)
+    network = NumpySocialNetwork(dataset)
+    assert_same_results(store.get_parsed_data(include_analytics=True),
+                        network.get_parsed_data(include_analytics=True))
+    # Cascadas y analítica son opcionales y no se mezclan con una ventana
+    for data in (store.get_parsed_data(), network.get_parsed_data(),
+                 store.get_parsed_data((0, 2**31 - 1), include_analytics=True),
+                 network.get_parsed_data(window=(0, 2**31 - 1), include_analytics=True)):
+        assert "cascadas" not in data and "analitica_hashtags" not in data
+
+
+def test_replayed_events_match_numpy(dataset):
+    store = SocialGraphStore()
+    for name in dataset.person_names:
+        store.add_person(name)
+    for name in dataset.company_names:
+        store.add_company(name)
+    # Consulta con el almacén vacío: desde acá los derivados se actualizan por evento
+    store.get_parsed_data(include_analytics=True)
+    for name, edges in dataset.relations.items():
+        store.apply_edges(name, edges[:, 0], edges[:, 1], timestamps=dataset.times(name))
+    for post, (author, author_type, original) in enumerate(dataset.posts.tolist()):
+        store.add_post(author_type, author, dataset.post_texts[post],
+                       dataset.post_hashtags[post], original, int(dataset.post_times[post]))
+    times = dataset.interaction_times
+    for row, (user_type, user, post, value) in enumerate(dataset.interactions.tolist()):
+        store.set_reaction(user_type, user, post, value, int(times[row]))
+    assert_same_results(store.get_parsed_data(include_analytics=True),
+                        NumpySocialNetwork(dataset).get_parsed_data(include_analytics=True))
+
+
+def random_events(store, rng, count, remove_posts=False):
+    """Seguimientos, bloqueos, publicaciones y reacciones (y bajas) al azar"""
+    persons, companies = len(store.person_names), len(store.company_names)
+    for step in range(count):
+        p, q = rng.integers(persons, size=2).tolist()
+        c, d = rng.integers(companies, size=2).tolist()
+        posts = len(store.post_texts)
+        kind = int(rng.integers(9 if remove_posts else 8))
+        if kind == 0:
+            store.add_follow(PERSON, p, PERSON, q)
+        elif kind == 1:
+            store.remove_follow(PERSON, p, PERSON, q)
+        elif kind == 2:
+            store.add_follow(PERSON, p, COMPANY, c)
+        elif kind == 3:
+            store.add_block(PERSON, p, PERSON, q)
+        elif kind == 4:
+            store.add_recommendation(c, d)
+        elif kind == 5:
+            tag = f"#tema{step % 4}"
+            store.add_post(COMPANY if step % 5 == 0 else PERSON, c if step % 5 == 0 else p,
+                           f"evento {step} {tag}", tag, int(rng.integers(-1, posts)))
+        elif kind in (6, 7):
+            post = int(rng.integers(posts))
+            if not store.post_deleted[post]:
+                user_type, user = (COMPANY, c) if kind == 7 and step % 3 == 0 else (PERSON, p)
+                store.set_reaction(user_type, user, post, int(rng.choice([NONE, LIKE, DISLIKE])))
+        else:
+            store.remove_post(int(rng.integers(posts)))
+
+
+def test_random_events_match_rebuild(dataset):
+    store = SocialGraphStore.from_dataset(dataset)
+    rng = np.random.default_rng(0)
+    for _ in range(4):
+        # Cada consulta intermedia deja los derivados armados para los eventos siguientes
+        store.get_parsed_data(include_analytics=True)
+        random_events(store, rng, 100)
+        expected = NumpySocialNetwork(store.to_dataset()).get_parsed_data(include_analytics=True)
+        assert_same_results(store.get_parsed_data(include_analytics=True), expected)
+
+
+def test_removed_posts(dataset):
+    store = SocialGraphStore.from_dataset(dataset)
+    store.get_parsed_data(include_analytics=True)
+    random_events(store, np.random.default_rng(1), 300, remove_posts=True)
+    deleted = np.array(store.post_deleted, dtype=bool)
+    assert deleted.any()
+
+    # Los posts eliminados quedan en la instantánea como lápidas sin reacciones
+    snapshot = store.to_dataset()
+    expected = NumpySocialNetwork(snapshot).get_parsed_data(include_analytics=True)
+    data = store.get_parsed_data(include_analytics=True)
+    for key in ("seguidores", "top_posts", "hashtags", "bloqueados", "recomendaciones",
+                "analitica_hashtags"):
+        assert data[key] == expected[key], key
+    assert data["reacciones"] == [r for r in expected["reacciones"] if not deleted[r["post_id"]]]
+
+    likes, dislikes = NumpySocialNetwork(snapshot).reaction_counts()
+    forest = CascadeForest(snapshot.posts[:, POST_ORIGINAL_ID], likes, dislikes,
+                           snapshot.post_texts)
+    assert data["cascadas"] == forest.summary(exclude=deleted)
@@ -0,0 +1,81 @@
+"""La ingesta NDJSON de un dataset deja el almacén igual que NumpySocialNetwork"""
+
+import asyncio
+import json
+
+import pytest
+
+from graph_store import BLOCK_RELATIONS, FOLLOW_RELATIONS
+from ingest import IngestionPipeline
+from numpy_engine import NumpySocialNetwork
+from social_dataset import COMPANY, DISLIKE, LIKE, PERSON
+
+TYPE_NAMES = {PERSON: "person", COMPANY: "company"}
+VALUE_NAMES = {LIKE: "like", DISLIKE: "dislike"}
+
+
+def relation_events():
+    """Relación -> (tipo de evento, tipo origen, tipo destino)"""
+    events = {name: ("follow", *types) for types, name in FOLLOW_RELATIONS.items()}
+    events.update({name: ("block", *types) for types, name in BLOCK_RELATIONS.items()})
+    events["person_is_client"] = ("client", PERSON, COMPANY)
+    events["company_recommends_company"] = ("recommend", COMPANY, COMPANY)
+    return events
+
+
+def dataset_events(dataset):
+    """Eventos que reconstruyen el dataset (sin las relaciones que no tienen evento)"""
+    events = [{"type": "person", "name": name} for name in dataset.person_names]
+    events += [{"type": "company", "name": name} for name in dataset.company_names]
+    for name, (kind, src_type, dst_type) in relation_events().items():
+        times = dataset.times(name)
+        for row, (src, dst) in enumerate(dataset.relations[name].tolist()):
+            event = {"type": kind, "src_type": TYPE_NAMES[src_type], "src": src,
+                     "dst_type": TYPE_NAMES[dst_type], "dst": dst}
+            if times is not None:
+                event["time"] = int(times[row])
+            events.append(event)
+    for post, (author, author_type, original) in enumerate(dataset.posts.tolist()):
+        events.append({"type": "post", "author_type": TYPE_NAMES[author_type], "author": author,
+                       "text": dataset.post_texts[post], "hashtag": dataset.post_hashtags[post],
+                       "original": original, "time": int(dataset.post_times[post])})
+    for row, (user_type, user, post, value) in enumerate(dataset.interactions.tolist()):
+        events.append({"type": "reaction", "user_type": TYPE_NAMES[user_type], "user": user,
+                       "post": post, "value": VALUE_NAMES[value],
+                       "time": int(dataset.interaction_times[row])})
+    return events
+
+
+def ingest(events, path, batch_size):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(event if isinstance(event, str) else json.dumps(event, ensure_ascii=False))
+            f.write("\n")
+    pipeline = IngestionPipeline(batch_size=batch_size)
+    stats = asyncio.run(pipeline.run_file(path))
+    return pipeline.store, stats
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 5000])
+def test_ingested_store_matches_numpy(dataset, tmp_path, batch_size):
+    events = dataset_events(dataset)
+    store, stats = ingest(events, tmp_path / "eventos.ndjson", batch_size)
+    assert stats["eventos"] == len(events)
+    assert stats["rechazados"] == 0
+    expected = NumpySocialNetwork(dataset).get_parsed_data(include_analytics=True)
+    for key, value in store.get_parsed_data(include_analytics=True).items():
+        assert value == expected[key], key
+
+
+def test_invalid_events_are_rejected(dataset, tmp_path):
+    events = dataset_events(dataset)
+    first_post = len(events) - len(dataset.posts) - len(dataset.interactions)
+    bad = ["no es json", json.dumps({"sin": "tipo"}),
+           {"type": "follow", "src_type": "person", "src": 0, "dst_type": "person", "dst": 10**6},
+           {"type": "reaction", "user_type": "person", "user": 0, "post": 10**6, "value": "like"},
+           {"type": "desconocido"}]
+    store, stats = ingest(events[:first_post] + bad + events[first_post:],
+                          tmp_path / "eventos.ndjson", 3)
+    assert stats["rechazados"] == len(bad)
+    expected = NumpySocialNetwork(dataset).get_parsed_data()
+    assert store.get_parsed_data()["output_raw"] == expected["output_raw"]
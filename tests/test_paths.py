@@ -0,0 +1,102 @@
+"""PathFinder contra un BFS en Python sobre las aristas de seguimiento"""
+
+from collections import deque
+
+import numpy as np
+import pytest
+
+from paths import BLOCK_RELATIONS, PathFinder
+from social_dataset import COMPANY
+
+
+def brute_graph(dataset, exclude_blocked):
+    """Vecinos hacia adelante de cada id global, armados desde las relaciones"""
+    persons = dataset.num_persons
+    edges = [(u, v) for u, v in dataset.relations["person_follows_person"].tolist()]
+    edges += [(u, v + persons) for u, v in dataset.relations["person_follows_company"].tolist()]
+    edges += [(u + persons, v + persons)
+              for u, v in dataset.relations["company_follows_company"].tolist()]
+    blocked = set()
+    if exclude_blocked:
+        for name, src_type, dst_type in BLOCK_RELATIONS:
+            for u, v in dataset.relations[name].tolist():
+                pair = (u + (persons if src_type == COMPANY else 0),
+                        v + (persons if dst_type == COMPANY else 0))
+                blocked |= {pair, pair[::-1]}
+        for u, v in dataset.relations["person_blocked_by_company"].tolist():
+            blocked |= {(u, v + persons), (v + persons, u)}
+    neighbors = [set() for _ in range(persons + dataset.num_companies)]
+    for u, v in edges:
+        if u != v and (u, v) not in blocked:
+            neighbors[u].add(v)
+    return neighbors
+
+
+def brute_distances(neighbors, source):
+    dist = {source: 0}
+    queue = deque([source])
+    while queue:
+        u = queue.popleft()
+        for v in neighbors[u]:
+            if v not in dist:
+                dist[v] = dist[u] + 1
+                queue.append(v)
+    return dist
+
+
+def assert_valid_path(neighbors, route, source, target, hops):
+    assert route[0] == source and route[-1] == target
+    assert len(route) == hops + 1
+    assert all(v in neighbors[u] for u, v in zip(route, route[1:]))
+
+
+@pytest.mark.parametrize("exclude_blocked", [False, True])
+def test_shortest_paths_match_bfs(dataset, exclude_blocked):
+    finder = PathFinder.from_dataset(dataset, exclude_blocked=exclude_blocked)
+    neighbors = brute_graph(dataset, exclude_blocked)
+    n = len(neighbors)
+    rng = np.random.default_rng(0)
+    sources = rng.integers(n, size=min(n, 40)).tolist()
+    targets = np.arange(n)
+    for source in sources:
+        dist = brute_distances(neighbors, source)
+        expected = [dist.get(t, -1) for t in range(n)]
+
+        hops, routes = finder.distances_from(source, targets)
+        assert hops.tolist() == expected
+        for target, h in enumerate(expected):
+            if h >= 0:
+                assert_valid_path(neighbors, routes[target], source, target, h)
+            else:
+                assert routes[target] is None
+
+        for target in rng.integers(n, size=20).tolist():
+            route = finder.shortest_path(source, target)
+            if expected[target] < 0:
+                assert route is None
+            else:
+                assert_valid_path(neighbors, route, source, target, expected[target])
+            limited = finder.shortest_path(source, target, max_hops=2)
+            assert (limited is None) == (not 0 <= expected[target] <= 2)
+
+
+@pytest.mark.parametrize("exclude_blocked", [False, True])
+def test_batch_matches_bfs(dataset, exclude_blocked):
+    finder = PathFinder.from_dataset(dataset, exclude_blocked=exclude_blocked)
+    neighbors = brute_graph(dataset, exclude_blocked)
+    n = len(neighbors)
+    rng = np.random.default_rng(1)
+    # Orígenes repetidos (BFS compartido) y sueltos (bidireccional)
+    sources = np.concatenate([np.repeat(rng.integers(n, size=5), 6), rng.integers(n, size=30)])
+    targets = rng.integers(n, size=len(sources))
+    for max_hops in (None, 3):
+        hops, routes = finder.batch(sources, targets, max_hops)
+        for i, (source, target) in enumerate(zip(sources.tolist(), targets.tolist())):
+            h = brute_distances(neighbors, source).get(target, -1)
+            if max_hops is not None and h > max_hops:
+                h = -1
+            assert hops[i] == h
+            if h >= 0:
+                assert_valid_path(neighbors, routes[i], source, target, h)
+            else:
+                assert routes[i] is None
@@ -0,0 +1,77 @@
+"""Caché de respuestas y consultas coalescidas del servidor"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from query_server import QueryError, QueryServer
+
+
+def test_cache_byte_budget():
+    handlers = {"texto": lambda params: "x" * int(params["n"])}
+    server = QueryServer(handlers, cache_bytes=1000)
+
+    async def run():
+        for n in (300, 300, 300, 300):
+            await server.resolve("texto", {"n": str(n), "i": str(server.stats["ejecuciones"])},
+                                 "json")
+        assert server.cache.nbytes <= 1000 and len(server.cache) == 3
+        # Más grande que todo el presupuesto: se responde pero no se guarda
+        body, _, _, origin = await server.resolve("texto", {"n": "5000"}, "json")
+        assert origin == "ejecutada" and len(json.loads(body)) == 5000
+        assert server.cache.nbytes <= 1000
+        assert (await server.resolve("texto", {"n": "5000"}, "json"))[3] == "ejecutada"
+        assert (await server.resolve("texto", {"n": "300", "i": "3"}, "json"))[3] == "cache"
+
+    asyncio.run(run())
+    assert server.info()["cache"]["bytes"] == server.cache.nbytes
+
+
+def test_cancelled_leader_does_not_hang_waiters():
+    release = threading.Event()
+    calls = []
+
+    def slow(params):
+        calls.append(1)
+        release.wait(5)
+        return {"llamadas": len(calls)}
+
+    server = QueryServer({"lenta": slow})
+
+    async def run():
+        leader = asyncio.create_task(server.resolve("lenta", {}, "json"))
+        await asyncio.sleep(0.05)
+        waiter = asyncio.create_task(server.resolve("lenta", {}, "json"))
+        await asyncio.sleep(0.05)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        release.set()
+        body, _, _, origin = await asyncio.wait_for(waiter, 5)
+        return json.loads(body), origin
+
+    data, origin = asyncio.run(run())
+    assert origin == "ejecutada" and data["llamadas"] == 2
+    assert not server.inflight
+
+
+def test_errors_reach_waiters():
+    release = threading.Event()
+
+    def failing(params):
+        release.wait(5)
+        raise QueryError(400, "mal")
+
+    server = QueryServer({"falla": failing})
+
+    async def run():
+        tasks = [asyncio.create_task(server.resolve("falla", {}, "json")) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 5)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, QueryError) and r.status == 400 for r in results)
+    assert server.stats["coalescidas"] == 2 and not server.inflight
@@ -0,0 +1,59 @@
+"""Ida y vuelta de los resultados por tablas Arrow y bundles Parquet"""
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from numpy_engine import NumpySocialNetwork  # noqa: E402
+from results_arrow import (ArrowRecords, TABLES, read_bundle, results_to_tables,  # noqa: E402
+                           tables_to_results, write_bundle)
+
+
+def plain(value):
+    """Resultado leído como dicts y listas comunes"""
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (ArrowRecords, list)):
+        return [plain(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize("window", [None, (0, 2**31 - 1)])
+@pytest.mark.parametrize("target", ["bundle", "bundle.zip", "bytes"])
+def test_bundle_round_trip(dataset, tmp_path, window, target):
+    network = NumpySocialNetwork(dataset)
+    data = network.get_parsed_data(include_communities=True, window=window,
+                                   include_analytics=True)
+    tables = network.get_arrow_tables() if window is None else None
+    path = write_bundle(data, tmp_path / target.replace("bytes", "bundle.zip"), tables)
+    source = path.read_bytes() if target == "bytes" else path
+    assert plain(read_bundle(source)) == data
+
+
+def test_tables_round_trip(dataset):
+    network = NumpySocialNetwork(dataset)
+    data = network.get_parsed_data()
+    tables = results_to_tables(data)
+    for name, table in network.get_arrow_tables().items():
+        assert table.equals(tables[name]), name
+    assert set(results_to_tables(data, ["seguidores", "hashtags"])) == \
+        {"personas", "empresas", "hashtags"}
+    result = tables_to_results(tables)
+    for name, (path, _) in TABLES.items():
+        records, expected = result, data
+        for key in path:
+            records, expected = records[key], expected[key]
+        assert plain(records) == expected, name
+
+
+def test_records_view(dataset):
+    data = NumpySocialNetwork(dataset).get_parsed_data()
+    expected = data["reacciones"]
+    records = ArrowRecords(results_to_tables(data)["reacciones"])
+    assert len(records) == len(expected)
+    assert records[0] == expected[0] and records[-1] == expected[-1]
+    assert records[1:7:2] == expected[1:7:2]
+    with pytest.raises(IndexError):
+        records[len(expected)]
+    columns = records.to_columns(["post_id", "likes"])
+    assert columns["likes"].tolist() == [r["likes"] for r in expected]
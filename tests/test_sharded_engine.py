@@ -0,0 +1,39 @@
+"""El motor particionado da los mismos resultados que NumpySocialNetwork"""
+
+import pytest
+
+from numpy_engine import NumpySocialNetwork
+from sharded_engine import ShardedSocialNetwork, build_shards
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_matches_numpy(dataset, dataset_path, tmp_path, workers):
+    # Shards chicos para que cada familia tenga varios
+    build_shards(dataset_path, tmp_path / "shards", users_per_shard=70, posts_per_shard=100)
+    data = ShardedSocialNetwork(tmp_path / "shards", workers=workers).get_parsed_data()
+    expected = NumpySocialNetwork(dataset).get_parsed_data()
+    for key, value in data.items():
+        assert value == expected[key], key
+
+
+def test_single_user_shards(dataset_paths, tmp_path):
+    path = dataset_paths["sample"]
+    build_shards(path, tmp_path / "shards", users_per_shard=1, posts_per_shard=1)
+    network = ShardedSocialNetwork(tmp_path / "shards")
+    expected = NumpySocialNetwork.from_path(path)
+    assert network.query_followers() == expected.query_followers()
+    assert network.query_top_posts() == expected.query_top_posts()
+    assert list(network.post_texts) == list(expected.dataset.post_texts)
+
+
+def test_output_raw_is_built_per_shard(dataset_paths, tmp_path):
+    path = dataset_paths["generado"]
+    build_shards(path, tmp_path / "shards", users_per_shard=70, posts_per_shard=100)
+    network = ShardedSocialNetwork(tmp_path / "shards", workers=2)
+    expected = NumpySocialNetwork.from_path(path).get_parsed_data()
+    assert network.get_parsed_data()["output_raw"] == expected["output_raw"]
+    # Sin juntar todos los textos en un solo StringPool
+    assert network._post_texts is None
+    data = network.get_parsed_data(include_output=False)
+    assert data["output_raw"] == ""
+    assert data["top_posts"] == expected["top_posts"]
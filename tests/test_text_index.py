@@ -0,0 +1,104 @@
+"""TextIndex contra un recorrido de todos los textos tokenizados"""
+
+import math
+
+import numpy as np
+import pytest
+
+from text_index import (BM25_B, BM25_K1, TextIndex, decode_varints, encode_varints,
+                        parse_query, tokenize)
+
+
+def contains(tokens, terms):
+    """Los términos aparecen consecutivos en tokens"""
+    size = len(terms)
+    return any(tuple(tokens[i:i + size]) == terms for i in range(len(tokens) - size + 1))
+
+
+def brute_search(texts, live, query):
+    """(posts que cumplen, puntaje BM25 de cada uno) recorriendo todos los textos"""
+    parsed = parse_query(query)
+    tokens = {doc: tokenize(texts[doc]) for doc in live}
+    docs = [doc for doc in live
+            if any(all(contains(tokens[doc], item) for item in clause) for clause in parsed)]
+    average = sum(len(t) for t in tokens.values()) / max(len(tokens), 1)
+    terms = {term for clause in parsed for item in clause for term in item}
+    scores = {}
+    for doc in docs:
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens[doc]) / max(average, 1e-9))
+        score = 0.0
+        for term in terms:
+            df = sum(term in t for t in tokens.values())
+            tf = tokens[doc].count(term)
+            if df:
+                idf = math.log(1 + (len(tokens) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        scores[doc] = score
+    return docs, scores
+
+
+def sample_queries(texts, rng, count=30):
+    """Palabras sueltas, frases de dos palabras, AND, OR y términos ausentes"""
+    tokenized = [tokenize(text) for text in texts]
+    words = sorted({token for tokens in tokenized for token in tokens})
+    queries = ["hola", "HOLA Mundo", '"hola mundo"', '"mundo hola"', "cuda OR tech",
+               "increíble", "palabraausente", "tech AND hola", '"hola mundo" OR #data']
+    for _ in range(count):
+        a, b = rng.choice(words, size=2).tolist()
+        tokens = tokenized[int(rng.integers(len(texts)))]
+        i = int(rng.integers(max(len(tokens) - 1, 1)))
+        phrase = " ".join(tokens[i:i + 2])
+        queries += [a, f"{a} {b}", f"{a} OR {b}", f'"{phrase}"', f'"{phrase}" OR {b}']
+    return queries
+
+
+def assert_same_search(index, texts, live, query, k=10):
+    expected, scores = brute_search(texts, live, query)
+    assert index.match(parse_query(query)).tolist() == expected, query
+    docs, found, total = index.search(query, k)
+    assert total == len(expected), query
+    ranking = sorted(scores.values(), reverse=True)[:k]
+    assert found.tolist() == pytest.approx(ranking), query
+    assert found.tolist() == pytest.approx([scores[doc] for doc in docs.tolist()]), query
+
+
+def test_search_matches_scan(dataset):
+    texts = list(dataset.post_texts)
+    index = TextIndex.from_texts(texts)
+    rng = np.random.default_rng(0)
+    for query in sample_queries(texts, rng):
+        assert_same_search(index, texts, range(len(texts)), query)
+
+
+def test_incremental_updates_match_scan(dataset):
+    texts = list(dataset.post_texts) + ["Increíble día con CUDA #tech", "hola hola mundo"]
+    half = len(texts) // 2
+    index = TextIndex.from_texts(texts[:half], flush_docs=3)
+    rng = np.random.default_rng(1)
+    live = set(range(half))
+    queries = sample_queries(texts, rng, count=10)
+    # Lotes de tamaño variable (algunos quedan pendientes hasta la búsqueda) y bajas
+    start = half
+    while start < len(texts):
+        stop = min(len(texts), start + int(rng.integers(1, 8)))
+        index.add(range(start, stop), texts[start:stop])
+        live.update(range(start, stop))
+        start = stop
+        for doc in rng.choice(sorted(live), size=min(2, len(live)), replace=False).tolist():
+            assert index.remove(doc)
+            live.discard(doc)
+        for query in rng.choice(queries, size=3).tolist():
+            assert_same_search(index, texts, sorted(live), query)
+    assert not index.remove(sorted(set(range(len(texts))) - live)[0])
+    with pytest.raises(ValueError):
+        index.add([0], ["repetido"])
+
+
+def test_varints_round_trip():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([[0, 1, 127, 128, 16383, 16384, 2**62],
+                             rng.integers(0, 2**40, size=1000)])
+    data, lengths = encode_varints(values)
+    assert data.dtype == np.uint8 and lengths.sum() == len(data)
+    assert decode_varints(data).tolist() == values.tolist()
+    assert decode_varints(encode_varints(np.zeros(0, dtype=np.int64))[0]).tolist() == []
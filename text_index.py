@@ -0,0 +1,496 @@
+"""
+Índice invertido sobre los textos de las publicaciones
+Búsqueda por palabras con AND / OR / "frase exacta" y ranking BM25
+
+    python text_index.py datos_1m 'cuda "hola mundo" OR #tech' -k 10
+
+Postings comprimidos: por término, los ids de post (diferencias con el
+anterior), las frecuencias y las posiciones (diferencias dentro de cada post)
+van codificados como varints (LEB128) en tres buffers de bytes con offsets
+por término, al estilo CSR. Codificación y decodificación son vectorizadas
+
+Actualización incremental: los posts nuevos se acumulan y se indexan como un
+segmento chico; cuando el último segmento crece hasta la mitad del anterior
+se fusionan (como un contador binario: O(log n) segmentos). Los posts
+eliminados quedan como lápidas hasta la próxima fusión
+"""
+
+import re
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from memo import LRUCache
+from numpy_engine import SEARCH_LIMIT, top_k_indices
+from string_pool import join_strings
+
+TOKEN_RE = re.compile(r"\w+")
+# Los textos se tokenizan juntos separados por NUL (no aparece en las cadenas de C)
+SEPARATOR = "\x00"
+JOINED_TOKEN_RE = re.compile(r"\w+|\x00")
+# Minúsculas sin tildes (la ñ se conserva)
+_FOLD = str.maketrans("áéíóúüàèìòùâêîôû", "aeiouuaeiouaeiou")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Postings decodificados que se mantienen en memoria (términos frecuentes)
+DECODED_CACHE = 256
+# Un segmento se fusiona con el anterior si tiene al menos 1/MERGE_FACTOR de sus postings
+MERGE_FACTOR = 2
+# Bits para la posición en las claves (post, posición) de las frases
+POSITION_BITS = 24
+
+Query = List[List[Tuple[str, ...]]]
+
+
+def normalize(text: str) -> str:
+    return text.lower().translate(_FOLD)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+def parse_query(query: str) -> Query:
+    """
+    Consulta -> OR de cláusulas AND; cada ítem es una tupla de términos
+    (un término suelto o una "frase"). AND es implícito entre palabras
+    """
+    clauses: Query = [[]]
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+        if word == "OR":
+            clauses.append([])
+            continue
+        if word == "AND":
+            continue
+        terms = tuple(tokenize(phrase or word))
+        if terms:
+            clauses[-1].append(terms)
+    return [clause for clause in clauses if clause]
+
+
+# ============================================================================
+# VARINTS
+# ============================================================================
+
+def varint_lengths(values: np.ndarray) -> np.ndarray:
+    """Bytes que ocupa cada valor como varint (7 bits por byte)"""
+    lengths = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+    return lengths
+
+
+def encode_varints(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Valores no negativos -> (bytes uint8, bytes por valor)"""
+    values = np.asarray(values).astype(np.uint64)
+    lengths = varint_lengths(values)
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    for k in range(int(lengths.max(initial=0))):
+        has = lengths > k
+        chunk = (values[has] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        chunk |= np.where(lengths[has] > k + 1, np.uint64(0x80), np.uint64(0))
+        out[starts[has] + k] = chunk
+    return out, lengths
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """Bytes uint8 -> valores int64 (inverso de encode_varints)"""
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    last = data < 0x80
+    ends = np.flatnonzero(last)
+    starts = np.r_[0, ends[:-1] + 1]
+    # Posición de cada byte dentro de su varint
+    shift = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    chunks = (data & 0x7F).astype(np.uint64) << (7 * shift).astype(np.uint64)
+    return np.add.reduceat(chunks, starts).astype(np.int64)
+
+
+def _group_starts(*columns: np.ndarray) -> np.ndarray:
+    """Máscara de los elementos que abren un grupo (columnas ya ordenadas)"""
+    starts = np.ones(len(columns[0]), dtype=bool)
+    if len(starts):
+        starts[1:] = False
+        for column in columns:
+            starts[1:] |= column[1:] != column[:-1]
+    return starts
+
+
+def _segmented_cumsum(deltas: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Suma acumulada que se reinicia en cada grupo de counts elementos"""
+    total = np.cumsum(deltas)
+    starts = np.cumsum(counts) - counts
+    base = total[starts] - deltas[starts] if len(deltas) else total[:0]
+    return total - np.repeat(base, counts)
+
+
+# ============================================================================
+# SEGMENTOS
+# ============================================================================
+
+class Postings:
+    """Postings decodificados de un término: posts, frecuencias y posiciones"""
+
+    def __init__(self, docs: np.ndarray, freqs: np.ndarray, positions: np.ndarray):
+        self.docs = docs
+        self.freqs = freqs
+        self.positions = positions
+
+    @classmethod
+    def empty(cls) -> "Postings":
+        empty = np.zeros(0, dtype=np.int64)
+        return cls(empty, empty, empty)
+
+    @classmethod
+    def concat(cls, parts: List["Postings"]) -> "Postings":
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(np.concatenate([p.docs for p in parts]),
+                   np.concatenate([p.freqs for p in parts]),
+                   np.concatenate([p.positions for p in parts]))
+
+    def keys(self, offset: int) -> np.ndarray:
+        """Claves post << POSITION_BITS | (posición - offset) para buscar frases"""
+        positions = self.positions - offset
+        docs = np.repeat(self.docs, self.freqs)
+        valid = positions >= 0
+        return (docs[valid] << POSITION_BITS) | positions[valid]
+
+
+class Segment:
+    """Postings comprimidos de un grupo de posts (inmutable)"""
+
+    def __init__(self, terms: List[str], term_ids: np.ndarray, docs: np.ndarray,
+                 positions: np.ndarray):
+        """
+        terms[i] es el texto del término i; term_ids, docs y positions
+        tienen una entrada por aparición de un término en un post
+        """
+        order = np.lexsort((positions, docs, term_ids))
+        term_ids, docs, positions = term_ids[order], docs[order], positions[order]
+        num_terms = len(terms)
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self.term_list = list(terms)
+
+        # Un posting por par (término, post)
+        new_posting = _group_starts(term_ids, docs)
+        posting_starts = np.flatnonzero(new_posting)
+        freqs = np.diff(np.r_[posting_starts, len(docs)])
+        posting_terms = term_ids[posting_starts]
+        posting_docs = docs[posting_starts]
+        df = np.bincount(posting_terms, minlength=num_terms)
+        self.df = df
+        self.num_postings = len(posting_starts)
+
+        # Diferencias: el primer post de cada término y la primera posición
+        # de cada post van absolutos
+        doc_deltas = posting_docs.copy()
+        first_of_term = _group_starts(posting_terms)
+        doc_deltas[~first_of_term] = np.diff(posting_docs)[~first_of_term[1:]]
+        pos_deltas = positions.copy()
+        pos_deltas[~new_posting] = np.diff(positions)[~new_posting[1:]]
+
+        def pack(values: np.ndarray, per_term: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            data, lengths = encode_varints(values)
+            cumulative = np.r_[0, np.cumsum(lengths)]
+            return data, cumulative[np.r_[0, np.cumsum(per_term)]]
+
+        self.doc_data, self.doc_offsets = pack(doc_deltas, df)
+        self.freq_data, self.freq_offsets = pack(freqs, df)
+        occurrences = np.bincount(term_ids, minlength=num_terms)
+        self.pos_data, self.pos_offsets = pack(pos_deltas, occurrences)
+
+    @classmethod
+    def from_texts(cls, doc_ids: np.ndarray, texts: Sequence[str]) -> Tuple["Segment", np.ndarray]:
+        """Segmento de un grupo de posts y la cantidad de términos de cada uno"""
+        # Una sola pasada de regex sobre todos los textos; el separador marca los posts
+        tokens = JOINED_TOKEN_RE.findall(normalize(join_strings(texts, SEPARATOR)))
+        vocabulary = {token: i for i, token in enumerate(dict.fromkeys(tokens))}
+        term_ids = np.fromiter(map(vocabulary.__getitem__, tokens), dtype=np.int64,
+                               count=len(tokens))
+        separator = vocabulary.pop(SEPARATOR, -1)
+        is_separator = term_ids == separator
+        doc_index = np.cumsum(is_separator)[~is_separator]
+        term_ids = term_ids[~is_separator]
+        if separator >= 0:
+            term_ids -= term_ids > separator
+        lengths = np.bincount(doc_index, minlength=len(texts))
+        docs = np.asarray(doc_ids, dtype=np.int64)[doc_index]
+        positions = np.arange(len(docs)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return cls(list(vocabulary), term_ids, docs, positions), lengths
+
+    def postings(self, term: str) -> Postings:
+        i = self.terms.get(term)
+        if i is None:
+            return Postings.empty()
+        docs = np.cumsum(decode_varints(self.doc_data[self.doc_offsets[i]:self.doc_offsets[i + 1]]))
+        freqs = decode_varints(self.freq_data[self.freq_offsets[i]:self.freq_offsets[i + 1]])
+        deltas = decode_varints(self.pos_data[self.pos_offsets[i]:self.pos_offsets[i + 1]])
+        return Postings(docs, freqs, _segmented_cumsum(deltas, freqs))
+
+    def export(self) -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+        """(términos, term_ids, docs, posiciones) de todas las apariciones"""
+        freqs = decode_varints(self.freq_data)
+        docs = _segmented_cumsum(decode_varints(self.doc_data), self.df)
+        positions = _segmented_cumsum(decode_varints(self.pos_data), freqs)
+        term_ids = np.repeat(np.arange(len(self.term_list)), self.df)
+        return self.term_list, np.repeat(term_ids, freqs), np.repeat(docs, freqs), positions
+
+    @property
+    def nbytes(self) -> int:
+        return (self.doc_data.nbytes + self.freq_data.nbytes + self.pos_data.nbytes
+                + self.doc_offsets.nbytes + self.freq_offsets.nbytes + self.pos_offsets.nbytes)
+
+
+# ============================================================================
+# ÍNDICE
+# ============================================================================
+
+def _intersect(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Intersección de dos arrays ordenados sin repetidos (busca el menor en el mayor)"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(a) == 0:
+        return a
+    position = np.minimum(np.searchsorted(b, a), len(b) - 1)
+    return a[b[position] == a]
+
+
+class TextIndex:
+    """
+    Índice invertido segmentado con búsqueda booleana y BM25
+    Los ids de post que se agregan deben ser mayores que los ya indexados
+    """
+
+    def __init__(self, flush_docs: int = 4096):
+        self.flush_docs = flush_docs
+        self.segments: List[Segment] = []
+        self._lengths = np.zeros(16, dtype=np.int64)
+        self._deleted = np.zeros(16, dtype=bool)
+        self.size = 0              # ids de post reservados (máximo id + 1)
+        self.num_docs = 0          # posts indexados y no eliminados
+        self.total_length = 0      # términos de esos posts
+        self._pending_ids: List[int] = []
+        self._pending_texts: List[str] = []
+        self._decoded = LRUCache(DECODED_CACHE)
+
+    @classmethod
+    def from_texts(cls, texts: Sequence[str], flush_docs: int = 4096) -> "TextIndex":
+        """Índice de los posts 0..n-1 construido en un solo segmento"""
+        index = cls(flush_docs)
+        index._add_segment(np.arange(len(texts), dtype=np.int64), texts)
+        return index
+
+    # --- Actualización -----------------------------------------------------
+
+    def _ensure(self, size: int):
+        if size > len(self._lengths):
+            capacity = max(size, 2 * len(self._lengths))
+            self._lengths = np.concatenate([self._lengths,
+                                            np.zeros(capacity - len(self._lengths), np.int64)])
+            self._deleted = np.concatenate([self._deleted,
+                                            np.zeros(capacity - len(self._deleted), bool)])
+        self.size = max(self.size, size)
+
+    def _add_segment(self, doc_ids: np.ndarray, texts: Sequence[str]):
+        segment, lengths = Segment.from_texts(doc_ids, texts)
+        if len(doc_ids):
+            self._ensure(int(doc_ids.max()) + 1)
+            self._lengths[doc_ids] = lengths
+            self.num_docs += len(doc_ids)
+            self.total_length += int(lengths.sum())
+        self.segments.append(segment)
+        self._decoded.clear()
+        while (len(self.segments) > 1 and MERGE_FACTOR * self.segments[-1].num_postings
+               >= self.segments[-2].num_postings):
+            self._merge_last()
+
+    def _merge_last(self):
+        """Fusiona los dos últimos segmentos descartando los posts eliminados"""
+        vocabulary: Dict[str, int] = {}
+        parts = []
+        for segment in self.segments[-2:]:
+            terms, term_ids, docs, positions = segment.export()
+            remap = np.array([vocabulary.setdefault(term, len(vocabulary)) for term in terms],
+                             dtype=np.int64)
+            keep = ~self._deleted[docs]
+            parts.append((remap[term_ids[keep]], docs[keep], positions[keep]))
+        term_ids, docs, positions = (np.concatenate(column) for column in zip(*parts))
+        used = np.zeros(len(vocabulary), dtype=bool)
+        used[term_ids] = True
+        terms = list(vocabulary)
+        if not used.all():
+            # Términos que solo aparecían en posts eliminados
+            remap = np.cumsum(used) - 1
+            terms = [term for term, keep in zip(terms, used.tolist()) if keep]
+            term_ids = remap[term_ids]
+        self.segments[-2:] = [Segment(terms, term_ids, docs, positions)]
+
+    def add(self, doc_ids: Sequence[int], texts: Sequence[str]):
+        """Agrega posts nuevos; se indexan al juntar flush_docs o al buscar"""
+        doc_ids = [int(doc) for doc in doc_ids]
+        last = self._pending_ids[-1] if self._pending_ids else self.size - 1
+        if doc_ids and (doc_ids[0] <= last or any(b <= a for a, b in zip(doc_ids, doc_ids[1:]))):
+            raise ValueError("Los ids de post nuevos deben ser crecientes y mayores que los indexados")
+        self._pending_ids.extend(doc_ids)
+        self._pending_texts.extend(texts)
+        if len(self._pending_ids) >= self.flush_docs:
+            self.flush()
+
+    def flush(self):
+        if self._pending_ids:
+            ids, texts = np.array(self._pending_ids, dtype=np.int64), self._pending_texts
+            self._pending_ids, self._pending_texts = [], []
+            self._add_segment(ids, texts)
+
+    def remove(self, doc_id: int) -> bool:
+        """Marca un post como eliminado (sus postings se descartan al fusionar)"""
+        self.flush()
+        if not 0 <= doc_id < self.size or self._deleted[doc_id]:
+            return False
+        self._deleted[doc_id] = True
+        self.num_docs -= 1
+        self.total_length -= int(self._lengths[doc_id])
+        return True
+
+    # --- Consulta ----------------------------------------------------------
+
+    def postings(self, term: str) -> Postings:
+        """Postings de un término en todos los segmentos (cacheados decodificados)"""
+        self.flush()
+        cached = self._decoded.get(term)
+        if cached is None:
+            cached = Postings.concat([p for p in (s.postings(term) for s in self.segments)
+                                      if len(p.docs)])
+            self._decoded.put(term, cached)
+        return cached
+
+    def phrase_docs(self, terms: Tuple[str, ...]) -> np.ndarray:
+        """Posts que contienen los términos en posiciones consecutivas"""
+        if len(terms) == 1:
+            return self.postings(terms[0]).docs
+        lists = [self.postings(term) for term in terms]
+        # Primero los términos más raros: las claves se reducen antes
+        order = sorted(range(len(terms)), key=lambda j: len(lists[j].docs))
+        candidates = lists[order[0]].docs
+        for j in order[1:]:
+            candidates = _intersect(candidates, lists[j].docs)
+        if len(candidates) == 0:
+            return candidates
+        keys = None
+        for j in order:
+            postings = lists[j]
+            # Solo las posiciones de los posts candidatos
+            position = np.minimum(np.searchsorted(candidates, postings.docs), len(candidates) - 1)
+            inside = candidates[position] == postings.docs
+            subset = Postings(postings.docs[inside], postings.freqs[inside],
+                              postings.positions[np.repeat(inside, postings.freqs)])
+            term_keys = subset.keys(j)
+            keys = term_keys if keys is None else _intersect(keys, term_keys)
+        docs = keys >> POSITION_BITS
+        return docs[_group_starts(docs)]
+
+    def match(self, query: Query) -> np.ndarray:
+        """Posts (ordenados, sin eliminados) que cumplen alguna cláusula"""
+        matched = np.zeros(0, dtype=np.int64)
+        for clause in query:
+            items = sorted((self.phrase_docs(item) for item in clause), key=len)
+            docs = items[0]
+            for other in items[1:]:
+                docs = _intersect(docs, other)
+            if len(matched):
+                # Unión de dos listas ordenadas sin repetidos
+                docs = np.sort(np.concatenate([matched, docs]), kind="stable")
+                docs = docs[_group_starts(docs)]
+            matched = docs
+        return matched[~self._deleted[matched]]
+
+    def bm25(self, terms: Sequence[str], docs: np.ndarray) -> np.ndarray:
+        scores = np.zeros(len(docs))
+        if self.num_docs == 0 or len(docs) == 0:
+            return scores
+        average = self.total_length / self.num_docs
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[docs] / max(average, 1e-9))
+        for term in set(terms):
+            postings = self.postings(term)
+            live = ~self._deleted[postings.docs]
+            if not live.all():
+                # Las lápidas siguen en los postings hasta la fusión: no cuentan para df
+                postings = Postings(postings.docs[live], postings.freqs[live],
+                                    postings.positions[np.repeat(live, postings.freqs)])
+            if len(postings.docs) == 0:
+                continue
+            df = len(postings.docs)
+            idf = np.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+            if df == len(docs) and np.array_equal(postings.docs, docs):
+                tf = postings.freqs
+            else:
+                position = np.minimum(np.searchsorted(postings.docs, docs), df - 1)
+                tf = np.where(postings.docs[position] == docs, postings.freqs[position], 0)
+            scores += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, k: int = SEARCH_LIMIT) -> Tuple[np.ndarray, np.ndarray, int]:
+        """
+        Posts que cumplen la consulta ordenados por BM25
+        Returns: (ids de los k mejores, puntajes, total de coincidencias)
+        """
+        parsed = parse_query(query)
+        docs = self.match(parsed)
+        terms = [term for clause in parsed for item in clause for term in item]
+        scores = self.bm25(terms, docs)
+        top = top_k_indices(scores, k, largest=True)
+        return docs[top], scores[top], len(docs)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment.nbytes for segment in self.segments)
+
+
+def search_results(index: TextIndex, query: str, k: int, texts: Sequence[str],
+                   author: Callable[[int], Tuple[str, str]], likes: np.ndarray,
+                   dislikes: np.ndarray) -> Dict:
+    """
+    Resultado de una búsqueda con texto, autor y reacciones de cada post
+    author(post) -> (nombre, "persona" | "empresa")
+    """
+    docs, scores, total = index.search(query, k)
+    results = []
+    for post, score in zip(docs.tolist(), scores.tolist()):
+        name, kind = author(post)
+        results.append({"post_id": post, "texto": texts[post], "autor": name,
+                         "tipo_autor": kind, "likes": int(likes[post]),
+                         "dislikes": int(dislikes[post]), "puntaje": round(score, 4)})
+    return {"consulta": query, "total": total, "resultados": results}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import time
+
+    from numpy_engine import NumpySocialNetwork
+    from social_dataset import load_dataset, sample_dataset
+
+    parser = argparse.ArgumentParser(description="Búsqueda de texto en las publicaciones")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("query", help='Consulta: palabras (AND), OR y "frases"')
+    parser.add_argument("-k", type=int, default=SEARCH_LIMIT, help="Resultados a mostrar")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset, mmap=True) if args.dataset else sample_dataset()
+    engine = NumpySocialNetwork(dataset)
+    start = time.perf_counter()
+    index = engine.text_index()
+    built = time.perf_counter()
+    results = engine.query_search(args.query, args.k)
+    end = time.perf_counter()
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"Índice: {built - start:.2f} s ({index.nbytes / 1e6:.1f} MB); "
+          f"búsqueda: {(end - built) * 1000:.1f} ms")
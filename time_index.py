@@ -0,0 +1,162 @@
+"""
+Índice temporal por bloques
+Posts, reacciones y seguimientos pueden llevar marca de tiempo (segundos
+Unix, int64). Cada tabla se ordena una vez por tiempo (orden columnar) y un
+índice de bloques guarda dónde empieza cada intervalo de `bucket` segundos.
+Una ventana [desde, hasta) ubica sus bloques por aritmética y solo busca
+dentro de los dos bloques de los extremos: las filas de la ventana quedan
+contiguas, así que el costo depende de la ventana y no de toda la historia
+
+    python time_index.py datos_1m --from=-24h
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+# Intervalo de los bloques del índice (una hora)
+DEFAULT_BUCKET = 3600
+# Límites de una ventana abierta
+MIN_TIME = -(2 ** 62)
+MAX_TIME = 2 ** 62
+
+Window = Tuple[int, int]
+
+_RELATIVE_RE = re.compile(r"^-(\d+(?:\.\d+)?)([smhdw])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_time(value: Union[int, str], now: int) -> int:
+    """
+    Convierte un instante a segundos Unix: entero, fecha ISO 8601 (UTC si no
+    indica zona), "ahora" o un desplazamiento hacia atrás desde now ("-24h",
+    "-30m", "-7d", "-2w")
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    text = str(value).strip().lower()
+    if text == "ahora":
+        return int(now)
+    if re.fullmatch(r"-?\d+", text):
+        return int(text)
+    match = _RELATIVE_RE.match(text)
+    if match:
+        return int(now) - int(float(match.group(1)) * _UNITS[match.group(2)])
+    try:
+        moment = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"Instante inválido '{value}': usar segundos Unix, ISO 8601 "
+                         "o un desplazamiento como -24h") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def parse_window(start: Optional[Union[int, str]], end: Optional[Union[int, str]],
+                 now: int) -> Window:
+    """Ventana [desde, hasta); un extremo omitido queda abierto"""
+    window = (MIN_TIME if start is None else parse_time(start, now),
+              MAX_TIME if end is None else parse_time(end, now))
+    if window[0] > window[1]:
+        raise ValueError("La ventana termina antes de empezar")
+    return window
+
+
+def format_time(value: int) -> str:
+    """Instante en ISO 8601 UTC (los extremos abiertos quedan vacíos)"""
+    if value <= MIN_TIME or value >= MAX_TIME:
+        return ""
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+class TimeIndex:
+    """
+    Orden temporal de una tabla con un índice de bloques por intervalo
+
+    - times: marcas ordenadas
+    - order: fila original de cada posición (None si la tabla ya venía ordenada)
+    - offsets[b]: primera posición del bloque b (intervalo
+      [origin + b * bucket, origin + (b + 1) * bucket))
+    """
+
+    def __init__(self, times: np.ndarray, bucket: int = DEFAULT_BUCKET):
+        times = np.asarray(times, dtype=np.int64)
+        self.order: Optional[np.ndarray] = None
+        if len(times) > 1 and (times[1:] < times[:-1]).any():
+            self.order = np.argsort(times, kind="stable")
+            times = times[self.order]
+        self.times = times
+        self.bucket = int(bucket)
+        self.origin = int(times[0]) // self.bucket * self.bucket if len(times) else 0
+        num_buckets = (int(times[-1]) - self.origin) // self.bucket + 1 if len(times) else 0
+        bounds = self.origin + np.arange(num_buckets + 1, dtype=np.int64) * self.bucket
+        self.offsets = np.searchsorted(times, bounds)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def num_buckets(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def latest(self) -> Optional[int]:
+        return int(self.times[-1]) if len(self.times) else None
+
+    def sort(self, values: np.ndarray) -> np.ndarray:
+        """Filas de una tabla alineada con las marcas, en orden temporal"""
+        values = np.asarray(values)
+        return values if self.order is None else values[self.order]
+
+    def position(self, moment: int) -> int:
+        """Primera posición con marca >= moment (busca solo dentro de su bloque)"""
+        block = (int(moment) - self.origin) // self.bucket
+        if block < 0:
+            return 0
+        if block >= self.num_buckets:
+            return len(self.times)
+        lo, hi = int(self.offsets[block]), int(self.offsets[block + 1])
+        return lo + int(np.searchsorted(self.times[lo:hi], moment))
+
+    def span(self, window: Window) -> Tuple[int, int]:
+        """Posiciones [lo, hi) de la ventana dentro del orden temporal"""
+        lo = self.position(window[0])
+        return lo, max(lo, self.position(window[1]))
+
+    def rows(self, window: Window) -> np.ndarray:
+        """Filas originales de la ventana, en orden temporal"""
+        lo, hi = self.span(window)
+        if self.order is None:
+            return np.arange(lo, hi, dtype=np.int64)
+        return self.order[lo:hi]
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from social_dataset import load_dataset, sample_dataset
+
+    parser = argparse.ArgumentParser(description="Filas por ventana de tiempo de un dataset")
+    parser.add_argument("dataset", nargs="?", help="Directorio del dataset (por defecto, ejemplo)")
+    parser.add_argument("--from", dest="start", help="Inicio (Unix, ISO 8601 o relativo: --from=-24h)")
+    parser.add_argument("--to", dest="end", help="Fin exclusivo (por defecto, abierto)")
+    parser.add_argument("--bucket", type=int, default=DEFAULT_BUCKET,
+                        help="Segundos por bloque del índice")
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset, mmap=True) if args.dataset else sample_dataset()
+    indexes = {name: TimeIndex(times, args.bucket)
+               for name, times in dataset.timed_tables().items()}
+    if not indexes:
+        parser.error("El dataset no tiene marcas de tiempo")
+    now = max(index.latest for index in indexes.values() if len(index))
+    window = parse_window(args.start, args.end, now)
+    result = {"desde": format_time(window[0]), "hasta": format_time(window[1]), "filas": {}}
+    for name, index in indexes.items():
+        lo, hi = index.span(window)
+        result["filas"][name] = {"ventana": hi - lo, "total": len(index),
+                                 "bloques": index.num_buckets}
+    print(json.dumps(result, indent=2, ensure_ascii=False))